@@ -5,14 +5,34 @@ This module provides the ConnectionManager class that handles WebSocket connecti
 for real-time market data streaming including order books and candles.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import asyncio
 import json
+import time
+import ccxt
 from fastapi import WebSocket, WebSocketDisconnect
 from app.services.exchange_service import exchange_service
 from app.services.chart_data_service import chart_data_service
 from app.services.orderbook_manager import orderbook_manager
+from app.services.market_capture_service import (
+    market_capture_service,
+    STREAM_CANDLES,
+    STREAM_ORDERBOOK,
+    STREAM_ORDERBOOK_SNAPSHOT,
+    STREAM_TRADES,
+)
+from app.services.memory_accounting_service import memory_accounting_service
 from app.services.trade_service import trade_service
+from app.services.formatting_service import formatting_service
+from app.services.volume_profile_service import volume_profile_service
+from app.services.orderbook_sync_service import (
+    orderbook_sync_service,
+    SEQ_OK,
+    SEQ_GAP,
+    SEQ_OUT_OF_ORDER,
+    STREAM_RETRY_DELAY,
+    STREAM_MAX_RETRY_DELAY,
+)
 from app.models.orderbook import OrderBookSnapshot, OrderBookLevel
 from app.core.logging_config import get_logger
 
@@ -30,6 +50,13 @@ class ConnectionManager:
         self.symbol_active_streams: Dict[str, set[str]] = {}
         # Stores the type of each stream_key
         self.stream_key_types: Dict[str, str] = {}
+        # id() of WebSockets in raw-numbers mode (client-side formatting)
+        self.raw_connections: set[int] = set()
+        # Orderbook streams kept running without subscribers while the
+        # OrderBook Manager keeps their book warm
+        self.warm_streams: set[str] = set()
+        # Per-symbol trade buffers of running trades streams (memory accounting)
+        self.trade_buffers: Dict[str, tuple] = {}
 
     async def connect(
         self,
@@ -37,10 +64,14 @@ class ConnectionManager:
         stream_key: str,
         stream_type: str = "orderbook",
         display_symbol: str = None,
+        raw: bool = False,
     ):
         """Accept a new WebSocket connection for a stream."""
         logger.info(
-            f"Connecting WebSocket for stream {stream_key} (type: {stream_type})")
+            f"Connecting WebSocket for stream {stream_key} (type: {stream_type}, raw: {raw})")
+
+        if raw:
+            self.raw_connections.add(id(websocket))
 
         # Store display symbol for response formatting
         if display_symbol and stream_key not in getattr(
@@ -74,14 +105,59 @@ class ConnectionManager:
 
         # Start streaming task if this is the first connection for this stream
         if len(self.active_connections[stream_key]) == 1:
+            if self._reuse_warm_stream(stream_key):
+                logger.info(f"Reusing warm streaming task for {stream_key}")
+                return
             logger.info(f"Starting streaming task for {stream_key}")
             await self._start_streaming(stream_key, stream_type)
 
+    def _reuse_warm_stream(self, stream_key: str) -> bool:
+        """Take a warm stream back into service; False if none is running."""
+        if stream_key not in self.warm_streams:
+            return False
+        self.warm_streams.discard(stream_key)
+        task = self.streaming_tasks.get(stream_key)
+        if task is None or task.done():
+            # Reason: The stream ended on its own while warm; start afresh.
+            self.streaming_tasks.pop(stream_key, None)
+            return False
+        return True
+
+    def _keep_stream_warm(self, stream_key: str) -> bool:
+        """Keep an orderbook stream running without subscribers if its book is warm."""
+        if (self.stream_key_types.get(stream_key) == "orderbook"
+                and stream_key in self.streaming_tasks
+                and orderbook_manager.is_warm(stream_key)):
+            self.warm_streams.add(stream_key)
+            return True
+        return False
+
+    def release_warm_stream(self, symbol: str) -> None:
+        """
+        Stop a warm orderbook stream once the OrderBook Manager evicts its book.
+
+        Registered as an OrderBook Manager eviction listener.
+
+        Args:
+            symbol: Symbol whose order book was removed
+        """
+        if symbol not in self.warm_streams:
+            return
+        self.warm_streams.discard(symbol)
+        if not self.active_connections.get(symbol):
+            logger.info(f"Stopping warm orderbook stream for {symbol} (book evicted)")
+            self._stop_streaming(symbol)
+
+    def _orderbook_stream_active(self, symbol: str) -> bool:
+        """Whether an orderbook stream has subscribers or is kept warm."""
+        return bool(self.active_connections.get(symbol)) or symbol in self.warm_streams
+
     def disconnect(self, websocket: WebSocket, stream_key: str):
         """Remove a WebSocket connection."""
         if stream_key in self.active_connections:
             if websocket in self.active_connections[stream_key]:
                 self.active_connections[stream_key].remove(websocket)
+                self.raw_connections.discard(id(websocket))
                 logger.debug(
                     f"WebSocket disconnected from stream {stream_key}. Remaining connections: {
                         len(
@@ -90,11 +166,15 @@ class ConnectionManager:
             # Check if there are any remaining connections for this specific
             # stream_key
             if not self.active_connections[stream_key]:
-                logger.debug(
-                    f"No more connections for stream_key: {stream_key}. Stopping its specific streaming task.")
-                self._stop_streaming(
-                    stream_key
-                )  # Cancels task and removes from self.streaming_tasks
+                if self._keep_stream_warm(stream_key):
+                    logger.debug(
+                        f"No more connections for stream_key: {stream_key}. Keeping its streaming task warm.")
+                else:
+                    logger.debug(
+                        f"No more connections for stream_key: {stream_key}. Stopping its specific streaming task.")
+                    self._stop_streaming(
+                        stream_key
+                    )  # Cancels task and removes from self.streaming_tasks
 
                 retrieved_stream_type = self.stream_key_types.get(stream_key)
                 del self.active_connections[stream_key]
@@ -131,6 +211,8 @@ class ConnectionManager:
                         stopped_task_keys_for_base_symbol = []
 
                         for task_key_iter in tasks_to_check_for_stop:
+                            if task_key_iter in self.warm_streams:
+                                continue  # Stopped when its book is evicted
                             # We need the type of task_key_iter to determine
                             # its base_symbol
                             iter_task_type = self.stream_key_types.get(
@@ -218,15 +300,40 @@ class ConnectionManager:
         )
         return None  # Default for unknown types or if logic above fails
 
-    async def broadcast_to_stream(self, stream_key: str, data: dict):
-        """Broadcast data to all connections for a specific stream."""
+    def is_raw(self, websocket: WebSocket) -> bool:
+        """Whether a connection is in raw-numbers mode."""
+        return id(websocket) in self.raw_connections
+
+    def has_formatted_connections(self, stream_key: str) -> bool:
+        """Whether any connection on a stream still needs server-side formatting."""
+        return any(id(connection) not in self.raw_connections
+                   for connection in self.active_connections.get(stream_key, ()))
+
+    async def broadcast_to_stream(self, stream_key: str, data: dict,
+                                  raw_data: dict = None):
+        """
+        Broadcast data to all connections for a specific stream.
+
+        Each payload is serialized at most once and the same text is sent to
+        every connection. When raw_data is given, raw-mode connections
+        receive it instead of data.
+        """
         if stream_key in self.active_connections:
             disconnected = []
+            text = None
+            raw_text = None
             # Iterate over a copy of the list of connections, as
             # self.disconnect can modify it
             for connection in list(self.active_connections[stream_key]):
                 try:
-                    await connection.send_text(json.dumps(data))
+                    if raw_data is not None and id(connection) in self.raw_connections:
+                        if raw_text is None:
+                            raw_text = json.dumps(raw_data)
+                        await connection.send_text(raw_text)
+                    else:
+                        if text is None:
+                            text = json.dumps(data)
+                        await connection.send_text(text)
                 except WebSocketDisconnect:
                     logger.info(
                         f"WebSocketDisconnect detected for a connection on stream {stream_key}. Marking for removal.")
@@ -316,16 +423,22 @@ class ConnectionManager:
     # Enhanced orderbook connection with aggregation support
     async def connect_orderbook(
         self, websocket: WebSocket, symbol: str, display_symbol: str = None,
-        limit: int = 20, rounding: float = 0.01
+        limit: int = 20, rounding: float = 0.01, raw: bool = False
     ):
-        """Accept a new WebSocket connection for orderbook with aggregation parameters."""
+        """
+        Accept a new WebSocket connection for orderbook with aggregation parameters.
+
+        Raw-mode connections first receive a format_descriptor message and then
+        orderbook updates with [price, amount, cumulative] levels and no
+        formatted strings.
+        """
         # Generate unique connection ID
         connection_id = f"{symbol}:{id(websocket)}"
 
         # Register connection with OrderBook Manager
         try:
             await orderbook_manager.register_connection(
-                connection_id, symbol, limit, rounding
+                connection_id, symbol, limit, rounding, raw=raw
             )
             logger.info(
                 f"Registered orderbook connection {connection_id} with limit={limit}, rounding={rounding}")
@@ -345,10 +458,30 @@ class ConnectionManager:
             'display_symbol': display_symbol,
             'limit': limit,
             'rounding': rounding,
+            'raw': raw,
             'type': 'orderbook'
         }
 
-        await self.connect(websocket, symbol, "orderbook", display_symbol)
+        if raw:
+            # Reason: the descriptor must arrive before the first raw update
+            await websocket.send_text(json.dumps({
+                "type": "format_descriptor",
+                "symbol": display_symbol or symbol,
+                "rounding": rounding,
+                "descriptor": await self._orderbook_format_descriptor(symbol, rounding),
+            }))
+
+        warm = symbol in self.warm_streams
+        await self.connect(websocket, symbol, "orderbook", display_symbol, raw=raw)
+        if warm:
+            # Reason: A warm book is already current; send it now instead of
+            # waiting for the next exchange update.
+            await self._broadcast_aggregated_orderbook(connection_id)
+
+    async def _orderbook_format_descriptor(self, symbol: str, rounding: float) -> dict:
+        """Build the formatting descriptor for a raw-mode orderbook connection."""
+        symbol_data = await orderbook_manager.get_symbol_data(symbol)
+        return formatting_service.get_format_descriptor(symbol_data, rounding)
 
     async def disconnect_orderbook(self, websocket: WebSocket, symbol: str):
         """Remove a WebSocket connection for orderbook with proper cleanup."""
@@ -414,6 +547,10 @@ class ConnectionManager:
                         "rounding": rounding,
                         "success": True
                     }
+                    if rounding is not None and self.is_raw(websocket):
+                        # Price decimals depend on the rounding
+                        ack_message["descriptor"] = await self._orderbook_format_descriptor(
+                            symbol, rounding)
                     await websocket.send_text(json.dumps(ack_message))
 
                     # Broadcast updated aggregated data
@@ -471,6 +608,13 @@ class ConnectionManager:
                     asks = aggregated_data.get('asks', [])
 
                     if len(bids) > 0 and len(asks) > 0:
+                        if metadata.get('raw'):
+                            # Compact [price, amount, cumulative] levels, formatted client-side
+                            bids = [[level['price'], level['amount'], level['cumulative']]
+                                    for level in bids]
+                            asks = [[level['price'], level['amount'], level['cumulative']]
+                                    for level in asks]
+
                         # Format for frontend
                         formatted_data = {
                             "type": "orderbook_update",
@@ -483,6 +627,14 @@ class ConnectionManager:
                             "market_depth_info": aggregated_data.get('market_depth_info', {}),
                             "aggregated": True  # Indicate this is pre-aggregated data
                         }
+                        if metadata.get('raw'):
+                            formatted_data["raw"] = True
+                        if aggregated_data.get('depth'):
+                            # Liquidity bands and sweep costs (depth index)
+                            formatted_data["depth"] = aggregated_data['depth']
+                        if aggregated_data.get('walls'):
+                            # Largest resting levels of the whole book
+                            formatted_data["walls"] = aggregated_data['walls']
 
                         await websocket.send_text(json.dumps(formatted_data))
                     else:
@@ -517,87 +669,73 @@ class ConnectionManager:
                 await self._stream_mock_orderbook_aggregated(symbol)
                 return
 
-            try:
-                # Fetch initial orderbook data with large limit for aggregation
-                logger.info(f"Fetching initial orderbook data for {symbol}")
-                initial_orderbook_data = await exchange_pro.fetch_order_book(symbol, limit=1000)
-
-                # Convert to OrderBook model format
-                bid_levels = [
-                    OrderBookLevel(price=float(bid[0]), amount=float(bid[1]))
-                    for bid in initial_orderbook_data["bids"]
-                    if float(bid[1]) > 0  # Filter zero amounts
-                ]
-
-                ask_levels = [
-                    OrderBookLevel(price=float(ask[0]), amount=float(ask[1]))
-                    for ask in initial_orderbook_data["asks"]
-                    if float(ask[1]) > 0  # Filter zero amounts
-                ]
-
-                # Create initial snapshot
-                import time
-                initial_snapshot = OrderBookSnapshot(
-                    symbol=symbol,
-                    bids=bid_levels,
-                    asks=ask_levels,
-                    timestamp=initial_orderbook_data.get("timestamp", int(time.time() * 1000))
-                )
-
-                # Update orderbook with initial data
-                await orderbook.update_snapshot(initial_snapshot)
-
-                # Immediately broadcast aggregated initial data to all connections
-                # This will apply each connection's specific limit and rounding
-                # parameters
+            if market_capture_service.enabled:
+                # Capture book updates as the level changes ccxt applies
+                market_capture_service.track_order_book_changes(exchange_pro)
+
+            # Reason: A recent book saved by the last shutdown replaces our
+            # initial REST snapshot and is served at once; updates older than
+            # its saved update id are skipped as stale. ccxt still fetches its
+            # own depth snapshot when watch_order_book subscribes, since the
+            # diff stream cannot resume from a saved id, so the first streamed
+            # book arrives after that request and brings the book current.
+            saved = await orderbook_manager.restore_orderbook(symbol, orderbook)
+            if saved is not None:
+                orderbook_sync_service.mark_synced(symbol, saved.nonce)
                 await self._broadcast_to_all_symbol_connections(symbol)
-                logger.info(
-                    f"Initial orderbook populated and sent for {symbol} with {
-                        len(bid_levels)} bids and {
-                        len(ask_levels)} asks")
+            else:
+                try:
+                    # Fetch initial orderbook data with large limit for aggregation
+                    logger.info(f"Fetching initial orderbook data for {symbol}")
+                    initial_orderbook_data = await exchange_pro.fetch_order_book(symbol, limit=1000)
+                    market_capture_service.record(
+                        STREAM_ORDERBOOK_SNAPSHOT, symbol, initial_orderbook_data)
+                    initial_snapshot = self._snapshot_from_ccxt(symbol, initial_orderbook_data)
+
+                    # Update orderbook with initial data
+                    await orderbook.update_snapshot(initial_snapshot)
+                    orderbook_sync_service.mark_synced(
+                        symbol, initial_orderbook_data.get("nonce"))
+
+                    # Immediately broadcast aggregated initial data to all connections
+                    # This will apply each connection's specific limit and rounding
+                    # parameters
+                    await self._broadcast_to_all_symbol_connections(symbol)
+                    logger.info(
+                        f"Initial orderbook populated and sent for {symbol} with {
+                            len(initial_snapshot.bids)} bids and {
+                            len(initial_snapshot.asks)} asks")
 
-            except Exception as e:
-                logger.error(
-                    f"Failed to fetch initial orderbook for {symbol}: {
-                        str(e)}")
-                logger.info(
-                    f"Falling back to mock orderbook data for {symbol}")
-                await self._stream_mock_orderbook_aggregated(symbol)
-                return
+                except Exception as e:
+                    logger.error(
+                        f"Failed to fetch initial orderbook for {symbol}: {
+                            str(e)}")
+                    logger.info(
+                        f"Falling back to mock orderbook data for {symbol}")
+                    await self._stream_mock_orderbook_aggregated(symbol)
+                    return
 
-            while symbol in self.active_connections and self.active_connections[symbol]:
+            retry_delay = STREAM_RETRY_DELAY
+            while self._orderbook_stream_active(symbol):
                 try:
                     # Watch order book updates with large limit for aggregation
                     order_book_data = await exchange_pro.watch_order_book(symbol)
-
-                    # Convert to OrderBook model format
-                    bid_levels = [
-                        OrderBookLevel(
-                            price=float(
-                                bid[0]), amount=float(
-                                bid[1]))
-                        for bid in order_book_data["bids"]
-                        if float(bid[1]) > 0  # Filter zero amounts
-                    ]
-
-                    ask_levels = [
-                        OrderBookLevel(
-                            price=float(
-                                ask[0]), amount=float(
-                                ask[1]))
-                        for ask in order_book_data["asks"]
-                        if float(ask[1]) > 0  # Filter zero amounts
-                    ]
+                    market_capture_service.record(STREAM_ORDERBOOK, symbol, order_book_data)
+
+                    sequence = orderbook_sync_service.check_update(
+                        symbol, order_book_data.get("nonce"))
+                    if sequence == SEQ_OUT_OF_ORDER:
+                        self._request_orderbook_resync(
+                            symbol, orderbook, exchange_pro, sequence)
+                        continue
+                    if sequence != SEQ_OK or orderbook_sync_service.is_resyncing(symbol):
+                        # Keep serving the last consistent version
+                        continue
 
                     # Create snapshot and update OrderBook
-                    snapshot = OrderBookSnapshot(
-                        symbol=symbol,
-                        bids=bid_levels,
-                        asks=ask_levels,
-                        timestamp=order_book_data["timestamp"]
-                    )
-
-                    await orderbook.update_snapshot(snapshot)
+                    await orderbook.update_snapshot(
+                        self._snapshot_from_ccxt(symbol, order_book_data))
+                    retry_delay = STREAM_RETRY_DELAY
 
                     # Broadcast aggregated data to all connections for this
                     # symbol
@@ -614,14 +752,27 @@ class ConnectionManager:
                             f"Error processing order book update in trading engine for {symbol}: {
                                 str(e)}")
 
+                except (ccxt.InvalidNonce, ccxt.ChecksumError) as e:
+                    # Reason: ccxt detected a gap in the diff stream and will
+                    # resubscribe; fetch a REST snapshot meanwhile instead of
+                    # sleeping.
+                    logger.warning(f"Order book sequence error for {symbol}: {e}")
+                    orderbook_sync_service.record_gap(symbol)
+                    self._request_orderbook_resync(
+                        symbol, orderbook, exchange_pro, SEQ_GAP)
+
                 except Exception as e:
+                    orderbook_sync_service.record_error(symbol)
                     error_data = {
                         "type": "error",
                         "message": f"Error streaming order book for {symbol}: {
                             str(e)}",
                     }
                     await self.broadcast_to_symbol(symbol, error_data)
-                    await asyncio.sleep(5)  # Wait before retrying
+                    self._request_orderbook_resync(
+                        symbol, orderbook, exchange_pro, "error")
+                    await asyncio.sleep(retry_delay)  # Wait before retrying
+                    retry_delay = min(retry_delay * 2, STREAM_MAX_RETRY_DELAY)
 
         except Exception as e:
             error_data = {
@@ -632,7 +783,63 @@ class ConnectionManager:
             await self.broadcast_to_symbol(symbol, error_data)
         finally:
             # Do NOT close exchange_pro here. It should be managed globally.
-            pass
+            orderbook_sync_service.reset(symbol)
+
+    @staticmethod
+    def _snapshot_from_ccxt(symbol: str, order_book_data: Dict) -> OrderBookSnapshot:
+        """
+        Convert a ccxt order book into an OrderBookSnapshot.
+
+        Args:
+            symbol: Exchange symbol
+            order_book_data: ccxt order book with bids, asks and timestamp
+
+        Returns:
+            OrderBookSnapshot without zero-amount levels
+        """
+        bid_levels = [
+            OrderBookLevel(price=float(bid[0]), amount=float(bid[1]))
+            for bid in order_book_data["bids"]
+            if float(bid[1]) > 0  # Filter zero amounts
+        ]
+        ask_levels = [
+            OrderBookLevel(price=float(ask[0]), amount=float(ask[1]))
+            for ask in order_book_data["asks"]
+            if float(ask[1]) > 0  # Filter zero amounts
+        ]
+        return OrderBookSnapshot(
+            symbol=symbol,
+            bids=bid_levels,
+            asks=ask_levels,
+            timestamp=order_book_data.get("timestamp") or int(time.time() * 1000)
+        )
+
+    def _request_orderbook_resync(self, symbol: str, orderbook, exchange_pro,
+                                  reason: str) -> Optional[asyncio.Task]:
+        """
+        Resync a symbol's order book from a REST snapshot in the background.
+
+        Clients keep receiving the last consistent version until the snapshot
+        is applied and broadcast.
+
+        Args:
+            symbol: Exchange symbol
+            orderbook: OrderBook instance to repair
+            exchange_pro: ccxt pro exchange used for the REST snapshot
+            reason: Why the resync was needed
+
+        Returns:
+            The resync task, or None if one was already running
+        """
+        async def fetch_snapshot() -> Optional[int]:
+            order_book_data = await exchange_pro.fetch_order_book(symbol, limit=1000)
+            market_capture_service.record(STREAM_ORDERBOOK_SNAPSHOT, symbol, order_book_data)
+            await orderbook.update_snapshot(
+                self._snapshot_from_ccxt(symbol, order_book_data))
+            await self._broadcast_to_all_symbol_connections(symbol)
+            return order_book_data.get("nonce")
+
+        return orderbook_sync_service.request_resync(symbol, reason, fetch_snapshot)
 
     async def _broadcast_to_all_symbol_connections(self, symbol: str):
         """Broadcast aggregated orderbook data to all connections for a symbol."""
@@ -645,6 +852,10 @@ class ConnectionManager:
             for connection_id in connection_ids:
                 await self._broadcast_aggregated_orderbook(connection_id)
 
+            # Precompute this version for recently used parameters so a client
+            # switching back to them gets a cache hit
+            await orderbook_manager.precompute_aggregations(symbol)
+
         except Exception as e:
             logger.error(
                 f"Error broadcasting to all connections for {symbol}: {e}")
@@ -664,7 +875,7 @@ class ConnectionManager:
                 f"No OrderBook instance found for {symbol} in mock stream")
             return
 
-        while symbol in self.active_connections and self.active_connections[symbol]:
+        while self._orderbook_stream_active(symbol):
             try:
                 # Generate mock orderbook data
                 current_time = int(time.time() * 1000)
@@ -763,6 +974,7 @@ class ConnectionManager:
 
                     # Watch OHLCV updates
                     ohlcv_data = await exchange_pro.watch_ohlcv(symbol, timeframe)
+                    market_capture_service.record(STREAM_CANDLES, stream_key, ohlcv_data)
 
                     # CRITICAL: Double-check stream is still active after async operation
                     if stream_key not in self.active_connections:
@@ -939,6 +1151,12 @@ class ConnectionManager:
             # Initialize trades cache with historical data
             from collections import deque
             trades_cache = deque(maxlen=100)
+            # Raw-mode rows mirror trades_cache without formatted strings
+            raw_trades_cache = deque(maxlen=100)
+            # Trades not yet formatted because only raw-mode clients were listening
+            unformatted_trades = deque(maxlen=100)
+            self.trade_buffers[symbol] = (
+                trades_cache, raw_trades_cache, unformatted_trades)
             
             # Fetch and populate initial historical trades from exchange
             try:
@@ -949,6 +1167,7 @@ class ConnectionManager:
                 # Add historical trades to cache (they're already in newest-first order)
                 for trade in historical_trades:
                     trades_cache.append(trade)
+                raw_trades_cache.extend(trade_service.compact_trades(historical_trades))
                     
                 logger.info(f"Initialized trades cache for {symbol} with {len(historical_trades)} historical trades")
             except Exception as e:
@@ -973,6 +1192,7 @@ class ConnectionManager:
 
                     # Watch for new trades
                     new_trades = await exchange_pro.watch_trades(symbol)
+                    market_capture_service.record(STREAM_TRADES, symbol, new_trades)
 
                     # CRITICAL: Double-check stream is still active after async operation
                     if stream_key not in self.active_connections:
@@ -983,19 +1203,23 @@ class ConnectionManager:
                         # Get symbol info for formatting
                         from app.services.symbol_service import symbol_service
                         symbol_info = symbol_service.get_symbol_info(symbol)
+
+                        # Feed raw trades into the volume-by-price profile
+                        volume_profile_service.record_trades(symbol, new_trades, symbol_info)
                         
-                        # Format and add new trades to cache
-                        formatted_trades = []
-                        for trade in new_trades:
-                            try:
-                                formatted = trade_service.format_trade(trade, symbol_info or {})
-                                formatted_trades.append(formatted)
-                                trades_cache.appendleft(formatted)
-                            except Exception as e:
-                                logger.warning(f"Failed to format trade for {symbol}: {e}")
-                                continue
-
-                        if formatted_trades:
+                        raw_rows = trade_service.compact_trades(new_trades)
+                        raw_trades_cache.extendleft(raw_rows)
+
+                        # Format only while a client still needs formatted strings;
+                        # the backlog is formatted once one connects
+                        unformatted_trades.extend(new_trades)
+                        if self.has_formatted_connections(stream_key):
+                            formatted_trades = trade_service.format_trades(
+                                list(unformatted_trades), symbol_info or {})
+                            unformatted_trades.clear()
+                            trades_cache.extendleft(formatted_trades)
+
+                        if raw_rows:
                             # Use display symbol if available, otherwise use the stream symbol
                             display_symbol = getattr(self, "_display_symbols", {}).get(
                                 stream_key, symbol
@@ -1010,10 +1234,15 @@ class ConnectionManager:
                                 "initial": False,
                                 "timestamp": int(time.time() * 1000)
                             }
+                            raw_update = {
+                                **update,
+                                "trades": list(raw_trades_cache),
+                                "raw": True
+                            }
 
                             # CRITICAL: Final validation before broadcast
                             if stream_key in self.active_connections and self.active_connections[stream_key]:
-                                await self.broadcast_to_stream(stream_key, update)
+                                await self.broadcast_to_stream(stream_key, update, raw_update)
                             else:
                                 logger.debug(f"Stream {stream_key} disconnected before broadcast, skipping trades update")
 
@@ -1033,7 +1262,7 @@ class ConnectionManager:
             await self.broadcast_to_stream(stream_key, error_data)
         finally:
             # Do NOT close exchange_pro here. It should be managed globally.
-            pass
+            self.trade_buffers.pop(symbol, None)
 
 
     async def _restart_orderbook_stream(self, symbol: str):
@@ -1053,3 +1282,6 @@ class ConnectionManager:
 
 # Global connection manager instance
 connection_manager = ConnectionManager()
+orderbook_manager.add_eviction_listener(connection_manager.release_warm_stream)
+memory_accounting_service.register_source(
+    "trade_buffers", lambda: dict(connection_manager.trade_buffers))
@@ -0,0 +1,109 @@
+"""
+Liquidity heatmap WebSocket API endpoints.
+
+This module provides a FastAPI WebSocket endpoint that pushes the liquidity
+heatmap columns sampled from a symbol's live order book.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Dict
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.services.liquidity_heatmap_service import liquidity_heatmap_service
+from app.services.symbol_service import symbol_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.websocket("/ws/heatmap/{symbol}")
+async def heatmap_stream(websocket: WebSocket, symbol: str):
+    """
+    WebSocket endpoint for live liquidity heatmap columns
+
+    Columns are sampled from the symbol's live order book, so the book must
+    be streaming (an /ws/orderbook client for the symbol, or a warm book).
+    History is served by GET /orderbook/{symbol}/heatmap. Columns not yet
+    sent to a slow client are batched into its next message, keeping at
+    most one ring's worth.
+
+    Messages:
+    {
+        "type": "heatmap_update",
+        "symbol": "BTCUSDT",
+        "columns": [
+            {
+                "timestamp": 1640995200000,
+                "mid": 50000.05,
+                "step": 5.0,
+                "first_index": 9900,  // bucket j is priced (first_index + j) * step
+                "amounts": [0.0, 1.25, ...]  // lowest price first
+            }, ...
+        ]
+    }
+    """
+    await websocket.accept()
+
+    exchange_symbol = symbol_service.resolve_symbol_to_exchange_format(symbol)
+    if not exchange_symbol:
+        error_msg = f"Symbol {symbol} not found"
+        logger.warning(f"Heatmap WebSocket error: {error_msg}")
+        await websocket.send_text(json.dumps({"type": "error", "message": error_msg}))
+        await websocket.close(code=4000, reason=error_msg)
+        return
+    logger.info(f"Heatmap WebSocket connected for {symbol} (exchange: {exchange_symbol})")
+
+    pending: deque = deque(maxlen=liquidity_heatmap_service.slices)
+    has_pending = asyncio.Event()
+    tasks = []
+
+    def column_callback(column: Dict[str, Any]):
+        """Queue a new column for this connection"""
+        pending.append(column)
+        has_pending.set()
+
+    try:
+        liquidity_heatmap_service.register_callback(exchange_symbol, column_callback)
+
+        async def send_updates():
+            while True:
+                await has_pending.wait()
+                has_pending.clear()
+                columns = list(pending)
+                pending.clear()
+
+                if websocket.client_state.name != "CONNECTED":
+                    break
+
+                await websocket.send_json({
+                    "type": "heatmap_update",
+                    "symbol": symbol,
+                    "columns": columns,
+                })
+
+        async def receive_messages():
+            while True:
+                message = json.loads(await websocket.receive_text())
+                if message.get("type") == "ping":
+                    await websocket.send_json({"type": "pong"})
+
+        tasks.append(asyncio.create_task(send_updates()))
+        tasks.append(asyncio.create_task(receive_messages()))
+
+        # Run until either side stops
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+
+    except WebSocketDisconnect:
+        logger.info(f"Heatmap WebSocket disconnected for {symbol}")
+    except Exception as e:
+        logger.error(f"Error in heatmap WebSocket for {symbol}: {e}")
+    finally:
+        liquidity_heatmap_service.unregister_callback(exchange_symbol, column_callback)
+        for task in tasks:
+            task.cancel()
@@ -9,6 +9,8 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from app.api.v1.endpoints.connection_manager import connection_manager as manager
 from app.services.symbol_service import symbol_service
 from app.services.liquidation_service import liquidation_service
+from app.services.formatting_service import formatting_service
+from app.services.memory_accounting_service import memory_accounting_service
 from app.models.liquidation import LiquidationVolumeUpdate, LiquidationVolume
 from typing import List, Dict, Optional
 import asyncio
@@ -23,14 +25,64 @@ router = APIRouter()
 # Global cache shared across all WebSocket connections for the same symbol
 liquidations_cache: Dict[str, deque] = {}
 MAX_LIQUIDATIONS = 50
+memory_accounting_service.register_source(
+    "liquidation_feed", lambda: dict(liquidations_cache))
 # Track if historical data has been loaded for each symbol
 historical_loaded: Dict[str, bool] = {}
 
+# Display strings dropped for raw-numbers mode connections
+LIQUIDATION_FORMATTED_FIELDS = frozenset({'quantityFormatted', 'priceUsdtFormatted', 'displayTime'})
+VOLUME_FORMATTED_FIELDS = frozenset({
+    'buy_volume_formatted', 'sell_volume_formatted',
+    'total_volume_formatted', 'delta_volume_formatted'
+})
+
+
+def _without_fields(row: Dict, fields: frozenset) -> Dict:
+    """Copy a row without the given keys."""
+    return {key: value for key, value in row.items() if key not in fields}
+
+
+def _volume_message(display_symbol: str, timeframe: str, volume_data: List[Dict],
+                    is_update: bool, raw: bool) -> Dict:
+    """
+    Build a liquidation_volume message.
+
+    Args:
+        display_symbol: Symbol for display purposes
+        timeframe: Aggregation timeframe
+        volume_data: Volume rows from liquidation_service
+        is_update: True for real-time updates, False for historical batches
+        raw: Drop the *_volume_formatted strings
+
+    Returns:
+        JSON-compatible message
+    """
+    timestamp = datetime.utcnow().isoformat()
+    if raw:
+        return {
+            "type": "liquidation_volume",
+            "symbol": display_symbol,
+            "timeframe": timeframe,
+            "data": [_without_fields(row, VOLUME_FORMATTED_FIELDS) for row in volume_data],
+            "timestamp": timestamp,
+            "is_update": is_update,
+            "raw": True
+        }
+    return LiquidationVolumeUpdate(
+        symbol=display_symbol,
+        timeframe=timeframe,
+        data=[LiquidationVolume(**row) if isinstance(row, dict) else row for row in volume_data],
+        timestamp=timestamp,
+        is_update=is_update
+    ).dict()
+
 @router.websocket("/ws/liquidations/{display_symbol}")
 async def liquidation_stream(
     websocket: WebSocket, 
     display_symbol: str,
-    timeframe: Optional[str] = Query(None, description="Timeframe for volume aggregation (1m, 5m, 15m, 1h, 4h, 1d)")
+    timeframe: Optional[str] = Query(None, description="Timeframe for volume aggregation (1m, 5m, 15m, 1h, 4h, 1d)"),
+    raw: bool = Query(False, description="Raw-numbers mode: omit formatted strings, format client-side")
 ):
     """
     WebSocket endpoint for liquidation data streaming
@@ -38,6 +90,9 @@ async def liquidation_stream(
     Args:
         display_symbol: Trading symbol (e.g., BTCUSDT)
         timeframe: Optional timeframe for volume aggregation
+        raw: Raw-numbers mode; formatted strings (quantityFormatted,
+            priceUsdtFormatted, displayTime, *_volume_formatted) are omitted and
+            the initial message carries a formatting descriptor
     """
     
     await websocket.accept()
@@ -117,13 +172,20 @@ async def liquidation_stream(
             logger.info(f"Using existing historical liquidations for {display_symbol}")
         
         # Send initial data with cached liquidations
+        cached_liquidations = list(liquidations_cache[display_symbol])
+        if raw:
+            cached_liquidations = [_without_fields(liquidation, LIQUIDATION_FORMATTED_FIELDS)
+                                   for liquidation in cached_liquidations]
         initial_data = {
             "type": "liquidation_order",  # Changed from "liquidations" for clarity
             "symbol": display_symbol,
-            "data": list(liquidations_cache[display_symbol]),
+            "data": cached_liquidations,
             "initial": True,
             "timestamp": datetime.utcnow().isoformat()
         }
+        if raw:
+            initial_data["raw"] = True
+            initial_data["descriptor"] = formatting_service.get_format_descriptor(symbol_info)
         await websocket.send_json(initial_data)
         
         # Connect to liquidation stream with symbol info
@@ -185,17 +247,9 @@ async def liquidation_stream(
                     if historical_volume:
                         # Check if WebSocket is still connected before sending
                         if websocket.client_state.name == "CONNECTED":
-                            # Convert dict objects to LiquidationVolume models
-                            volume_data = [LiquidationVolume(**vol) for vol in historical_volume]
-                            
-                            volume_update = LiquidationVolumeUpdate(
-                                symbol=display_symbol,
-                                timeframe=timeframe,
-                                data=volume_data,
-                                timestamp=datetime.utcnow().isoformat(),
-                                is_update=False  # Historical data, not real-time update
-                            )
-                            await websocket.send_json(volume_update.dict())
+                            # Historical data, not real-time update
+                            await websocket.send_json(_volume_message(
+                                display_symbol, timeframe, historical_volume, False, raw))
                             logger.info(f"Sent {len(historical_volume)} historical volume records for {display_symbol}/{timeframe}")
                         else:
                             logger.debug(f"WebSocket disconnected for {display_symbol}, skipping historical volume send")
@@ -227,6 +281,9 @@ async def liquidation_stream(
                         "data": liquidation,
                         "timestamp": datetime.utcnow().isoformat()
                     }
+                    if raw:
+                        update["data"] = _without_fields(liquidation, LIQUIDATION_FORMATTED_FIELDS)
+                        update["raw"] = True
                     await websocket.send_json(update)
                     
                 except asyncio.TimeoutError:
@@ -268,14 +325,9 @@ async def liquidation_stream(
                     # Type check - timeframe is guaranteed to be not None in this function
                     assert timeframe is not None
                     
-                    volume_update = LiquidationVolumeUpdate(
-                        symbol=display_symbol,
-                        timeframe=timeframe,
-                        data=volume_data,
-                        timestamp=datetime.utcnow().isoformat(),
-                        is_update=is_realtime_update  # True for real-time, False for historical batches
-                    )
-                    await websocket.send_json(volume_update.dict())
+                    # True for real-time, False for historical batches
+                    await websocket.send_json(_volume_message(
+                        display_symbol, timeframe, volume_data, is_realtime_update, raw))
                     
                 except asyncio.TimeoutError:
                     # Check connection state on timeout
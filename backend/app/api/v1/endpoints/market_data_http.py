@@ -6,10 +6,18 @@ symbols, order books, and candlestick data from the exchange.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.api.v1.schemas import SymbolInfo, OrderBook, OrderBookLevel, Candle
 from app.services.exchange_service import exchange_service
 from app.services.symbol_service import symbol_service
+from app.services.symbol_refresher import symbol_refresher
+from app.services.ticker_stream_service import ticker_stream_service
+from app.services.market_capture_service import market_capture_service
+from app.services.orderbook_sync_service import orderbook_sync_service
+from app.services.memory_accounting_service import memory_accounting_service
+from app.services.orderbook_manager import orderbook_manager
+from app.services.liquidity_heatmap_service import liquidity_heatmap_service
+from app.models.liquidity_heatmap import encode_window
 from app.core.logging_config import get_logger
 from app.core.config import settings
 
@@ -128,6 +136,111 @@ async def get_orderbook(
                 str(e)}")
 
 
+@router.get("/orderbook/{symbol}/depth")
+async def get_orderbook_depth(
+    symbol: str,
+    sweep: Optional[str] = Query(
+        default=None,
+        description="Comma-separated sweep sizes in base units (e.g. 0.5,1,10); "
+                    "the configured quote notionals when omitted",
+    ),
+):
+    """
+    Get liquidity-band depth and sweep costs from a live order book.
+
+    Read from the book's depth index in O(log n) per figure; the book must
+    be streaming (a client subscribed to the symbol within the keep-warm
+    period).
+
+    Args:
+        symbol: Trading symbol (e.g., 'BTCUSDT')
+        sweep: Sweep sizes in base units
+
+    Returns:
+        Dict with mid, index step, per-band bid/ask amount and notional, and
+        buy/sell cost, average price and slippage per sweep size
+
+    Raises:
+        HTTPException: If the symbol, its live book or its depth index is
+            not found, or the sweep sizes are invalid
+    """
+    exchange_symbol = symbol_service.resolve_symbol_to_exchange_format(symbol)
+    if not exchange_symbol:
+        raise HTTPException(status_code=404, detail=f"Symbol {symbol} not found")
+
+    sweep_units = None
+    if sweep:
+        try:
+            sweep_units = [float(size) for size in sweep.split(",") if size.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid sweep sizes: {sweep}")
+        if any(size <= 0 for size in sweep_units):
+            raise HTTPException(status_code=400, detail="Sweep sizes must be positive")
+
+    metrics = await orderbook_manager.get_depth_metrics(exchange_symbol, sweep_units)
+    if metrics is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No live order book with a depth index for {symbol}")
+
+    return {
+        "status": "success",
+        "symbol": symbol,
+        **metrics,
+    }
+
+
+@router.get("/orderbook/{symbol}/heatmap")
+async def get_orderbook_heatmap(
+    symbol: str,
+    start: Optional[int] = Query(default=None, description="First sample time (ms)"),
+    end: Optional[int] = Query(default=None, description="Last sample time (ms)"),
+    low: Optional[float] = Query(default=None, gt=0, description="Lowest price"),
+    high: Optional[float] = Query(default=None, gt=0, description="Highest price"),
+):
+    """
+    Get a time/price window of a symbol's liquidity heatmap.
+
+    The heatmap is sampled from the live order book once per
+    ORDERBOOK_HEATMAP_INTERVAL_SECONDS and keeps the last
+    ORDERBOOK_HEATMAP_SLICES samples. The window is returned as
+    application/octet-stream in the layout of
+    app.models.liquidity_heatmap.encode_window: a 32-byte header, then
+    int64 timestamps, float64 mids and a float32 slices x buckets matrix.
+
+    Args:
+        symbol: Trading symbol (e.g., 'BTCUSDT')
+        start: First sample time in milliseconds (oldest sample when omitted)
+        end: Last sample time in milliseconds (newest sample when omitted)
+        low: Lowest price (the lowest sampled bucket when omitted)
+        high: Highest price (the highest sampled bucket when omitted)
+
+    Returns:
+        Encoded heatmap window
+
+    Raises:
+        HTTPException: If the symbol or its heatmap is not found, no sample
+            falls in the window, or the price range is empty or too large
+    """
+    exchange_symbol = symbol_service.resolve_symbol_to_exchange_format(symbol)
+    if not exchange_symbol:
+        raise HTTPException(status_code=404, detail=f"Symbol {symbol} not found")
+
+    heatmap = liquidity_heatmap_service.get_heatmap(exchange_symbol)
+    if heatmap is None:
+        raise HTTPException(status_code=404, detail=f"No liquidity heatmap for {symbol}")
+
+    try:
+        window = heatmap.window(start, end, low, high)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if window is None:
+        raise HTTPException(
+            status_code=404, detail=f"No heatmap samples for {symbol} in the window")
+
+    return Response(content=encode_window(window), media_type="application/octet-stream")
+
+
 @router.get("/candles/{symbol}", response_model=List[Candle])
 async def get_candles(
     symbol: str,
@@ -226,12 +339,16 @@ async def refresh_symbols():
     """
     Refresh the symbol cache. Useful for development when symbols are updated.
 
+    Markets and tickers are fetched off the event loop and swapped in only on
+    success; the previous snapshot keeps being served meanwhile.
+
     Returns:
         Dict with refresh status and cache statistics.
     """
     try:
         logger.info("Manual symbol cache refresh requested")
-        symbol_service.refresh_cache()
+        await symbol_refresher.refresh_markets()
+        await symbol_refresher.refresh_tickers()
         stats = symbol_service.get_cache_stats()
         logger.info(f"Symbol cache refreshed successfully: {stats}")
         return {
@@ -258,7 +375,12 @@ async def get_symbol_cache_stats():
     """
     try:
         stats = symbol_service.get_cache_stats()
-        return {"status": "success", "cache_stats": stats}
+        return {
+            "status": "success",
+            "cache_stats": stats,
+            "refresher_stats": symbol_refresher.get_stats(),
+            "ticker_stream_stats": ticker_stream_service.get_stats(),
+        }
     except Exception as e:
         logger.error(
             f"Failed to get symbol cache stats: {
@@ -267,3 +389,75 @@ async def get_symbol_cache_stats():
             status_code=500,
             detail=f"Failed to get symbol cache stats: {
                 str(e)}")
+
+
+@router.get("/orderbook-sync-stats")
+async def get_orderbook_sync_stats(
+    symbol: Optional[str] = Query(
+        default=None,
+        description="Exchange symbol (e.g. BTC/USDT:USDT); all streamed symbols when omitted",
+    ),
+):
+    """
+    Get order book sequence and resync statistics.
+
+    Returns:
+        Dict with per-symbol gap/out-of-order counts, resync counts and
+        time-to-recover.
+    """
+    return {
+        "status": "success",
+        "symbols": orderbook_sync_service.get_stats(symbol),
+    }
+
+
+@router.get("/market-capture-stats")
+async def get_market_capture_stats():
+    """
+    Get market data capture statistics.
+
+    Returns:
+        Dict with capture state, current segment and message, byte, batch
+        and drop counts.
+    """
+    return {
+        "status": "success",
+        "capture": market_capture_service.get_stats(),
+    }
+
+
+@router.get("/memory-stats")
+async def get_memory_stats(
+    subsystem: Optional[str] = Query(
+        default=None,
+        description="Limit to one subsystem (e.g. orderbooks, aggregation_cache)",
+    ),
+    symbol: Optional[str] = Query(
+        default=None,
+        description="Limit to one symbol as keyed by the subsystem",
+    ),
+    top: int = Query(
+        default=10, ge=0, le=100,
+        description="Allocation sites to list when tracemalloc is tracing",
+    ),
+):
+    """
+    Sample the retained memory of order books and caches.
+
+    Walks every registered structure on the event loop, so a sample of a
+    large process takes a few milliseconds; `sample_ms` reports how long.
+
+    Returns:
+        Dict with bytes per subsystem and per symbol, process RSS and, with
+        MEMORY_TRACEMALLOC enabled, the top allocation sites.
+    """
+    if subsystem is not None and subsystem not in memory_accounting_service.get_subsystems():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown subsystem: {subsystem}. Available: "
+                   f"{', '.join(memory_accounting_service.get_subsystems())}")
+
+    return {
+        "status": "success",
+        **memory_accounting_service.sample(subsystem, symbol, top),
+    }
@@ -22,7 +22,8 @@ async def websocket_orderbook(
     websocket: WebSocket,
     symbol: str,
     limit: int = Query(default=20, ge=5, le=5000),
-    rounding: float = Query(default=0.01, gt=0)
+    rounding: float = Query(default=0.01, gt=0),
+    raw: bool = Query(default=False)
 ):
     """
     WebSocket endpoint for real-time aggregated order book updates.
@@ -32,6 +33,7 @@ async def websocket_orderbook(
         symbol: Trading symbol (e.g., 'BTCUSDT')
         limit: Number of order book levels to stream (default: 20, max: 5000)
         rounding: Price rounding value for aggregation (default: 0.01, must be > 0)
+        raw: Raw-numbers mode; the client formats values itself
 
     The WebSocket will send JSON messages with the following format:
     {
@@ -68,6 +70,18 @@ async def websocket_orderbook(
     are included when symbol precision data is available. These fields provide
     backend-formatted strings optimized for display, eliminating frontend formatting.
 
+    In raw-numbers mode (?raw=true) the server skips formatting. The first
+    message is a formatting descriptor, and levels are sent as compact
+    [price, amount, cumulative] arrays with "raw": true on each update:
+    {
+        "type": "format_descriptor",
+        "symbol": "BTCUSDT",
+        "rounding": 0.01,
+        "descriptor": {"version": 1, "price": {...}, "amount": {...}, "total": {...}}
+    }
+    A params_updated message that changes the rounding carries a new
+    "descriptor".
+
     Parameter update messages can be sent:
     {
         "type": "update_params",
@@ -125,6 +139,9 @@ async def websocket_orderbook(
                 rounding, 'default') else 0.01)
         rounding = max(0.0001, rounding_value)  # Ensure minimum rounding value
 
+        # Raw-numbers mode flag (handle Query object in tests)
+        raw = raw if isinstance(raw, bool) else False
+
         # Populate symbol data for optimal aggregation
         try:
             symbol_info = symbol_service.get_symbol_info(exchange_symbol)
@@ -137,8 +154,14 @@ async def websocket_orderbook(
                     'amountPrecision': symbol_info.get('amountPrecision', 2),
                     'symbol': symbol_info['symbol'],
                     'base_asset': symbol_info.get('base_asset'),
-                    'quote_asset': symbol_info.get('quote_asset')
+                    'quote_asset': symbol_info.get('quote_asset'),
+                    # Limits aggregation precompute to valid roundings
+                    'roundingOptions': symbol_info.get('roundingOptions'),
                 }
+                # Tick size lets the tick ladder order book backend index levels
+                metadata = symbol_service.get_symbol_metadata(exchange_symbol)
+                if metadata is not None:
+                    symbol_data['tickSize'] = metadata.tick_size
                 await orderbook_manager.update_symbol_data(exchange_symbol, symbol_data)
                 logger.info(
                     f"Updated symbol data for {exchange_symbol} with pricePrecision={
@@ -152,7 +175,8 @@ async def websocket_orderbook(
 
         # Connect to the connection manager using the exchange symbol, limit,
         # and rounding
-        await connection_manager.connect_orderbook(websocket, exchange_symbol, symbol, limit, rounding)
+        await connection_manager.connect_orderbook(
+            websocket, exchange_symbol, symbol, limit, rounding, raw=raw)
         logger.info(
             f"WebSocket orderbook streaming started for {symbol} (exchange: {exchange_symbol})"
         )
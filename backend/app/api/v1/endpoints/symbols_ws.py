@@ -0,0 +1,91 @@
+"""
+Symbols WebSocket API endpoints.
+
+This module provides a FastAPI WebSocket endpoint that pushes live 24h volume
+changes for the symbol list, fed by the all-market ticker stream.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.services.symbol_service import symbol_service
+from app.services.ticker_stream_service import ticker_stream_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.websocket("/ws/symbols")
+async def symbols_stream(websocket: WebSocket):
+    """
+    WebSocket endpoint for live symbol list updates
+
+    Sends the full symbol list once, then only rows whose 24h volume changed.
+    Pending changes are coalesced per symbol, so a slow client receives the
+    latest row instead of a growing backlog.
+    """
+    await websocket.accept()
+    logger.info("Symbols WebSocket connected")
+
+    pending: Dict[str, Dict[str, Any]] = {}
+    has_pending = asyncio.Event()
+    tasks = []
+
+    def rows_callback(rows: List[Dict[str, Any]]):
+        """Coalesce changed rows for this connection"""
+        for row in rows:
+            pending[row["id"]] = row
+        has_pending.set()
+
+    try:
+        await websocket.send_json({
+            "type": "symbols_snapshot",
+            "data": symbol_service.get_all_symbols(),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+        ticker_stream_service.register_callback(rows_callback)
+
+        async def send_updates():
+            while True:
+                await has_pending.wait()
+                has_pending.clear()
+                rows = list(pending.values())
+                pending.clear()
+
+                if websocket.client_state.name != "CONNECTED":
+                    break
+
+                await websocket.send_json({
+                    "type": "symbols_update",
+                    "data": rows,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+
+        async def receive_messages():
+            while True:
+                message = json.loads(await websocket.receive_text())
+                if message.get("type") == "ping":
+                    await websocket.send_json({"type": "pong"})
+
+        tasks.append(asyncio.create_task(send_updates()))
+        tasks.append(asyncio.create_task(receive_messages()))
+
+        # Run until either side stops
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+
+    except WebSocketDisconnect:
+        logger.info("Symbols WebSocket disconnected")
+    except Exception as e:
+        logger.error(f"Error in symbols WebSocket: {e}")
+    finally:
+        ticker_stream_service.unregister_callback(rows_callback)
+        for task in tasks:
+            task.cancel()
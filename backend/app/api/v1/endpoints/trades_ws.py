@@ -9,7 +9,8 @@ import json
 import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from app.services.symbol_service import symbol_service
-from app.services.trade_service import trade_service
+from app.services.trade_service import RAW_TRADE_FIELDS, trade_service
+from app.services.formatting_service import formatting_service
 from app.api.v1.endpoints.connection_manager import connection_manager
 from app.core.logging_config import get_logger
 
@@ -19,13 +20,18 @@ router = APIRouter()
 
 
 @router.websocket("/ws/trades/{symbol}")
-async def websocket_trades(websocket: WebSocket, symbol: str):
+async def websocket_trades(
+    websocket: WebSocket,
+    symbol: str,
+    raw: bool = Query(default=False)
+):
     """
     WebSocket endpoint for real-time trades updates.
 
     Args:
         websocket: WebSocket connection
         symbol: Trading symbol (e.g., 'BTCUSDT')
+        raw: Raw-numbers mode; the client formats values itself
 
     The WebSocket will send JSON messages with the following format:
     {
@@ -47,6 +53,12 @@ async def websocket_trades(websocket: WebSocket, symbol: str):
         "timestamp": 1640995200000
     }
 
+    In raw-numbers mode (?raw=true) trades are compact rows
+    [id, price, amount, side, timestamp] without formatted strings, and
+    every update has "raw": true. The initial message also carries
+    "fields" (the row layout) and "descriptor" (see FormattingService.
+    get_format_descriptor) so the client can format numbers itself.
+
     Error messages have the format:
     {
         "type": "error",
@@ -80,11 +92,14 @@ async def websocket_trades(websocket: WebSocket, symbol: str):
         logger.info(
             f"Using exchange symbol: {exchange_symbol} for WebSocket symbol: {symbol}")
 
+        # Raw-numbers mode flag (handle Query object in tests)
+        raw = raw if isinstance(raw, bool) else False
+
         # Fetch initial trades data
         try:
             logger.info(f"Fetching initial trades data for {symbol}")
             initial_trades = await trade_service.fetch_recent_trades(
-                exchange_symbol, limit=100
+                exchange_symbol, limit=100, raw=raw
             )
 
             # Send initial batch with 'initial': true
@@ -95,6 +110,13 @@ async def websocket_trades(websocket: WebSocket, symbol: str):
                 "initial": True,
                 "timestamp": int(time.time() * 1000)
             }
+            if raw:
+                initial_message.update({
+                    "raw": True,
+                    "fields": RAW_TRADE_FIELDS,
+                    "descriptor": formatting_service.get_format_descriptor(
+                        symbol_service.get_symbol_info(exchange_symbol)),
+                })
 
             await websocket.send_text(json.dumps(initial_message))
             logger.info(
@@ -110,7 +132,7 @@ async def websocket_trades(websocket: WebSocket, symbol: str):
 
         # Connect to the connection manager using unique trades stream key
         trades_stream_key = f"{exchange_symbol}:trades"
-        await connection_manager.connect(websocket, trades_stream_key, "trades", symbol)
+        await connection_manager.connect(websocket, trades_stream_key, "trades", symbol, raw=raw)
         logger.info(
             f"WebSocket trades streaming started for {symbol} (exchange: {exchange_symbol})"
         )
@@ -0,0 +1,71 @@
+"""
+API endpoints for volume profile data
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.services.symbol_service import symbol_service
+from app.services.volume_profile_service import volume_profile_service
+from app.models.volume_profile import VolumeProfileResponse, VolumeProfileLevel
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/volume-profile/{symbol}", response_model=VolumeProfileResponse)
+async def get_volume_profile(
+    symbol: str,
+    rounding: Optional[float] = Query(None, gt=0, description="Price bucket size (default: tick size)"),
+    session: Optional[str] = Query(None, description="UTC session date YYYY-MM-DD (default: current)")
+):
+    """
+    Get the volume-by-price profile for a symbol
+
+    The profile is accumulated from the live trades stream, so it only
+    contains data while a trades stream for the symbol is (or was) active.
+
+    Args:
+        symbol: Trading symbol (e.g., BTCUSDT)
+        rounding: Price bucket size, a multiple of the symbol tick size (optional)
+        session: UTC session date (optional)
+
+    Returns:
+        VolumeProfileResponse with histogram rows
+    """
+    try:
+        exchange_symbol = symbol_service.resolve_symbol_to_exchange_format(symbol)
+        if not exchange_symbol:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Symbol {symbol} not found"
+            )
+
+        symbol_info = symbol_service.get_symbol_info(symbol)
+
+        try:
+            profile = volume_profile_service.build_profile_response(
+                symbol=exchange_symbol,
+                display_symbol=symbol.upper(),
+                rounding=rounding,
+                session=session,
+                symbol_info=symbol_info
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return VolumeProfileResponse(
+            **{key: value for key, value in profile.items() if key != 'data'},
+            data=[VolumeProfileLevel(**row) for row in profile['data']]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching volume profile for {symbol}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to fetch volume profile data"
+        )
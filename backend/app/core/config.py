@@ -43,6 +43,22 @@ class Settings:
         "wss://fstream.binance.com")
     BINANCE_API_BASE_URL: str = os.getenv(
         "BINANCE_API_BASE_URL", "https://fapi.binance.com")
+    # Streaming exchange backend: "binance" (CCXT Pro) or "replay" (offline
+    # stand-in fed from EXCHANGE_REPLAY_CAPTURE_DIR, or generated data when
+    # that is empty)
+    EXCHANGE_BACKEND: str = os.getenv("EXCHANGE_BACKEND", "binance").lower()
+    EXCHANGE_REPLAY_CAPTURE_DIR: str = os.getenv("EXCHANGE_REPLAY_CAPTURE_DIR", "")
+    # 1 = real time, N = N times faster, 0 = as fast as possible
+    EXCHANGE_REPLAY_SPEED: float = float(os.getenv("EXCHANGE_REPLAY_SPEED", "1"))
+    EXCHANGE_REPLAY_LOOP: bool = os.getenv("EXCHANGE_REPLAY_LOOP", "True").lower() == "true"
+    # Markets listed by the replay exchange without a capture
+    EXCHANGE_REPLAY_SYMBOLS: str = os.getenv(
+        "EXCHANGE_REPLAY_SYMBOLS", "BTCUSDT,ETHUSDT,SOLUSDT,XRPUSDT,DOGEUSDT")
+    EXCHANGE_SYNTHETIC_LEVELS: int = int(os.getenv("EXCHANGE_SYNTHETIC_LEVELS", "500"))
+    EXCHANGE_SYNTHETIC_BOOK_RATE: float = float(
+        os.getenv("EXCHANGE_SYNTHETIC_BOOK_RATE", "10"))
+    EXCHANGE_SYNTHETIC_TRADE_RATE: float = float(
+        os.getenv("EXCHANGE_SYNTHETIC_TRADE_RATE", "20"))
 
     # Liquidation API Configuration
     LIQUIDATION_API_BASE_URL: Optional[str] = os.getenv("LIQUIDATION_API_BASE_URL", "")
@@ -65,6 +81,78 @@ class Settings:
 
     # Market Data Configuration
     MAX_ORDERBOOK_LIMIT: int = int(os.getenv("MAX_ORDERBOOK_LIMIT", "5000"))
+    # Order book storage: "sorted" (SortedDict) or "tick_ladder" (NumPy tick
+    # arrays for dense books; needs numpy and falls back to sorted without it)
+    ORDERBOOK_BACKEND: str = os.getenv("ORDERBOOK_BACKEND", "sorted").lower()
+    ORDERBOOK_TICK_LADDER_WIDTH: int = int(
+        os.getenv("ORDERBOOK_TICK_LADDER_WIDTH", "4096"))
+    # Seconds an order book and its exchange stream stay live after the last
+    # client leaves (0 drops it immediately)
+    ORDERBOOK_KEEP_WARM_SECONDS: float = float(
+        os.getenv("ORDERBOOK_KEEP_WARM_SECONDS", "30"))
+    # Memory budget for all order books; above it idle books are evicted
+    # least recently used first, before their keep-warm period ends
+    ORDERBOOK_MEMORY_BUDGET_MB: float = float(
+        os.getenv("ORDERBOOK_MEMORY_BUDGET_MB", "64"))
+    # Maintain a per-symbol aggregation pyramid over the symbol's power-of-10
+    # rounding options, updated with each book change
+    ORDERBOOK_PYRAMID: bool = os.getenv(
+        "ORDERBOOK_PYRAMID", "True").lower() == "true"
+    # Maintain a per-symbol Fenwick-tree depth index: liquidity within each
+    # band (percent of mid) and the cost of sweeping each notional (quote
+    # currency) are published with every order book update
+    ORDERBOOK_DEPTH_INDEX: bool = os.getenv(
+        "ORDERBOOK_DEPTH_INDEX", "True").lower() == "true"
+    ORDERBOOK_DEPTH_BANDS: list = [
+        float(band) for band in os.getenv("ORDERBOOK_DEPTH_BANDS", "0.5,1,2").split(",")
+        if band.strip()]
+    ORDERBOOK_DEPTH_SWEEP_NOTIONALS: list = [
+        float(size) for size in os.getenv(
+            "ORDERBOOK_DEPTH_SWEEP_NOTIONALS", "10000,100000,1000000").split(",")
+        if size.strip()]
+    ORDERBOOK_DEPTH_INDEX_WIDTH: int = int(
+        os.getenv("ORDERBOOK_DEPTH_INDEX_WIDTH", "4096"))
+    # Publish each book's largest resting levels ("walls") per side with its
+    # updates; a positive minimum z-score (against the rolling mean level
+    # size) only reports levels that stand out
+    ORDERBOOK_WALLS: bool = os.getenv(
+        "ORDERBOOK_WALLS", "True").lower() == "true"
+    ORDERBOOK_WALLS_TOP_K: int = int(os.getenv("ORDERBOOK_WALLS_TOP_K", "5"))
+    ORDERBOOK_WALLS_MIN_Z_SCORE: float = float(
+        os.getenv("ORDERBOOK_WALLS_MIN_Z_SCORE", "0"))
+    # Sample every live book into a liquidity heatmap (amount per price
+    # bucket over time) once per interval; each symbol keeps SLICES columns
+    # of BUCKETS buckets spanning ±RANGE_PCT of the mid, about
+    # SLICES * (BUCKETS * 4 + 24) bytes
+    ORDERBOOK_HEATMAP: bool = os.getenv(
+        "ORDERBOOK_HEATMAP", "True").lower() == "true"
+    ORDERBOOK_HEATMAP_INTERVAL_SECONDS: float = float(
+        os.getenv("ORDERBOOK_HEATMAP_INTERVAL_SECONDS", "1"))
+    ORDERBOOK_HEATMAP_BUCKETS: int = int(os.getenv("ORDERBOOK_HEATMAP_BUCKETS", "200"))
+    ORDERBOOK_HEATMAP_SLICES: int = int(os.getenv("ORDERBOOK_HEATMAP_SLICES", "3600"))
+    ORDERBOOK_HEATMAP_RANGE_PCT: float = float(
+        os.getenv("ORDERBOOK_HEATMAP_RANGE_PCT", "2"))
+    # Live order books are saved here on shutdown and restored on startup in
+    # place of the initial REST snapshot, unless older than MAX_AGE_SECONDS
+    # (empty string disables)
+    ORDERBOOK_STATE_PATH: str = os.getenv(
+        "ORDERBOOK_STATE_PATH", "data/orderbook_state.bin")
+    ORDERBOOK_STATE_MAX_AGE_SECONDS: float = float(
+        os.getenv("ORDERBOOK_STATE_MAX_AGE_SECONDS", "120"))
+    # Aggregation precompute follows the (limit, rounding) pairs clients use:
+    # pairs stay hot this many seconds after their last subscriber left, and
+    # at most AGGREGATION_PRECOMPUTE_MAX pairs per symbol are precomputed
+    # Capture raw exchange messages from the ingestion points to rotating,
+    # compressed segment files under MARKET_CAPTURE_DIR for later replay
+    MARKET_CAPTURE: bool = os.getenv("MARKET_CAPTURE", "False").lower() == "true"
+    MARKET_CAPTURE_DIR: str = os.getenv("MARKET_CAPTURE_DIR", "data/capture")
+    MARKET_CAPTURE_SEGMENT_MB: float = float(os.getenv("MARKET_CAPTURE_SEGMENT_MB", "64"))
+    MARKET_CAPTURE_SEGMENT_SECONDS: float = float(
+        os.getenv("MARKET_CAPTURE_SEGMENT_SECONDS", "3600"))
+    AGGREGATION_DEMAND_WINDOW_SECONDS: float = float(
+        os.getenv("AGGREGATION_DEMAND_WINDOW_SECONDS", "300"))
+    AGGREGATION_PRECOMPUTE_MAX: int = int(
+        os.getenv("AGGREGATION_PRECOMPUTE_MAX", "8"))
 
     # Development settings
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
@@ -80,6 +168,11 @@ class Settings:
     REQUEST_LOGGING: bool = DEBUG and os.getenv(
         "REQUEST_LOGGING", "True").lower() == "true"
 
+    # Memory accounting: trace allocations from startup so /memory-stats can
+    # report the top allocation sites (costs CPU and memory while enabled)
+    MEMORY_TRACEMALLOC: bool = os.getenv(
+        "MEMORY_TRACEMALLOC", "False").lower() == "true"
+
     # Static Files Configuration (for development)
     SERVE_STATIC_FILES: bool = DEVELOPMENT and os.getenv(
         "SERVE_STATIC_FILES", "True").lower() == "true"
@@ -95,6 +188,20 @@ class Settings:
         else []
     )
 
+    # Symbol Refresh Configuration (background stale-while-revalidate)
+    SYMBOL_MARKETS_REFRESH_INTERVAL: int = int(
+        os.getenv("SYMBOL_MARKETS_REFRESH_INTERVAL", "3600"))
+    SYMBOL_TICKERS_REFRESH_INTERVAL: int = int(
+        os.getenv("SYMBOL_TICKERS_REFRESH_INTERVAL", "60"))
+    SYMBOL_REFRESH_MAX_RETRY_DELAY: float = float(
+        os.getenv("SYMBOL_REFRESH_MAX_RETRY_DELAY", "60"))
+    # Compiled markets persisted for warm starts (empty string disables)
+    SYMBOL_SNAPSHOT_PATH: str = os.getenv(
+        "SYMBOL_SNAPSHOT_PATH", "data/symbol_snapshot.json")
+    # Live 24h volume via the all-market mini-ticker stream
+    TICKER_STREAM_ENABLED: bool = os.getenv(
+        "TICKER_STREAM_ENABLED", "True").lower() == "true"
+
     # WebSocket Configuration
     WS_HEARTBEAT_INTERVAL: int = int(os.getenv("WS_HEARTBEAT_INTERVAL", "30"))
     WS_TIMEOUT: int = int(os.getenv("WS_TIMEOUT", "60"))
@@ -1,5 +1,7 @@
+import asyncio
 import json
 import time
+import tracemalloc
 from pathlib import Path
 from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,6 +15,9 @@ from app.api.v1.endpoints.market_data_ws import router as market_data_ws_router
 from app.api.v1.endpoints.trades_ws import router as trades_ws_router
 from app.api.v1.endpoints.liquidations_ws import router as liquidations_ws_router
 from app.api.v1.endpoints.liquidation_volume import router as liquidation_volume_router
+from app.api.v1.endpoints.volume_profile import router as volume_profile_router
+from app.api.v1.endpoints.symbols_ws import router as symbols_ws_router
+from app.api.v1.endpoints.heatmap_ws import router as heatmap_ws_router
 from app.api.v1.endpoints.bots import router as bots_router
 from app.api.v1.endpoints import trading as trading_router
 from app.core.logging_config import (
@@ -22,6 +27,11 @@ from app.core.logging_config import (
 )
 from app.core.config import settings, DEVCONTAINER_MODE, DEVELOPMENT
 from app.core.database import init_db
+from app.services.symbol_refresher import symbol_refresher
+from app.services.ticker_stream_service import ticker_stream_service
+from app.services.liquidity_heatmap_service import liquidity_heatmap_service
+from app.services.orderbook_manager import orderbook_manager
+from app.services.market_capture_service import market_capture_service
 
 # Setup logging
 setup_logging("DEBUG" if settings.DEBUG else "INFO")
@@ -145,6 +155,10 @@ async def startup_event():
     logger.info(f"Container mode: {DEVCONTAINER_MODE}")
     logger.info(f"Server binding to: {settings.HOST}:{settings.PORT}")
 
+    if settings.MEMORY_TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        logger.info("tracemalloc enabled for memory accounting")
+
     # Initialize database
     try:
         logger.info("Initializing database...")
@@ -155,6 +169,19 @@ async def startup_event():
         # Don't fail startup - allow the app to run without database for development
         logger.warning("Application will continue without database initialization")
 
+    if settings.MARKET_CAPTURE:
+        market_capture_service.start()
+
+    # Order books saved by the last shutdown replace initial REST snapshots
+    await orderbook_manager.load_saved_state()
+
+    # Keep symbol markets/tickers fresh in the background
+    await symbol_refresher.start()
+    if settings.TICKER_STREAM_ENABLED:
+        await ticker_stream_service.start()
+    if settings.ORDERBOOK_HEATMAP:
+        await liquidity_heatmap_service.start()
+
     # Mount static files in development
     if settings.SERVE_STATIC_FILES:
         static_path = Path(settings.STATIC_FILES_PATH)
@@ -175,6 +202,13 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown event."""
     logger.info("Trading Bot API shutting down...")
+    await liquidity_heatmap_service.stop()
+    await ticker_stream_service.stop()
+    await symbol_refresher.stop()
+    # Saves the live order books for the next startup
+    await orderbook_manager.shutdown()
+    # Writes the messages still queued and closes the current segment
+    await asyncio.to_thread(market_capture_service.stop)
     logger.info("Application shutdown completed")
 
 
@@ -240,6 +274,18 @@ app.include_router(
     liquidation_volume_router,
     prefix="/api/v1",
     tags=["liquidation-volume"])
+app.include_router(
+    volume_profile_router,
+    prefix="/api/v1",
+    tags=["volume-profile"])
+app.include_router(
+    symbols_ws_router,
+    prefix="/api/v1",
+    tags=["symbols-ws"])
+app.include_router(
+    heatmap_ws_router,
+    prefix="/api/v1",
+    tags=["heatmap-ws"])
 app.include_router(bots_router, prefix="/api/v1/bots", tags=["bots"])
 app.include_router(trading_router.router, prefix="/api/v1", tags=["trading"])
 
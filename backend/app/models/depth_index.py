@@ -0,0 +1,351 @@
+"""
+Fenwick-tree depth index for liquidity-band and sweep queries.
+
+"Depth within ±0.5% of mid" or "cost to sweep 10 BTC" are sums over a price
+range of one side. Walking the levels for every active symbol on every tick
+is O(levels); instead each side keeps two Fenwick (binary indexed) trees,
+amount and notional (price * amount), over integer price steps:
+
+- A level change is an O(log n) point update of both trees
+- Depth within a band is one O(log n) prefix sum
+- Sweeping N units is an O(log n) descent to the step where the prefix
+  amount reaches N (volume -> price), plus prefix sums for its cost
+
+Slots are mirrored per side so that slot 0 is the step nearest the mid and
+higher slots are further away, for bids and asks alike. The window covers
+`width` steps around the mid and is rebuilt from the book when the mid
+drifts out of its central half. The step is the symbol's tick, multiplied
+by 10 until a quarter of the window spans the widest band; band sums are
+therefore exact to one step at the band edge. Levels outside the window
+only count towards the side's totals.
+"""
+
+import math
+from array import array
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .level_changes import ASKS, BIDS, LevelChange
+
+DEFAULT_DEPTH_WIDTH = 4096
+MIN_DEPTH_WIDTH = 16
+DEFAULT_DEPTH_BANDS = (0.5, 1.0, 2.0)
+
+# Prices within this fraction of a step of a step boundary count as on it
+STEP_TOLERANCE = 1e-6
+
+Level = Tuple[float, float]
+
+
+class FenwickTree:
+    """Prefix sums over slots 0..size-1 with O(log n) updates and search."""
+
+    __slots__ = ('size', '_tree', '_top_bit')
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = array('d', bytes(8 * (size + 1)))  # 1-based
+        self._top_bit = 1 << (size.bit_length() - 1)
+
+    def add(self, slot: int, delta: float) -> None:
+        """Add delta to one slot."""
+        tree = self._tree
+        index = slot + 1
+        while index <= self.size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix(self, slot: int) -> float:
+        """Sum of slots 0..slot (0.0 for a negative slot)."""
+        tree = self._tree
+        index = min(slot, self.size - 1) + 1
+        total = 0.0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def search(self, target: float) -> int:
+        """
+        Find the first slot whose prefix sum reaches target.
+
+        Returns:
+            Smallest slot with prefix(slot) >= target, or size if the total
+            is below target
+        """
+        tree = self._tree
+        position = 0
+        remaining = target
+        bit = self._top_bit
+        while bit:
+            candidate = position + bit
+            if candidate <= self.size and tree[candidate] < remaining:
+                position = candidate
+                remaining -= tree[candidate]
+            bit >>= 1
+        return position
+
+    @property
+    def nbytes(self) -> int:
+        return self._tree.itemsize * len(self._tree)
+
+
+class DepthIndex:
+    """
+    Cumulative amount and notional per side over a window of price steps.
+
+    Fed the same level changes as the aggregation pyramid; see
+    OrderBook.set_depth_index.
+    """
+
+    def __init__(self, tick_size: float,
+                 bands: Iterable[float] = DEFAULT_DEPTH_BANDS,
+                 sweep_notionals: Iterable[float] = (),
+                 width: int = DEFAULT_DEPTH_WIDTH):
+        """
+        Args:
+            tick_size: The symbol's price tick
+            bands: Band half-widths in percent of mid reported by metrics()
+            sweep_notionals: Sweep sizes in quote currency reported by
+                metrics() (converted to base units at the mid)
+            width: Window size in steps
+
+        Raises:
+            ValueError: If the tick size, bands or width are invalid
+        """
+        if tick_size <= 0:
+            raise ValueError("Tick size must be positive")
+        if width < MIN_DEPTH_WIDTH:
+            raise ValueError(f"Depth index width must be at least {MIN_DEPTH_WIDTH}")
+        self.tick_size = tick_size
+        self.bands = tuple(sorted({float(band) for band in bands if band > 0}))
+        if not self.bands:
+            raise ValueError("Depth index needs at least one positive band")
+        self.sweep_notionals = tuple(float(size) for size in sweep_notionals if size > 0)
+        self.width = width
+
+        self.step: Optional[float] = None  # Set by load()
+        self._low = 0  # Step index of the lowest price in the window
+        self._amounts: Tuple[FenwickTree, ...] = ()
+        self._notionals: Tuple[FenwickTree, ...] = ()
+        # Amount and notional of levels outside the window, per side
+        self._outside = [[0.0, 0.0], [0.0, 0.0]]
+        self.rebuild_count = 0
+
+    # Step arithmetic
+
+    def _choose_step(self, mid: float) -> float:
+        """Smallest tick * 10^k whose quarter window spans the widest band."""
+        tick = Decimal(str(self.tick_size))
+        needed = mid * self.bands[-1] / 100 / (self.width // 4)
+        step = tick
+        while float(step) < needed:
+            step *= 10
+        return float(step)
+
+    def _step_index(self, side: int, price: float) -> int:
+        # Reason: Bids round down and asks up, like the aggregation buckets,
+        # so a step never mixes prices from both sides of the mid.
+        scaled = price / self.step
+        if side == ASKS:
+            return math.ceil(scaled - STEP_TOLERANCE)
+        return math.floor(scaled + STEP_TOLERANCE)
+
+    def _slot(self, side: int, index: int) -> int:
+        """Window slot of a step index, mirrored for bids (may be out of range)."""
+        if side == ASKS:
+            return index - self._low
+        return self._low + self.width - 1 - index
+
+    @staticmethod
+    def _mid(best_bid: Optional[float], best_ask: Optional[float]) -> Optional[float]:
+        if best_bid is None:
+            return best_ask
+        if best_ask is None:
+            return best_bid
+        return (best_bid + best_ask) / 2
+
+    # Updates
+
+    def needs_load(self, best_bid: Optional[float], best_ask: Optional[float]) -> bool:
+        """Whether the window must be rebuilt around the current mid."""
+        mid = self._mid(best_bid, best_ask)
+        if mid is None:
+            return False
+        if self.step is None:
+            return True
+        slot = round(mid / self.step) - self._low
+        return not self.width // 4 <= slot <= 3 * self.width // 4
+
+    def load(self, bids: Iterable[Level], asks: Iterable[Level]) -> None:
+        """
+        Rebuild the index around the mid of these levels.
+
+        Args:
+            bids: (price, amount) bid levels, highest price first
+            asks: (price, amount) ask levels, lowest price first
+        """
+        bids, asks = list(bids), list(asks)
+        mid = self._mid(bids[0][0] if bids else None, asks[0][0] if asks else None)
+        self._amounts = tuple(FenwickTree(self.width) for _ in (BIDS, ASKS))
+        self._notionals = tuple(FenwickTree(self.width) for _ in (BIDS, ASKS))
+        self._outside = [[0.0, 0.0], [0.0, 0.0]]
+        if mid is None:
+            self.step = None
+            return
+
+        self.step = self._choose_step(mid)
+        self._low = round(mid / self.step) - self.width // 2
+        self.rebuild_count += 1
+        for side, levels in ((BIDS, bids), (ASKS, asks)):
+            for price, amount in levels:
+                self._add(side, price, amount)
+
+    def _add(self, side: int, price: float, amount: float) -> None:
+        slot = self._slot(side, self._step_index(side, price))
+        if 0 <= slot < self.width:
+            self._amounts[side].add(slot, amount)
+            self._notionals[side].add(slot, amount * price)
+        else:
+            outside = self._outside[side]
+            outside[0] += amount
+            outside[1] += amount * price
+
+    def apply_changes(self, changes: Iterable[LevelChange]) -> None:
+        """
+        Apply the level changes of one order book update.
+
+        Args:
+            changes: (side, price, previous amount, new amount) tuples
+        """
+        if self.step is None:
+            return  # Built by load() once the book has a mid
+        for side, price, previous, amount in changes:
+            if amount != previous:
+                self._add(side, price, amount - previous)
+
+    # Queries
+
+    def band_depth(self, is_ask: bool, mid: float, pct: float) -> Tuple[float, float]:
+        """
+        Resting amount and notional within pct percent of the mid.
+
+        Args:
+            is_ask: Whether to sum asks (above the mid) or bids (below it)
+            mid: Mid price
+            pct: Band half-width in percent
+
+        Returns:
+            Tuple of (amount, notional)
+        """
+        if self.step is None:
+            return 0.0, 0.0
+        side = ASKS if is_ask else BIDS
+        if is_ask:
+            edge = math.floor(mid * (1 + pct / 100) / self.step + STEP_TOLERANCE)
+        else:
+            edge = math.ceil(mid * (1 - pct / 100) / self.step - STEP_TOLERANCE)
+        slot = self._slot(side, edge)
+        return self._amounts[side].prefix(slot), self._notionals[side].prefix(slot)
+
+    def sweep(self, is_ask: bool, units: float) -> Dict:
+        """
+        Cost of a market order consuming units from the best price outward.
+
+        Args:
+            is_ask: Whether the order buys (consumes asks) or sells (bids)
+            units: Order size in base units
+
+        Returns:
+            Dict with filled units, cost in quote currency, average price,
+            price of the last step reached and whether the window held
+            enough liquidity (complete)
+        """
+        side = ASKS if is_ask else BIDS
+        if self.step is None or units <= 0:
+            return {'filled': 0.0, 'cost': 0.0, 'average_price': None,
+                    'price': None, 'complete': units <= 0}
+
+        amounts, notionals = self._amounts[side], self._notionals[side]
+        slot = amounts.search(units)
+        if slot >= self.width:
+            filled = amounts.prefix(self.width - 1)
+            cost = notionals.prefix(self.width - 1)
+            last = None
+            complete = False
+        else:
+            before = amounts.prefix(slot - 1)
+            before_cost = notionals.prefix(slot - 1)
+            step_amount = amounts.prefix(slot) - before
+            step_cost = notionals.prefix(slot) - before_cost
+            # Reason: Within a step levels are priced at its average, which
+            # is exact when the step is the tick (one level per step).
+            last = step_cost / step_amount if step_amount > 0 else None
+            filled = units
+            cost = before_cost + (units - before) * (last or 0.0)
+            complete = True
+        return {
+            'filled': filled,
+            'cost': cost,
+            'average_price': cost / filled if filled > 0 else None,
+            'price': last,
+            'complete': complete,
+        }
+
+    def metrics(self, best_bid: Optional[float], best_ask: Optional[float],
+                sweep_units: Optional[Sequence[float]] = None) -> Optional[Dict]:
+        """
+        Band depth and sweep costs for the current book.
+
+        Args:
+            best_bid: Best bid price
+            best_ask: Best ask price
+            sweep_units: Sweep sizes in base units (the configured
+                sweep_notionals converted at the mid when None)
+
+        Returns:
+            Dict with mid, step, bands and sweeps, or None for an empty book
+        """
+        mid = self._mid(best_bid, best_ask)
+        if mid is None or self.step is None:
+            return None
+
+        bands: List[Dict] = []
+        for pct in self.bands:
+            bid_amount, bid_notional = self.band_depth(False, mid, pct)
+            ask_amount, ask_notional = self.band_depth(True, mid, pct)
+            bands.append({
+                'pct': pct,
+                'bid_amount': bid_amount,
+                'ask_amount': ask_amount,
+                'bid_notional': bid_notional,
+                'ask_notional': ask_notional,
+            })
+
+        if sweep_units is None:
+            sweep_units = [notional / mid for notional in self.sweep_notionals]
+        sweeps = []
+        for units in sweep_units:
+            buy = self.sweep(True, units)
+            sell = self.sweep(False, units)
+            if best_ask is not None and buy['average_price'] is not None:
+                buy['slippage_pct'] = (buy['average_price'] - best_ask) / best_ask * 100
+            if best_bid is not None and sell['average_price'] is not None:
+                sell['slippage_pct'] = (best_bid - sell['average_price']) / best_bid * 100
+            sweeps.append({'units': units, 'buy': buy, 'sell': sell})
+
+        return {'mid': mid, 'step': self.step, 'bands': bands, 'sweeps': sweeps}
+
+    def get_stats(self) -> Dict:
+        """Window placement and amounts outside it."""
+        return {
+            'step': self.step,
+            'window': ([self._low * self.step, (self._low + self.width) * self.step]
+                       if self.step is not None else None),
+            'outside_amount': [self._outside[BIDS][0], self._outside[ASKS][0]],
+            'rebuilds': self.rebuild_count,
+        }
+
+    def get_memory_bytes(self) -> int:
+        """Bytes held by the four trees."""
+        return sum(tree.nbytes for tree in self._amounts + self._notionals)
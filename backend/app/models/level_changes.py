@@ -0,0 +1,20 @@
+"""
+Level changes shared by the indexes an OrderBook maintains.
+
+The book computes the changes of each update once (a full snapshot as its
+difference to the previous levels, a delta with the amounts it replaces) and
+hands the same list to every index: the aggregation pyramid, the depth
+index and the wall index. Indexes therefore keep no copy of the raw levels;
+the wall index's heap entries are checked against the book's own amounts.
+"""
+
+from typing import Tuple
+
+BIDS = 0
+ASKS = 1
+
+# Raw levels at or below LEVEL_DUST count as absent
+LEVEL_DUST = 1e-10
+
+# (side, price, previous amount, new amount); a zero amount is no level
+LevelChange = Tuple[int, float, float, float]
@@ -0,0 +1,248 @@
+"""
+Ring buffer of order book liquidity per price bucket over time (heatmap).
+
+Each column is one sample of a book: the resting amount per price bucket in
+a window of `buckets` buckets centred on the mid. Columns are written into
+preallocated arrays of slices x buckets and overwrite the oldest column once
+the ring is full, so a symbol's heatmap never holds more than
+
+    slices * (buckets * 4 + COLUMN_HEADER_BYTES) bytes
+
+Buckets sit on a fixed price grid, `index * step`, with the step chosen at
+the first sample so the window spans ±range_pct of the mid. Each column
+records the grid index of its first bucket, so columns sampled around
+different mids line up on a common price axis (see window).
+"""
+
+import math
+import struct
+import sys
+from array import array
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+DEFAULT_HEATMAP_BUCKETS = 200
+DEFAULT_HEATMAP_SLICES = 3600
+DEFAULT_HEATMAP_RANGE_PCT = 2.0
+
+# Steps are 1, 2 or 5 times a power of ten
+STEP_MANTISSAS = (1, 2, 5)
+GRID_TOLERANCE = 1e-6
+# Per column: timestamp (int64), first bucket index (int64), mid (float64)
+COLUMN_HEADER_BYTES = 24
+# Upper bound on time slices x buckets returned by one window (16 MiB of float32)
+MAX_WINDOW_CELLS = 1 << 22
+
+HEATMAP_MAGIC = b"OFHM"
+HEATMAP_FORMAT_VERSION = 1
+# Little-endian: magic, version, reserved, slices, buckets, step, first bucket index
+HEATMAP_HEADER = struct.Struct("<4sHHIIdq")
+
+
+def heatmap_step(mid: float, buckets: int, range_pct: float) -> float:
+    """
+    Smallest 1-2-5 step whose half window spans range_pct of the mid.
+
+    Args:
+        mid: Mid price
+        buckets: Buckets per column
+        range_pct: Percent of the mid to cover on each side
+
+    Returns:
+        Step as a float with a short decimal representation (e.g. 0.05)
+    """
+    target = mid * range_pct / 100 / (buckets // 2)
+    exponent = math.floor(math.log10(target))
+    for power in (exponent, exponent + 1):
+        for mantissa in STEP_MANTISSAS:
+            step = float(Decimal(mantissa).scaleb(power))
+            if step >= target * (1 - GRID_TOLERANCE):
+                return step
+    return float(Decimal(10).scaleb(exponent + 1))  # pragma: no cover
+
+
+class LiquidityHeatmap:
+    """
+    Fixed-size time x price ring buffer of one symbol's book liquidity.
+    """
+
+    def __init__(self, buckets: int = DEFAULT_HEATMAP_BUCKETS,
+                 slices: int = DEFAULT_HEATMAP_SLICES,
+                 range_pct: float = DEFAULT_HEATMAP_RANGE_PCT):
+        """
+        Args:
+            buckets: Price buckets per column
+            slices: Columns kept (the oldest is overwritten first)
+            range_pct: Percent of the mid each column spans on either side
+
+        Raises:
+            ValueError: If a size is too small or range_pct is not positive
+        """
+        if buckets < 2:
+            raise ValueError("A heatmap needs at least 2 buckets")
+        if slices <= 0:
+            raise ValueError("Slice count must be positive")
+        if range_pct <= 0:
+            raise ValueError("Range must be a positive percentage")
+        self.buckets = buckets
+        self.slices = slices
+        self.range_pct = range_pct
+        self.step: Optional[float] = None
+
+        self._amounts = array("f", bytes(4 * slices * buckets))
+        self._timestamps = array("q", bytes(8 * slices))
+        self._first_indexes = array("q", bytes(8 * slices))
+        self._mids = array("d", bytes(8 * slices))
+        self._next = 0  # Slot of the next column
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def first_index(self, mid: float) -> int:
+        """
+        Grid index of the first bucket of a column centred on mid.
+
+        The grid step is fixed by the first call.
+        """
+        if self.step is None:
+            self.step = heatmap_step(mid, self.buckets, self.range_pct)
+        return math.floor(mid / self.step + GRID_TOLERANCE) - self.buckets // 2
+
+    def append(self, timestamp: int, mid: float, first_index: int,
+               amounts: List[float]) -> None:
+        """
+        Store a column, overwriting the oldest one when full.
+
+        Args:
+            timestamp: Sample time in milliseconds
+            mid: Mid price at sample time
+            first_index: Grid index of amounts[0] (see first_index)
+            amounts: Resting amount per bucket, lowest price first
+
+        Raises:
+            ValueError: If amounts does not hold one value per bucket
+        """
+        if len(amounts) != self.buckets:
+            raise ValueError(f"Expected {self.buckets} amounts, got {len(amounts)}")
+        slot = self._next
+        start = slot * self.buckets
+        self._amounts[start:start + self.buckets] = array("f", amounts)
+        self._timestamps[slot] = timestamp
+        self._first_indexes[slot] = first_index
+        self._mids[slot] = mid
+        self._next = (slot + 1) % self.slices
+        self._count = min(self._count + 1, self.slices)
+
+    def _slots(self) -> List[int]:
+        """Occupied slots, oldest first."""
+        oldest = (self._next - self._count) % self.slices
+        return [(oldest + offset) % self.slices for offset in range(self._count)]
+
+    def window(self, start: Optional[int] = None, end: Optional[int] = None,
+               low: Optional[float] = None, high: Optional[float] = None) -> Optional[Dict]:
+        """
+        Columns in a time window, laid out on a common price axis.
+
+        Args:
+            start: First sample time in milliseconds (oldest column when None)
+            end: Last sample time in milliseconds (newest column when None)
+            low: Lowest price (lowest bucket of the selected columns when None)
+            high: Highest price (highest bucket of the selected columns when None)
+
+        Returns:
+            Dict with 'step', 'first_index' (grid index of bucket 0),
+            'buckets', 'timestamps', 'mids' and 'amounts' (array('f') of
+            len(timestamps) rows x buckets, lowest price first; zero where a
+            column did not cover a bucket), or None when no column matches
+
+        Raises:
+            ValueError: If the price range is empty or the window exceeds
+                MAX_WINDOW_CELLS
+        """
+        slots = [slot for slot in self._slots()
+                 if (start is None or self._timestamps[slot] >= start)
+                 and (end is None or self._timestamps[slot] <= end)]
+        if not slots or self.step is None:
+            return None
+
+        step = self.step
+        lowest = (math.floor(low / step + GRID_TOLERANCE) if low is not None
+                  else min(self._first_indexes[slot] for slot in slots))
+        highest = (math.floor(high / step + GRID_TOLERANCE) if high is not None
+                   else max(self._first_indexes[slot] for slot in slots) + self.buckets - 1)
+        width = highest - lowest + 1
+        if width <= 0:
+            raise ValueError("Price window is empty")
+        if width * len(slots) > MAX_WINDOW_CELLS:
+            raise ValueError(
+                f"Window of {len(slots)} slices x {width} buckets exceeds "
+                f"{MAX_WINDOW_CELLS} cells")
+
+        amounts = array("f", bytes(4 * width * len(slots)))
+        for row, slot in enumerate(slots):
+            first = self._first_indexes[slot]
+            # Overlap of the column's buckets with the requested range
+            begin = max(first, lowest)
+            stop = min(first + self.buckets, highest + 1)
+            if begin >= stop:
+                continue
+            source = slot * self.buckets + begin - first
+            target = row * width + begin - lowest
+            amounts[target:target + stop - begin] = self._amounts[source:source + stop - begin]
+
+        return {
+            'step': step,
+            'first_index': lowest,
+            'buckets': width,
+            'timestamps': [self._timestamps[slot] for slot in slots],
+            'mids': [self._mids[slot] for slot in slots],
+            'amounts': amounts,
+        }
+
+    def get_stats(self) -> Dict:
+        """Ring size, fill and grid step."""
+        return {
+            'buckets': self.buckets,
+            'slices': self.slices,
+            'columns': self._count,
+            'step': self.step,
+            'bytes': self.get_memory_bytes(),
+        }
+
+    def get_memory_bytes(self) -> int:
+        """Bytes held by the preallocated arrays."""
+        return (self._amounts.itemsize * len(self._amounts)
+                + self.slices * COLUMN_HEADER_BYTES)
+
+
+def encode_window(window: Dict) -> bytes:
+    """
+    Pack a heatmap window (see LiquidityHeatmap.window) into bytes.
+
+    Layout, all little-endian:
+        header      HEATMAP_HEADER: magic b"OFHM", format version (uint16),
+                    reserved (uint16), slices n (uint32), buckets m (uint32),
+                    step (float64), first bucket index (int64)
+        timestamps  n x int64, milliseconds
+        mids        n x float64
+        amounts     n x m float32, one row per slice; bucket j of a row is
+                    priced (first bucket index + j) * step
+
+    Args:
+        window: Result of LiquidityHeatmap.window
+
+    Returns:
+        Encoded window
+    """
+    timestamps = array("q", window['timestamps'])
+    mids = array("d", window['mids'])
+    amounts = window['amounts']
+    if sys.byteorder == "big":  # pragma: no cover - the wire format is little-endian
+        amounts = array("f", amounts)
+        for column in (timestamps, mids, amounts):
+            column.byteswap()
+    header = HEATMAP_HEADER.pack(
+        HEATMAP_MAGIC, HEATMAP_FORMAT_VERSION, 0, len(timestamps),
+        window['buckets'], window['step'], window['first_index'])
+    return b"".join((header, timestamps.tobytes(), mids.tobytes(), amounts.tobytes()))
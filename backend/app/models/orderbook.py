@@ -1,9 +1,22 @@
-from typing import List, Dict, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
+from itertools import islice
 from sortedcontainers import SortedDict
 import asyncio
 import time
 
+from .depth_index import DepthIndex
+from .level_changes import ASKS, BIDS, LevelChange
+from .orderbook_pyramid import OrderBookPyramid
+from .wall_index import WallIndex
+
+# Approximate bytes per SortedDict price level (two boxed floats plus dict
+# and sorted-list overhead), measured with tracemalloc on a 2000-level book
+SORTED_LEVEL_BYTES = 112
+
+LevelIterator = Iterator[Tuple[float, float]]
+Levels = Tuple[Tuple[float, float], ...]
+
 
 @dataclass
 class OrderBookLevel:
@@ -35,10 +48,46 @@ class OrderBookSnapshot:
             self.timestamp = time.time()
 
 
+@dataclass(frozen=True)
+class OrderBookView:
+    """
+    Immutable, versioned view of an order book.
+
+    Levels are (price, amount) tuples in display order: bids highest price
+    first, asks lowest price first. A view never changes once published, so
+    readers can hold and iterate it without locking while the book keeps
+    updating.
+    """
+    symbol: str
+    version: int
+    timestamp: float
+    bids: Tuple[Tuple[float, float], ...]
+    asks: Tuple[Tuple[float, float], ...]
+
+    def top_bids(self, limit: Optional[int] = None) -> Tuple[Tuple[float, float], ...]:
+        """Best bid levels, at most `limit` of them (all when limit is falsy)."""
+        return self.bids[:limit] if limit else self.bids
+
+    def top_asks(self, limit: Optional[int] = None) -> Tuple[Tuple[float, float], ...]:
+        """Best ask levels, at most `limit` of them (all when limit is falsy)."""
+        return self.asks[:limit] if limit else self.asks
+
+
 class OrderBook:
     """
-    Thread-safe order book implementation with sorted price levels.
+    Order book implementation with sorted price levels.
     Supports both full snapshots and delta updates.
+
+    Writers take the book's lock and bump `version` after each applied
+    update. Readers never take the lock: `get_view()` is an immutable
+    copy-on-write view of the whole version, while `top_levels()` and the
+    best bid/ask read only the levels they return.
+
+    An optional aggregation pyramid (see set_pyramid_roundings), depth
+    index (see set_depth_index) and wall index (see set_wall_index) are
+    updated with the levels under the same lock, so they always match
+    `version`. Each update's level changes are computed once and fed to all
+    of them.
     """
 
     def __init__(self, symbol: str):
@@ -55,6 +104,316 @@ class OrderBook:
         # Track last update time
         self._last_update = time.time()
 
+        # Copy-on-write publication: every applied update bumps the version;
+        # the view for a version is built on first read and then shared.
+        self._version = 0
+        self._view = OrderBookView(symbol, 0, self.timestamp, (), ())
+
+        self._pyramid: Optional[OrderBookPyramid] = None
+        self._depth_index: Optional[DepthIndex] = None
+        # (version, metrics) of the last get_depth_metrics() with default sizes
+        self._depth_metrics: Optional[Tuple[int, Optional[Dict]]] = None
+        self._wall_index: Optional[WallIndex] = None
+        # (version, metrics) of the last get_index_metrics()
+        self._index_metrics: Optional[Tuple[int, Dict]] = None
+
+    @property
+    def version(self) -> int:
+        """Monotonic version, incremented by each applied update."""
+        return self._version
+
+    @property
+    def pyramid(self) -> Optional[OrderBookPyramid]:
+        """Aggregation pyramid maintained with the levels, if enabled."""
+        return self._pyramid
+
+    def set_pyramid_roundings(self, roundings: Optional[Iterable[float]]) -> None:
+        """
+        Maintain an aggregation pyramid for these roundings.
+
+        The pyramid is built from the current levels without awaiting, so no
+        update can interleave. Unchanged roundings keep the existing pyramid.
+
+        Args:
+            roundings: Roundings to maintain (e.g. the symbol's
+                roundingOptions); None or no usable rounding disables it
+        """
+        chain = OrderBookPyramid.rounding_chain(roundings or ())
+        if not chain:
+            self._pyramid = None
+            return
+        if self._pyramid is not None and self._pyramid.roundings == chain:
+            return
+        pyramid = OrderBookPyramid(chain)
+        pyramid.load(*self.iter_levels())
+        self._pyramid = pyramid
+
+    @property
+    def depth_index(self) -> Optional[DepthIndex]:
+        """Liquidity-band depth index maintained with the levels, if enabled."""
+        return self._depth_index
+
+    def set_depth_index(self, depth_index: Optional[DepthIndex]) -> None:
+        """
+        Maintain a depth index with the levels.
+
+        The index is loaded from the current levels without awaiting, so no
+        update can interleave.
+
+        Args:
+            depth_index: Empty index to maintain; None disables it
+        """
+        if depth_index is not None:
+            depth_index.load(*self.iter_levels())
+        self._depth_index = depth_index
+        self._depth_metrics = None
+        self._index_metrics = None
+
+    def get_depth_metrics(self, sweep_units: Optional[List[float]] = None) -> Optional[Dict]:
+        """
+        Get liquidity within the depth index bands and sweep costs.
+
+        With the default sweep sizes the result is computed once per version
+        and shared, so callers must not modify it.
+
+        Args:
+            sweep_units: Sweep sizes in base units (the index's configured
+                quote notionals when None)
+
+        Returns:
+            DepthIndex.metrics() dictionary, or None without a depth index
+            or levels
+        """
+        if self._depth_index is None:
+            return None
+        if sweep_units is None:
+            cached = self._depth_metrics
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+        metrics = self._depth_index.metrics(*self._best_prices(), sweep_units)
+        if sweep_units is None:
+            self._depth_metrics = (self._version, metrics)
+        return metrics
+
+    @property
+    def wall_index(self) -> Optional[WallIndex]:
+        """Largest-level (wall) index maintained with the levels, if enabled."""
+        return self._wall_index
+
+    def set_wall_index(self, wall_index: Optional[WallIndex]) -> None:
+        """
+        Maintain a wall index with the levels.
+
+        The index is loaded from the current levels without awaiting, so no
+        update can interleave.
+
+        Args:
+            wall_index: Empty index to maintain; None disables it
+        """
+        if wall_index is not None:
+            wall_index.load(*self.iter_levels(), self._level_amount)
+        self._wall_index = wall_index
+        self._index_metrics = None
+
+    def get_index_metrics(self) -> Dict:
+        """
+        Get the published metrics of the level indexes for this version.
+
+        Computed once per version and shared, so callers must not modify
+        the result.
+
+        Returns:
+            Dict with 'depth' (see get_depth_metrics) and 'walls' (see
+            WallIndex.walls) for the indexes that are enabled and have
+            levels; empty otherwise
+        """
+        cached = self._index_metrics
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        metrics: Dict = {}
+        depth = self.get_depth_metrics()
+        if depth is not None:
+            metrics['depth'] = depth
+        if self._wall_index is not None:
+            walls = self._wall_index.walls()
+            if walls['bids'] or walls['asks']:
+                metrics['walls'] = walls
+        self._index_metrics = (self._version, metrics)
+        return metrics
+
+    def get_view(self) -> OrderBookView:
+        """
+        Get the immutable view of the current version without locking.
+
+        Returns:
+            OrderBookView for the latest applied update
+        """
+        view = self._view
+        if view.version != self._version:
+            # Reason: Built lazily so writers never pay for versions nobody
+            # reads. No await happens here, so the copy cannot interleave
+            # with a writer on the event loop.
+            bids, asks = self._materialize_levels()
+            view = OrderBookView(
+                symbol=self.symbol,
+                version=self._version,
+                timestamp=self.timestamp,
+                bids=bids,
+                asks=asks
+            )
+            self._view = view
+        return view
+
+    def top_levels(self, limit: Optional[int] = None) -> Tuple[Levels, Levels]:
+        """
+        Get the best levels of the current version without locking.
+
+        Sliced from the published view when it is current; otherwise only
+        the first `limit` live levels are read, so a shallow read of a deep
+        book never copies the whole book.
+
+        Args:
+            limit: Maximum number of levels per side (all when falsy)
+
+        Returns:
+            Tuple of (bids highest price first, asks lowest price first)
+        """
+        if not limit or self._view.version == self._version:
+            view = self.get_view()
+            return view.top_bids(limit), view.top_asks(limit)
+        # Reason: No await between reading the live levels, so the slices
+        # cannot interleave with a writer on the event loop.
+        bids, asks = self.iter_levels()
+        return tuple(islice(bids, limit)), tuple(islice(asks, limit))
+
+    # Storage hooks. Subclasses with a different level store (see
+    # TickLadderOrderBook) override these methods only; locking,
+    # versioning and view publication stay here.
+
+    def _load_snapshot(self, bids: List[OrderBookLevel],
+                       asks: List[OrderBookLevel]) -> None:
+        """Replace all levels with a full snapshot (zero amounts skipped)."""
+        # Clear existing data
+        self._bids.clear()
+        self._asks.clear()
+
+        # Update bids
+        for level in bids:
+            if level.amount > 0:  # Only add non-zero amounts
+                self._bids[level.price] = level.amount
+
+        # Update asks
+        for level in asks:
+            if level.amount > 0:  # Only add non-zero amounts
+                self._asks[level.price] = level.amount
+
+    def _apply_delta(self, bids: List[OrderBookLevel],
+                     asks: List[OrderBookLevel]) -> None:
+        """Apply level changes; a zero amount removes the level."""
+        # Update bids
+        for level in bids:
+            if level.amount == 0:
+                # Remove the level if amount is 0
+                self._bids.pop(level.price, None)
+            else:
+                # Update or add the level
+                self._bids[level.price] = level.amount
+
+        # Update asks
+        for level in asks:
+            if level.amount == 0:
+                # Remove the level if amount is 0
+                self._asks.pop(level.price, None)
+            else:
+                # Update or add the level
+                self._asks[level.price] = level.amount
+
+    def _materialize_levels(self) -> Tuple[Tuple[Tuple[float, float], ...],
+                                           Tuple[Tuple[float, float], ...]]:
+        """Copy both sides as (price, amount) tuples in display order."""
+        return tuple(self._bids.items()), tuple(self._asks.items())
+
+    def _level_counts(self) -> Tuple[int, int]:
+        """Number of bid and ask levels."""
+        return len(self._bids), len(self._asks)
+
+    def _level_amount(self, is_ask: bool, price: float) -> float:
+        """Amount resting at a price (0.0 when there is no level)."""
+        return (self._asks if is_ask else self._bids).get(price, 0.0)
+
+    def _stored_levels(self) -> Tuple[Dict[float, float], Dict[float, float]]:
+        """Bid and ask amounts by price; read only, before the next update."""
+        return self._bids, self._asks
+
+    def _best_prices(self) -> Tuple[Optional[float], Optional[float]]:
+        """Best bid and ask prices of the live levels."""
+        return (self._bids.peekitem(0)[0] if self._bids else None,
+                self._asks.peekitem(0)[0] if self._asks else None)
+
+    def iter_levels(self) -> Tuple[LevelIterator, LevelIterator]:
+        """
+        Lazily walk both sides of the live book from the best price.
+
+        Unlike get_view() nothing is copied up front, so a reader that only
+        needs the top of a deep book only touches the top. The iterators
+        read the live levels: consume them without awaiting in between.
+
+        Returns:
+            Tuple of (bids highest price first, asks lowest price first)
+            iterators over (price, amount) tuples
+        """
+        return iter(self._bids.items()), iter(self._asks.items())
+
+    # Level indexes. Changes are computed against the stored levels before an
+    # update is applied and fed to every index after it.
+
+    def _has_level_indexes(self) -> bool:
+        return (self._pyramid is not None or self._depth_index is not None
+                or self._wall_index is not None)
+
+    def _snapshot_changes(self, bids: List[OrderBookLevel],
+                          asks: List[OrderBookLevel]) -> List[LevelChange]:
+        """Difference between the stored levels and a full snapshot."""
+        changes: List[LevelChange] = []
+        for side, levels, stored in zip((BIDS, ASKS), (bids, asks), self._stored_levels()):
+            # Reason: Built first so a price listed twice counts once, with
+            # the last amount, like _load_snapshot.
+            current = {level.price: level.amount for level in levels if level.amount > 0}
+            for price, amount in current.items():
+                # Most levels of a streamed snapshot are unchanged
+                old = stored.get(price, 0.0)
+                if old != amount:
+                    changes.append((side, price, old, amount))
+            changes.extend((side, price, stored[price], 0.0)
+                           for price in stored if price not in current)
+        return changes
+
+    def _delta_changes(self, bids: List[OrderBookLevel],
+                       asks: List[OrderBookLevel]) -> List[LevelChange]:
+        """Level changes of a delta, with the amounts they replace."""
+        changes: List[LevelChange] = []
+        for side, levels in ((BIDS, bids), (ASKS, asks)):
+            pending: Dict[float, float] = {}
+            for level in levels:
+                price = level.price
+                old = (pending[price] if price in pending
+                       else self._level_amount(side == ASKS, price))
+                if old != level.amount:
+                    changes.append((side, price, old, level.amount))
+                pending[price] = level.amount
+        return changes
+
+    def _apply_level_changes(self, changes: List[LevelChange]) -> None:
+        if self._pyramid is not None:
+            self._pyramid.apply_changes(changes)
+        if self._depth_index is not None:
+            self._depth_index.apply_changes(changes)
+            best_bid, best_ask = self._best_prices()
+            if self._depth_index.needs_load(best_bid, best_ask):
+                self._depth_index.load(*self.iter_levels())
+        if self._wall_index is not None:
+            self._wall_index.apply_changes(changes)
+
     async def update_snapshot(self, snapshot: OrderBookSnapshot) -> None:
         """
         Update the order book with a full snapshot.
@@ -69,22 +428,15 @@ class OrderBook:
                     snapshot.symbol}")
 
         async with self._lock:
-            # Clear existing data
-            self._bids.clear()
-            self._asks.clear()
-
-            # Update bids
-            for level in snapshot.bids:
-                if level.amount > 0:  # Only add non-zero amounts
-                    self._bids[level.price] = level.amount
-
-            # Update asks
-            for level in snapshot.asks:
-                if level.amount > 0:  # Only add non-zero amounts
-                    self._asks[level.price] = level.amount
+            changes = (self._snapshot_changes(snapshot.bids, snapshot.asks)
+                       if self._has_level_indexes() else None)
+            self._load_snapshot(snapshot.bids, snapshot.asks)
+            if changes is not None:
+                self._apply_level_changes(changes)
 
             self.timestamp = snapshot.timestamp
             self._last_update = time.time()
+            self._version += 1
 
     async def update_delta(
             self,
@@ -100,26 +452,14 @@ class OrderBook:
             timestamp: Update timestamp
         """
         async with self._lock:
-            # Update bids
-            for level in bids:
-                if level.amount == 0:
-                    # Remove the level if amount is 0
-                    self._bids.pop(level.price, None)
-                else:
-                    # Update or add the level
-                    self._bids[level.price] = level.amount
-
-            # Update asks
-            for level in asks:
-                if level.amount == 0:
-                    # Remove the level if amount is 0
-                    self._asks.pop(level.price, None)
-                else:
-                    # Update or add the level
-                    self._asks[level.price] = level.amount
+            changes = self._delta_changes(bids, asks) if self._has_level_indexes() else None
+            self._apply_delta(bids, asks)
+            if changes is not None:
+                self._apply_level_changes(changes)
 
             self.timestamp = timestamp
             self._last_update = time.time()
+            self._version += 1
 
     async def get_snapshot(
             self,
@@ -127,53 +467,32 @@ class OrderBook:
         """
         Get a snapshot of the current order book.
 
+        Reads through top_levels(), so with a `limit` only the first
+        `limit` levels per side are touched, and writers are never blocked.
+
         Args:
             limit: Maximum number of levels to return per side
 
         Returns:
             OrderBookSnapshot with current data
         """
-        async with self._lock:
-            # Get bids (highest price first)
-            bid_items = list(self._bids.items())
-            if limit:
-                bid_items = bid_items[:limit]
-            bids = [OrderBookLevel(price=price, amount=amount)
-                    for price, amount in bid_items]
-
-            # Get asks (lowest price first)
-            ask_items = list(self._asks.items())
-            if limit:
-                ask_items = ask_items[:limit]
-            asks = [OrderBookLevel(price=price, amount=amount)
-                    for price, amount in ask_items]
-
-            return OrderBookSnapshot(
-                symbol=self.symbol,
-                bids=bids,
-                asks=asks,
-                timestamp=self.timestamp
-            )
+        bids, asks = self.top_levels(limit)
+        return OrderBookSnapshot(
+            symbol=self.symbol,
+            bids=[OrderBookLevel(price=price, amount=amount) for price, amount in bids],
+            asks=[OrderBookLevel(price=price, amount=amount) for price, amount in asks],
+            timestamp=self.timestamp
+        )
 
     async def get_best_bid_ask(
             self) -> Tuple[Optional[float], Optional[float]]:
         """
-        Get the best bid and ask prices.
+        Get the best bid and ask prices from the live levels (no copy).
 
         Returns:
             Tuple of (best_bid_price, best_ask_price)
         """
-        async with self._lock:
-            best_bid = None
-            best_ask = None
-
-            if self._bids:
-                best_bid = next(iter(self._bids))  # First key (highest price)
-
-            if self._asks:
-                best_ask = next(iter(self._asks))  # First key (lowest price)
-
-            return best_bid, best_ask
+        return self._best_prices()
 
     async def get_levels_count(self) -> Tuple[int, int]:
         """
@@ -182,8 +501,7 @@ class OrderBook:
         Returns:
             Tuple of (bid_count, ask_count)
         """
-        async with self._lock:
-            return len(self._bids), len(self._asks)
+        return self._level_counts()
 
     async def get_aggregated_view(self, limit: int, rounding: float) -> Dict:
         """
@@ -197,27 +515,34 @@ class OrderBook:
         Returns:
             Dictionary with aggregated bid/ask data
         """
-        async with self._lock:
-            # This is a placeholder - actual aggregation will be handled by the
-            # service
-            # Get more data for aggregation
-            snapshot = await self.get_snapshot(limit * 10)
-            return {
-                'symbol': self.symbol,
-                'bids': [{'price': level.price, 'amount': level.amount} for level in snapshot.bids],
-                'asks': [{'price': level.price, 'amount': level.amount} for level in snapshot.asks],
-                'timestamp': self.timestamp,
-                'limit': limit,
-                'rounding': rounding
-            }
+        # This is a placeholder - actual aggregation will be handled by the
+        # service
+        # Get more data for aggregation
+        bids, asks = self.top_levels(limit * 10)
+        return {
+            'symbol': self.symbol,
+            'bids': [{'price': price, 'amount': amount} for price, amount in bids],
+            'asks': [{'price': price, 'amount': amount} for price, amount in asks],
+            'timestamp': self.timestamp,
+            'limit': limit,
+            'rounding': rounding
+        }
+
+    def get_memory_bytes(self) -> int:
+        """Approximate bytes held by the price levels and the level indexes."""
+        indexes = (self._pyramid, self._depth_index, self._wall_index)
+        index_bytes = sum(index.get_memory_bytes() for index in indexes if index is not None)
+        return (len(self._bids) + len(self._asks)) * SORTED_LEVEL_BYTES + index_bytes
 
     def is_empty(self) -> bool:
         """Check if the order book is empty."""
-        return len(self._bids) == 0 and len(self._asks) == 0
+        return self._level_counts() == (0, 0)
 
     def get_age(self) -> float:
         """Get the age of the last update in seconds."""
         return time.time() - self._last_update
 
     def __repr__(self) -> str:
-        return f"OrderBook(symbol={self.symbol}, bids={len(self._bids)}, asks={len(self._asks)})"
+        bid_count, ask_count = self._level_counts()
+        return (f"{type(self).__name__}(symbol={self.symbol}, bids={bid_count}, "
+                f"asks={ask_count}, version={self._version})")
@@ -0,0 +1,203 @@
+"""
+Multi-resolution aggregation pyramid for one order book.
+
+Clients of a symbol watch it at different roundings (0.1, 1, 10, 100...).
+Instead of bucketing the raw levels once per rounding, the pyramid keeps one
+bucket map per rounding, finest first:
+
+- The finest level buckets the raw price levels
+- Each coarser level buckets the level below it; with power-of-10 (or any
+  integer ratio) roundings a bucket is an integer index (price = index *
+  rounding), so moving up a level is an integer division
+- A changed raw level updates exactly one bucket per level, the path from
+  its finest bucket to the top, and nothing else
+
+The pyramid is fed the level changes the order book computes for each
+update (see level_changes), so a full snapshot (a ccxt stream delivers the
+whole book on every update) only touches the levels that changed. A
+subscription's view is a top-N read from its level.
+"""
+
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedDict
+
+from .level_changes import ASKS, BIDS, LEVEL_DUST, LevelChange
+
+# Buckets at or below BUCKET_DUST are not served (raw levels at or below
+# LEVEL_DUST count as absent; the thresholds of the aggregation walk)
+BUCKET_DUST = 1e-6
+
+# Approximate bytes per bucket, measured with tracemalloc
+PYRAMID_BUCKET_BYTES = 200
+
+Level = Tuple[float, float]
+
+
+class OrderBookPyramid:
+    """
+    Bucket maps for a chain of roundings, maintained level by level.
+
+    Buckets are [amount, raw level count, price] lists keyed by integer
+    index; bids are rounded down and kept highest first, asks are rounded
+    up and kept lowest first, matching the aggregation service. A bucket is
+    deleted when its last raw level goes, so removals are exact.
+    """
+
+    def __init__(self, roundings: Iterable[float]):
+        """
+        Args:
+            roundings: Roundings to maintain; see rounding_chain()
+
+        Raises:
+            ValueError: If no rounding is usable
+        """
+        self.roundings = self.rounding_chain(roundings)
+        if not self.roundings:
+            raise ValueError("Pyramid needs at least one positive rounding")
+
+        self._decimal_roundings = [Decimal(str(rounding)) for rounding in self.roundings]
+        # Index ratio of each level to the level below it (1 for the finest)
+        self._ratios = [1] + [
+            int(coarse / fine) for fine, coarse in
+            zip(self._decimal_roundings, self._decimal_roundings[1:])]
+        # One bucket map per rounding, per side
+        self._buckets: Tuple[List[SortedDict], ...] = (
+            [SortedDict(lambda index: -index) for _ in self.roundings],
+            [SortedDict() for _ in self.roundings],
+        )
+
+    @staticmethod
+    def rounding_chain(roundings: Iterable[float]) -> List[float]:
+        """
+        Pick the roundings a pyramid can maintain.
+
+        Args:
+            roundings: Candidate roundings, e.g. a symbol's roundingOptions
+
+        Returns:
+            Ascending positive roundings where each one is an integer
+            multiple of the previous; others are left out
+        """
+        chain: List[float] = []
+        for rounding in sorted({float(r) for r in roundings if r and r > 0}):
+            if chain:
+                ratio = Decimal(str(rounding)) / Decimal(str(chain[-1]))
+                if ratio != ratio.to_integral_value():
+                    continue
+            chain.append(rounding)
+        return chain
+
+    def level_for(self, rounding: float) -> Optional[int]:
+        """Pyramid level of a rounding, or None if it is not maintained."""
+        for level, candidate in enumerate(self.roundings):
+            if abs(candidate - rounding) <= 1e-9 * candidate:
+                return level
+        return None
+
+    def _bucket_price(self, level: int, index: int) -> float:
+        # Reason: Same Decimal product as DecimalUtils, so bucket prices are
+        # identical to those of the aggregation walk.
+        return float(Decimal(index) * self._decimal_roundings[level])
+
+    def _finest_index(self, side: int, price: float) -> int:
+        quotient = Decimal(str(price)) / self._decimal_roundings[0]
+        return int(quotient.to_integral_value(
+            rounding=ROUND_CEILING if side == ASKS else ROUND_FLOOR))
+
+    def _apply_change(self, side: int, price: float, previous: float,
+                      amount: float) -> None:
+        """Move one raw level from its previous amount and update its bucket path."""
+        was_present = previous > LEVEL_DUST
+        present = amount > LEVEL_DUST
+        if not (was_present or present):
+            return
+        change = (amount if present else 0.0) - (previous if was_present else 0.0)
+        count_change = present - was_present
+        if not change and not count_change:
+            return
+
+        index = self._finest_index(side, price)
+        for level, buckets in enumerate(self._buckets[side]):
+            ratio = self._ratios[level]
+            if ratio > 1:
+                index = -(-index // ratio) if side == ASKS else index // ratio
+            bucket = buckets.get(index)
+            if bucket is None:
+                bucket = [0.0, 0, self._bucket_price(level, index)]
+                buckets[index] = bucket
+            bucket[0] += change
+            bucket[1] += count_change
+            if bucket[1] == 0:
+                del buckets[index]
+
+    def load(self, bids: Iterable[Level], asks: Iterable[Level]) -> None:
+        """
+        Bucket the levels of a book into an empty pyramid.
+
+        Args:
+            bids: (price, amount) bid levels
+            asks: (price, amount) ask levels
+        """
+        for side, levels in ((BIDS, bids), (ASKS, asks)):
+            for price, amount in levels:
+                self._apply_change(side, price, 0.0, amount)
+
+    def apply_changes(self, changes: Iterable[LevelChange]) -> None:
+        """
+        Apply the level changes of one order book update.
+
+        Args:
+            changes: (side, price, previous amount, new amount) tuples
+        """
+        for side, price, previous, amount in changes:
+            self._apply_change(side, price, previous, amount)
+
+    def top(self, is_ask: bool, limit: int,
+            rounding: float) -> Tuple[List[Dict], int, bool]:
+        """
+        Read the best buckets of one side at a maintained rounding.
+
+        Args:
+            is_ask: Whether to read asks (True) or bids (False)
+            limit: Number of buckets to return
+            rounding: A rounding in self.roundings
+
+        Returns:
+            Tuple of (price/amount dictionaries from the best price, raw
+            levels in the buckets read, whether the side was read to its
+            end), like OrderBookAggregationService.walk_buckets
+
+        Raises:
+            ValueError: If the rounding is not maintained
+        """
+        level = self.level_for(rounding)
+        if level is None:
+            raise ValueError(f"Rounding {rounding} is not in the pyramid")
+
+        result: List[Dict] = []
+        if limit <= 0:
+            return result, 0, False
+        covered = 0
+        for amount, count, price in self._buckets[ASKS if is_ask else BIDS][level].values():
+            covered += count
+            if amount > BUCKET_DUST:
+                result.append({'price': price, 'amount': amount})
+                if len(result) >= limit:
+                    return result, covered, False
+        return result, covered, True
+
+    def get_stats(self) -> Dict:
+        """Bucket counts per rounding."""
+        return {
+            'buckets': {
+                str(rounding): [len(self._buckets[BIDS][level]), len(self._buckets[ASKS][level])]
+                for level, rounding in enumerate(self.roundings)
+            },
+        }
+
+    def get_memory_bytes(self) -> int:
+        """Approximate bytes held by all bucket maps."""
+        buckets = sum(len(level) for side in self._buckets for level in side)
+        return buckets * PYRAMID_BUCKET_BYTES
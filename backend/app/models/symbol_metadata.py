@@ -0,0 +1,200 @@
+"""
+Precompiled symbol metadata.
+
+Market definitions are compiled once into immutable records when the
+markets are loaded, so hot paths (trade formatting, WebSocket connects,
+chart loads) do not re-parse exchange precision data on every call.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+
+def parse_precision(precision_value: Any) -> Optional[int]:
+    """
+    Convert a ccxt precision value into a number of decimal places.
+
+    ccxt reports precision either as decimal places (int) or as a tick size
+    (float such as 0.01 or 1e-8), depending on the exchange precision mode.
+
+    Args:
+        precision_value: Precision value from market['precision']
+
+    Returns:
+        Number of decimal places, or None if it cannot be determined
+    """
+    if precision_value is None or isinstance(precision_value, bool):
+        return None
+    if isinstance(precision_value, int):
+        return precision_value
+    if isinstance(precision_value, float):
+        if 0 < precision_value < 1:
+            # Convert scientific notation to decimal places
+            return abs(int(round(float(f"{precision_value:.10e}".split("e")[1]))))
+        return int(precision_value)
+    return None
+
+
+def parse_tick_size(precision_value: Any, decimals: Optional[int]) -> Optional[float]:
+    """
+    Get the minimum price/amount increment for a precision value.
+
+    Args:
+        precision_value: Precision value from market['precision']
+        decimals: Decimal places parsed from the same value
+
+    Returns:
+        Tick size, or None if precision is unknown
+    """
+    if isinstance(precision_value, float) and 0 < precision_value < 1:
+        return precision_value
+    if decimals is None:
+        return None
+    return 10 ** -decimals if decimals > 0 else 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolMetadata:
+    """Immutable, compiled view of a single market."""
+
+    id: str
+    symbol: str
+    base_asset: Optional[str]
+    quote_asset: Optional[str]
+    active: bool
+    type: Optional[str]
+    spot: bool
+    future: bool
+    price_precision: Optional[int]
+    amount_precision: Optional[int]
+    tick_size: Optional[float]
+    amount_step: Optional[float]
+    # Full rounding ladder before any current-price limit is applied
+    rounding_ladder: Tuple[float, ...]
+    rounding_options: Tuple[float, ...]
+    default_rounding: float
+    price_format: Tuple[Tuple[str, Any], ...]
+    # Prebuilt format specs, e.g. ".2f", for price and amount values
+    price_format_spec: str
+    amount_format_spec: str
+
+    @property
+    def swap(self) -> bool:
+        """Whether the market is a perpetual swap."""
+        return self.type == "swap"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Build the symbol info dictionary returned by SymbolService.
+
+        Returns:
+            New dictionary; callers may modify it freely
+        """
+        return {
+            "id": self.id,
+            "symbol": self.symbol,
+            "base_asset": self.base_asset,
+            "quote_asset": self.quote_asset,
+            "active": self.active,
+            "type": self.type,
+            "spot": self.spot,
+            "swap": self.swap,
+            "future": self.future,
+            "pricePrecision": self.price_precision,
+            "amountPrecision": self.amount_precision,
+            "roundingOptions": list(self.rounding_options),
+            "defaultRounding": self.default_rounding,
+            "priceFormat": dict(self.price_format),
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """
+        Serialize to a JSON-compatible record for the disk snapshot.
+
+        Returns:
+            Dictionary of all fields
+        """
+        return asdict(self)
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "SymbolMetadata":
+        """
+        Rebuild a record written by to_record().
+
+        Args:
+            record: Dictionary of all fields
+
+        Returns:
+            SymbolMetadata instance
+
+        Raises:
+            TypeError: If the record does not match the current fields
+        """
+        return cls(**{
+            **record,
+            "rounding_ladder": tuple(record["rounding_ladder"]),
+            "rounding_options": tuple(record["rounding_options"]),
+            "price_format": tuple(tuple(item) for item in record["price_format"]),
+        })
+
+    def to_market(self) -> Dict[str, Any]:
+        """
+        Build the subset of a ccxt market dictionary SymbolService reads.
+
+        Returns:
+            Market dictionary with id, symbol, assets, type flags and precision
+        """
+        return {
+            "id": self.id,
+            "symbol": self.symbol,
+            "base": self.base_asset,
+            "quote": self.quote_asset,
+            "active": self.active,
+            "type": self.type,
+            "spot": self.spot,
+            "future": self.future,
+            "precision": {"price": self.tick_size, "amount": self.amount_step},
+        }
+
+
+class MarketsSnapshot(NamedTuple):
+    """
+    Everything derived from one load_markets() result.
+
+    Built off the event loop and swapped into SymbolService as a unit, so
+    readers never observe a half-updated set of indexes.
+    """
+
+    markets: Dict[str, Any]
+    symbol_cache: Dict[str, str]  # ID -> exchange symbol
+    exchange_to_id: Dict[str, str]  # exchange symbol -> ID
+    metadata_by_id: Dict[str, SymbolMetadata]
+    metadata_by_symbol: Dict[str, SymbolMetadata]
+
+
+def snapshot_from_metadata(records: Iterable[SymbolMetadata]) -> MarketsSnapshot:
+    """
+    Build a markets snapshot from compiled metadata alone.
+
+    Used for warm starts from disk, before the exchange markets are loaded.
+
+    Args:
+        records: Compiled metadata records
+
+    Returns:
+        MarketsSnapshot with market dictionaries rebuilt from the records
+    """
+    markets: Dict[str, Any] = {}
+    symbol_cache: Dict[str, str] = {}
+    exchange_to_id: Dict[str, str] = {}
+    by_id: Dict[str, SymbolMetadata] = {}
+    by_symbol: Dict[str, SymbolMetadata] = {}
+
+    for metadata in records:
+        markets[metadata.symbol] = metadata.to_market()
+        symbol_cache[metadata.id] = metadata.symbol
+        exchange_to_id[metadata.symbol] = metadata.id
+        by_id[metadata.id] = metadata
+        by_symbol[metadata.symbol] = metadata
+
+    return MarketsSnapshot(markets, symbol_cache, exchange_to_id, by_id, by_symbol)
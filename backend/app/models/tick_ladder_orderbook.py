@@ -0,0 +1,384 @@
+"""
+Array-backed tick ladder order book for dense books.
+
+Near the mid of a liquid market almost every tick holds liquidity, so each
+side is stored as a NumPy amount array indexed by integer tick offset from a
+moving anchor instead of a SortedDict of float keys:
+
+- O(1) level updates (one array store; best bid/ask tracked incrementally)
+- Vectorized full-snapshot loads and view materialization
+- The window recenters when the mid drifts out of its central half
+- Off-grid prices and prices outside the window fall back to the sorted maps
+  inherited from OrderBook
+
+NumPy is optional; without it `create_orderbook` falls back to OrderBook.
+"""
+
+import heapq
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from .orderbook import LevelIterator, OrderBook, OrderBookLevel
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+logger = logging.getLogger(__name__)
+
+BACKEND_SORTED = "sorted"
+BACKEND_TICK_LADDER = "tick_ladder"
+
+DEFAULT_LADDER_WIDTH = 4096
+MIN_LADDER_WIDTH = 16
+
+# Prices within this fraction of a tick of the grid count as on-grid
+GRID_TOLERANCE = 1e-6
+# Slots scanned per step when walking the ladder lazily
+WALK_CHUNK = 256
+
+Levels = Tuple[Tuple[float, float], ...]
+
+
+class TickLadderOrderBook(OrderBook):
+    """
+    OrderBook whose levels live in fixed-width tick arrays.
+
+    Slot i of each array is the amount at tick (anchor + i), i.e. price
+    (anchor + i) * tick_size. The inherited `_bids`/`_asks` SortedDicts hold
+    only outliers: off-grid prices and prices outside the window.
+    """
+
+    def __init__(self, symbol: str, tick_size: float,
+                 width: int = DEFAULT_LADDER_WIDTH):
+        if np is None:
+            raise RuntimeError("TickLadderOrderBook requires numpy")
+        if tick_size <= 0:
+            raise ValueError("Tick size must be positive")
+        if width < MIN_LADDER_WIDTH:
+            raise ValueError(f"Ladder width must be at least {MIN_LADDER_WIDTH}")
+
+        super().__init__(symbol)
+        self.tick_size = tick_size
+        self.width = width
+        # Reason: Prices are rebuilt from tick indexes; rounding to the tick's
+        # own decimals recovers the exact float the exchange sent.
+        self._decimals = max(0, -Decimal(str(tick_size)).normalize().as_tuple().exponent)
+
+        self._anchor: Optional[int] = None  # Tick index of slot 0
+        self._bid_amounts = np.zeros(width, dtype=np.float64)
+        self._ask_amounts = np.zeros(width, dtype=np.float64)
+        self._best_bid = -1  # Highest bid slot, -1 when the ladder has none
+        self._best_ask = width  # Lowest ask slot, width when it has none
+        self.recenter_count = 0
+
+    # Tick arithmetic
+
+    def _price(self, slot: int) -> float:
+        """Price of a ladder slot."""
+        return round((self._anchor + slot) * self.tick_size, self._decimals)
+
+    def _slot(self, price: float) -> Optional[int]:
+        """Ladder slot for a price, or None for off-grid/out-of-window prices."""
+        scaled = price / self.tick_size
+        tick = round(scaled)
+        if abs(scaled - tick) > GRID_TOLERANCE:
+            return None
+        slot = tick - self._anchor
+        return slot if 0 <= slot < self.width else None
+
+    def _mid_tick(self, best_bid: Optional[float],
+                  best_ask: Optional[float]) -> Optional[int]:
+        """Tick index halfway between the best prices (either may be None)."""
+        if best_bid is None and best_ask is None:
+            return None
+        if best_bid is None:
+            return round(best_ask / self.tick_size)
+        if best_ask is None:
+            return round(best_bid / self.tick_size)
+        return round((best_bid + best_ask) / 2 / self.tick_size)
+
+    def _is_centered(self, mid_tick: int) -> bool:
+        """Whether the mid lies in the central half of the window."""
+        slot = mid_tick - self._anchor
+        return self.width // 4 <= slot <= 3 * self.width // 4
+
+    # Best price tracking
+
+    def _scan_best_bid(self, below: int) -> int:
+        nonzero = np.flatnonzero(self._bid_amounts[:below])
+        return int(nonzero[-1]) if nonzero.size else -1
+
+    def _scan_best_ask(self, above: int) -> int:
+        nonzero = np.flatnonzero(self._ask_amounts[above + 1:])
+        return above + 1 + int(nonzero[0]) if nonzero.size else self.width
+
+    def _set_bid(self, slot: int, amount: float) -> None:
+        self._bid_amounts[slot] = amount
+        if amount > 0:
+            if slot > self._best_bid:
+                self._best_bid = slot
+        elif slot == self._best_bid:
+            self._best_bid = self._scan_best_bid(slot)
+
+    def _set_ask(self, slot: int, amount: float) -> None:
+        self._ask_amounts[slot] = amount
+        if amount > 0:
+            if slot < self._best_ask:
+                self._best_ask = slot
+        elif slot == self._best_ask:
+            self._best_ask = self._scan_best_ask(slot)
+
+    def _best_prices(self) -> Tuple[Optional[float], Optional[float]]:
+        """Best bid and ask across the ladder and the outlier maps."""
+        best_bid = self._price(self._best_bid) if self._best_bid >= 0 else None
+        if self._bids:
+            outlier = self._bids.peekitem(0)[0]  # Highest price first
+            if best_bid is None or outlier > best_bid:
+                best_bid = outlier
+
+        best_ask = self._price(self._best_ask) if self._best_ask < self.width else None
+        if self._asks:
+            outlier = self._asks.peekitem(0)[0]  # Lowest price first
+            if best_ask is None or outlier < best_ask:
+                best_ask = outlier
+
+        return best_bid, best_ask
+
+    # Recentering
+
+    def _recenter(self, mid_tick: int) -> None:
+        """Move the window so mid_tick sits in its middle, keeping all levels."""
+        new_anchor = mid_tick - self.width // 2
+        if self._anchor is None:
+            self._anchor = new_anchor
+            return
+
+        shift = new_anchor - self._anchor
+        for ladder, outliers in ((self._bid_amounts, self._bids),
+                                 (self._ask_amounts, self._asks)):
+            # Levels leaving the window become outliers
+            occupied = np.flatnonzero(ladder)
+            leaving = occupied[(occupied < shift) | (occupied >= shift + self.width)]
+            for slot, amount in zip(leaving.tolist(), ladder[leaving].tolist()):
+                outliers[self._price(slot)] = amount
+
+            kept = ladder[max(shift, 0):min(shift + self.width, self.width)].copy()
+            ladder.fill(0)
+            start = max(-shift, 0)
+            ladder[start:start + kept.size] = kept
+
+        self._anchor = new_anchor
+
+        # Outliers now inside the window move onto the ladder
+        for ladder, outliers in ((self._bid_amounts, self._bids),
+                                 (self._ask_amounts, self._asks)):
+            for price in list(outliers.keys()):
+                slot = self._slot(price)
+                if slot is not None:
+                    ladder[slot] = outliers.pop(price)
+
+        self._best_bid = self._scan_best_bid(self.width)
+        self._best_ask = self._scan_best_ask(-1)
+        self.recenter_count += 1
+        logger.debug(f"Recentered tick ladder for {self.symbol} at tick {mid_tick}")
+
+    def _maybe_recenter(self) -> None:
+        """Recenter when the mid has drifted out of the central half."""
+        mid_tick = self._mid_tick(*self._best_prices())
+        if mid_tick is not None and (self._anchor is None or not self._is_centered(mid_tick)):
+            self._recenter(mid_tick)
+
+    # OrderBook storage hooks
+
+    def _fill_side(self, levels: List[OrderBookLevel], ladder, outliers) -> None:
+        """Vectorized load of one snapshot side into an empty ladder."""
+        if not levels:
+            return
+        prices = np.fromiter((level.price for level in levels), np.float64, len(levels))
+        amounts = np.fromiter((level.amount for level in levels), np.float64, len(levels))
+        positive = amounts > 0
+        prices, amounts = prices[positive], amounts[positive]
+
+        scaled = prices / self.tick_size
+        ticks = np.rint(scaled)
+        slots = ticks.astype(np.int64) - self._anchor
+        inside = ((np.abs(scaled - ticks) <= GRID_TOLERANCE)
+                  & (slots >= 0) & (slots < self.width))
+
+        ladder[slots[inside]] = amounts[inside]
+        outside = ~inside
+        for price, amount in zip(prices[outside].tolist(), amounts[outside].tolist()):
+            outliers[price] = amount
+
+    def _load_snapshot(self, bids: List[OrderBookLevel],
+                       asks: List[OrderBookLevel]) -> None:
+        self._bids.clear()
+        self._asks.clear()
+        self._bid_amounts.fill(0)
+        self._ask_amounts.fill(0)
+
+        best_bid = max((level.price for level in bids if level.amount > 0), default=None)
+        best_ask = min((level.price for level in asks if level.amount > 0), default=None)
+        mid_tick = self._mid_tick(best_bid, best_ask)
+        if mid_tick is not None and (self._anchor is None or not self._is_centered(mid_tick)):
+            # Reason: The ladder is empty here, so moving the anchor is free.
+            self._anchor = mid_tick - self.width // 2
+
+        if self._anchor is not None:
+            self._fill_side(bids, self._bid_amounts, self._bids)
+            self._fill_side(asks, self._ask_amounts, self._asks)
+
+        self._best_bid = self._scan_best_bid(self.width)
+        self._best_ask = self._scan_best_ask(-1)
+
+    def _apply_delta(self, bids: List[OrderBookLevel],
+                     asks: List[OrderBookLevel]) -> None:
+        if self._anchor is None:
+            best_bid = max((level.price for level in bids if level.amount > 0), default=None)
+            best_ask = min((level.price for level in asks if level.amount > 0), default=None)
+            mid_tick = self._mid_tick(best_bid, best_ask)
+            if mid_tick is None:
+                return  # Nothing to add to an empty book
+            self._anchor = mid_tick - self.width // 2
+
+        for level in bids:
+            slot = self._slot(level.price)
+            if slot is not None:
+                self._set_bid(slot, level.amount)
+            elif level.amount == 0:
+                self._bids.pop(level.price, None)
+            else:
+                self._bids[level.price] = level.amount
+
+        for level in asks:
+            slot = self._slot(level.price)
+            if slot is not None:
+                self._set_ask(slot, level.amount)
+            elif level.amount == 0:
+                self._asks.pop(level.price, None)
+            else:
+                self._asks[level.price] = level.amount
+
+        self._maybe_recenter()
+
+    def _ladder_levels(self, slots, ladder) -> Levels:
+        """(price, amount) tuples for ladder slots, in the given order."""
+        if self._anchor is None or not slots.size:
+            return ()
+        prices = np.round((slots + self._anchor) * self.tick_size, self._decimals)
+        return tuple(zip(prices.tolist(), ladder[slots].tolist()))
+
+    def _materialize_levels(self) -> Tuple[Levels, Levels]:
+        bids = self._ladder_levels(np.flatnonzero(self._bid_amounts)[::-1], self._bid_amounts)
+        if self._bids:
+            bids = tuple(heapq.merge(bids, self._bids.items(), key=lambda level: -level[0]))
+
+        asks = self._ladder_levels(np.flatnonzero(self._ask_amounts), self._ask_amounts)
+        if self._asks:
+            asks = tuple(heapq.merge(asks, self._asks.items(), key=lambda level: level[0]))
+
+        return bids, asks
+
+    def _walk_ladder(self, ladder, best: int, descending: bool) -> LevelIterator:
+        """Yield occupied ladder slots from the best one outward, a chunk at a time."""
+        if self._anchor is None:
+            return
+        if descending:
+            high = best + 1
+            while high > 0:
+                low = max(0, high - WALK_CHUNK)
+                yield from self._ladder_levels(np.flatnonzero(ladder[low:high])[::-1] + low, ladder)
+                high = low
+        else:
+            low = max(best, 0)
+            while low < self.width:
+                high = min(self.width, low + WALK_CHUNK)
+                yield from self._ladder_levels(np.flatnonzero(ladder[low:high]) + low, ladder)
+                low = high
+
+    def iter_levels(self) -> Tuple[LevelIterator, LevelIterator]:
+        bids = self._walk_ladder(self._bid_amounts, self._best_bid, descending=True)
+        if self._bids:
+            bids = heapq.merge(bids, self._bids.items(), key=lambda level: -level[0])
+
+        asks = self._walk_ladder(self._ask_amounts, self._best_ask, descending=False)
+        if self._asks:
+            asks = heapq.merge(asks, self._asks.items(), key=lambda level: level[0])
+
+        return bids, asks
+
+    def _level_counts(self) -> Tuple[int, int]:
+        return (int(np.count_nonzero(self._bid_amounts)) + len(self._bids),
+                int(np.count_nonzero(self._ask_amounts)) + len(self._asks))
+
+    def _stored_levels(self) -> Tuple[Dict[float, float], Dict[float, float]]:
+        bids, asks = self.iter_levels()
+        return dict(bids), dict(asks)
+
+    def _level_amount(self, is_ask: bool, price: float) -> float:
+        slot = self._slot(price) if self._anchor is not None else None
+        if slot is not None:
+            return float((self._ask_amounts if is_ask else self._bid_amounts)[slot])
+        return super()._level_amount(is_ask, price)
+
+    def get_memory_bytes(self) -> int:
+        """Approximate bytes held by the ladder arrays and outlier levels."""
+        return (self._bid_amounts.nbytes + self._ask_amounts.nbytes
+                + super().get_memory_bytes())
+
+
+def tick_size_from_symbol_data(symbol_data: Optional[Dict]) -> Optional[float]:
+    """
+    Get a symbol's price tick from the manager's symbol data.
+
+    Args:
+        symbol_data: Symbol metadata with 'tickSize' and/or 'pricePrecision'
+
+    Returns:
+        Positive tick size, or None if it cannot be determined
+    """
+    if not symbol_data:
+        return None
+    tick_size = symbol_data.get('tickSize')
+    if isinstance(tick_size, (int, float)) and tick_size > 0:
+        return float(tick_size)
+    precision = symbol_data.get('pricePrecision')
+    if isinstance(precision, int) and precision >= 0:
+        return 10.0 ** -precision
+    return None
+
+
+def create_orderbook(symbol: str, backend: str = BACKEND_SORTED,
+                     symbol_data: Optional[Dict] = None,
+                     width: int = DEFAULT_LADDER_WIDTH) -> OrderBook:
+    """
+    Create an order book with the configured storage backend.
+
+    Falls back to the SortedDict OrderBook when the tick ladder is not
+    selected, numpy is missing, or the symbol's tick size is unknown.
+
+    Args:
+        symbol: Trading symbol
+        backend: BACKEND_SORTED or BACKEND_TICK_LADDER
+        symbol_data: Symbol metadata used to find the tick size
+        width: Ladder width in ticks
+
+    Returns:
+        OrderBook or TickLadderOrderBook instance
+    """
+    if backend != BACKEND_TICK_LADDER:
+        return OrderBook(symbol)
+
+    if np is None:
+        logger.warning(f"numpy not available - using sorted order book for {symbol}")
+        return OrderBook(symbol)
+
+    tick_size = tick_size_from_symbol_data(symbol_data)
+    if tick_size is None:
+        logger.warning(f"Unknown tick size for {symbol} - using sorted order book")
+        return OrderBook(symbol)
+
+    return TickLadderOrderBook(symbol, tick_size, width)
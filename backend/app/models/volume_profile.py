@@ -0,0 +1,30 @@
+"""
+Volume profile models for API responses
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class VolumeProfileLevel(BaseModel):
+    """Traded volume for a single price bucket"""
+
+    price: float = Field(..., description="Lower bound of the price bucket")
+    buy_volume: float = Field(..., description="Taker buy volume in base asset")
+    sell_volume: float = Field(..., description="Taker sell volume in base asset")
+    total_volume: float = Field(..., description="Total traded volume in base asset")
+    price_formatted: str = Field(..., description="Formatted price for display")
+    total_volume_formatted: str = Field(..., description="Formatted total volume for display")
+
+
+class VolumeProfileResponse(BaseModel):
+    """Response model for volume profile API endpoint"""
+
+    symbol: str = Field(..., description="Trading symbol")
+    session: str = Field(..., description="UTC session date (YYYY-MM-DD)")
+    rounding: float = Field(..., description="Price bucket size")
+    tick_size: float = Field(..., description="Symbol price tick size")
+    trade_count: int = Field(..., description="Number of trades recorded in the session")
+    total_volume: float = Field(..., description="Total volume recorded in the session")
+    point_of_control: Optional[float] = Field(None, description="Price bucket with the highest volume")
+    data: List[VolumeProfileLevel] = Field(..., description="Histogram rows, lowest price first")
@@ -0,0 +1,211 @@
+"""
+Incremental index of the largest resting levels ("walls") of an order book.
+
+Highlighting walls across a 1000-level book by sorting it on every update is
+O(levels). Instead each side keeps a max-heap of (amount, price) entries fed
+the book's level changes (see level_changes):
+
+- A new or changed amount is pushed: O(log n)
+- Removed and replaced amounts are not searched for; an entry is stale when
+  the book no longer holds that amount at that price and is dropped when it
+  reaches the top (lazy deletion)
+- Reading the top K pops until K live entries are found and pushes them back
+- The heap is compacted once stale entries outnumber live levels, so memory
+  stays proportional to the book
+
+A z-score per wall compares its amount to a rolling (exponentially weighted)
+mean and variance of level sizes, updated with every changed level in O(1).
+"""
+
+import heapq
+import math
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .level_changes import ASKS, BIDS, LEVEL_DUST, LevelChange
+
+DEFAULT_WALL_COUNT = 5
+DEFAULT_ROLLING_LEVELS = 1000
+
+# Compact a heap when it holds more than this many entries per live level
+COMPACT_FACTOR = 2
+COMPACT_SLACK = 64
+
+Level = Tuple[float, float]
+# (is_ask, price) -> amount currently resting at the price
+LevelAmount = Callable[[bool, float], float]
+
+
+class WallIndex:
+    """
+    Top-K levels by amount per side with lazy deletion.
+
+    Entries are validated against the book's own amounts, so the index
+    keeps no copy of the levels; see OrderBook.set_wall_index.
+    """
+
+    def __init__(self, top_k: int = DEFAULT_WALL_COUNT, min_z_score: float = 0.0,
+                 rolling_levels: int = DEFAULT_ROLLING_LEVELS):
+        """
+        Args:
+            top_k: Walls reported per side
+            min_z_score: Only report walls at least this many rolling
+                standard deviations above the rolling mean (0 reports the
+                top_k levels regardless)
+            rolling_levels: Span, in changed levels, of the rolling mean
+                and variance of level sizes
+
+        Raises:
+            ValueError: If top_k or rolling_levels is not positive
+        """
+        if top_k <= 0:
+            raise ValueError("Wall count must be positive")
+        if rolling_levels <= 0:
+            raise ValueError("Rolling span must be positive")
+        self.top_k = top_k
+        self.min_z_score = min_z_score
+        self._alpha = 2 / (rolling_levels + 1)
+
+        self._level_amount: LevelAmount = lambda is_ask, price: 0.0
+        # (-amount, price) entries, per side
+        self._heaps: Tuple[List[Tuple[float, float]], ...] = ([], [])
+        self._live = [0, 0]  # Levels on the book, per side
+        self._mean = [0.0, 0.0]
+        self._variance = [0.0, 0.0]
+        self._samples = [0, 0]
+        self.compactions = 0
+
+    def load(self, bids: Iterable[Level], asks: Iterable[Level],
+             level_amount: LevelAmount) -> None:
+        """
+        Index the levels of a book.
+
+        Args:
+            bids: (price, amount) bid levels
+            asks: (price, amount) ask levels
+            level_amount: The book's lookup of the amount at a price, used
+                to tell live entries from stale ones
+        """
+        self._level_amount = level_amount
+        for side, levels in ((BIDS, bids), (ASKS, asks)):
+            heap = [(-amount, price) for price, amount in levels if amount > LEVEL_DUST]
+            heapq.heapify(heap)
+            self._heaps[side][:] = heap
+            self._live[side] = len(heap)
+            if heap:
+                # Reason: Seeded with the book's exact statistics; folding the
+                # levels in one by one would weight them by heap order.
+                amounts = [-negated for negated, _ in heap]
+                mean = sum(amounts) / len(amounts)
+                self._mean[side] = mean
+                self._variance[side] = sum((amount - mean) ** 2 for amount in amounts) / len(amounts)
+                self._samples[side] = len(amounts)
+
+    def _observe(self, side: int, amount: float) -> None:
+        """Fold a level size into the side's rolling mean and variance."""
+        if not self._samples[side]:
+            self._mean[side] = amount
+        else:
+            difference = amount - self._mean[side]
+            increment = self._alpha * difference
+            self._mean[side] += increment
+            self._variance[side] = (1 - self._alpha) * (
+                self._variance[side] + difference * increment)
+        self._samples[side] += 1
+
+    def apply_changes(self, changes: Iterable[LevelChange]) -> None:
+        """
+        Apply the level changes of one order book update.
+
+        Args:
+            changes: (side, price, previous amount, new amount) tuples
+        """
+        for side, price, previous, amount in changes:
+            present = amount > LEVEL_DUST
+            self._live[side] += present - (previous > LEVEL_DUST)
+            if present:
+                heapq.heappush(self._heaps[side], (-amount, price))
+                self._observe(side, amount)
+
+        for side in (BIDS, ASKS):
+            if len(self._heaps[side]) > COMPACT_FACTOR * self._live[side] + COMPACT_SLACK:
+                self._compact(side)
+
+    def _is_live(self, side: int, negated: float, price: float) -> bool:
+        return self._level_amount(side == ASKS, price) == -negated
+
+    def _compact(self, side: int) -> None:
+        """Drop stale and duplicate entries: O(n), amortized over the pushes."""
+        seen = set()
+        heap = []
+        for negated, price in self._heaps[side]:
+            if price not in seen and self._is_live(side, negated, price):
+                seen.add(price)
+                heap.append((negated, price))
+        heapq.heapify(heap)
+        self._heaps[side][:] = heap
+        self.compactions += 1
+
+    def top(self, is_ask: bool) -> List[Level]:
+        """
+        Largest levels of one side.
+
+        Args:
+            is_ask: Whether to read asks (True) or bids (False)
+
+        Returns:
+            Up to top_k (price, amount) tuples, largest amount first
+        """
+        side = ASKS if is_ask else BIDS
+        heap = self._heaps[side]
+        found: List[Tuple[float, float]] = []
+        seen = set()
+        while heap and len(found) < self.top_k:
+            negated, price = heapq.heappop(heap)
+            # Stale entries and duplicates of a price are dropped for good
+            if price not in seen and self._is_live(side, negated, price):
+                seen.add(price)
+                found.append((negated, price))
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [(price, -negated) for negated, price in found]
+
+    def z_score(self, is_ask: bool, amount: float) -> float:
+        """Standard deviations of amount above the side's rolling mean level size."""
+        side = ASKS if is_ask else BIDS
+        deviation = math.sqrt(self._variance[side])
+        if deviation <= 0:
+            return 0.0
+        return (amount - self._mean[side]) / deviation
+
+    def walls(self) -> Dict[str, List[Dict]]:
+        """
+        Walls of both sides with their z-scores.
+
+        Returns:
+            {'bids': [...], 'asks': [...]} of price/amount/z_score
+            dictionaries, largest amount first, filtered by min_z_score
+        """
+        result = {}
+        for key, is_ask in (('bids', False), ('asks', True)):
+            walls = []
+            for price, amount in self.top(is_ask):
+                z_score = self.z_score(is_ask, amount)
+                if self.min_z_score > 0 and z_score < self.min_z_score:
+                    # Amounts only get smaller from here
+                    break
+                walls.append({'price': price, 'amount': amount, 'z_score': z_score})
+            result[key] = walls
+        return result
+
+    def get_stats(self) -> Dict:
+        """Heap sizes against live levels and the rolling level size."""
+        return {
+            'heap_entries': [len(self._heaps[BIDS]), len(self._heaps[ASKS])],
+            'live_levels': list(self._live),
+            'rolling_mean': list(self._mean),
+            'compactions': self.compactions,
+        }
+
+    def get_memory_bytes(self) -> int:
+        """Approximate bytes held by the heaps (tuple plus two floats per entry)."""
+        return sum(len(heap) for heap in self._heaps) * 120
@@ -0,0 +1,127 @@
+"""
+Per-symbol histogram of the aggregation parameters clients subscribe with.
+
+The OrderBook Manager records every (limit, rounding, formatted) combination
+a connection uses. Aggregation precompute asks for the "hot" combinations of
+a symbol: those with live subscribers or seen within the demand window,
+limited to the symbol's rounding options and ordered by popularity.
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# (limit, rounding, formatted)
+AggregationParams = Tuple[int, float, bool]
+
+
+class ParamDemand:
+    """Subscription counts for one parameter combination."""
+
+    __slots__ = ('live', 'count', 'last_seen')
+
+    def __init__(self):
+        self.live = 0  # Connections currently using the combination
+        self.count = 0  # Subscriptions seen in total
+        self.last_seen = time.monotonic()
+
+
+class AggregationDemandTracker:
+    """Tracks which aggregation parameters are in demand per symbol."""
+
+    def __init__(self, window_seconds: float = 300.0, max_combinations: int = 8):
+        """
+        Args:
+            window_seconds: How long a combination without live subscribers
+                stays hot after its last subscriber left
+            max_combinations: Most combinations returned per symbol
+        """
+        self._window_seconds = window_seconds
+        self._max_combinations = max_combinations
+        self._demand: Dict[str, Dict[AggregationParams, ParamDemand]] = {}
+
+    def subscribe(self, symbol: str, limit: int, rounding: float,
+                  formatted: bool = True) -> None:
+        """Record a connection starting to use a combination."""
+        params = (limit, rounding, formatted)
+        demand = self._demand.setdefault(symbol, {}).get(params)
+        if demand is None:
+            demand = ParamDemand()
+            self._demand[symbol][params] = demand
+        demand.live += 1
+        demand.count += 1
+        demand.last_seen = time.monotonic()
+
+    def unsubscribe(self, symbol: str, limit: int, rounding: float,
+                    formatted: bool = True) -> None:
+        """Record a connection no longer using a combination."""
+        demand = self._demand.get(symbol, {}).get((limit, rounding, formatted))
+        if demand is None:
+            return
+        demand.live = max(0, demand.live - 1)
+        demand.last_seen = time.monotonic()
+
+    def _prune(self, symbol: str, now: float) -> Dict[AggregationParams, ParamDemand]:
+        """Drop combinations that went cold; return what is left."""
+        by_params = self._demand.get(symbol, {})
+        for params, demand in list(by_params.items()):
+            if demand.live == 0 and now - demand.last_seen > self._window_seconds:
+                del by_params[params]
+        if not by_params:
+            self._demand.pop(symbol, None)
+        return by_params
+
+    def hot_params(self, symbol: str,
+                   rounding_options: Optional[Iterable[float]] = None
+                   ) -> List[AggregationParams]:
+        """
+        Get the combinations worth precomputing for a symbol.
+
+        Args:
+            symbol: Trading symbol
+            rounding_options: Valid roundings for the symbol; combinations
+                with other roundings are skipped (no filter when None)
+
+        Returns:
+            Combinations with live or recent subscribers, live ones first and
+            then by subscription count, at most max_combinations
+        """
+        by_params = self._prune(symbol, time.monotonic())
+        options = list(rounding_options) if rounding_options else None
+
+        hot = [
+            (params, demand) for params, demand in by_params.items()
+            if options is None or any(
+                math.isclose(params[1], option, rel_tol=1e-9) for option in options)
+        ]
+        hot.sort(key=lambda item: (item[1].live > 0, item[1].count), reverse=True)
+        return [params for params, _ in hot[:self._max_combinations]]
+
+    def get_stats(self, symbol: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the parameter histogram.
+
+        Args:
+            symbol: Limit to one symbol (all symbols when None)
+
+        Returns:
+            {symbol: [{limit, rounding, formatted, live, count, idle_seconds}]}
+        """
+        now = time.monotonic()
+        symbols = [symbol] if symbol is not None else list(self._demand)
+        stats = {}
+        for name in symbols:
+            entries = [
+                {
+                    'limit': limit,
+                    'rounding': rounding,
+                    'formatted': formatted,
+                    'live': demand.live,
+                    'count': demand.count,
+                    'idle_seconds': 0.0 if demand.live else round(now - demand.last_seen, 1),
+                }
+                for (limit, rounding, formatted), demand in self._prune(name, now).items()
+            ]
+            if entries:
+                stats[name] = sorted(entries, key=lambda entry: entry['count'], reverse=True)
+        return stats
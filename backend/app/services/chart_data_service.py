@@ -8,6 +8,7 @@ optimized data handling for Lightweight Charts frontend integration.
 import logging
 from typing import Dict, List, Any, Optional
 from app.services.exchange_service import exchange_service
+from app.services.memory_accounting_service import group_by_symbol, memory_accounting_service
 
 logger = logging.getLogger(__name__)
 
@@ -308,3 +309,5 @@ class ChartDataService:
 
 # Global instance
 chart_data_service = ChartDataService()
+memory_accounting_service.register_source(
+    "chart_time_ranges", lambda: group_by_symbol(chart_data_service.time_range_cache, 1))
@@ -4,6 +4,12 @@ from typing import Optional, Dict, Any
 from fastapi import HTTPException
 from app.core.config import settings
 from app.core.logging_config import get_logger
+from app.services.replay_exchange import (
+    create_replay_exchange,
+    create_replay_rest_exchange,
+)
+
+BACKEND_REPLAY = "replay"
 
 logger = get_logger("exchange_service")
 
@@ -21,12 +27,21 @@ class ExchangeService:
         """
         Initialize the CCXT Binance exchange instance for REST API calls.
 
+        With EXCHANGE_BACKEND=replay the ReplayRestExchange stand-in is used
+        instead, sharing its source with the streaming ReplayExchange.
+
         Returns:
             ccxt.Exchange: Initialized Binance exchange instance
 
         Raises:
             HTTPException: If API keys are missing or initialization fails
         """
+        if settings.EXCHANGE_BACKEND == BACKEND_REPLAY:
+            self.exchange = create_replay_rest_exchange(self.get_exchange_pro())
+            logger.info(f"Serving REST calls from the replay exchange "
+                        f"({len(self.exchange.markets)} markets)")
+            return self.exchange
+
         try:
             logger.info("Initializing CCXT Binance exchange...")
 
@@ -86,12 +101,21 @@ class ExchangeService:
         """
         Initialize the CCXT Pro Binance exchange instance for WebSocket connections.
 
+        With EXCHANGE_BACKEND=replay the offline ReplayExchange is used instead.
+
         Returns:
             Any: Initialized Binance Pro exchange instance
 
         Raises:
             HTTPException: If API keys are missing or initialization fails
         """
+        if settings.EXCHANGE_BACKEND == BACKEND_REPLAY:
+            self.exchange_pro = create_replay_exchange()
+            logger.info(f"Streaming from the replay exchange "
+                        f"({self.exchange_pro.get_stats()['source']}, "
+                        f"speed {self.exchange_pro.clock.speed:g})")
+            return self.exchange_pro
+
         try:
             logger.info("Initializing CCXT Pro Binance exchange...")
 
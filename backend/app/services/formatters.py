@@ -0,0 +1,506 @@
+"""
+Compiled formatters for order book display values.
+
+A formatter is built once per (price precision, amount precision, rounding)
+combination with all format specs and thresholds precomputed, so formatting
+a value is a couple of comparisons and a single format() call. The output is
+identical to the per-call logic FormattingService used before.
+
+Each formatter also formats whole columns (order book ladders, volume
+bucket series): values are first grouped by magnitude class, then each group
+is formatted in one tight pass with a prebound format function.
+
+Formatters can describe themselves as a small JSON descriptor, which lets
+raw-mode WebSocket clients format numbers locally.
+"""
+
+import logging
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Marks a precision key that is absent from symbol_info (as opposed to None)
+MISSING = object()
+
+# Values below this are shown in scientific notation
+SCIENTIFIC_THRESHOLD = 0.00001
+
+ZERO = "0.00"
+
+# Bumped whenever the descriptor layout or formatting rules change
+DESCRIPTOR_VERSION = 1
+
+# Prebound format functions for the fixed magnitude classes
+_format_scientific = "{:.2e}".format
+_format_millions = "{:.2f}M".format
+_format_thousands = "{:.2f}K".format
+_format_small_total = "{:.4f}".format
+_format_plain_total = "{:.2f}".format
+
+# Compact notation as (threshold, suffix), largest first; shared by descriptors
+COMPACT_SUFFIXES = ((1000000, "M"), (1000, "K"))
+
+
+def amount_decimals(price_precision: Any, amount_precision: Any) -> int:
+    """
+    Decimal places used for amounts, before the 2-decimal minimum.
+
+    Args:
+        price_precision: symbol_info['pricePrecision'] or MISSING
+        amount_precision: symbol_info['amountPrecision'] or MISSING
+
+    Returns:
+        Number of decimal places
+    """
+    if isinstance(amount_precision, int) and amount_precision >= 0:
+        return min(amount_precision, 8)  # Cap at 8 decimal places
+    if isinstance(price_precision, int) and price_precision >= 0:
+        return min(price_precision, 6)  # Cap at 6 for amounts
+    return 2
+
+
+class PriceFormatter:
+    """Formats prices for one price precision and rounding level."""
+
+    __slots__ = ('rounding', '_whole', '_decimals', '_spec', '_format_spec',
+                 '_scientific_any', '_half_rounding')
+
+    def __init__(self, price_precision: Any = MISSING, rounding: Optional[float] = None):
+        """
+        Precompute the price format for a precision and rounding.
+
+        Args:
+            price_precision: symbol_info['pricePrecision'] or MISSING
+            rounding: Rounding level used for orderbook aggregation
+        """
+        if rounding is not None and rounding > 0:
+            self.rounding = rounding
+            # Scientific notation applies to tiny values unless the rounding
+            # is finer than 0.0001 and the value is at least half a bucket
+            self._scientific_any = rounding >= 0.0001
+            self._half_rounding = rounding / 2
+            self._whole = rounding >= 1.0
+            if rounding >= 1.0:
+                # Non-whole values at rounding >= 1
+                self._decimals = 0 if rounding >= 10 else 1
+            elif rounding >= 0.1:
+                self._decimals = 1
+            elif rounding >= 0.01:
+                self._decimals = 2
+            elif rounding >= 0.001:
+                self._decimals = 3
+            else:
+                # e.g., 0.00001 needs 5 decimal places
+                self._decimals = max(2, -int(math.floor(math.log10(rounding))))
+            self._spec = f".{self._decimals}f"
+        else:
+            self.rounding = None
+            self._scientific_any = True
+            self._half_rounding = 0.0
+            self._whole = False
+            # Reason: an explicit None precision keeps failing at format time
+            # (and falls back to str(value)) exactly like the uncompiled path
+            precision = 2 if price_precision is MISSING else price_precision
+            self._spec = f".{precision}f"
+            self._decimals = precision if isinstance(precision, int) and precision >= 0 else None
+
+        self._format_spec = ("{:" + self._spec + "}").format
+
+    def format(self, value: float) -> str:
+        """Format a value; raises on values that cannot be formatted."""
+        if value is None or value == 0:
+            return ZERO
+
+        if abs(value) < SCIENTIFIC_THRESHOLD and (
+                self._scientific_any or abs(value) < self._half_rounding):
+            return f"{value:.2e}"
+
+        if self._whole and value == int(value):
+            return str(int(value))
+        return format(value, self._spec)
+
+    def __call__(self, value: float) -> str:
+        try:
+            return self.format(value)
+        except (ValueError, TypeError, OverflowError) as e:
+            logger.warning(f"Price formatting error for value {value}: {e}")
+            return str(value)
+
+    def format_column(self, values: Sequence[float]) -> List[str]:
+        """
+        Format a column of prices; identical to calling the formatter per value.
+
+        Args:
+            values: Price values
+
+        Returns:
+            Formatted strings in input order
+        """
+        try:
+            return self._format_column(values)
+        except (ValueError, TypeError, OverflowError):
+            # Rare invalid input: fall back to per-value handling and logging
+            return [self(value) for value in values]
+
+    def _format_column(self, values: Sequence[float]) -> List[str]:
+        out = [ZERO] * len(values)
+        scientific: List[int] = []
+        whole: List[int] = []
+        plain: List[int] = []
+        scientific_any = self._scientific_any
+        half_rounding = self._half_rounding
+        whole_mode = self._whole
+
+        for i, value in enumerate(values):
+            if value is None or value == 0:
+                continue
+            magnitude = abs(value)
+            if magnitude < SCIENTIFIC_THRESHOLD and (scientific_any or magnitude < half_rounding):
+                scientific.append(i)
+            elif whole_mode and value == int(value):
+                whole.append(i)
+            else:
+                plain.append(i)
+
+        format_spec = self._format_spec
+        for i in plain:
+            out[i] = format_spec(values[i])
+        for i in whole:
+            out[i] = str(int(values[i]))
+        for i in scientific:
+            out[i] = _format_scientific(values[i])
+        return out
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe this formatter for client-side formatting.
+
+        Returns:
+            Descriptor with decimals (None means plain str(value)), whether whole
+            values drop their decimals, and the scientific notation rule
+        """
+        return {
+            "rounding": self.rounding,
+            "decimals": self._decimals,
+            "wholeAsInteger": self._whole,
+            "scientificBelow": SCIENTIFIC_THRESHOLD,
+            # Reason: with a fine rounding, tiny values only switch to
+            # scientific notation below half a bucket
+            "scientificBelowHalfRounding": None if self._scientific_any else self._half_rounding,
+        }
+
+
+class AmountFormatter:
+    """Formats amounts with compact K/M notation for one amount precision."""
+
+    __slots__ = ('_decimals', '_spec', '_format_spec')
+
+    def __init__(self, decimals: int = 2):
+        """
+        Precompute the amount format.
+
+        Args:
+            decimals: Decimal places for amounts below 1000 (minimum 2 applied)
+        """
+        self._decimals = max(2, decimals)
+        self._spec = f".{self._decimals}f"
+        self._format_spec = ("{:" + self._spec + "}").format
+
+    def format(self, value: float) -> str:
+        """Format a value; raises on values that cannot be formatted."""
+        if value is None or value == 0:
+            return ZERO
+
+        magnitude = abs(value)
+        if magnitude < SCIENTIFIC_THRESHOLD:
+            return f"{value:.2e}"
+        if magnitude >= 1000000:
+            return f"{value / 1000000:.2f}M"
+        if magnitude >= 1000:
+            return f"{value / 1000:.2f}K"
+        return format(value, self._spec)
+
+    def __call__(self, value: float) -> str:
+        try:
+            return self.format(value)
+        except (ValueError, TypeError, OverflowError) as e:
+            logger.warning(f"Amount formatting error for value {value}: {e}")
+            return str(value)
+
+    def format_column(self, values: Sequence[float]) -> List[str]:
+        """
+        Format a column of amounts; identical to calling the formatter per value.
+
+        Args:
+            values: Amount values
+
+        Returns:
+            Formatted strings in input order
+        """
+        try:
+            return self._format_column(values)
+        except (ValueError, TypeError, OverflowError):
+            return [self(value) for value in values]
+
+    def _format_column(self, values: Sequence[float]) -> List[str]:
+        out = [ZERO] * len(values)
+        scientific: List[int] = []
+        millions: List[int] = []
+        thousands: List[int] = []
+        plain: List[int] = []
+
+        for i, value in enumerate(values):
+            if value is None or value == 0:
+                continue
+            magnitude = abs(value)
+            if magnitude < SCIENTIFIC_THRESHOLD:
+                scientific.append(i)
+            elif magnitude >= 1000000:
+                millions.append(i)
+            elif magnitude >= 1000:
+                thousands.append(i)
+            else:
+                plain.append(i)
+
+        format_spec = self._format_spec
+        for i in plain:
+            out[i] = format_spec(values[i])
+        for i in thousands:
+            out[i] = _format_thousands(values[i] / 1000)
+        for i in millions:
+            out[i] = _format_millions(values[i] / 1000000)
+        for i in scientific:
+            out[i] = _format_scientific(values[i])
+        return out
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe this formatter for client-side formatting.
+
+        Returns:
+            Descriptor with decimals and the compact/scientific thresholds
+        """
+        return {
+            "decimals": self._decimals,
+            "compact": COMPACT_SUFFIXES,
+            "compactDecimals": 2,
+            "scientificBelow": SCIENTIFIC_THRESHOLD,
+        }
+
+
+class TotalFormatter:
+    """Formats cumulative totals; independent of symbol precision."""
+
+    __slots__ = ()
+
+    def format(self, value: float) -> str:
+        """Format a value; raises on values that cannot be formatted."""
+        if value is None or value == 0:
+            return ZERO
+
+        magnitude = abs(value)
+        if magnitude >= 1000000:
+            return f"{value / 1000000:.2f}M"
+        if magnitude >= 1000:
+            return f"{value / 1000:.2f}K"
+        if magnitude < SCIENTIFIC_THRESHOLD:
+            return f"{value:.2e}"
+        if magnitude < 0.01:
+            return f"{value:.4f}"
+        return f"{value:.2f}"
+
+    def __call__(self, value: float) -> str:
+        try:
+            return self.format(value)
+        except (ValueError, TypeError, OverflowError) as e:
+            logger.warning(f"Total formatting error for value {value}: {e}")
+            return str(value)
+
+    def format_column(self, values: Sequence[float]) -> List[str]:
+        """
+        Format a column of totals; identical to calling the formatter per value.
+
+        Args:
+            values: Total values
+
+        Returns:
+            Formatted strings in input order
+        """
+        try:
+            return self._format_column(values)
+        except (ValueError, TypeError, OverflowError):
+            return [self(value) for value in values]
+
+    def _format_column(self, values: Sequence[float]) -> List[str]:
+        out = [ZERO] * len(values)
+        millions: List[int] = []
+        thousands: List[int] = []
+        scientific: List[int] = []
+        small: List[int] = []
+        plain: List[int] = []
+
+        for i, value in enumerate(values):
+            if value is None or value == 0:
+                continue
+            magnitude = abs(value)
+            if magnitude >= 1000000:
+                millions.append(i)
+            elif magnitude >= 1000:
+                thousands.append(i)
+            elif magnitude < SCIENTIFIC_THRESHOLD:
+                scientific.append(i)
+            elif magnitude < 0.01:
+                small.append(i)
+            else:
+                plain.append(i)
+
+        for i in plain:
+            out[i] = _format_plain_total(values[i])
+        for i in thousands:
+            out[i] = _format_thousands(values[i] / 1000)
+        for i in millions:
+            out[i] = _format_millions(values[i] / 1000000)
+        for i in small:
+            out[i] = _format_small_total(values[i])
+        for i in scientific:
+            out[i] = _format_scientific(values[i])
+        return out
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe this formatter for client-side formatting.
+
+        Returns:
+            Descriptor with decimals and the compact/small/scientific thresholds
+        """
+        return {
+            "decimals": 2,
+            "compact": COMPACT_SUFFIXES,
+            "compactDecimals": 2,
+            "smallBelow": 0.01,
+            "smallDecimals": 4,
+            "scientificBelow": SCIENTIFIC_THRESHOLD,
+        }
+
+
+TOTAL_FORMATTER = TotalFormatter()
+
+
+class SymbolFormatter:
+    """Price, amount and total formatters for one symbol precision and rounding."""
+
+    __slots__ = ('price', 'amount', 'total')
+
+    def __init__(self, price_precision: Any = MISSING, amount_precision: Any = MISSING,
+                 rounding: Optional[float] = None):
+        """
+        Build the formatters.
+
+        Args:
+            price_precision: symbol_info['pricePrecision'] or MISSING
+            amount_precision: symbol_info['amountPrecision'] or MISSING
+            rounding: Rounding level used for price formatting
+        """
+        self.price = PriceFormatter(price_precision, rounding)
+        self.amount = AmountFormatter(amount_decimals(price_precision, amount_precision))
+        self.total = TOTAL_FORMATTER
+
+    @staticmethod
+    def key_for(symbol_info: Optional[Dict], rounding: Optional[float] = None) -> Tuple:
+        """
+        Get the cache key for a symbol_info and rounding.
+
+        Reason: output depends only on the two precisions and the rounding,
+        so symbols sharing them share one formatter.
+
+        Args:
+            symbol_info: Symbol information containing precision data
+            rounding: Rounding level used for price formatting
+
+        Returns:
+            Hashable key tuple
+        """
+        if not symbol_info:
+            return (MISSING, MISSING, rounding)
+        return (symbol_info.get('pricePrecision', MISSING),
+                symbol_info.get('amountPrecision', MISSING),
+                rounding)
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Build the compact formatting descriptor sent to raw-mode clients.
+
+        A client holding this descriptor reproduces the server-formatted
+        strings from raw numbers, so raw-mode streams can skip formatting.
+
+        Returns:
+            JSON-compatible descriptor for price, amount and total values
+        """
+        return {
+            "version": DESCRIPTOR_VERSION,
+            "zero": ZERO,
+            "scientificDecimals": 2,
+            "price": self.price.describe(),
+            "amount": self.amount.describe(),
+            "total": self.total.describe(),
+        }
+
+
+class FormatterCache:
+    """
+    Bounded LRU of compiled formatters.
+
+    Lock-free: every operation is a single OrderedDict call, which is atomic
+    under the GIL. A race between two threads can at worst build the same
+    formatter twice or miss a move_to_end, never return a wrong formatter.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of formatters kept
+        """
+        self.max_size = max_size
+        self._formatters: "OrderedDict[Hashable, SymbolFormatter]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._formatters)
+
+    def get(self, key: Tuple) -> SymbolFormatter:
+        """
+        Get the formatter for a key, compiling it on a miss.
+
+        Args:
+            key: Key from SymbolFormatter.key_for
+
+        Returns:
+            SymbolFormatter for the key
+        """
+        formatter = self._formatters.get(key)
+        if formatter is not None:
+            self.hits += 1
+            try:
+                self._formatters.move_to_end(key)
+            except KeyError:
+                pass  # Evicted by another thread in the meantime
+            return formatter
+
+        self.misses += 1
+        formatter = SymbolFormatter(*key)
+        self._formatters[key] = formatter
+        while len(self._formatters) > self.max_size:
+            try:
+                self._formatters.popitem(last=False)
+            except KeyError:
+                break
+        return formatter
+
+    def clear(self) -> None:
+        """Drop all compiled formatters."""
+        self._formatters.clear()
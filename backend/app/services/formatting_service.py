@@ -6,16 +6,18 @@ moving all formatting logic from frontend to backend for consistency.
 
 Features:
 - Dynamic precision based on value size and symbol characteristics
-- Optional caching for repeated values (especially amounts)
+- Compiled formatters per symbol precision and rounding level
 - Scientific notation for very small values
 - Compact notation (K/M) for large amounts
 - Thread-safe singleton pattern
 """
 
 import logging
-import time
 import threading
-from typing import Dict, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence
+
+from app.services.formatters import MISSING, FormatterCache, SymbolFormatter, amount_decimals
+from app.services.memory_accounting_service import memory_accounting_service
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +28,8 @@ class FormattingService:
 
     Features:
     - Thread-safe singleton pattern
-    - Optional caching for performance optimization
-    - Configurable cache TTL and size limits
+    - Compiled per-(precision, rounding) formatters instead of per-value caching
+    - Bounded, lock-free formatter LRU
     - Cache statistics and monitoring
     """
 
@@ -46,14 +48,14 @@ class FormattingService:
             self,
             enable_cache: bool = True,
             cache_ttl: float = 300.0,
-            max_cache_size: int = 10000):
+            max_cache_size: int = 1024):
         """
         Initialize the formatting service.
 
         Args:
-            enable_cache: Whether to enable caching (default: True)
-            cache_ttl: Cache time-to-live in seconds (default: 300 = 5 minutes)
-            max_cache_size: Maximum number of cache entries (default: 10000)
+            enable_cache: Whether to keep compiled formatters (default: True)
+            cache_ttl: Unused; compiled formatters never go stale (kept for compatibility)
+            max_cache_size: Maximum number of compiled formatters (default: 1024)
         """
         if hasattr(self, '_initialized') and self._initialized:
             return
@@ -61,140 +63,56 @@ class FormattingService:
         self._initialized = True
         self._enable_cache = enable_cache
         self._cache_ttl = cache_ttl
-        self._max_cache_size = max_cache_size
-
-        # Cache storage: key -> (value, timestamp)
-        self._cache: Dict[str, Tuple[str, float]] = {}
-        self._cache_lock = threading.RLock()
 
-        # Cache statistics
-        self._cache_hits = 0
-        self._cache_misses = 0
-        self._total_requests = 0
+        # Reason: per-value caching cost more (key building, RLock, time())
+        # than formatting itself; formatters are compiled once per precision
+        # and rounding combination and format values directly.
+        self._formatters = FormatterCache(max_cache_size)
 
         logger.info(f"FormattingService initialized (cache_enabled={enable_cache}, "
-                    f"cache_ttl={cache_ttl}s, max_size={max_cache_size})")
+                    f"max_formatters={max_cache_size})")
 
-    def _generate_cache_key(
+    def get_formatter(
             self,
-            method: str,
-            value: float,
-            symbol_info: Optional[Dict],
-            rounding: Optional[float] = None) -> str:
-        """Generate a cache key for the given parameters."""
-        symbol = symbol_info.get(
-            'symbol', 'DEFAULT') if symbol_info else 'DEFAULT'
-        precision_key = ''
-
-        if symbol_info:
-            price_precision = symbol_info.get('pricePrecision', 2)
-            amount_precision = symbol_info.get('amountPrecision', 8)
-            precision_key = f"{price_precision}:{amount_precision}"
-
-        rounding_key = f"{rounding}" if rounding is not None else "default"
-        return f"{method}:{symbol}:{precision_key}:{rounding_key}:{value}"
-
-    def _get_from_cache(self, cache_key: str) -> Optional[str]:
-        """Get value from cache if it exists and is not expired."""
-        if not self._enable_cache:
-            return None
-
-        with self._cache_lock:
-            self._total_requests += 1
-
-            if cache_key in self._cache:
-                cached_value, timestamp = self._cache[cache_key]
+            symbol_info: Optional[Dict] = None,
+            rounding: Optional[float] = None) -> SymbolFormatter:
+        """
+        Get the compiled formatter for a symbol and rounding level.
 
-                # Check if cache entry is still valid
-                if time.time() - timestamp < self._cache_ttl:
-                    self._cache_hits += 1
-                    return cached_value
-                else:
-                    # Remove expired entry
-                    del self._cache[cache_key]
+        Hot loops should fetch the formatter once and call its price, amount
+        and total members directly.
 
-            self._cache_misses += 1
-            return None
+        Args:
+            symbol_info: Symbol information containing precision data
+            rounding: Rounding level used for price formatting
 
-    def _set_cache(self, cache_key: str, value: str) -> None:
-        """Set value in cache."""
+        Returns:
+            SymbolFormatter with price, amount and total callables
+        """
+        key = SymbolFormatter.key_for(symbol_info, rounding)
         if not self._enable_cache:
-            return
+            return SymbolFormatter(*key)
+        try:
+            return self._formatters.get(key)
+        except TypeError:
+            # Unhashable precision values cannot be cached
+            return SymbolFormatter(*key)
 
-        with self._cache_lock:
-            # Clean up cache if it's getting too large
-            if len(self._cache) >= self._max_cache_size:
-                self._cleanup_expired_cache()
-
-                # If still too large after cleanup, remove oldest entries
-                if len(self._cache) >= self._max_cache_size:
-                    # Remove 20% of oldest entries
-                    entries_to_remove = max(1, len(self._cache) // 5)
-                    oldest_entries = sorted(
-                        self._cache.items(),
-                        key=lambda x: x[1][1])[
-                        :entries_to_remove]
-                    for key, _ in oldest_entries:
-                        del self._cache[key]
-
-            self._cache[cache_key] = (value, time.time())
-
-    def _cleanup_expired_cache(self) -> None:
-        """Remove expired entries from cache."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in self._cache.items()
-            if current_time - timestamp >= self._cache_ttl
-        ]
-
-        for key in expired_keys:
-            del self._cache[key]
-
-    def _format_price_with_rounding(
-            self, value: float, rounding: float) -> str:
+    def get_format_descriptor(
+            self,
+            symbol_info: Optional[Dict] = None,
+            rounding: Optional[float] = None) -> Dict:
         """
-        Format price based on the rounding level used in orderbook aggregation.
+        Get the formatting descriptor sent to raw-mode WebSocket clients.
 
         Args:
-            value: Price value to format
-            rounding: Rounding level (e.g., 0.01, 0.1, 1.0, 10.0)
+            symbol_info: Symbol information containing precision data
+            rounding: Rounding level used for price formatting
 
         Returns:
-            Formatted price string appropriate for the rounding level
+            JSON-compatible descriptor (see SymbolFormatter.describe)
         """
-        # Handle very small numbers with scientific notation when appropriate
-        if abs(value) < 0.00001 and (
-                rounding is None or rounding >= 0.0001 or abs(value) < rounding / 2):
-            return f"{value:.2e}"
-
-        # Determine decimal places based on rounding level
-        if rounding >= 1.0:
-            # For rounding >= 1, show as integer if value is whole number
-            if value == int(value):
-                return str(int(value))
-            else:
-                # Show minimal decimal places for non-whole numbers
-                return f"{value:.0f}" if rounding >= 10 else f"{value:.1f}"
-        elif rounding >= 0.1:
-            # For rounding like 0.1, show 1 decimal place
-            return f"{value:.1f}"
-        elif rounding >= 0.01:
-            # For rounding like 0.01, show 2 decimal places
-            return f"{value:.2f}"
-        elif rounding >= 0.001:
-            # For rounding like 0.001, show 3 decimal places
-            return f"{value:.3f}"
-        else:
-            # For very small rounding, determine decimal places from rounding
-            # value
-            import math
-            if rounding > 0:
-                # Calculate decimal places needed based on rounding precision
-                # e.g., 0.00001 needs 5 decimal places
-                decimal_places = max(2, -int(math.floor(math.log10(rounding))))
-            else:
-                decimal_places = 8  # Default for very high precision
-            return f"{value:.{decimal_places}f}"
+        return self.get_formatter(symbol_info, rounding).describe()
 
     def format_price(
             self,
@@ -212,39 +130,8 @@ class FormattingService:
         Returns:
             Formatted price string
         """
-        if value is None or value == 0:
-            return "0.00"
-
-        # Check cache first (prices change frequently, so cache may have lower
-        # hit rate)
-        cache_key = self._generate_cache_key(
-            'price', value, symbol_info, rounding)
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result is not None:
-            return cached_result
-
         try:
-            # If rounding is provided, format according to the rounding level
-            if rounding is not None and rounding > 0:
-                result = self._format_price_with_rounding(value, rounding)
-            else:
-                # Get price precision from symbol info
-                price_precision = 2  # Default fallback
-                if symbol_info and 'pricePrecision' in symbol_info:
-                    price_precision = symbol_info['pricePrecision']
-
-                # Handle very small numbers with scientific notation
-                if abs(value) < 0.00001:
-                    result = f"{value:.2e}"
-                else:
-                    # For prices, we want to show the actual value, not compact notation
-                    # Prices need to be precise for trading decisions
-                    result = f"{value:.{price_precision}f}"
-
-            # Cache the result
-            self._set_cache(cache_key, result)
-            return result
-
+            return self.get_formatter(symbol_info, rounding).price.format(value)
         except (ValueError, TypeError, OverflowError) as e:
             logger.warning(f"Price formatting error for value {value}: {e}")
             return str(value)
@@ -263,41 +150,8 @@ class FormattingService:
         Returns:
             Formatted amount string
         """
-        if value is None or value == 0:
-            return "0.00"
-
-        # Check cache first (amounts have high repetition rate, so cache is
-        # very beneficial)
-        cache_key = self._generate_cache_key('amount', value, symbol_info)
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result is not None:
-            return cached_result
-
         try:
-            # Get amount precision from symbol info
-            amount_precision = self.get_amount_precision(symbol_info)
-
-            # Handle very small amounts with scientific notation
-            if abs(value) < 0.00001:
-                result = f"{value:.2e}"
-
-            # Handle large amounts with compact notation (use 2 decimals for
-            # readability)
-            elif abs(value) >= 1000000:
-                result = f"{value / 1000000:.2f}M"
-            elif abs(value) >= 1000:
-                result = f"{value / 1000:.2f}K"
-
-            # All other amounts - use consistent symbol precision (minimum 2
-            # for readability)
-            else:
-                decimal_places = max(2, amount_precision)
-                result = f"{value:.{decimal_places}f}"
-
-            # Cache the result
-            self._set_cache(cache_key, result)
-            return result
-
+            return self.get_formatter(symbol_info).amount.format(value)
         except (ValueError, TypeError, OverflowError) as e:
             logger.warning(f"Amount formatting error for value {value}: {e}")
             return str(value)
@@ -316,39 +170,68 @@ class FormattingService:
         Returns:
             Formatted total string
         """
-        if value is None or value == 0:
-            return "0.00"
-
-        # Check cache first (totals may have moderate repetition)
-        cache_key = self._generate_cache_key('total', value, symbol_info)
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result is not None:
-            return cached_result
-
         try:
-            # Totals are often larger, so use compact notation more
-            # aggressively
-            if abs(value) >= 1000000:
-                result = f"{value / 1000000:.2f}M"
-            elif abs(value) >= 1000:
-                result = f"{value / 1000:.2f}K"
-            elif abs(value) < 0.00001:
-                result = f"{value:.2e}"
-            elif abs(value) < 0.01:
-                # Use 4 decimal places for small totals
-                result = f"{value:.4f}"
-            else:
-                # Use 2 decimal places for regular totals
-                result = f"{value:.2f}"
-
-            # Cache the result
-            self._set_cache(cache_key, result)
-            return result
-
+            return self.get_formatter(symbol_info).total.format(value)
         except (ValueError, TypeError, OverflowError) as e:
             logger.warning(f"Total formatting error for value {value}: {e}")
             return str(value)
 
+    def format_price_column(
+            self,
+            values: Sequence[float],
+            symbol_info: Optional[Dict] = None,
+            rounding: Optional[float] = None) -> List[str]:
+        """
+        Format a column of prices in one call.
+
+        Output is identical to calling format_price for each value.
+
+        Args:
+            values: Price values (e.g., every level of an order book side)
+            symbol_info: Symbol information containing precision data
+            rounding: Rounding level used for orderbook aggregation
+
+        Returns:
+            Formatted price strings in input order
+        """
+        return self.get_formatter(symbol_info, rounding).price.format_column(values)
+
+    def format_amount_column(
+            self,
+            values: Sequence[float],
+            symbol_info: Optional[Dict] = None) -> List[str]:
+        """
+        Format a column of amounts in one call.
+
+        Output is identical to calling format_amount for each value.
+
+        Args:
+            values: Amount values
+            symbol_info: Symbol information containing precision data
+
+        Returns:
+            Formatted amount strings in input order
+        """
+        return self.get_formatter(symbol_info).amount.format_column(values)
+
+    def format_total_column(
+            self,
+            values: Sequence[float],
+            symbol_info: Optional[Dict] = None) -> List[str]:
+        """
+        Format a column of totals in one call.
+
+        Output is identical to calling format_total for each value.
+
+        Args:
+            values: Total values (e.g., cumulative depth or bucket volumes)
+            symbol_info: Symbol information containing precision data
+
+        Returns:
+            Formatted total strings in input order
+        """
+        return self.get_formatter(symbol_info).total.format_column(values)
+
     def get_amount_precision(self, symbol_info: Optional[Dict] = None) -> int:
         """
         Calculate optimal decimal places for amount display based on symbol data.
@@ -362,25 +245,8 @@ class FormattingService:
         if not symbol_info:
             return 2  # Default fallback
 
-        try:
-            # Check if amount precision is available
-            if 'amountPrecision' in symbol_info:
-                amount_precision = symbol_info['amountPrecision']
-                if isinstance(amount_precision, int) and amount_precision >= 0:
-                    return min(amount_precision, 8)  # Cap at 8 decimal places
-
-            # Fallback to price precision if amount precision not available
-            if 'pricePrecision' in symbol_info:
-                price_precision = symbol_info['pricePrecision']
-                if isinstance(price_precision, int) and price_precision >= 0:
-                    return min(price_precision, 6)  # Cap at 6 for amounts
-
-            # Default fallback
-            return 2
-
-        except (KeyError, TypeError, ValueError) as e:
-            logger.warning(f"Amount precision calculation error: {e}")
-            return 2
+        return amount_decimals(symbol_info.get('pricePrecision', MISSING),
+                               symbol_info.get('amountPrecision', MISSING))
 
     def format_orderbook_level(
             self,
@@ -398,14 +264,12 @@ class FormattingService:
         """
         try:
             formatted_level = level.copy()
+            formatter = self.get_formatter(symbol_info)
 
             # Add formatted fields
-            formatted_level['price_formatted'] = self.format_price(
-                level.get('price', 0), symbol_info)
-            formatted_level['amount_formatted'] = self.format_amount(
-                level.get('amount', 0), symbol_info)
-            formatted_level['cumulative_formatted'] = self.format_total(
-                level.get('cumulative', 0), symbol_info)
+            formatted_level['price_formatted'] = formatter.price(level.get('price', 0))
+            formatted_level['amount_formatted'] = formatter.amount(level.get('amount', 0))
+            formatted_level['cumulative_formatted'] = formatter.total(level.get('cumulative', 0))
 
             return formatted_level
 
@@ -415,33 +279,30 @@ class FormattingService:
             return level
 
     def clear_cache(self) -> None:
-        """Clear all cached formatting results."""
-        with self._cache_lock:
-            self._cache.clear()
-            logger.info("Formatting cache cleared")
+        """Drop all compiled formatters."""
+        self._formatters.clear()
+        logger.info("Formatting cache cleared")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """
-        Get cache performance statistics.
+        Get formatter cache statistics.
 
         Returns:
             Dictionary with cache statistics
         """
-        with self._cache_lock:
-            hit_rate = (
-                self._cache_hits
-                / self._total_requests
-                * 100) if self._total_requests > 0 else 0
-            return {
-                'cache_enabled': self._enable_cache,
-                'cache_hits': self._cache_hits,
-                'cache_misses': self._cache_misses,
-                'total_requests': self._total_requests,
-                'hit_rate_percent': round(hit_rate, 2),
-                'cache_size': len(self._cache),
-                'cache_ttl_seconds': self._cache_ttl,
-                'max_cache_size': self._max_cache_size
-            }
+        hits = self._formatters.hits
+        misses = self._formatters.misses
+        total_requests = hits + misses
+        hit_rate = hits / total_requests * 100 if total_requests > 0 else 0
+        return {
+            'cache_enabled': self._enable_cache,
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'total_requests': total_requests,
+            'hit_rate_percent': round(hit_rate, 2),
+            'cache_size': len(self._formatters),
+            'max_cache_size': self._formatters.max_size
+        }
 
     def get_formatting_stats(self) -> Dict[str, Any]:
         """
@@ -468,36 +329,27 @@ class FormattingService:
         Reconfigure cache settings.
 
         Args:
-            enable_cache: Whether to enable caching
-            cache_ttl: Cache time-to-live in seconds
-            max_cache_size: Maximum number of cache entries
+            enable_cache: Whether to keep compiled formatters
+            cache_ttl: Unused; kept for compatibility
+            max_cache_size: Maximum number of compiled formatters
         """
-        with self._cache_lock:
-            if enable_cache is not None:
-                self._enable_cache = enable_cache
-                if not enable_cache:
-                    self._cache.clear()
-                logger.info(f"Cache enabled: {enable_cache}")
-
-            if cache_ttl is not None:
-                self._cache_ttl = cache_ttl
-                logger.info(f"Cache TTL set to: {cache_ttl}s")
-
-            if max_cache_size is not None:
-                self._max_cache_size = max_cache_size
-                # Clean up if current cache is larger than new limit
-                if len(self._cache) > max_cache_size:
-                    self._cleanup_expired_cache()
-                    if len(self._cache) > max_cache_size:
-                        # Remove oldest entries to fit new limit
-                        entries_to_remove = len(self._cache) - max_cache_size
-                        oldest_entries = sorted(
-                            self._cache.items(), key=lambda x: x[1][1])[
-                            :entries_to_remove]
-                        for key, _ in oldest_entries:
-                            del self._cache[key]
-                logger.info(f"Max cache size set to: {max_cache_size}")
+        if enable_cache is not None:
+            self._enable_cache = enable_cache
+            if not enable_cache:
+                self._formatters.clear()
+            logger.info(f"Cache enabled: {enable_cache}")
+
+        if cache_ttl is not None:
+            self._cache_ttl = cache_ttl
+
+        if max_cache_size is not None:
+            self._formatters = FormatterCache(max_cache_size)
+            logger.info(f"Max cache size set to: {max_cache_size}")
 
 
 # Global formatting service instance
 formatting_service = FormattingService()
+# Reason: Formatters are keyed by precision and rounding and shared between
+# symbols, so they are reported as one shared entry.
+memory_accounting_service.register_source(
+    "formatters", lambda: {'shared': formatting_service._formatters})
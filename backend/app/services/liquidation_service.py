@@ -15,7 +15,10 @@ import logging
 from decimal import Decimal
 from collections import defaultdict
 import time
+from app.services.exchange_service import BACKEND_REPLAY, exchange_service
 from app.services.formatting_service import formatting_service
+from app.services.market_capture_service import STREAM_LIQUIDATIONS, market_capture_service
+from app.services.memory_accounting_service import group_by_symbol, memory_accounting_service
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -101,7 +104,12 @@ class LiquidationService:
         """Connect to WebSocket and listen for messages"""
         logger.info(f"Connecting to liquidation stream: {stream_url}")
         
-        async with websockets.connect(stream_url) as websocket:
+        if settings.EXCHANGE_BACKEND == BACKEND_REPLAY:
+            connection = exchange_service.get_exchange_pro().connect_liquidations(symbol)
+        else:
+            connection = websockets.connect(stream_url)
+
+        async with connection as websocket:
             logger.info(f"Connected to {symbol} liquidation stream")
             
             # Create ping task
@@ -112,6 +120,7 @@ class LiquidationService:
                     try:
                         # Wait for message with timeout
                         message = await asyncio.wait_for(websocket.recv(), timeout=30)
+                        market_capture_service.record(STREAM_LIQUIDATIONS, symbol, message)
                         data = json.loads(message)
                         
                         # Process liquidation data
@@ -342,6 +351,10 @@ class LiquidationService:
         # Convert to list format
         result = []
         symbol_info = self.symbol_info_cache.get(symbol)
+        buy_volumes: List[float] = []
+        sell_volumes: List[float] = []
+        total_volumes: List[float] = []
+        delta_volumes: List[float] = []
         
         # Determine the time range to fill
         if buckets:
@@ -375,18 +388,47 @@ class LiquidationService:
                     "sell_volume": str(sell_volume),
                     "total_volume": str(total_volume),
                     "delta_volume": str(delta_volume),
-                    "buy_volume_formatted": formatting_service.format_total(buy_volume, symbol_info),
-                    "sell_volume_formatted": formatting_service.format_total(sell_volume, symbol_info),
-                    "total_volume_formatted": formatting_service.format_total(total_volume, symbol_info),
-                    "delta_volume_formatted": formatting_service.format_total(abs(delta_volume), symbol_info),
                     "count": count,
                     "timestamp_ms": current_bucket
                 })
+                buy_volumes.append(buy_volume)
+                sell_volumes.append(sell_volume)
+                total_volumes.append(total_volume)
+                delta_volumes.append(abs(delta_volume))
                 
                 # Move to next bucket
                 current_bucket += timeframe_ms
+
+            self._format_volume_columns(result, buy_volumes, sell_volumes,
+                                        total_volumes, delta_volumes, symbol_info)
         
         return result
+
+    def _format_volume_columns(self, rows: List[Dict[str, Any]],
+                               buy_volumes: List[float], sell_volumes: List[float],
+                               total_volumes: List[float], delta_volumes: List[float],
+                               symbol_info: Optional[Dict[str, Any]]) -> None:
+        """
+        Add the *_volume_formatted fields to volume rows, one column at a time.
+
+        Args:
+            rows: Volume rows to update in place
+            buy_volumes: Buy volume per row
+            sell_volumes: Sell volume per row
+            total_volumes: Total volume per row
+            delta_volumes: Absolute delta volume per row
+            symbol_info: Symbol information for formatting
+        """
+        columns = (
+            ("buy_volume_formatted", buy_volumes),
+            ("sell_volume_formatted", sell_volumes),
+            ("total_volume_formatted", total_volumes),
+            ("delta_volume_formatted", delta_volumes),
+        )
+        for key, values in columns:
+            formatted = formatting_service.format_total_column(values, symbol_info)
+            for row, value in zip(rows, formatted):
+                row[key] = value
     
     def _get_timeframe_ms(self, timeframe: str) -> int:
         """Convert timeframe string to milliseconds"""
@@ -720,6 +762,10 @@ class LiquidationService:
         if updated_buckets:
             symbol_info = self.symbol_info_cache.get(symbol)
             volume_updates = []
+            buy_volumes: List[float] = []
+            sell_volumes: List[float] = []
+            total_volumes: List[float] = []
+            delta_volumes: List[float] = []
             
             for bucket_time in sorted(updated_buckets):
                 data = self.accumulated_volumes[symbol][timeframe][bucket_time]
@@ -739,13 +785,16 @@ class LiquidationService:
                     "sell_volume": str(sell_volume),
                     "total_volume": str(total_volume),
                     "delta_volume": str(delta_volume),
-                    "buy_volume_formatted": formatting_service.format_total(buy_volume, symbol_info),
-                    "sell_volume_formatted": formatting_service.format_total(sell_volume, symbol_info),
-                    "total_volume_formatted": formatting_service.format_total(total_volume, symbol_info),
-                    "delta_volume_formatted": formatting_service.format_total(abs(delta_volume), symbol_info),
                     "count": data["count"],
                     "timestamp_ms": bucket_time
                 })
+                buy_volumes.append(buy_volume)
+                sell_volumes.append(sell_volume)
+                total_volumes.append(total_volume)
+                delta_volumes.append(abs(delta_volume))
+
+            self._format_volume_columns(volume_updates, buy_volumes, sell_volumes,
+                                        total_volumes, delta_volumes, symbol_info)
             
             # Notify callbacks with updated data only
             await self._notify_volume_callbacks(symbol, timeframe, volume_updates)
@@ -828,5 +877,22 @@ class LiquidationService:
                 logger.info(f"Removing failed callback for {symbol}/{timeframe}")
                 await self.unregister_volume_callback(symbol, timeframe, callback)
 
+    def get_memory_objects(self) -> Dict[str, List[Any]]:
+        """Buffers, volume accumulators and cached history per symbol, for memory accounting."""
+        cached = group_by_symbol(self.liquidation_cache, 3)
+        symbols = (set(self.liquidation_buffers) | set(self.accumulated_volumes)
+                   | set(self.symbol_info_cache) | set(cached))
+        return {
+            symbol: [
+                self.liquidation_buffers.get(symbol),
+                self.accumulated_volumes.get(symbol),
+                self.symbol_info_cache.get(symbol),
+                cached.get(symbol),
+            ]
+            for symbol in symbols
+        }
+
 # Singleton instance
-liquidation_service = LiquidationService()
\ No newline at end of file
+liquidation_service = LiquidationService()
+memory_accounting_service.register_source(
+    "liquidations", liquidation_service.get_memory_objects)
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+Liquidity heatmap sampling service.
+
+Once per ORDERBOOK_HEATMAP_INTERVAL_SECONDS every live order book of the
+OrderBook Manager is sampled into its symbol's LiquidityHeatmap: the levels
+within the heatmap window are bucketed by the aggregation kernel
+(OrderBookManager.walk_buckets) at the heatmap's price step, so a
+column is one lazy walk over the levels near the mid. New columns are pushed
+to per-symbol callbacks (/ws/heatmap/{symbol}).
+
+A heatmap lives as long as its book: when the manager evicts a book, its
+heatmap is dropped, so memory is bounded by the live books times
+LiquidityHeatmap.get_memory_bytes().
+"""
+
+import asyncio
+import time
+from itertools import takewhile
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.models.liquidity_heatmap import LiquidityHeatmap
+from app.models.orderbook import OrderBook
+from app.services.memory_accounting_service import memory_accounting_service
+from app.services.orderbook_manager import OrderBookManager, orderbook_manager
+
+logger = get_logger("liquidity_heatmap_service")
+
+ColumnCallback = Callable[[Dict[str, Any]], Any]
+
+
+class LiquidityHeatmapService:
+    """Samples live order books into per-symbol heatmaps."""
+
+    def __init__(self, manager: OrderBookManager,
+                 interval: float = 1.0,
+                 buckets: int = 200,
+                 slices: int = 3600,
+                 range_pct: float = 2.0):
+        """
+        Initialize the heatmap service.
+
+        Args:
+            manager: OrderBook Manager whose books are sampled
+            interval: Seconds between samples
+            buckets: Price buckets per column
+            slices: Columns kept per symbol
+            range_pct: Percent of the mid each column spans on either side
+        """
+        self._manager = manager
+        self.interval = interval
+        self.buckets = buckets
+        self.slices = slices
+        self.range_pct = range_pct
+        self.heatmaps: Dict[str, LiquidityHeatmap] = {}
+        self.callbacks: Dict[str, List[ColumnCallback]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.samples = 0
+        self.sample_seconds = 0.0  # Duration of the last sampling pass
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the sampling task is running."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the sampling task."""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Liquidity heatmap sampling started (every {self.interval}s, "
+            f"{self.buckets} buckets x {self.slices} slices per symbol)")
+
+    async def stop(self) -> None:
+        """Stop the sampling task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Liquidity heatmap sampling stopped")
+
+    async def _run(self) -> None:
+        """Sample on a fixed cadence, compensating for the time a pass takes."""
+        loop = asyncio.get_running_loop()
+        next_sample = loop.time()
+        while True:
+            try:
+                await self.sample_all()
+            except Exception as e:
+                logger.error(f"Liquidity heatmap sampling failed: {e}")
+            next_sample += self.interval
+            # Reason: Skip missed ticks rather than sampling in a burst after a stall
+            while next_sample <= loop.time():
+                next_sample += self.interval
+            await asyncio.sleep(next_sample - loop.time())
+
+    async def sample_all(self, timestamp: Optional[int] = None) -> int:
+        """
+        Sample every live order book once.
+
+        Args:
+            timestamp: Sample time in milliseconds (now when None)
+
+        Returns:
+            Number of columns added
+        """
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        started = time.perf_counter()
+        sampled = 0
+        for symbol, orderbook in self._manager.get_orderbooks().items():
+            column = await self.sample(symbol, orderbook, timestamp)
+            if column is None:
+                continue
+            sampled += 1
+            if self.callbacks.get(symbol):
+                await self._notify_callbacks(symbol, column)
+        self.samples += 1
+        self.sample_seconds = time.perf_counter() - started
+        return sampled
+
+    async def sample(self, symbol: str, orderbook: OrderBook,
+                     timestamp: int) -> Optional[Dict[str, Any]]:
+        """
+        Add one column for a book to its symbol's heatmap.
+
+        Args:
+            symbol: Trading symbol
+            orderbook: The symbol's live order book
+            timestamp: Sample time in milliseconds
+
+        Returns:
+            The column (timestamp, mid, step, first_index and amounts per
+            bucket, lowest price first), or None if the book has no two-sided
+            top of book
+        """
+        best_bid, best_ask = await orderbook.get_best_bid_ask()
+        if best_bid is None or best_ask is None:
+            return None
+
+        heatmap = self.heatmaps.get(symbol)
+        if heatmap is None:
+            heatmap = LiquidityHeatmap(self.buckets, self.slices, self.range_pct)
+            self.heatmaps[symbol] = heatmap
+
+        mid = (best_bid + best_ask) / 2
+        first_index = heatmap.first_index(mid)
+        step = heatmap.step
+        last_index = first_index + heatmap.buckets - 1
+        amounts = [0.0] * heatmap.buckets
+
+        bids, asks = orderbook.iter_levels()
+        # Reason: Only the levels inside the window are walked; the bounds are
+        # a step loose and the bucket indexes below are checked exactly.
+        bids = takewhile(lambda level: level[0] > (first_index - 1) * step, bids)
+        asks = takewhile(lambda level: level[0] < (last_index + 1) * step, asks)
+        walk_buckets = self._manager.walk_buckets
+        for is_ask, levels in ((False, bids), (True, asks)):
+            buckets, _, _ = walk_buckets(levels, is_ask, heatmap.buckets, step)
+            for bucket in buckets:
+                index = round(bucket['price'] / step) - first_index
+                if 0 <= index < heatmap.buckets:
+                    amounts[index] += bucket['amount']
+
+        heatmap.append(timestamp, mid, first_index, amounts)
+        return {
+            'timestamp': timestamp,
+            'mid': mid,
+            'step': step,
+            'first_index': first_index,
+            'amounts': amounts,
+        }
+
+    def get_heatmap(self, symbol: str) -> Optional[LiquidityHeatmap]:
+        """Get a symbol's heatmap, or None if it has not been sampled."""
+        return self.heatmaps.get(symbol)
+
+    def drop_symbol(self, symbol: str) -> None:
+        """
+        Drop a symbol's heatmap once the OrderBook Manager evicts its book.
+
+        Registered as an OrderBook Manager eviction listener.
+
+        Args:
+            symbol: Symbol whose order book was removed
+        """
+        if self.heatmaps.pop(symbol, None) is not None:
+            logger.info(f"Dropped liquidity heatmap for {symbol} (book evicted)")
+
+    def register_callback(self, symbol: str, callback: ColumnCallback) -> None:
+        """Register a callback receiving each new column of a symbol."""
+        self.callbacks.setdefault(symbol, []).append(callback)
+
+    def unregister_callback(self, symbol: str, callback: ColumnCallback) -> None:
+        """Unregister a column callback."""
+        callbacks = self.callbacks.get(symbol)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self.callbacks[symbol]
+
+    async def _notify_callbacks(self, symbol: str, column: Dict[str, Any]) -> None:
+        """Send a new column to the symbol's callbacks."""
+        for callback in list(self.callbacks.get(symbol, ())):
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(column)
+                else:
+                    callback(column)
+            except Exception as e:
+                logger.error(f"Error in liquidity heatmap callback for {symbol}: {e}")
+
+    def get_memory_objects(self) -> Dict[str, LiquidityHeatmap]:
+        """Heatmaps per symbol, for memory accounting."""
+        return dict(self.heatmaps)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get sampling statistics.
+
+        Returns:
+            Dictionary with sampling state and per-symbol heatmap stats
+        """
+        return {
+            "running": self.is_running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "last_sample_ms": self.sample_seconds * 1000,
+            "subscribers": sum(len(callbacks) for callbacks in self.callbacks.values()),
+            "heatmaps": {symbol: heatmap.get_stats()
+                         for symbol, heatmap in list(self.heatmaps.items())},
+        }
+
+
+# Global liquidity heatmap service instance
+liquidity_heatmap_service = LiquidityHeatmapService(
+    orderbook_manager,
+    interval=settings.ORDERBOOK_HEATMAP_INTERVAL_SECONDS,
+    buckets=settings.ORDERBOOK_HEATMAP_BUCKETS,
+    slices=settings.ORDERBOOK_HEATMAP_SLICES,
+    range_pct=settings.ORDERBOOK_HEATMAP_RANGE_PCT,
+)
+orderbook_manager.add_eviction_listener(liquidity_heatmap_service.drop_symbol)
+memory_accounting_service.register_source(
+    "heatmaps", liquidity_heatmap_service.get_memory_objects)
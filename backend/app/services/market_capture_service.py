@@ -0,0 +1,488 @@
+"""
+Market data capture service.
+
+Records the exchange messages received at the ingestion points (order book,
+trade, candle and liquidation streams) to rotating, gzip-compressed,
+append-only segment files, so production message streams can be replayed
+exactly when reproducing performance problems.
+
+The event loop only encodes each message with msgpack and appends it to an
+in-memory queue; a background writer thread drains the queue in batches,
+compresses and writes them. If the writer falls behind by MAX_PENDING
+messages, new messages are dropped (and counted) instead of blocking.
+
+Order books are the heavy messages: ccxt returns the whole (2x1000-level)
+book on every update, and encoding it costs hundreds of microseconds. With
+track_order_book_changes() the level changes ccxt applies to a captured
+book are collected as it applies them, and the next capture of that book
+is written as those changes only. The first capture of a book in each
+segment (and after a drop) is written whole, and the reader rebuilds full
+books, so replay sees the books exactly as they were delivered.
+
+Segment layout (inside the gzip stream), all little-endian:
+
+    SEGMENT_HEADER  magic b"OFCP", format version (uint16), reserved (uint16)
+    frames, each:
+        FRAME       receive time (int64, unix ns), stream (uint8), key
+                    length (uint16), payload length (uint32)
+        key         UTF-8 (symbol, or symbol:timeframe for candles)
+        payload     msgpack of the message as delivered by the exchange
+                    client (raw text for liquidations)
+
+Order book change frames (STREAM_ORDERBOOK_CHANGES) carry the book's fields
+without its levels, the level changes since the previous frame of the key
+as [price, amount] pairs (amount 0 removes the level) under 'bids'/'asks',
+and the side lengths after the update under 'depth' (ccxt trims each side
+to its depth before returning the book).
+
+A segment is closed once it holds MARKET_CAPTURE_SEGMENT_MB of uncompressed
+frames or is MARKET_CAPTURE_SEGMENT_SECONDS old; closed segments are never
+written again.
+"""
+
+import gzip
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import msgpack
+from sortedcontainers import SortedDict
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger("market_capture_service")
+
+CAPTURE_MAGIC = b"OFCP"
+# Bump whenever the layout or its meaning changes
+CAPTURE_FORMAT_VERSION = 2
+# Versions the reader understands (1 has no order book change frames)
+READABLE_VERSIONS = (1, 2)
+SEGMENT_HEADER = struct.Struct("<4sHH")
+FRAME = struct.Struct("<qBHI")
+SEGMENT_SUFFIX = ".ofcap.gz"
+
+# Stream codes
+STREAM_ORDERBOOK = 1  # watch_order_book results
+STREAM_ORDERBOOK_SNAPSHOT = 2  # fetch_order_book (initial and resync) results
+STREAM_TRADES = 3  # watch_trades results
+STREAM_CANDLES = 4  # watch_ohlcv results
+STREAM_LIQUIDATIONS = 5  # Raw forceOrder WebSocket messages
+# On disk only: watch_order_book results as level changes (read back as
+# STREAM_ORDERBOOK)
+STREAM_ORDERBOOK_CHANGES = 6
+STREAM_NAMES = {
+    STREAM_ORDERBOOK: "orderbook",
+    STREAM_ORDERBOOK_SNAPSHOT: "orderbook_snapshot",
+    STREAM_TRADES: "trades",
+    STREAM_CANDLES: "candles",
+    STREAM_LIQUIDATIONS: "liquidations",
+}
+
+# Writer wakes up when this many messages are queued, or after the interval
+BATCH_SIZE = 1000
+FLUSH_INTERVAL = 0.25
+# Messages queued for the writer before new ones are dropped
+MAX_PENDING = 100_000
+# Fast compression; market data still shrinks several times
+COMPRESS_LEVEL = 1
+# Level changes kept for a tracked book side that is not being captured
+# (its stream stopped) before the book is dropped from tracking
+MAX_TRACKED_CHANGES = 100_000
+
+
+class CapturedMessage(NamedTuple):
+    """One captured message, as read back from a segment."""
+
+    received_ns: int
+    stream: int
+    key: str
+    payload: Any
+
+
+def list_segments(directory: str) -> List[str]:
+    """
+    Capture segments in a directory, oldest first.
+
+    Args:
+        directory: Capture directory
+
+    Returns:
+        Segment paths (empty if the directory does not exist)
+    """
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.endswith(SEGMENT_SUFFIX)]
+
+
+class _BookState:
+    """Levels of a captured order book, rebuilt from its frames."""
+
+    def __init__(self, book: Dict[str, Any]):
+        # Reason: sorted levels are only built once a change frame needs
+        # them, so captures of whole books read at full speed
+        self.book: Optional[Dict[str, Any]] = book
+        self.bids = SortedDict()
+        self.asks = SortedDict()
+
+    def apply(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a change frame and return the full book it describes."""
+        if self.book is not None:
+            self.bids.update((level[0], level[1]) for level in self.book['bids'])
+            self.asks.update((level[0], level[1]) for level in self.book['asks'])
+            self.book = None
+        bid_depth, ask_depth = changes['depth']
+        for side, levels, depth, worst in ((self.bids, changes['bids'], bid_depth, 0),
+                                           (self.asks, changes['asks'], ask_depth, -1)):
+            for price, amount in levels:
+                price, amount = float(price), float(amount)
+                if amount:
+                    side[price] = amount
+                else:
+                    side.pop(price, None)
+            # Reason: ccxt drops the levels beyond its depth for good
+            while len(side) > depth:
+                side.popitem(worst)
+        book = {key: value for key, value in changes.items() if key != 'depth'}
+        book['bids'] = [[price, amount] for price, amount in reversed(self.bids.items())]
+        book['asks'] = [[price, amount] for price, amount in self.asks.items()]
+        return book
+
+
+def read_segment(path: str,
+                 books: Optional[Dict[str, _BookState]] = None) -> Iterator[CapturedMessage]:
+    """
+    Read the messages of one segment in capture order.
+
+    A segment cut short (the process died while writing it) yields the
+    messages before the cut. Order book change frames are yielded as the
+    full STREAM_ORDERBOOK books they describe; one whose base book is not
+    known (read without the previous segment) is skipped.
+
+    Args:
+        path: Segment path
+        books: Order books rebuilt so far, carried across segments
+
+    Raises:
+        ValueError: If the file is not a capture segment of a readable version
+    """
+    if books is None:
+        books = {}
+    with gzip.open(path, "rb") as f:
+        header = f.read(SEGMENT_HEADER.size)
+        if len(header) < SEGMENT_HEADER.size:
+            return
+        magic, version, _ = SEGMENT_HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC or version not in READABLE_VERSIONS:
+            raise ValueError(f"{path} is not a version {CAPTURE_FORMAT_VERSION} capture segment")
+
+        try:
+            while True:
+                frame = f.read(FRAME.size)
+                if len(frame) < FRAME.size:
+                    return
+                received_ns, stream, key_length, payload_length = FRAME.unpack(frame)
+                body = f.read(key_length + payload_length)
+                if len(body) < key_length + payload_length:
+                    return
+                key = body[:key_length].decode("utf-8")
+                payload = msgpack.unpackb(body[key_length:])
+                if stream == STREAM_ORDERBOOK_CHANGES:
+                    state = books.get(key)
+                    if state is None:
+                        continue
+                    stream, payload = STREAM_ORDERBOOK, state.apply(payload)
+                elif stream == STREAM_ORDERBOOK:
+                    books[key] = _BookState(payload)
+                yield CapturedMessage(received_ns, stream, key, payload)
+        except (EOFError, zlib.error):
+            logger.warning(f"Capture segment {path} ends early")
+
+
+def read_capture(directory: str) -> Iterator[CapturedMessage]:
+    """Read every segment of a capture directory in order."""
+    books: Dict[str, _BookState] = {}
+    for path in list_segments(directory):
+        yield from read_segment(path, books)
+
+
+class MarketCaptureService:
+    """Queues ingested messages and writes them from a background thread."""
+
+    def __init__(self, directory: Optional[str] = None,
+                 segment_bytes: Optional[int] = None,
+                 segment_seconds: Optional[float] = None,
+                 max_pending: int = MAX_PENDING):
+        """
+        Initialize the capture service (capturing starts with start()).
+
+        Args:
+            directory: Segment directory (MARKET_CAPTURE_DIR by default)
+            segment_bytes: Uncompressed bytes per segment
+            segment_seconds: Maximum age of a segment
+            max_pending: Messages queued for the writer before dropping
+        """
+        self.directory = directory or settings.MARKET_CAPTURE_DIR
+        self.segment_bytes = segment_bytes or int(
+            settings.MARKET_CAPTURE_SEGMENT_MB * 1024 * 1024)
+        self.segment_seconds = segment_seconds or settings.MARKET_CAPTURE_SEGMENT_SECONDS
+        self.max_pending = max_pending
+        self.enabled = False  # Checked by the ingestion points before recording
+
+        # (receive time ns, stream, key, msgpack payload), appended on the loop
+        self._pending: Deque[Tuple[int, int, str, bytes]] = deque()
+        self._packer = msgpack.Packer(default=str)  # Event loop thread only
+        # Order books captured whole, per key: (book, segment number, level
+        # changes applied to its bids and asks since). Event loop thread only.
+        self._books: Dict[str, Tuple[Any, int, List, List]] = {}
+        # id() of a tracked book side -> its list of changes
+        self._side_changes: Dict[int, List] = {}
+        self._tracking_changes = False
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Writer state (writer thread only)
+        self._segment = None
+        self._segment_path: Optional[str] = None
+        self._segment_opened_at = 0.0
+        self._segment_written = 0
+        self._segment_sequence = 0
+
+        self._stats = {'messages': 0, 'dropped': 0, 'batches': 0, 'bytes': 0,
+                       'segments': 0, 'write_ms': 0.0, 'orderbook_changes': 0}
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread and begin capturing."""
+        if self.is_running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Reason: open the first segment before the writer runs, so books
+        # captured whole from now on are known to land in it
+        self._open_segment(time.time())
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="market-capture-writer", daemon=True)
+        self._thread.start()
+        self.enabled = True
+        logger.info(f"Market data capture started: {self.directory}")
+
+    def stop(self) -> None:
+        """Stop capturing, write everything queued and close the segment (blocking)."""
+        self.enabled = False
+        self._books.clear()
+        self._side_changes.clear()
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        logger.info(f"Market data capture stopped ({self._stats['messages']} messages, "
+                    f"{self._stats['dropped']} dropped)")
+
+    def track_order_book_changes(self, exchange: Any) -> None:
+        """
+        Collect the level changes a ccxt pro exchange applies to order books.
+
+        Wraps the exchange's handle_deltas, through which ccxt applies each
+        depth update to a book side. Changes to the sides of books captured
+        whole are kept, so the next capture of such a book only encodes
+        them. Exchanges without handle_deltas keep being captured whole.
+
+        Args:
+            exchange: ccxt pro exchange (wrapped once)
+        """
+        handle_deltas = getattr(exchange, 'handle_deltas', None)
+        if handle_deltas is None or getattr(handle_deltas, 'capture_tracked', False):
+            return
+        side_changes = self._side_changes
+
+        def tracked_handle_deltas(bookside, deltas):
+            result = handle_deltas(bookside, deltas)
+            changes = side_changes.get(id(bookside))
+            if changes is not None:
+                if len(changes) < MAX_TRACKED_CHANGES:
+                    changes.extend(deltas)
+                else:
+                    # Reason: nobody captures this book any more; its next
+                    # capture (if any) is written whole
+                    del side_changes[id(bookside)]
+            return result
+
+        tracked_handle_deltas.capture_tracked = True
+        exchange.handle_deltas = tracked_handle_deltas
+        self._tracking_changes = True
+
+    def record(self, stream: int, key: str, payload: Any) -> None:
+        """
+        Queue one message for capture (event loop side).
+
+        The payload is encoded right away, so the exchange client may
+        mutate it afterwards (ccxt updates order books in place).
+
+        Args:
+            stream: Stream code (STREAM_*)
+            key: Symbol, or symbol:timeframe for candles
+            payload: Message as received
+        """
+        if not self.enabled:
+            return
+        if len(self._pending) >= self.max_pending:
+            self._stats['dropped'] += 1
+            if stream == STREAM_ORDERBOOK:
+                # Reason: later changes would miss this update's
+                self._untrack_book(key)
+            return
+
+        if stream == STREAM_ORDERBOOK and self._tracking_changes:
+            stream, body = self._encode_book(key, payload)
+        else:
+            body = self._packer.pack(payload)
+        # Reason: framing is left to the writer thread; the loop only pays
+        # for the msgpack encode and a deque append.
+        self._pending.append((time.time_ns(), stream, key, body))
+        # Reason: wake the writer once per batch; until it gets the GIL and
+        # drains the queue, setting the event again on every message would
+        # cost the loop more than encoding a small message
+        if len(self._pending) == BATCH_SIZE:
+            self._wakeup.set()
+
+    def _encode_book(self, key: str, book: Any) -> Tuple[int, bytes]:
+        """Encode an order book whole, or as its changes since the last capture."""
+        tracked = self._books.get(key)
+        bids, asks = book['bids'], book['asks']
+        if (tracked is not None and tracked[0] is book
+                and tracked[1] == self._stats['segments']
+                and id(bids) in self._side_changes and id(asks) in self._side_changes):
+            _, _, bid_changes, ask_changes = tracked
+            changes = {field: value for field, value in book.items()
+                       if field != 'bids' and field != 'asks'}
+            changes['bids'] = bid_changes
+            changes['asks'] = ask_changes
+            changes['depth'] = (len(bids), len(asks))
+            body = self._packer.pack(changes)
+            bid_changes.clear()
+            ask_changes.clear()
+            self._stats['orderbook_changes'] += 1
+            return STREAM_ORDERBOOK_CHANGES, body
+
+        # Reason: a new segment starts from a whole book so that it can be
+        # read on its own; so does a book ccxt replaced (resubscription)
+        self._untrack_book(key)
+        body = self._packer.pack(book)
+        bid_changes, ask_changes = [], []
+        self._books[key] = (book, self._stats['segments'], bid_changes, ask_changes)
+        self._side_changes[id(bids)] = bid_changes
+        self._side_changes[id(asks)] = ask_changes
+        return STREAM_ORDERBOOK, body
+
+    def _untrack_book(self, key: str) -> None:
+        """Capture a key's next order book whole."""
+        tracked = self._books.pop(key, None)
+        if tracked is not None:
+            book = tracked[0]
+            self._side_changes.pop(id(book['bids']), None)
+            self._side_changes.pop(id(book['asks']), None)
+
+    def _run(self) -> None:
+        """Writer thread: drain the queue in batches until stopped."""
+        try:
+            while True:
+                self._wakeup.wait(FLUSH_INTERVAL)
+                self._wakeup.clear()
+                stopping = self._stopping.is_set()
+                self._write_pending()
+                if stopping:
+                    break
+        except Exception as e:
+            self.enabled = False
+            logger.error(f"Market data capture writer failed: {e}")
+        finally:
+            self._close_segment()
+
+    def _write_pending(self) -> None:
+        """Write everything queued so far as one batch."""
+        pending = self._pending
+        count = len(pending)
+        if count == 0:
+            return
+
+        start = time.perf_counter()
+        frames = []
+        for _ in range(count):
+            received_ns, stream, key, body = pending.popleft()
+            key_bytes = key.encode("utf-8")
+            frames.append(FRAME.pack(received_ns, stream, len(key_bytes), len(body)))
+            frames.append(key_bytes)
+            frames.append(body)
+        batch = b"".join(frames)
+        now = time.time()
+        if (self._segment is None or self._segment_written >= self.segment_bytes
+                or now - self._segment_opened_at >= self.segment_seconds):
+            self._open_segment(now)
+
+        self._segment.write(batch)
+        # Reason: a sync flush per batch makes everything but the current
+        # batch readable even if the process dies mid-segment.
+        self._segment.flush()
+        self._segment_written += len(batch)
+
+        self._stats['messages'] += count
+        self._stats['batches'] += 1
+        self._stats['bytes'] += len(batch)
+        self._stats['write_ms'] += (time.perf_counter() - start) * 1000
+
+    def _open_segment(self, now: float) -> None:
+        """Close the current segment and start the next one."""
+        self._close_segment()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now))
+        while self._segment is None:
+            self._segment_sequence += 1
+            self._segment_path = os.path.join(
+                self.directory, f"capture-{stamp}-{self._segment_sequence:04d}{SEGMENT_SUFFIX}")
+            try:
+                # Reason: exclusive create; existing segments are never rewritten
+                self._segment = gzip.open(self._segment_path, "xb",
+                                          compresslevel=COMPRESS_LEVEL)
+            except FileExistsError:
+                continue
+        self._segment.write(SEGMENT_HEADER.pack(CAPTURE_MAGIC, CAPTURE_FORMAT_VERSION, 0))
+        self._segment_opened_at = now
+        self._segment_written = 0
+        self._stats['segments'] += 1
+
+    def _close_segment(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get capture statistics.
+
+        Returns:
+            Dictionary with capture state and counters
+        """
+        return {
+            'enabled': self.enabled,
+            'running': self.is_running,
+            'directory': self.directory,
+            'segment': self._segment_path,
+            'pending': len(self._pending),
+            **self._stats,
+        }
+
+
+# Global market capture service instance
+market_capture_service = MarketCaptureService()
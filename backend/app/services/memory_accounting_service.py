@@ -0,0 +1,235 @@
+"""
+Memory accounting for in-process market data structures.
+
+Each subsystem (order books, aggregation cache, formatters, liquidation
+buffers, chart time ranges, trade buffers, ...) registers a source: a
+callable returning the objects it retains, keyed by symbol (or by any other
+label for shared structures). On demand the service walks those objects and
+reports their retained size per subsystem and per symbol.
+
+Sizes come from a recursive `sys.getsizeof` walk over containers and the
+app's own objects; NumPy arrays count their buffers. Objects shared between
+structures are counted once per sample, for the first source that reaches
+them. When tracemalloc is tracing (MEMORY_TRACEMALLOC), a sample also
+includes the biggest allocation sites in the app's own modules.
+"""
+
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.logging_config import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+logger = get_logger("memory_accounting_service")
+
+# Module prefixes whose objects are walked attribute by attribute; anything
+# else that is not a container is sized shallowly (locks, tasks, clients).
+WALKED_MODULE_PREFIXES = ("app.", "sortedcontainers")
+# Allocation sites reported from a tracemalloc snapshot
+DEFAULT_TOP_ALLOCATIONS = 10
+
+_CONTAINERS = (list, tuple, set, frozenset, deque)
+_LEAF_TYPES = (str, bytes, bytearray, int, float, bool, type(None))
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate the retained size of an object graph in bytes.
+
+    Args:
+        obj: Root object
+        seen: ids of objects already counted; shared across calls to count
+            shared objects once
+
+    Returns:
+        Size in bytes of every object reachable from obj that is not in seen
+    """
+    if seen is None:
+        seen = set()
+
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, _LEAF_TYPES):
+            continue
+        if np is not None and isinstance(current, np.ndarray):
+            # Reason: getsizeof already includes the buffer of arrays that
+            # own it; views share their base's buffer and count the header
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, _CONTAINERS):
+            stack.extend(current)
+
+        module = type(current).__module__ or ""
+        if not module.startswith(WALKED_MODULE_PREFIXES):
+            continue
+        attributes = getattr(current, "__dict__", None)
+        if attributes is not None:
+            stack.append(attributes)
+        for slot in getattr(type(current), "__slots__", ()):
+            value = getattr(current, slot, None)
+            if value is not None:
+                stack.append(value)
+
+    return total
+
+
+def group_by_symbol(cache: Dict[str, Any], key_fields: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Group a cache keyed by "symbol:field1:...:fieldN" strings by symbol.
+
+    Args:
+        cache: Cache dictionary
+        key_fields: Number of ":"-separated fields after the symbol (symbols
+            may contain ":" themselves, e.g. BTC/USDT:USDT)
+
+    Returns:
+        {symbol: {key: value}}
+    """
+    grouped: Dict[str, Dict[str, Any]] = {}
+    for key, value in list(cache.items()):
+        symbol = key.rsplit(":", key_fields)[0]
+        grouped.setdefault(symbol, {})[key] = value
+    return grouped
+
+
+class MemoryAccountingService:
+    """Samples the retained size of registered subsystems on demand."""
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register_source(self, subsystem: str,
+                        source: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Register the objects a subsystem retains.
+
+        Args:
+            subsystem: Name shown in the breakdown (e.g. "orderbooks")
+            source: Callable returning {symbol or label: retained objects};
+                called on every sample, so it must be cheap and not await
+        """
+        self._sources[subsystem] = source
+
+    def get_subsystems(self) -> list:
+        """Names of the registered subsystems."""
+        return sorted(self._sources)
+
+    def sample(self, subsystem: Optional[str] = None,
+               symbol: Optional[str] = None,
+               top_allocations: int = DEFAULT_TOP_ALLOCATIONS) -> Dict[str, Any]:
+        """
+        Measure the retained size of every registered subsystem.
+
+        Args:
+            subsystem: Limit to one subsystem (all when None)
+            symbol: Limit to one symbol or label (all when None)
+            top_allocations: Allocation sites to report when tracemalloc is
+                tracing
+
+        Returns:
+            Dictionary with per-subsystem and per-symbol byte counts, process
+            memory and, when tracing, the top tracemalloc allocation sites
+        """
+        start = time.perf_counter()
+        seen: Set[int] = set()
+        subsystems: Dict[str, Dict[str, Any]] = {}
+        symbols: Dict[str, Dict[str, int]] = {}
+
+        names = [subsystem] if subsystem is not None else self.get_subsystems()
+        for name in names:
+            source = self._sources.get(name)
+            if source is None:
+                continue
+            try:
+                objects_by_key = source()
+            except Exception as e:
+                logger.error(f"Memory source {name} failed: {e}")
+                subsystems[name] = {'total_bytes': 0, 'entries': {}, 'error': str(e)}
+                continue
+
+            entries = {}
+            for key, objects in objects_by_key.items():
+                if symbol is not None and key != symbol:
+                    continue
+                size = deep_sizeof(objects, seen)
+                entries[key] = size
+                by_symbol = symbols.setdefault(key, {'total_bytes': 0})
+                by_symbol[name] = size
+                by_symbol['total_bytes'] += size
+
+            subsystems[name] = {
+                'total_bytes': sum(entries.values()),
+                'entries': entries,
+            }
+
+        result = {
+            'total_bytes': sum(info['total_bytes'] for info in subsystems.values()),
+            'subsystems': subsystems,
+            'symbols': symbols,
+            'process': self._process_memory(),
+            'tracemalloc': self._tracemalloc_top(top_allocations),
+            'sample_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+        return result
+
+    @staticmethod
+    def _process_memory() -> Dict[str, Optional[int]]:
+        """Current and peak resident set size of this process in bytes."""
+        rss = None
+        try:
+            with open("/proc/self/statm") as statm:
+                rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            pass  # Not Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reason: ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak_bytes = peak if sys.platform == "darwin" else peak * 1024
+        return {'rss_bytes': rss, 'peak_rss_bytes': peak_bytes}
+
+    @staticmethod
+    def _tracemalloc_top(limit: int) -> Optional[Dict[str, Any]]:
+        """Biggest allocation sites in the app's modules, when tracing."""
+        if not tracemalloc.is_tracing():
+            return None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, os.path.join(_APP_ROOT, "*"))])
+        statistics = snapshot.statistics("lineno")
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            'traced_bytes': traced,
+            'peak_traced_bytes': peak,
+            'app_bytes': sum(stat.size for stat in statistics),
+            'top': [
+                {
+                    'location': f"{os.path.relpath(stat.traceback[0].filename, _APP_ROOT)}"
+                                f":{stat.traceback[0].lineno}",
+                    'bytes': stat.size,
+                    'count': stat.count,
+                }
+                for stat in statistics[:limit]
+            ],
+        }
+
+
+# Global memory accounting service instance
+memory_accounting_service = MemoryAccountingService()
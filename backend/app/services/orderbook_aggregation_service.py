@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
 import time
 import asyncio
 import logging
@@ -162,6 +162,64 @@ class OrderBookAggregationService:
 
         return result_levels
 
+    def walk_buckets(
+            self,
+            levels: Iterable[Tuple[float, float]],
+            is_ask: bool,
+            limit: int,
+            rounding: float) -> Tuple[List[Dict], int, bool]:
+        """
+        Aggregate one side into price buckets, walking from the best price.
+
+        Levels arrive in price order, so every level of a bucket is adjacent:
+        a bucket is complete as soon as a level falls outside it, and the
+        walk stops once `limit` non-empty buckets are filled. Only the
+        levels needed are read, each once, and prices are rounded once per
+        bucket instead of once per level. The buckets match get_exact_levels
+        over the whole side.
+
+        Args:
+            levels: (price, amount) tuples, bids highest price first and asks
+                lowest price first (see OrderBook.iter_levels)
+            is_ask: Whether this is ask data (True) or bid data (False)
+            limit: Number of buckets to return
+            rounding: Price rounding value
+
+        Returns:
+            Tuple of (buckets as price/amount dictionaries in walk order,
+            number of levels read, whether the side was read to its end)
+        """
+        buckets = []
+        if limit <= 0:
+            return buckets, 0, False
+        bucket_price = None
+        bucket_amount = 0.0
+        walked = 0
+
+        for price, amount in levels:
+            walked += 1
+            if price <= 0 or amount <= 1e-10:
+                continue
+
+            if bucket_price is not None and (
+                    price <= bucket_price if is_ask else price >= bucket_price):
+                bucket_amount += amount
+                continue
+
+            # This level opens the next bucket; close the current one
+            if bucket_price is not None and bucket_amount > 1e-6:
+                buckets.append({'price': bucket_price, 'amount': bucket_amount})
+                if len(buckets) >= limit:
+                    return buckets, walked, False
+
+            bucket_price = (self.round_up(price, rounding) if is_ask
+                            else self.round_down(price, rounding))
+            bucket_amount = amount
+
+        if bucket_price is not None and bucket_amount > 1e-6 and len(buckets) < limit:
+            buckets.append({'price': bucket_price, 'amount': bucket_amount})
+        return buckets, walked, True
+
     def calculate_cumulative_totals(
             self,
             levels: List[Dict],
@@ -242,11 +300,13 @@ class OrderBookAggregationService:
         }
 
     def _generate_cache_key(self, symbol: str, limit: int, rounding: float,
-                            timestamp: float) -> str:
+                            version: int, formatted: bool = True) -> str:
         """Generate a cache key for aggregated data."""
-        # Round timestamp to nearest second for cache effectiveness
-        rounded_timestamp = int(timestamp)
-        return f"{symbol}:{limit}:{rounding}:{rounded_timestamp}"
+        # Reason: The book version changes with every applied update, so a
+        # cached result is reused exactly until the book changes.
+        key = f"{symbol}:{limit}:{rounding}:{version}"
+        # Raw results lack the *_formatted fields, so they are cached apart
+        return key if formatted else f"{key}:raw"
 
     async def _get_from_cache(self, cache_key: str) -> Optional[Dict]:
         """Get data from cache if still valid."""
@@ -281,83 +341,80 @@ class OrderBookAggregationService:
             orderbook: OrderBook,
             limit: int,
             rounding: float,
-            symbol_data: Optional[Dict] = None) -> Dict:
+            symbol_data: Optional[Dict] = None,
+            formatted: bool = True) -> Dict:
         """
         Aggregate order book data with the specified parameters.
 
+        Roundings the book's aggregation pyramid maintains are a top-N read
+        from their pyramid level; others walk the book (see walk_buckets).
+
         Args:
             orderbook: OrderBook instance
             limit: Number of levels to return
             rounding: Price rounding value
             symbol_data: Optional symbol information for rounding options
+            formatted: Add *_formatted strings to each level; raw-mode
+                connections format client-side and skip this step
 
         Returns:
             Dictionary with aggregated order book data
         """
         # Generate cache key
         cache_key = self._generate_cache_key(
-            orderbook.symbol, limit, rounding, orderbook.timestamp)
+            orderbook.symbol, limit, rounding, orderbook.version, formatted)
 
         # Check cache first
         cached_result = await self._get_from_cache(cache_key)
         if cached_result:
             return cached_result
 
-        # Start with a reasonable multiplier and increase if needed
-        multiplier = max(100, int(rounding * 100)) if rounding >= 1 else 100
-        max_attempts = 5
-        attempt = 0
-
-        while attempt < max_attempts:
-            # Get snapshot with current multiplier
-            snapshot = await orderbook.get_snapshot(limit * multiplier)
-
-            # Convert to the format expected by aggregation functions
-            # Filter out any potential zeros at this stage as well
-            raw_bids = [{'price': level.price, 'amount': level.amount}
-                        for level in snapshot.bids if level.amount > 1e-10]
-            raw_asks = [{'price': level.price, 'amount': level.amount}
-                        for level in snapshot.asks if level.amount > 1e-10]
-
-            # Get aggregated levels
-            aggregated_bids = self.get_exact_levels(
-                raw_bids, False, limit, rounding)
-            aggregated_asks = self.get_exact_levels(
-                raw_asks, True, limit, rounding)
-
-            # Check if we have enough non-zero levels
-            if len(aggregated_bids) >= limit and len(aggregated_asks) >= limit:
-                # We have enough levels, proceed
-                break
-            else:
-                # Not enough levels, increase multiplier and try again
-                logger.debug(
-                    f"[ORDERBOOK_AGGREGATION] Fetching more data for {
-                        orderbook.symbol}: " f"current levels: bids={
-                        len(aggregated_bids)}, asks={
-                        len(aggregated_asks)}, requested={limit}")
-                multiplier *= 2
-                attempt += 1
-
-        # If we still don't have enough levels after max attempts, log
-        # appropriately
+        # Reason: Both paths read the live book; the version is taken here,
+        # with no await before the read, so the result is cached under the
+        # version it was computed from.
+        cache_key = self._generate_cache_key(
+            orderbook.symbol, limit, rounding, orderbook.version, formatted)
+        pyramid = orderbook.pyramid
+        if pyramid is not None and pyramid.level_for(rounding) is not None:
+            # Top-N read from the pyramid level kept current by every update
+            aggregated_bids, walked_bids, bids_exhausted = pyramid.top(
+                False, limit, rounding)
+            aggregated_asks, walked_asks, asks_exhausted = pyramid.top(
+                True, limit, rounding)
+        else:
+            bid_levels, ask_levels = orderbook.iter_levels()
+            aggregated_bids, walked_bids, bids_exhausted = self.walk_buckets(
+                bid_levels, False, limit, rounding)
+            aggregated_asks, walked_asks, asks_exhausted = self.walk_buckets(
+                ask_levels, True, limit, rounding)
+
         if len(aggregated_bids) < limit or len(aggregated_asks) < limit:
             # Use debug for completely empty orderbooks (initial load), warning
             # for partial data
             if len(aggregated_bids) == 0 and len(aggregated_asks) == 0:
                 logger.debug(
-                    f"[ORDERBOOK_AGGREGATION] Empty orderbook for {
-                        orderbook.symbol} after {max_attempts} attempts")
+                    f"[ORDERBOOK_AGGREGATION] Empty orderbook for {orderbook.symbol}")
             else:
                 logger.warning(
-                    f"[ORDERBOOK_AGGREGATION] Could not get {limit} levels for {
-                        orderbook.symbol} after {max_attempts} attempts. " f"Got bids={
-                        len(aggregated_bids)}, asks={
-                        len(aggregated_asks)}")
+                    f"[ORDERBOOK_AGGREGATION] Could not get {limit} levels for "
+                    f"{orderbook.symbol} at rounding={rounding}. "
+                    f"Got bids={len(aggregated_bids)}, asks={len(aggregated_asks)}")
 
         # Analyze market depth
-        market_depth_info = self.analyze_market_depth(
-            raw_bids, raw_asks, limit, rounding)
+        min_required_raw_data = limit * 10
+        actual_levels = min(len(aggregated_bids), len(aggregated_asks))
+        market_depth_info = {
+            # Only a side walked to its end can be short of raw levels
+            'has_insufficient_raw_data': (
+                (bids_exhausted and walked_bids < min_required_raw_data)
+                or (asks_exhausted and walked_asks < min_required_raw_data)),
+            'is_market_depth_limited': actual_levels < limit,
+            'actual_levels': actual_levels,
+            'requested_levels': limit,
+            'raw_bids_count': walked_bids,
+            'raw_asks_count': walked_asks,
+            'min_required_raw_data': min_required_raw_data
+        }
 
         # Calculate cumulative totals for bids (highest to lowest)
         bids_with_cumulative = self.calculate_cumulative_totals(
@@ -370,24 +427,18 @@ class OrderBookAggregationService:
             aggregated_asks, True)
 
         # Apply formatting to all levels if symbol_data is available
-        if symbol_data:
-            # Format bids
-            for bid in bids_with_cumulative:
-                bid['price_formatted'] = formatting_service.format_price(
-                    bid['price'], symbol_data, rounding)
-                bid['amount_formatted'] = formatting_service.format_amount(
-                    bid['amount'], symbol_data)
-                bid['cumulative_formatted'] = formatting_service.format_total(
-                    bid['cumulative'], symbol_data)
-
-            # Format asks
-            for ask in asks_with_cumulative:
-                ask['price_formatted'] = formatting_service.format_price(
-                    ask['price'], symbol_data, rounding)
-                ask['amount_formatted'] = formatting_service.format_amount(
-                    ask['amount'], symbol_data)
-                ask['cumulative_formatted'] = formatting_service.format_total(
-                    ask['cumulative'], symbol_data)
+        if symbol_data and formatted:
+            for levels in (bids_with_cumulative, asks_with_cumulative):
+                prices = formatting_service.format_price_column(
+                    [level['price'] for level in levels], symbol_data, rounding)
+                amounts = formatting_service.format_amount_column(
+                    [level['amount'] for level in levels], symbol_data)
+                cumulatives = formatting_service.format_total_column(
+                    [level['cumulative'] for level in levels], symbol_data)
+                for level, price, amount, cumulative in zip(levels, prices, amounts, cumulatives):
+                    level['price_formatted'] = price
+                    level['amount_formatted'] = amount
+                    level['cumulative_formatted'] = cumulative
 
         # Format timestamp for display
         try:
@@ -444,45 +495,47 @@ class OrderBookAggregationService:
                 'cache_size': len(self._cache)
             }
 
+    def get_memory_objects(self) -> Dict[str, Dict]:
+        """Cached aggregations per symbol, for memory accounting."""
+        grouped: Dict[str, Dict] = {}
+        for key, entry in list(self._cache.items()):
+            # Keys are symbol:limit:rounding:version with an optional :raw
+            fields = key[:-len(":raw")] if key.endswith(":raw") else key
+            grouped.setdefault(fields.rsplit(":", 3)[0], {})[key] = entry
+        return grouped
+
     async def warm_cache_for_symbol(
             self,
             symbol: str,
             orderbook: OrderBook,
-            symbol_data: Optional[Dict] = None) -> None:
+            symbol_data: Optional[Dict] = None,
+            params: Iterable[Tuple[int, float, bool]] = ()) -> int:
         """
-        Pre-warm cache for common parameter combinations for a symbol.
+        Precompute aggregations of the book's current version.
 
         Args:
             symbol: Trading symbol
             orderbook: OrderBook instance
             symbol_data: Optional symbol information for rounding calculations
-        """
-        # Common depth limits used by most traders
-        common_limits = [5, 10, 20, 50]
+            params: (limit, rounding, formatted) combinations to compute,
+                usually the symbol's hot parameters from the demand tracker
 
-        # Calculate rounding options for this symbol
-        try:
-            snapshot = await orderbook.get_snapshot(1)
-            if snapshot.bids:
-                snapshot.bids[0].price
-            elif snapshot.asks:
-                snapshot.asks[0].price
-        except Exception:
-            # If orderbook is empty or has issues, current_price will remain
-            # None
-            pass
-
-        # Use common rounding values for cache warming
-        common_roundings = [0.01, 0.1, 1.0]  # Standard rounding values
-
-        # Pre-calculate and cache common combinations
-        for limit in common_limits:
-            for rounding in common_roundings:
-                try:
-                    # This will calculate and cache the result
-                    await self.aggregate_orderbook(orderbook, limit, rounding, symbol_data)
-                except Exception as e:
-                    # Don't let cache warming errors break the flow
-                    logger.warning(
-                        f"Cache warming failed for {symbol} limit={limit} rounding={rounding}: {e}")
-                    continue
+        Returns:
+            Number of combinations computed (already cached ones are skipped)
+        """
+        computed = 0
+        for limit, rounding, formatted in params:
+            cache_key = self._generate_cache_key(
+                orderbook.symbol, limit, rounding, orderbook.version, formatted)
+            if cache_key in self._cache:
+                continue
+            try:
+                # This will calculate and cache the result
+                await self.aggregate_orderbook(
+                    orderbook, limit, rounding, symbol_data, formatted=formatted)
+                computed += 1
+            except Exception as e:
+                # Don't let cache warming errors break the flow
+                logger.warning(
+                    f"Cache warming failed for {symbol} limit={limit} rounding={rounding}: {e}")
+        return computed
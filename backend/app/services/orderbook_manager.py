@@ -1,24 +1,80 @@
-from typing import Dict, Set, Optional, List
+from typing import Callable, Dict, Iterable, Set, Optional, List, Tuple
 import asyncio
 import time
 import logging
-from collections import defaultdict
 
+from ..core.config import settings
+from ..models.depth_index import DepthIndex
 from ..models.orderbook import OrderBook
+from ..models.wall_index import WallIndex
+from ..models.tick_ladder_orderbook import (
+    BACKEND_TICK_LADDER, create_orderbook, tick_size_from_symbol_data)
 from .orderbook_aggregation_service import OrderBookAggregationService
+from .memory_accounting_service import memory_accounting_service
+from .aggregation_demand_tracker import AggregationDemandTracker
+from .orderbook_state_store import OrderBookStateStore, SavedOrderBook
+from .orderbook_sync_service import orderbook_sync_service
 
 
 logger = logging.getLogger(__name__)
 
 
+class SymbolShard:
+    """
+    Per-symbol manager state: the order book, its connections and a lock.
+
+    The shard lock only serializes work on this symbol (aggregation), so a
+    slow symbol never delays broadcasts for the others. A shard without
+    connections is idle (kept warm) from `idle_since` until its expiry task
+    evicts it.
+    """
+
+    __slots__ = ('symbol', 'orderbook', 'connections', 'lock', 'created_at',
+                 'idle_since', 'expiry_task')
+
+    def __init__(self, symbol: str, orderbook: OrderBook):
+        self.symbol = symbol
+        self.orderbook = orderbook
+        self.connections: Set[str] = set()
+        self.lock = asyncio.Lock()
+        self.created_at = time.time()
+        self.idle_since: Optional[float] = None  # time.monotonic() when idle
+        self.expiry_task: Optional[asyncio.Task] = None
+
+
 class OrderBookManager:
     """
     Singleton manager for order book lifecycle and state management.
     Handles creation, destruction, and tracking of order books.
+
+    State is split into per-symbol shards. The registry lock is held only
+    while a shard is created or destroyed; everything else runs without a
+    manager-wide lock. Reads and single-step updates of the shard and
+    connection dictionaries need no lock on the event loop because they do
+    not await.
+
+    When the last connection leaves, the book is kept warm for
+    ORDERBOOK_KEEP_WARM_SECONDS so a reload or symbol flip reuses it. While
+    the books exceed ORDERBOOK_MEMORY_BUDGET_MB, idle books are evicted least
+    recently used first. Eviction listeners are told about every removed
+    book so its exchange stream can be stopped.
+
+    The (limit, rounding) parameters of every connection feed a per-symbol
+    demand histogram; after each new book version only the combinations
+    with live or recent subscribers are precomputed.
+
+    With ORDERBOOK_PYRAMID each book maintains an aggregation pyramid over
+    its symbol's rounding options, so aggregating at those roundings is a
+    top-N read. With ORDERBOOK_DEPTH_INDEX each book also maintains a depth
+    index for liquidity-band and sweep-cost metrics, and with ORDERBOOK_WALLS
+    an index of its largest levels.
+
+    With ORDERBOOK_STATE_PATH the live books are saved on shutdown, and a
+    book created after a restart starts from its saved levels when they are
+    recent and consistent (see restore_orderbook).
     """
 
     _instance = None
-    _lock = asyncio.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -31,18 +87,33 @@ class OrderBookManager:
             return
 
         self._initialized = True
-        self._orderbooks: Dict[str, OrderBook] = {}
-        self._connections: Dict[str, Set[str]] = defaultdict(
-            set)  # symbol -> connection_ids
-        # connection_id -> {limit, rounding, symbol}
+        self._registry_lock = asyncio.Lock()
+        self._shards: Dict[str, SymbolShard] = {}  # symbol -> shard
+        # connection_id -> {limit, rounding, symbol, raw}
         self._connection_params: Dict[str, Dict] = {}
         self._persistent_mode = False  # Future flag for persistent order books
         self._aggregation_service = OrderBookAggregationService()
         self._symbol_data: Dict[str, Dict] = {}  # symbol -> symbol metadata
 
-        # Memory monitoring
-        self._max_orderbooks = 100
-        self._cleanup_threshold = 0.8  # Start cleanup at 80% of max
+        # Keep-warm and memory budget
+        self._keep_warm_seconds = settings.ORDERBOOK_KEEP_WARM_SECONDS
+        self._memory_budget_bytes = int(
+            settings.ORDERBOOK_MEMORY_BUDGET_MB * 1024 * 1024)
+        self._eviction_listeners: List[Callable[[str], None]] = []
+        self._evictions = {'expired': 0, 'memory': 0}
+
+        # Demand-driven aggregation precompute
+        self._demand = AggregationDemandTracker(
+            settings.AGGREGATION_DEMAND_WINDOW_SECONDS,
+            settings.AGGREGATION_PRECOMPUTE_MAX)
+
+        # Order book state kept across restarts
+        self._state_store = (OrderBookStateStore(settings.ORDERBOOK_STATE_PATH)
+                             if settings.ORDERBOOK_STATE_PATH else None)
+        self._state_max_age = settings.ORDERBOOK_STATE_MAX_AGE_SECONDS
+        self._saved_books: Dict[str, SavedOrderBook] = {}
+        self._state_stats = {'saved': 0, 'loaded': 0, 'restored': 0,
+                             'expired': 0, 'inconsistent': 0}
 
         logger.info("OrderBookManager initialized")
 
@@ -54,13 +125,12 @@ class OrderBookManager:
         Args:
             persistent: Whether to enable persistent mode
         """
-        async with self._lock:
-            self._persistent_mode = persistent
-            logger.info(
-                f"OrderBookManager persistent mode set to {persistent}")
+        self._persistent_mode = persistent
+        logger.info(f"OrderBookManager persistent mode set to {persistent}")
 
     async def register_connection(self, connection_id: str, symbol: str,
-                                  limit: int, rounding: float) -> OrderBook:
+                                  limit: int, rounding: float,
+                                  raw: bool = False) -> OrderBook:
         """
         Register a new connection and get or create the associated order book.
 
@@ -69,43 +139,117 @@ class OrderBookManager:
             symbol: Trading symbol
             limit: Display depth limit
             rounding: Price rounding value
+            raw: Connection formats numbers client-side (no *_formatted fields)
 
         Returns:
             OrderBook instance for the symbol
         """
-        async with self._lock:
-            # Store connection parameters
-            self._connection_params[connection_id] = {
-                'symbol': symbol,
-                'limit': limit,
-                'rounding': rounding,
-                'connected_at': time.time()
-            }
-
-            # Add connection to symbol tracking
-            self._connections[symbol].add(connection_id)
-
-            # Create or get order book
-            if symbol not in self._orderbooks:
-                self._orderbooks[symbol] = OrderBook(symbol)
-                logger.info(f"Created new OrderBook for {symbol}")
+        # Store connection parameters
+        previous = self._connection_params.get(connection_id)
+        if previous is not None:
+            self._demand.unsubscribe(previous['symbol'], previous['limit'],
+                                     previous['rounding'], not previous.get('raw', False))
+        self._connection_params[connection_id] = {
+            'symbol': symbol,
+            'limit': limit,
+            'rounding': rounding,
+            'raw': raw,
+            'connected_at': time.time()
+        }
+        self._demand.subscribe(symbol, limit, rounding, not raw)
+
+        # Reason: Joining an existing shard is a plain dict lookup plus set
+        # add with no await in between, so it cannot race a shard removal
+        # and never touches the registry lock.
+        shard = self._shards.get(symbol)
+        if shard is None:
+            shard = await self._create_shard(symbol, connection_id)
+        else:
+            if shard.idle_since is not None:
+                logger.info(f"Reusing warm OrderBook for {symbol}")
+            shard.connections.add(connection_id)
+            self._mark_active(shard)
+
+        logger.info(f"Registered connection {connection_id} for {symbol} "
+                    f"(limit={limit}, rounding={rounding})")
+
+        return shard.orderbook
+
+    async def _create_shard(self, symbol: str,
+                            connection_id: str) -> SymbolShard:
+        """
+        Create the shard for a symbol under the registry lock.
 
-                # Trigger cache warming for new orderbook (don't wait for it)
-                orderbook = self._orderbooks[symbol]
-                symbol_data = self._symbol_data.get(symbol)
-                asyncio.create_task(
-                    self._aggregation_service.warm_cache_for_symbol(
-                        symbol, orderbook, symbol_data))
-            else:
-                orderbook = self._orderbooks[symbol]
+        Args:
+            symbol: Trading symbol
+            connection_id: First connection to add to the shard
 
-            # Check if we need memory cleanup
-            await self._check_memory_usage()
+        Returns:
+            The new shard, or the existing one if another task created it
+        """
+        async with self._registry_lock:
+            shard = self._shards.get(symbol)
+            if shard is not None:
+                shard.connections.add(connection_id)
+                self._mark_active(shard)
+                return shard
+
+            shard = SymbolShard(symbol, self._new_orderbook(symbol))
+            shard.connections.add(connection_id)
+            self._shards[symbol] = shard
+            logger.info(f"Created new OrderBook for {symbol}")
+
+            # Make room for the new book by evicting idle ones
+            self._enforce_memory_budget()
+
+            # Reason: The new book is still empty; precompute starts with its
+            # first version (see precompute_aggregations).
+            return shard
+
+    def _new_orderbook(self, symbol: str) -> OrderBook:
+        """
+        Create an order book with the configured storage backend.
 
-            logger.info(f"Registered connection {connection_id} for {symbol} "
-                        f"(limit={limit}, rounding={rounding})")
+        Args:
+            symbol: Trading symbol
 
-            return orderbook
+        Returns:
+            OrderBook, or TickLadderOrderBook when ORDERBOOK_BACKEND selects it
+        """
+        if settings.ORDERBOOK_BACKEND == BACKEND_TICK_LADDER:
+            orderbook = create_orderbook(
+                symbol, BACKEND_TICK_LADDER, self._symbol_data.get(symbol),
+                settings.ORDERBOOK_TICK_LADDER_WIDTH)
+        else:
+            orderbook = OrderBook(symbol)
+        self._configure_pyramid(orderbook, symbol)
+        self._configure_depth_index(orderbook, symbol)
+        if settings.ORDERBOOK_WALLS:
+            orderbook.set_wall_index(WallIndex(
+                settings.ORDERBOOK_WALLS_TOP_K, settings.ORDERBOOK_WALLS_MIN_Z_SCORE))
+        return orderbook
+
+    def _configure_pyramid(self, orderbook: OrderBook, symbol: str) -> None:
+        """Maintain an aggregation pyramid over the symbol's rounding options."""
+        rounding_options = (self._symbol_data.get(symbol) or {}).get('roundingOptions')
+        if settings.ORDERBOOK_PYRAMID and rounding_options:
+            orderbook.set_pyramid_roundings(rounding_options)
+
+    def _configure_depth_index(self, orderbook: OrderBook, symbol: str) -> None:
+        """Maintain a depth index over the symbol's price tick."""
+        tick_size = tick_size_from_symbol_data(self._symbol_data.get(symbol))
+        if not settings.ORDERBOOK_DEPTH_INDEX or tick_size is None:
+            return
+        current = orderbook.depth_index
+        if current is not None and current.tick_size == tick_size:
+            return
+        try:
+            orderbook.set_depth_index(DepthIndex(
+                tick_size, settings.ORDERBOOK_DEPTH_BANDS,
+                settings.ORDERBOOK_DEPTH_SWEEP_NOTIONALS,
+                settings.ORDERBOOK_DEPTH_INDEX_WIDTH))
+        except ValueError as e:
+            logger.warning(f"Depth index disabled for {symbol}: {e}")
 
     async def unregister_connection(self, connection_id: str) -> None:
         """
@@ -114,32 +258,126 @@ class OrderBookManager:
         Args:
             connection_id: Connection identifier to remove
         """
-        async with self._lock:
-            if connection_id not in self._connection_params:
-                return
+        connection_info = self._connection_params.pop(connection_id, None)
+        if connection_info is None:
+            return
 
-            # Get connection info
-            connection_info = self._connection_params[connection_id]
-            symbol = connection_info['symbol']
+        symbol = connection_info['symbol']
+        self._demand.unsubscribe(
+            symbol, connection_info['limit'], connection_info['rounding'],
+            not connection_info.get('raw', False))
+        shard = self._shards.get(symbol)
+        if shard is not None:
+            shard.connections.discard(connection_id)
+
+            # If no more connections and not persistent mode, keep the order
+            # book warm or clean it up
+            if not shard.connections and not self._persistent_mode:
+                async with self._registry_lock:
+                    # Reason: A connection may have joined while we waited
+                    # for the lock; only idle or drop the shard if still unused.
+                    if self._shards.get(symbol) is shard and not shard.connections:
+                        if self._keep_warm_seconds > 0:
+                            self._mark_idle(shard)
+                            self._enforce_memory_budget()
+                        else:
+                            self._remove_shard(shard)
+                            logger.info(
+                                f"Removed OrderBook for {symbol} (no active connections)")
+
+        logger.info(f"Unregistered connection {connection_id} for {symbol}")
+
+    def _mark_idle(self, shard: SymbolShard) -> None:
+        """Start the keep-warm period of a shard that lost its last connection."""
+        shard.idle_since = time.monotonic()
+        shard.expiry_task = asyncio.create_task(
+            self._expire_after(shard, self._keep_warm_seconds))
+        logger.info(f"Keeping OrderBook for {shard.symbol} warm for "
+                    f"{self._keep_warm_seconds:g}s")
+
+    def _mark_active(self, shard: SymbolShard) -> None:
+        """End a shard's keep-warm period because a connection joined."""
+        shard.idle_since = None
+        if shard.expiry_task is not None:
+            shard.expiry_task.cancel()
+            shard.expiry_task = None
+
+    async def _expire_after(self, shard: SymbolShard, delay: float) -> None:
+        """Evict an idle shard once its keep-warm period is over."""
+        await asyncio.sleep(delay)
+        async with self._registry_lock:
+            if self._shards.get(shard.symbol) is shard and not shard.connections:
+                shard.expiry_task = None  # Don't cancel ourselves on removal
+                self._remove_shard(shard)
+                self._evictions['expired'] += 1
+                logger.info(f"Evicted OrderBook for {shard.symbol} "
+                            f"(idle for {self._keep_warm_seconds:g}s)")
+
+    def _enforce_memory_budget(self) -> None:
+        """Evict idle shards, least recently used first, while over budget.
+
+        Must be called with the registry lock held.
+        """
+        idle = sorted(
+            (shard for shard in self._shards.values()
+             if shard.idle_since is not None and not shard.connections),
+            key=lambda shard: shard.idle_since)
+        if not idle:
+            return
+
+        total = sum(self._shard_memory(shard) for shard in self._shards.values())
+        for shard in idle:
+            if total <= self._memory_budget_bytes:
+                break
+            total -= self._shard_memory(shard)
+            self._remove_shard(shard)
+            self._evictions['memory'] += 1
+            logger.info(f"Evicted idle OrderBook for {shard.symbol} "
+                        f"(memory budget {self._memory_budget_bytes} bytes)")
+
+    @staticmethod
+    def _shard_memory(shard: SymbolShard) -> int:
+        """Approximate bytes held by a shard's order book."""
+        return int(shard.orderbook.get_memory_bytes())
+
+    def _remove_shard(self, shard: SymbolShard) -> None:
+        """Drop a shard and notify eviction listeners.
+
+        Must be called with the registry lock held.
+        """
+        del self._shards[shard.symbol]
+        if shard.expiry_task is not None:
+            shard.expiry_task.cancel()
+            shard.expiry_task = None
+        for listener in list(self._eviction_listeners):
+            try:
+                listener(shard.symbol)
+            except Exception as e:
+                logger.error(f"Eviction listener failed for {shard.symbol}: {e}")
+
+    def add_eviction_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a callback run with the symbol whenever an order book is removed.
 
-            # Remove from tracking
-            self._connections[symbol].discard(connection_id)
-            del self._connection_params[connection_id]
+        Args:
+            listener: Synchronous callable taking the symbol
+        """
+        if listener not in self._eviction_listeners:
+            self._eviction_listeners.append(listener)
 
-            # If no more connections and not persistent mode, cleanup order
-            # book
-            if not self._connections[symbol] and not self._persistent_mode:
-                if symbol in self._orderbooks:
-                    del self._orderbooks[symbol]
-                    logger.info(
-                        f"Removed OrderBook for {symbol} (no active connections)")
+    def is_warm(self, symbol: str) -> bool:
+        """
+        Whether a symbol's order book is kept warm without connections.
 
-                # Clean up empty connection set
-                if not self._connections[symbol]:
-                    del self._connections[symbol]
+        Args:
+            symbol: Trading symbol
 
-            logger.info(
-                f"Unregistered connection {connection_id} for {symbol}")
+        Returns:
+            True while the book is in its keep-warm period
+        """
+        shard = self._shards.get(symbol)
+        return (shard is not None and not shard.connections
+                and shard.idle_since is not None)
 
     async def update_connection_params(
             self,
@@ -157,23 +395,27 @@ class OrderBookManager:
         Returns:
             True if connection was found and updated, False otherwise
         """
-        async with self._lock:
-            if connection_id not in self._connection_params:
-                return False
-
-            connection_info = self._connection_params[connection_id]
+        connection_info = self._connection_params.get(connection_id)
+        if connection_info is None:
+            return False
 
-            if limit is not None:
-                connection_info['limit'] = limit
-            if rounding is not None:
-                connection_info['rounding'] = rounding
+        symbol = connection_info['symbol']
+        formatted = not connection_info.get('raw', False)
+        self._demand.unsubscribe(symbol, connection_info['limit'],
+                                 connection_info['rounding'], formatted)
+        if limit is not None:
+            connection_info['limit'] = limit
+        if rounding is not None:
+            connection_info['rounding'] = rounding
 
-            connection_info['updated_at'] = time.time()
+        connection_info['updated_at'] = time.time()
+        self._demand.subscribe(symbol, connection_info['limit'],
+                               connection_info['rounding'], formatted)
 
-            logger.info(f"Updated connection {connection_id} parameters: "
-                        f"limit={limit}, rounding={rounding}")
+        logger.info(f"Updated connection {connection_id} parameters: "
+                    f"limit={limit}, rounding={rounding}")
 
-            return True
+        return True
 
     async def warm_cache_for_symbol(self, symbol: str) -> None:
         """
@@ -182,15 +424,121 @@ class OrderBookManager:
         Args:
             symbol: Trading symbol to warm cache for
         """
-        async with self._lock:
-            orderbook = self._orderbooks.get(symbol)
-            symbol_data = self._symbol_data.get(symbol)
+        if symbol in self._shards:
+            # Trigger cache warming in background (don't wait for it)
+            asyncio.create_task(self.precompute_aggregations(symbol))
+
+    async def precompute_aggregations(self, symbol: str) -> int:
+        """
+        Precompute the current book version for the symbol's hot parameters.
+
+        Only (limit, rounding) combinations with live or recently seen
+        subscribers are computed, and only roundings from the symbol's
+        roundingOptions when known. Combinations a broadcast already
+        computed for this version are cache hits and skipped.
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Number of combinations computed
+        """
+        shard = self._shards.get(symbol)
+        if shard is None:
+            return 0
+
+        symbol_data = self._symbol_data.get(symbol)
+        params = self._demand.hot_params(
+            symbol, (symbol_data or {}).get('roundingOptions'))
+        if not params:
+            return 0
+
+        async with shard.lock:
+            return await self._aggregation_service.warm_cache_for_symbol(
+                symbol, shard.orderbook, symbol_data, params)
+
+    def get_demand_stats(self, symbol: Optional[str] = None) -> Dict:
+        """
+        Get the per-symbol histogram of subscription parameters.
+
+        Args:
+            symbol: Limit to one symbol (all symbols when None)
+
+        Returns:
+            {symbol: [{limit, rounding, formatted, live, count, idle_seconds}]}
+        """
+        return self._demand.get_stats(symbol)
+
+    async def load_saved_state(self) -> int:
+        """
+        Read the books saved by the last shutdown.
+
+        Returns:
+            Number of saved books available to restore_orderbook
+        """
+        if self._state_store is None:
+            return 0
+        self._saved_books = await asyncio.to_thread(self._state_store.load)
+        self._state_stats['loaded'] = len(self._saved_books)
+        return len(self._saved_books)
+
+    async def restore_orderbook(self, symbol: str,
+                                orderbook: OrderBook) -> Optional[SavedOrderBook]:
+        """
+        Load a symbol's saved levels into its (new) order book.
+
+        Each saved book is used at most once. It is skipped when older than
+        ORDERBOOK_STATE_MAX_AGE_SECONDS or not a consistent book; the caller
+        then fetches a REST snapshot as usual.
+
+        Args:
+            symbol: Trading symbol
+            orderbook: Order book to load the levels into
 
-            if orderbook:
-                # Trigger cache warming in background (don't wait for it)
-                asyncio.create_task(
-                    self._aggregation_service.warm_cache_for_symbol(
-                        symbol, orderbook, symbol_data))
+        Returns:
+            The restored book (for its update id), or None if nothing was restored
+        """
+        saved = self._saved_books.pop(symbol, None)
+        if saved is None:
+            return None
+
+        age = time.time() - saved.saved_at
+        if age > self._state_max_age:
+            # Reason: the other saved books are at least as old
+            self._state_stats['expired'] += 1 + len(self._saved_books)
+            self._saved_books.clear()
+            logger.info(f"Saved order book for {symbol} is {age:.0f}s old; "
+                        f"fetching a snapshot instead")
+            return None
+        if not saved.is_consistent() or not (saved.bids or saved.asks):
+            self._state_stats['inconsistent'] += 1
+            logger.warning(f"Saved order book for {symbol} is inconsistent; "
+                           f"fetching a snapshot instead")
+            return None
+
+        await orderbook.update_snapshot(saved.to_snapshot())
+        self._state_stats['restored'] += 1
+        logger.info(f"Restored OrderBook for {symbol} from saved state "
+                    f"({len(saved.bids)} bids, {len(saved.asks)} asks, {age:.0f}s old)")
+        return saved
+
+    def _saved_state(self) -> List[SavedOrderBook]:
+        """Current levels of every live book that is not mid-resync."""
+        books = []
+        for symbol, shard in self._shards.items():
+            # Reason: during a resync the book lags the tracked update id
+            if orderbook_sync_service.is_resyncing(symbol):
+                continue
+            bids, asks = shard.orderbook.iter_levels()
+            book = SavedOrderBook(
+                symbol=symbol,
+                nonce=orderbook_sync_service.last_nonce(symbol),
+                timestamp=float(shard.orderbook.timestamp),
+                bids=list(bids),
+                asks=list(asks))
+            if book.bids or book.asks:
+                books.append(book)
+        return books
 
     async def get_orderbook(self, symbol: str) -> Optional[OrderBook]:
         """
@@ -202,41 +550,79 @@ class OrderBookManager:
         Returns:
             OrderBook instance or None if not found
         """
-        async with self._lock:
-            return self._orderbooks.get(symbol)
+        shard = self._shards.get(symbol)
+        return shard.orderbook if shard else None
+
+    def get_orderbooks(self) -> Dict[str, OrderBook]:
+        """Live (subscribed or warm) order books per symbol."""
+        return {symbol: shard.orderbook for symbol, shard in list(self._shards.items())}
+
+    def get_memory_objects(self) -> Dict[str, OrderBook]:
+        """Order books per symbol, for memory accounting."""
+        return self.get_orderbooks()
+
+    def walk_buckets(
+            self,
+            levels: Iterable[Tuple[float, float]],
+            is_ask: bool,
+            limit: int,
+            rounding: float) -> Tuple[List[Dict], int, bool]:
+        """
+        Aggregate one side of a book into price buckets.
+
+        Exposes the aggregation walk (see
+        OrderBookAggregationService.walk_buckets) to services that bucket
+        levels themselves, such as the liquidity heatmap.
+
+        Returns:
+            Tuple of (buckets in walk order, number of levels read, whether
+            the side was read to its end)
+        """
+        return self._aggregation_service.walk_buckets(levels, is_ask, limit, rounding)
 
     async def get_aggregated_orderbook(
             self, connection_id: str) -> Optional[Dict]:
         """
         Get aggregated order book data for a specific connection.
 
+        Aggregation runs under the symbol's shard lock only, so concurrent
+        requests for the same symbol and parameters compute once and then
+        hit the cache, while other symbols proceed independently. The
+        book's index metrics (see OrderBook.get_index_metrics) are included
+        as 'depth' and 'walls'.
+
         Args:
             connection_id: Connection identifier
 
         Returns:
             Aggregated order book data or None if connection not found
         """
-        async with self._lock:
-            if connection_id not in self._connection_params:
-                return None
-
-            connection_info = self._connection_params[connection_id]
-            symbol = connection_info['symbol']
-            limit = connection_info['limit']
-            rounding = connection_info['rounding']
+        connection_info = self._connection_params.get(connection_id)
+        if connection_info is None:
+            return None
 
-            orderbook = self._orderbooks.get(symbol)
-            if not orderbook:
-                return None
-
-            # Get symbol data if available
-            symbol_data = self._symbol_data.get(symbol)
+        symbol = connection_info['symbol']
+        shard = self._shards.get(symbol)
+        if not shard:
+            return None
 
+        async with shard.lock:
             # Use aggregation service to get aggregated data
-            return await self._aggregation_service.aggregate_orderbook(
-                orderbook, limit, rounding, symbol_data
+            result = await self._aggregation_service.aggregate_orderbook(
+                shard.orderbook,
+                connection_info['limit'],
+                connection_info['rounding'],
+                self._symbol_data.get(symbol),
+                formatted=not connection_info.get('raw', False)
             )
 
+        # Reason: Index metrics are per book version, not per (limit,
+        # rounding), so they are added to a copy instead of the cached result.
+        metrics = shard.orderbook.get_index_metrics()
+        if result is not None and metrics:
+            result = {**result, **metrics}
+        return result
+
     async def get_connections_for_symbol(self, symbol: str) -> List[str]:
         """
         Get all connection IDs for a symbol.
@@ -247,8 +633,8 @@ class OrderBookManager:
         Returns:
             List of connection IDs
         """
-        async with self._lock:
-            return list(self._connections.get(symbol, set()))
+        shard = self._shards.get(symbol)
+        return list(shard.connections) if shard else []
 
     async def get_connection_params(
             self, connection_id: str) -> Optional[Dict]:
@@ -261,8 +647,7 @@ class OrderBookManager:
         Returns:
             Connection parameters or None if not found
         """
-        async with self._lock:
-            return self._connection_params.get(connection_id)
+        return self._connection_params.get(connection_id)
 
     async def update_symbol_data(self, symbol: str, symbol_data: Dict) -> None:
         """
@@ -272,8 +657,42 @@ class OrderBookManager:
             symbol: Trading symbol
             symbol_data: Symbol metadata including price precision
         """
-        async with self._lock:
-            self._symbol_data[symbol] = symbol_data
+        self._symbol_data[symbol] = symbol_data
+        shard = self._shards.get(symbol)
+        if shard is not None:
+            self._configure_pyramid(shard.orderbook, symbol)
+            self._configure_depth_index(shard.orderbook, symbol)
+
+    async def get_depth_metrics(
+            self, symbol: str,
+            sweep_units: Optional[List[float]] = None) -> Optional[Dict]:
+        """
+        Get liquidity-band depth and sweep costs for a symbol's book.
+
+        Args:
+            symbol: Trading symbol
+            sweep_units: Sweep sizes in base units (the configured
+                ORDERBOOK_DEPTH_SWEEP_NOTIONALS when None)
+
+        Returns:
+            Depth metrics, or None without a book, depth index or levels
+        """
+        shard = self._shards.get(symbol)
+        if shard is None:
+            return None
+        return shard.orderbook.get_depth_metrics(sweep_units)
+
+    async def get_symbol_data(self, symbol: str) -> Optional[Dict]:
+        """
+        Get symbol metadata set by update_symbol_data.
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Symbol metadata or None if not set
+        """
+        return self._symbol_data.get(symbol)
 
     async def get_stats(self) -> Dict:
         """
@@ -282,59 +701,54 @@ class OrderBookManager:
         Returns:
             Dictionary with current statistics
         """
-        async with self._lock:
-            total_connections = len(self._connection_params)
-            active_orderbooks = len(self._orderbooks)
-
-            # Calculate memory usage estimate
-            memory_usage = 0
-            for orderbook in self._orderbooks.values():
-                bid_count, ask_count = await orderbook.get_levels_count()
-                memory_usage += (bid_count + ask_count) * 32  # Rough estimate
-
-            return {
-                'total_connections': total_connections,
-                'active_orderbooks': active_orderbooks,
-                'symbols': list(self._orderbooks.keys()),
-                'persistent_mode': self._persistent_mode,
-                'memory_usage_estimate': memory_usage,
-                'cache_size': len(self._aggregation_service._cache),
-                'cache_metrics': await self._aggregation_service.get_cache_metrics()
-            }
-
-    async def _check_memory_usage(self) -> None:
-        """Check memory usage and perform cleanup if necessary."""
-        if len(self._orderbooks) > self._max_orderbooks * \
-                self._cleanup_threshold:
-            await self._cleanup_old_orderbooks()
-
-    async def _cleanup_old_orderbooks(self) -> None:
-        """Clean up old order books to manage memory."""
-        if self._persistent_mode:
-            return  # Don't cleanup in persistent mode
-
-        # Find order books with no connections
-        symbols_to_remove = []
-        for symbol in self._orderbooks:
-            if not self._connections.get(symbol):
-                symbols_to_remove.append(symbol)
-
-        # Remove order books with no connections
-        for symbol in symbols_to_remove:
-            del self._orderbooks[symbol]
-            logger.info(
-                f"Cleaned up OrderBook for {symbol} (memory management)")
-
-        if symbols_to_remove:
-            logger.info(
-                f"Cleaned up {
-                    len(symbols_to_remove)} order books for memory management")
+        # Reason: Snapshot the shards so the figures below describe one set
+        # of books even if a shard is added or evicted meanwhile.
+        shards = list(self._shards.values())
+
+        memory_usage = sum(self._shard_memory(shard) for shard in shards)
+
+        return {
+            'total_connections': len(self._connection_params),
+            'active_orderbooks': len(shards),
+            'warm_orderbooks': sum(1 for shard in shards if shard.idle_since is not None),
+            'symbols': [shard.symbol for shard in shards],
+            'persistent_mode': self._persistent_mode,
+            'memory_usage_estimate': memory_usage,
+            'memory_budget': self._memory_budget_bytes,
+            'keep_warm_seconds': self._keep_warm_seconds,
+            'evictions': dict(self._evictions),
+            'aggregation_demand': self._demand.get_stats(),
+            'pyramids': {
+                shard.symbol: shard.orderbook.pyramid.get_stats()
+                for shard in shards if shard.orderbook.pyramid is not None
+            },
+            'depth_indexes': {
+                shard.symbol: shard.orderbook.depth_index.get_stats()
+                for shard in shards if shard.orderbook.depth_index is not None
+            },
+            'wall_indexes': {
+                shard.symbol: shard.orderbook.wall_index.get_stats()
+                for shard in shards if shard.orderbook.wall_index is not None
+            },
+            'saved_state': dict(self._state_stats),
+            'cache_size': len(self._aggregation_service._cache),
+            'cache_metrics': await self._aggregation_service.get_cache_metrics()
+        }
 
     async def shutdown(self) -> None:
-        """Shutdown the manager and cleanup resources."""
-        async with self._lock:
-            self._orderbooks.clear()
-            self._connections.clear()
+        """Save the live books (see restore_orderbook), then clean up resources."""
+        async with self._registry_lock:
+            if self._state_store is not None:
+                try:
+                    self._state_stats['saved'] = await asyncio.to_thread(
+                        self._state_store.save, self._saved_state())
+                except Exception as e:
+                    logger.error(f"Failed to save order book state: {e}")
+
+            for shard in self._shards.values():
+                if shard.expiry_task is not None:
+                    shard.expiry_task.cancel()
+            self._shards.clear()
             self._connection_params.clear()
             self._symbol_data.clear()
             self._aggregation_service._cache.clear()
@@ -344,3 +758,7 @@ class OrderBookManager:
 
 # Global instance
 orderbook_manager = OrderBookManager()
+memory_accounting_service.register_source(
+    "orderbooks", orderbook_manager.get_memory_objects)
+memory_accounting_service.register_source(
+    "aggregation_cache", orderbook_manager._aggregation_service.get_memory_objects)
@@ -0,0 +1,252 @@
+"""
+Disk snapshot of live order books for fast restarts.
+
+On shutdown the OrderBook Manager writes every live book to one compact
+binary file; on startup the file is read back, and a book created for a
+saved symbol starts from its saved levels instead of a REST depth snapshot.
+The exchange stream then catches the book up, with the saved update id
+telling the sequence checks which streamed updates are already contained.
+
+Layout, all little-endian:
+
+    FILE_HEADER     magic b"OFOB", format version (uint16), reserved
+                    (uint16), saved_at (float64, unix seconds), books (uint32)
+    zlib stream of, per book:
+        BOOK_HEADER symbol length (uint16), price exponent (uint8), amount
+                    exponent (uint8), update id (int64, -1 if unknown),
+                    book timestamp (float64), bids (uint32), asks (uint32)
+        symbol      UTF-8
+        levels      bid prices, bid amounts, ask prices, ask amounts, each
+                    int64[count]: value * 10**exponent
+
+Prices and amounts are stored as integers at the finest decimal they use,
+so the round trip is exact for exchange-quoted values.
+"""
+
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.logging_config import get_logger
+from app.models.orderbook import OrderBookLevel, OrderBookSnapshot
+
+logger = get_logger("orderbook_state_store")
+
+STATE_MAGIC = b"OFOB"
+# Bump whenever the layout or its meaning changes
+STATE_FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHdI")
+BOOK_HEADER = struct.Struct("<HBBqdII")
+# Finest decimal kept for prices and amounts
+MAX_DECIMALS = 12
+
+Level = Tuple[float, float]
+
+
+def _decimals(values: Iterable[float]) -> int:
+    """Decimal places needed to write every value exactly (at most MAX_DECIMALS)."""
+    decimals = 0
+    for text in {repr(value) for value in values}:
+        exponent = Decimal(text).as_tuple().exponent
+        if -exponent > decimals:
+            decimals = -exponent
+            if decimals >= MAX_DECIMALS:
+                return MAX_DECIMALS
+    return decimals
+
+
+def _scaled(values: Iterable[float], decimals: int) -> array:
+    """Values as int64 units of 10**-decimals (OverflowError if one does not fit)."""
+    scale = 10 ** decimals
+    return array("q", (round(value * scale) for value in values))
+
+
+def _little_endian(column: array) -> array:
+    if sys.byteorder == "big":  # pragma: no cover - the file format is little-endian
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+@dataclass
+class SavedOrderBook:
+    """One order book as written to or read from the state file."""
+
+    symbol: str
+    nonce: Optional[int]  # Exchange update id (ccxt nonce) of the saved version
+    timestamp: float  # Book timestamp as set by the exchange feed
+    bids: List[Level] = field(default_factory=list)  # Highest price first
+    asks: List[Level] = field(default_factory=list)  # Lowest price first
+    saved_at: float = 0.0
+
+    def is_consistent(self) -> bool:
+        """Whether both sides are sorted, positive and not crossed."""
+        for levels, descending in ((self.bids, True), (self.asks, False)):
+            previous = None
+            for price, amount in levels:
+                if price <= 0 or amount <= 0 or not math.isfinite(price + amount):
+                    return False
+                if previous is not None and (price >= previous if descending
+                                             else price <= previous):
+                    return False
+                previous = price
+        return not (self.bids and self.asks and self.bids[0][0] >= self.asks[0][0])
+
+    def to_snapshot(self) -> OrderBookSnapshot:
+        """The saved levels as an OrderBookSnapshot."""
+        return OrderBookSnapshot(
+            symbol=self.symbol,
+            bids=[OrderBookLevel(price, amount) for price, amount in self.bids],
+            asks=[OrderBookLevel(price, amount) for price, amount in self.asks],
+            timestamp=self.timestamp)
+
+
+def encode_book(book: SavedOrderBook) -> bytes:
+    """
+    Encode one book (BOOK_HEADER, symbol, level columns).
+
+    Raises:
+        OverflowError: If a price or amount does not fit the integer columns
+    """
+    levels = book.bids + book.asks
+    price_exp = _decimals(price for price, _ in levels)
+    amount_exp = _decimals(amount for _, amount in levels)
+    symbol = book.symbol.encode("utf-8")
+    columns = [
+        _scaled((price for price, _ in book.bids), price_exp),
+        _scaled((amount for _, amount in book.bids), amount_exp),
+        _scaled((price for price, _ in book.asks), price_exp),
+        _scaled((amount for _, amount in book.asks), amount_exp),
+    ]
+    header = BOOK_HEADER.pack(
+        len(symbol), price_exp, amount_exp,
+        -1 if book.nonce is None else book.nonce, book.timestamp,
+        len(book.bids), len(book.asks))
+    return b"".join([header, symbol] + [_little_endian(column).tobytes() for column in columns])
+
+
+def decode_book(payload: memoryview, offset: int, saved_at: float) -> Tuple[SavedOrderBook, int]:
+    """
+    Decode one book written by encode_book.
+
+    Returns:
+        Tuple of (book, offset after it)
+    """
+    symbol_length, price_exp, amount_exp, nonce, timestamp, bid_count, ask_count = \
+        BOOK_HEADER.unpack_from(payload, offset)
+    offset += BOOK_HEADER.size
+    symbol = bytes(payload[offset:offset + symbol_length]).decode("utf-8")
+    offset += symbol_length
+
+    columns = []
+    for count in (bid_count, bid_count, ask_count, ask_count):
+        column = array("q")
+        column.frombytes(payload[offset:offset + count * 8])
+        if len(column) != count:
+            raise ValueError(f"Truncated levels for {symbol}")
+        columns.append(_little_endian(column))
+        offset += count * 8
+
+    price_scale = 10 ** price_exp
+    amount_scale = 10 ** amount_exp
+    bid_prices, bid_amounts, ask_prices, ask_amounts = columns
+    return SavedOrderBook(
+        symbol=symbol,
+        nonce=None if nonce < 0 else nonce,
+        timestamp=timestamp,
+        bids=[(price / price_scale, amount / amount_scale)
+              for price, amount in zip(bid_prices, bid_amounts)],
+        asks=[(price / price_scale, amount / amount_scale)
+              for price, amount in zip(ask_prices, ask_amounts)],
+        saved_at=saved_at), offset
+
+
+class OrderBookStateStore:
+    """Reads and writes the versioned order book state file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the state store.
+
+        Args:
+            path: State file path
+        """
+        self.path = path
+
+    def save(self, books: Iterable[SavedOrderBook]) -> int:
+        """
+        Write order books to disk (blocking).
+
+        Reason: the file is written next to the target and moved into place
+        with os.replace, so a crash mid-write never leaves a truncated
+        file behind.
+
+        Args:
+            books: Books to persist
+
+        Returns:
+            Number of books written
+        """
+        encoded = []
+        for book in books:
+            try:
+                encoded.append(encode_book(book))
+            except OverflowError as e:
+                logger.warning(f"Not saving order book for {book.symbol}: {e}")
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(FILE_HEADER.pack(
+                STATE_MAGIC, STATE_FORMAT_VERSION, 0, time.time(), len(encoded)))
+            f.write(zlib.compress(b"".join(encoded)))
+        os.replace(tmp_path, self.path)
+
+        logger.info(f"Saved {len(encoded)} order books to {self.path}")
+        return len(encoded)
+
+    def load(self) -> Dict[str, SavedOrderBook]:
+        """
+        Read the state file (blocking).
+
+        Returns:
+            Saved books by symbol; empty if the file is missing, unreadable
+            or written by an incompatible version
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            magic, version, _, saved_at, count = FILE_HEADER.unpack_from(data)
+            if magic != STATE_MAGIC or version != STATE_FORMAT_VERSION:
+                logger.info(
+                    f"Ignoring order book state with format version {version} "
+                    f"(expected {STATE_FORMAT_VERSION})")
+                return {}
+
+            payload = memoryview(zlib.decompress(data[FILE_HEADER.size:]))
+            books = {}
+            offset = 0
+            for _ in range(count):
+                book, offset = decode_book(payload, offset, saved_at)
+                books[book.symbol] = book
+        except (OSError, ValueError, struct.error, zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Ignoring unreadable order book state {self.path}: {str(e)}")
+            return {}
+
+        logger.info(
+            f"Loaded {len(books)} order books from {self.path} "
+            f"({time.time() - saved_at:.0f}s old)")
+        return books
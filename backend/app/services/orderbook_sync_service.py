@@ -0,0 +1,251 @@
+"""
+Order book sequence tracking and resync service.
+
+Tracks the exchange update id (ccxt `nonce`) of every order book update per
+symbol and classifies it before it is applied:
+
+- ok: newer than the last applied update
+- duplicate: same id as the last applied update (nothing new)
+- stale: older than a REST resync snapshot that was applied meanwhile
+- out_of_order: older than the last streamed update
+
+Gaps in the exchange's diff stream are not visible here: ccxt merges the
+diffs into its own full book (whose id only increases) and raises
+InvalidNonce or ChecksumError itself when one is missing; those are
+counted with record_gap(). Gaps, out-of-order updates and stream errors
+trigger a background resync from a REST snapshot. Until it lands the symbol keeps serving its last
+consistent version, and per-symbol resync counts and time-to-recover are
+kept for monitoring.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from app.core.logging_config import get_logger
+
+logger = get_logger("orderbook_sync_service")
+
+SEQ_OK = "ok"
+SEQ_DUPLICATE = "duplicate"
+SEQ_STALE = "stale"
+SEQ_OUT_OF_ORDER = "out_of_order"
+SEQ_GAP = "gap"  # Resync reason for gaps reported by the exchange client
+
+# Delay before retrying a failed resync snapshot, doubling up to the maximum
+RESYNC_RETRY_DELAY = 0.1
+RESYNC_MAX_RETRY_DELAY = 2.0
+# Delay before re-watching a stream after an error, doubling up to the maximum
+STREAM_RETRY_DELAY = 0.25
+STREAM_MAX_RETRY_DELAY = 5.0
+# Recovery times kept per symbol for the average
+RECOVERY_HISTORY = 50
+
+
+class SymbolSyncState:
+    """Sequence and resync bookkeeping for one symbol."""
+
+    __slots__ = ('symbol', 'last_nonce', 'from_snapshot', 'resync_task',
+                 'resync_started_at', 'resync_count', 'gap_count',
+                 'out_of_order_count', 'duplicate_count', 'stale_count',
+                 'error_count', 'last_reason', 'recovery_ms')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.last_nonce: Optional[int] = None
+        self.from_snapshot = False  # last_nonce came from a REST snapshot
+        self.resync_task: Optional[asyncio.Task] = None
+        self.resync_started_at: Optional[float] = None
+        self.resync_count = 0
+        self.gap_count = 0
+        self.out_of_order_count = 0
+        self.duplicate_count = 0
+        self.stale_count = 0
+        self.error_count = 0
+        self.last_reason: Optional[str] = None
+        self.recovery_ms: Deque[float] = deque(maxlen=RECOVERY_HISTORY)
+
+    @property
+    def resyncing(self) -> bool:
+        return self.resync_started_at is not None
+
+
+class OrderBookSyncService:
+    """Detects sequence problems and runs background REST resyncs."""
+
+    def __init__(self):
+        self._states: Dict[str, SymbolSyncState] = {}
+
+    def _state(self, symbol: str) -> SymbolSyncState:
+        state = self._states.get(symbol)
+        if state is None:
+            state = SymbolSyncState(symbol)
+            self._states[symbol] = state
+        return state
+
+    def check_update(self, symbol: str, nonce: Optional[int]) -> str:
+        """
+        Classify a streamed update by its exchange update id.
+
+        Args:
+            symbol: Trading symbol
+            nonce: Update id of this update (ccxt `nonce`); None if unknown
+
+        Returns:
+            One of SEQ_OK, SEQ_DUPLICATE, SEQ_STALE, SEQ_OUT_OF_ORDER
+        """
+        state = self._state(symbol)
+        if nonce is None:
+            return SEQ_OK  # Feed without update ids: nothing to check
+
+        last = state.last_nonce
+        if last is not None:
+            if nonce == last:
+                state.duplicate_count += 1
+                return SEQ_DUPLICATE
+            if nonce < last:
+                # Reason: After a REST resync the stream may still deliver
+                # updates the snapshot already contains; skip those quietly.
+                if state.from_snapshot:
+                    state.stale_count += 1
+                    return SEQ_STALE
+                state.out_of_order_count += 1
+                return SEQ_OUT_OF_ORDER
+
+        state.last_nonce = nonce
+        state.from_snapshot = False
+        return SEQ_OK
+
+    def mark_synced(self, symbol: str, nonce: Optional[int]) -> None:
+        """
+        Record that a REST snapshot was applied.
+
+        Args:
+            symbol: Trading symbol
+            nonce: Update id of the snapshot (None if unknown)
+        """
+        if nonce is None:
+            return
+        state = self._state(symbol)
+        state.last_nonce = nonce
+        state.from_snapshot = True
+
+    def last_nonce(self, symbol: str) -> Optional[int]:
+        """Update id of the last applied update or snapshot (None if unknown)."""
+        state = self._states.get(symbol)
+        return state.last_nonce if state is not None else None
+
+    def record_gap(self, symbol: str) -> None:
+        """Count a gap reported by the exchange client itself (InvalidNonce)."""
+        self._state(symbol).gap_count += 1
+
+    def record_error(self, symbol: str) -> None:
+        """Count a stream error."""
+        self._state(symbol).error_count += 1
+
+    def is_resyncing(self, symbol: str) -> bool:
+        """Whether a resync is in progress for a symbol."""
+        state = self._states.get(symbol)
+        return state is not None and state.resyncing
+
+    def request_resync(self, symbol: str, reason: str,
+                       fetch_snapshot: Callable[[], Awaitable[Optional[int]]]
+                       ) -> Optional[asyncio.Task]:
+        """
+        Start a background resync unless one is already running.
+
+        Args:
+            symbol: Trading symbol
+            reason: Why the resync was needed (gap, out_of_order, error, ...)
+            fetch_snapshot: Coroutine function that fetches and applies a REST
+                snapshot and returns its update id (or None if unknown)
+
+        Returns:
+            The resync task, or None if one was already in progress
+        """
+        state = self._state(symbol)
+        if state.resyncing:
+            return None
+
+        state.resync_started_at = time.perf_counter()
+        state.resync_count += 1
+        state.last_reason = reason
+        logger.warning(f"Order book resync for {symbol} ({reason})")
+
+        state.resync_task = asyncio.create_task(
+            self._run_resync(state, fetch_snapshot))
+        return state.resync_task
+
+    async def _run_resync(self, state: SymbolSyncState,
+                          fetch_snapshot: Callable[[], Awaitable[Optional[int]]]) -> None:
+        """Fetch snapshots until one applies, then record time-to-recover."""
+        delay = RESYNC_RETRY_DELAY
+        try:
+            while True:
+                try:
+                    nonce = await fetch_snapshot()
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(
+                        f"Resync snapshot for {state.symbol} failed: {e}; "
+                        f"retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RESYNC_MAX_RETRY_DELAY)
+
+            self.mark_synced(state.symbol, nonce)
+
+            recovery_ms = (time.perf_counter() - state.resync_started_at) * 1000
+            state.recovery_ms.append(recovery_ms)
+            logger.info(f"Order book for {state.symbol} resynced in {recovery_ms:.0f}ms")
+        finally:
+            state.resync_started_at = None
+            state.resync_task = None
+
+    def reset(self, symbol: str) -> None:
+        """Forget a symbol's sequence state (stream stopped); stats are kept."""
+        state = self._states.get(symbol)
+        if state is None:
+            return
+        if state.resync_task is not None:
+            state.resync_task.cancel()
+        state.last_nonce = None
+        state.from_snapshot = False
+
+    def get_stats(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get per-symbol sequence and resync statistics.
+
+        Args:
+            symbol: Limit to one symbol (all symbols when None)
+
+        Returns:
+            Dictionary keyed by symbol
+        """
+        states = ([self._states[symbol]] if symbol in self._states else []) \
+            if symbol is not None else list(self._states.values())
+
+        stats = {}
+        for state in states:
+            recovery = list(state.recovery_ms)
+            stats[state.symbol] = {
+                'last_nonce': state.last_nonce,
+                'resyncing': state.resyncing,
+                'resync_count': state.resync_count,
+                'last_reason': state.last_reason,
+                'gaps': state.gap_count,
+                'out_of_order': state.out_of_order_count,
+                'duplicates': state.duplicate_count,
+                'stale': state.stale_count,
+                'errors': state.error_count,
+                'last_recovery_ms': round(recovery[-1], 1) if recovery else None,
+                'avg_recovery_ms': round(sum(recovery) / len(recovery), 1) if recovery else None,
+                'max_recovery_ms': round(max(recovery), 1) if recovery else None,
+            }
+        return stats
+
+
+# Global order book sync service instance
+orderbook_sync_service = OrderBookSyncService()
@@ -0,0 +1,135 @@
+"""
+Captured market: a market data capture loaded for replay.
+
+Holds the messages of a capture directory (see market_capture_service) per
+stream and key, with their offsets from the first message, and serves them
+to the replay exchange in capture order. A looped capture starts over later
+in replay time with its book update ids continued, so consumers see one
+ever-advancing market.
+"""
+
+import bisect
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import ccxt
+
+from app.core.logging_config import get_logger
+from app.services.market_capture_service import (
+    STREAM_NAMES,
+    STREAM_ORDERBOOK,
+    STREAM_ORDERBOOK_SNAPSHOT,
+    STREAM_TRADES,
+    read_capture,
+)
+
+logger = get_logger("replay_capture")
+
+# (seconds since replay start, message)
+Timed = Tuple[float, Any]
+
+BOOK_STREAMS = (STREAM_ORDERBOOK, STREAM_ORDERBOOK_SNAPSHOT)
+
+
+class CapturedMarket:
+    """Messages of a capture directory, per stream and key."""
+
+    def __init__(self, directory: str):
+        """
+        Read a capture directory into memory.
+
+        Args:
+            directory: Capture directory (MARKET_CAPTURE_DIR of the capturing run)
+        """
+        self.directory = directory
+        self._messages: Dict[Tuple[int, str], List[Timed]] = {}
+        first_ns = None
+        last_ns = 0
+        for message in read_capture(directory):
+            if first_ns is None:
+                first_ns = message.received_ns
+            last_ns = message.received_ns
+            self._messages.setdefault((message.stream, message.key), []).append(
+                ((message.received_ns - first_ns) / 1e9, message.payload))
+        self.duration = (last_ns - first_ns) / 1e9 if first_ns is not None else 0.0
+        # Reason: a looped pass starts one average message interval after
+        # the capture's end, so the pause between passes looks like any
+        # other; every stream loops with the same period to stay in step
+        count = sum(len(messages) for messages in self._messages.values())
+        self.period = self.duration + self.duration / count if count else 0.0
+        # Reason: a looped pass continues the update ids (ccxt nonces) past
+        # the previous pass, or the sync service would take every new pass
+        # for out-of-order updates and resync
+        nonces: Dict[str, List[int]] = {}
+        for (stream, key), messages in self._messages.items():
+            if stream in BOOK_STREAMS:
+                nonces.setdefault(key, []).extend(
+                    payload['nonce'] for _, payload in messages
+                    if payload.get('nonce') is not None)
+        self._nonce_spans = {key: max(ids) - min(ids) + 1
+                             for key, ids in nonces.items() if ids}
+        logger.info(f"Loaded {count} captured "
+                    f"messages ({self.duration:.0f}s) from {directory}")
+
+    def keys(self, stream: int) -> List[str]:
+        """Keys (symbols) captured for a stream."""
+        return sorted(key for s, key in self._messages if s == stream)
+
+    def stream(self, stream: int, key: str, loop: bool,
+               start: float = 0.0) -> Iterator[Timed]:
+        """
+        Messages of one stream in capture order.
+
+        Args:
+            stream: Stream code
+            key: Symbol, or symbol:timeframe for candles
+            loop: Start over (later in replay time) after the last message
+            start: Replay offset to join the stream at
+        """
+        messages = self._messages.get((stream, key))
+        if not messages:
+            raise ccxt.BadSymbol(f"No captured {STREAM_NAMES[stream]} messages for {key}")
+        return self._iterate(stream, key, messages, loop, start)
+
+    def _iterate(self, stream: int, key: str, messages: List[Timed], loop: bool,
+                 start: float) -> Iterator[Timed]:
+        period = self.period
+        passes = math.floor(start / period) if loop and period > 0 else 0
+        shift = period * passes
+        index = bisect.bisect_left(messages, start - shift, key=lambda item: item[0])
+        while True:
+            for offset, payload in messages[index:]:
+                yield offset + shift, self._renumber(stream, key, payload, passes)
+            if not loop:
+                return
+            passes += 1
+            shift += period
+            index = 0
+
+    def _renumber(self, stream: int, key: str, payload: Any, passes: int) -> Any:
+        """Continue a book's update id (nonce) after `passes` looped passes."""
+        span = self._nonce_spans.get(key) if stream in BOOK_STREAMS else None
+        if not passes or not span or payload.get('nonce') is None:
+            return payload
+        return {**payload, 'nonce': payload['nonce'] + passes * span}
+
+    def symbols(self) -> List[str]:
+        """Exchange symbols with captured order book or trade messages."""
+        return sorted({key for stream, key in self._messages
+                       if stream in (STREAM_ORDERBOOK, STREAM_ORDERBOOK_SNAPSHOT, STREAM_TRADES)})
+
+    def first(self, stream: int, key: str) -> Optional[Any]:
+        """First captured message of a stream, if any."""
+        messages = self._messages.get((stream, key))
+        return messages[0][1] if messages else None
+
+    def latest(self, stream: int, key: str, offset: float) -> Optional[Any]:
+        """Last message of a stream at or before a replay offset (first if none yet)."""
+        messages = self._messages.get((stream, key))
+        if not messages:
+            return None
+        passes = 0
+        if self.period > 0:
+            passes, offset = divmod(offset, self.period)
+        index = bisect.bisect_right(messages, offset, key=lambda item: item[0])
+        return self._renumber(stream, key, messages[max(0, index - 1)][1], int(passes))
@@ -0,0 +1,422 @@
+"""
+Replay exchange: an offline stand-in for the CCXT Pro exchange.
+
+Implements the part of the ccxt.pro surface the streaming paths use
+(watch_order_book, watch_trades, watch_ohlcv and the fetch_* calls made
+before streaming) plus the Binance forceOrder WebSocket used by the
+liquidation service, fed from either
+
+- a market data capture (see market_capture_service), replayed per
+  stream in capture order (CapturedMarket, replay_capture), or
+- a parametric generator of books, trades, candles and liquidations
+  around a seeded random-walk mid price (SyntheticMarket, replay_synthetic).
+
+All streams share one replay clock, so they keep their relative timing at
+any speed: 1 is real time, N is N times faster and 0 is as fast as the
+consumers read. Content is deterministic: a capture replays exactly, and
+the generator yields the same prices and amounts for a symbol on every run
+regardless of how the streams interleave. Only the exchange timestamps of
+books, trades and liquidations are set to the wall-clock time each message
+is due, so receive-minus-exchange latency can be measured at any speed, and
+a looped capture continues its book update ids on every pass.
+
+ReplayRestExchange serves the synchronous ccxt calls (markets, recent
+trades, candle history, tickers) from the same source, so symbols resolve
+and histories load without network access.
+
+Selected with EXCHANGE_BACKEND=replay (see ExchangeService).
+"""
+
+import asyncio
+import json
+import random
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import ccxt
+
+from app.core.config import settings
+from app.services.market_capture_service import (
+    STREAM_CANDLES,
+    STREAM_LIQUIDATIONS,
+    STREAM_ORDERBOOK,
+    STREAM_ORDERBOOK_SNAPSHOT,
+    STREAM_TRADES,
+)
+from app.services.replay_capture import CapturedMarket, Timed
+from app.services.replay_synthetic import SyntheticMarket, binance_market_id, iso_datetime
+
+DEFAULT_SYMBOLS = ("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT")
+
+
+def _exchange_symbol(market_id: str) -> str:
+    """USDT-margined swap symbol of a market id ('BTCUSDT' -> 'BTC/USDT:USDT')."""
+    if "/" in market_id:
+        return market_id
+    base = market_id[:-4] if market_id.endswith("USDT") else market_id
+    return f"{base}/USDT:USDT"
+
+
+def _market(symbol: str, tick: float, decimals: int) -> Dict[str, Any]:
+    """A ccxt-shaped USDT-margined swap market."""
+    base, rest = symbol.split("/", 1)
+    quote = rest.split(":")[0]
+    return {
+        'id': binance_market_id(symbol), 'symbol': symbol, 'base': base, 'quote': quote,
+        'settle': quote, 'type': 'swap', 'spot': False, 'margin': False,
+        'swap': True, 'future': False, 'contract': True, 'linear': True,
+        'active': True, 'precision': {'price': round(tick, decimals), 'amount': 0.001},
+        'limits': {}, 'info': {},
+    }
+
+
+def _decimals(prices: Iterable[float]) -> int:
+    """Most decimals used by a set of prices (at most 8)."""
+    most = 0
+    for price in prices:
+        text = f"{price:.8f}".rstrip("0")
+        most = max(most, len(text) - text.index(".") - 1)
+    return most
+
+class ReplayClock:
+    """Maps replay offsets to wall-clock time at a given speed."""
+
+    def __init__(self, speed: float):
+        """
+        Initialize the clock; it starts with the first wait.
+
+        Args:
+            speed: Replay speed (1 = real time, N = N times faster, 0 = no waiting)
+        """
+        self.speed = speed
+        self._started_at: Optional[float] = None
+        self.start_ms = 0  # Wall time of the start, for generated timestamps
+
+    def start(self) -> None:
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+            self.start_ms = int(time.time() * 1000)
+
+    def offset(self) -> float:
+        """Replay offset reached by the clock (0 when not pacing)."""
+        if self.speed <= 0 or self._started_at is None:
+            return 0.0
+        return (time.monotonic() - self._started_at) * self.speed
+
+    def wall_ms(self, offset: float) -> int:
+        """Wall-clock time (ms) a replay offset is due (now when not pacing)."""
+        if self.speed <= 0 or self._started_at is None:
+            return int(time.time() * 1000)
+        return self.start_ms + int(offset / self.speed * 1000)
+
+    async def wait_until(self, offset: float) -> None:
+        """Sleep until a replay offset is due."""
+        self.start()
+        if self.speed <= 0:
+            await asyncio.sleep(0)  # Still let other tasks run
+            return
+        delay = self._started_at + offset / self.speed - time.monotonic()
+        await asyncio.sleep(max(0.0, delay))
+
+
+class ReplayWebSocket:
+    """Liquidation WebSocket stand-in with the websockets client calls used."""
+
+    def __init__(self, exchange: 'ReplayExchange', symbol: str):
+        self._exchange = exchange
+        self._symbol = symbol
+
+    async def __aenter__(self) -> 'ReplayWebSocket':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def recv(self) -> str:
+        return await self._exchange._next(STREAM_LIQUIDATIONS, self._symbol)
+
+    async def ping(self) -> None:
+        return None
+
+
+class ReplayExchange:
+    """CCXT Pro surface served from a capture or the synthetic generator."""
+
+    id = 'replay'
+    has = {
+        'fetchOrderBook': True, 'fetchTrades': True, 'fetchOHLCV': True,
+        'watchOrderBook': True, 'watchTrades': True, 'watchOHLCV': True,
+    }
+
+    def __init__(self, capture: Optional[CapturedMarket] = None,
+                 synthetic: Optional[SyntheticMarket] = None,
+                 speed: float = 1.0, loop: bool = True):
+        """
+        Initialize the replay exchange.
+
+        Args:
+            capture: Captured market to replay (takes precedence)
+            synthetic: Generator used without a capture (defaults apply if None)
+            speed: Replay speed (1 = real time, N = N times faster, 0 = no waiting)
+            loop: Replay a capture again from the start once it ends
+        """
+        self.capture = capture
+        self.synthetic = synthetic if synthetic is not None or capture is not None \
+            else SyntheticMarket()
+        self.loop = loop
+        self.clock = ReplayClock(speed)
+        self._streams: Dict[Tuple[int, str], Iterator[Timed]] = {}
+        self._offsets: Dict[Tuple[int, str], float] = {}
+        self.messages_served = 0
+
+    def _stream(self, stream: int, key: str) -> Iterator[Timed]:
+        iterator = self._streams.get((stream, key))
+        if iterator is None:
+            self.clock.start()
+            # Reason: like a live subscription, a stream opened later joins
+            # at the current replay position instead of replaying a backlog
+            start = self.clock.offset()
+            if self.capture is not None:
+                iterator = self.capture.stream(stream, key, self.loop, start)
+            else:
+                iterator = self.synthetic.stream(stream, key, self.clock.start_ms, start)
+            self._streams[(stream, key)] = iterator
+        return iterator
+
+    async def _next(self, stream: int, key: str) -> Any:
+        """Next message of a stream, once it is due."""
+        try:
+            offset, payload = next(self._stream(stream, key))
+        except StopIteration:
+            # Reason: a capture that ended without looping goes quiet like
+            # an idle exchange stream instead of failing the consumer
+            await asyncio.Event().wait()
+        await self.clock.wait_until(offset)
+        self._offsets[(stream, key)] = offset
+        self.messages_served += 1
+        return self._restamp(stream, payload, self.clock.wall_ms(offset))
+
+    @staticmethod
+    def _restamp(stream: int, payload: Any, timestamp: int) -> Any:
+        """Copy of a message with its exchange timestamps set to the time it is due."""
+        # Reason: payloads are the capture's own messages, which later passes
+        # and first() serve again; stamp a shallow copy, not the original
+        if stream == STREAM_ORDERBOOK:
+            payload = {**payload, 'timestamp': timestamp, 'datetime': iso_datetime(timestamp)}
+        elif stream == STREAM_TRADES:
+            payload = [{**trade, 'timestamp': timestamp, 'datetime': iso_datetime(timestamp)}
+                       for trade in payload]
+        elif stream == STREAM_LIQUIDATIONS:
+            message = json.loads(payload)
+            message['E'] = timestamp
+            if isinstance(message.get('o'), dict):
+                message['o']['T'] = timestamp
+            payload = json.dumps(message)
+        return payload
+
+    def _now(self) -> float:
+        """Replay offset reached by the fastest stream so far."""
+        return max(self._offsets.values(), default=0.0)
+
+    async def watch_order_book(self, symbol: str, limit: Optional[int] = None,
+                               params: Optional[Dict] = None) -> Dict[str, Any]:
+        return await self._next(STREAM_ORDERBOOK, symbol)
+
+    async def watch_trades(self, symbol: str, since: Optional[int] = None,
+                           limit: Optional[int] = None,
+                           params: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        return await self._next(STREAM_TRADES, symbol)
+
+    async def watch_ohlcv(self, symbol: str, timeframe: str = '1m',
+                          since: Optional[int] = None, limit: Optional[int] = None,
+                          params: Optional[Dict] = None) -> List[List[float]]:
+        return await self._next(STREAM_CANDLES, f"{symbol}:{timeframe}")
+
+    async def fetch_order_book(self, symbol: str, limit: Optional[int] = None,
+                               params: Optional[Dict] = None) -> Dict[str, Any]:
+        await asyncio.sleep(0)
+        return self.order_book(symbol, limit)
+
+    def order_book(self, symbol: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Order book snapshot at the current replay position."""
+        if self.capture is None:
+            self.clock.start()
+            book = self.synthetic.book(symbol, self._now(), self.clock.start_ms,
+                                       nonce=self._book_nonce(symbol))
+        else:
+            book = self.capture.latest(STREAM_ORDERBOOK_SNAPSHOT, symbol, self._now()) \
+                or self.capture.latest(STREAM_ORDERBOOK, symbol, self._now())
+            if book is None:
+                raise ccxt.BadSymbol(f"No captured order book for {symbol}")
+        if limit is not None:
+            book = {**book, 'bids': book['bids'][:limit], 'asks': book['asks'][:limit]}
+        return book
+
+    def _book_nonce(self, symbol: str) -> int:
+        """Update id of the last generated book of a symbol."""
+        offset = self._offsets.get((STREAM_ORDERBOOK, symbol), 0.0)
+        return int(round(offset * self.synthetic.book_rate))
+
+    async def fetch_trades(self, symbol: str, since: Optional[int] = None,
+                           limit: Optional[int] = None,
+                           params: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        await asyncio.sleep(0)
+        return self.recent_trades(symbol, limit)
+
+    def recent_trades(self, symbol: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Trades before the current replay position, oldest first."""
+        if self.capture is None:
+            self.clock.start()
+            offset = self.clock.offset()
+            trades = self.synthetic.recent_trades(symbol, offset, self.clock.wall_ms(offset),
+                                                  limit or 100)
+        else:
+            trades = self.capture.first(STREAM_TRADES, symbol)
+            if trades is None:
+                raise ccxt.BadSymbol(f"No captured trades for {symbol}")
+        return trades[-limit:] if limit else trades
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m',
+                          since: Optional[int] = None, limit: Optional[int] = None,
+                          params: Optional[Dict] = None) -> List[List[float]]:
+        await asyncio.sleep(0)
+        return self.candles(symbol, timeframe, limit)
+
+    def candles(self, symbol: str, timeframe: str = '1m',
+                limit: Optional[int] = None) -> List[List[float]]:
+        """Candle history up to the replay start, oldest first."""
+        key = f"{symbol}:{timeframe}"
+        if self.capture is None:
+            self.clock.start()
+            candles = self.synthetic.history(symbol, timeframe, self.clock.start_ms,
+                                             limit or 500)
+        else:
+            candles = self.capture.first(STREAM_CANDLES, key)
+            if candles is None:
+                raise ccxt.BadSymbol(f"No captured candles for {key}")
+        return candles[-limit:] if limit else candles
+
+    def markets(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        ccxt-shaped markets for the replayed symbols.
+
+        Args:
+            symbols: Market ids or exchange symbols (used without a capture;
+                a capture provides its own symbols)
+        """
+        markets = {}
+        if self.capture is None:
+            for symbol in map(_exchange_symbol, symbols):
+                state = self.synthetic.symbol(symbol)
+                markets[symbol] = _market(symbol, state.tick, state.decimals)
+        else:
+            for symbol in self.capture.symbols():
+                book = self.capture.first(STREAM_ORDERBOOK_SNAPSHOT, symbol) \
+                    or self.capture.first(STREAM_ORDERBOOK, symbol) or {}
+                prices = [level[0] for side in ('bids', 'asks')
+                          for level in book.get(side, [])[:50]]
+                if not prices:
+                    prices = [trade['price'] for trade in
+                              self.capture.first(STREAM_TRADES, symbol) or []]
+                decimals = _decimals(prices)
+                markets[symbol] = _market(symbol, 10 ** -decimals, decimals)
+        return markets
+
+    def connect_liquidations(self, symbol: str) -> ReplayWebSocket:
+        """
+        Stand-in for websockets.connect to a symbol's forceOrder stream.
+
+        Args:
+            symbol: Binance market id (e.g. 'BTCUSDT')
+        """
+        return ReplayWebSocket(self, symbol)
+
+    async def close(self) -> None:
+        self._streams.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Replay position and message counts."""
+        return {
+            'source': 'capture' if self.capture is not None else 'synthetic',
+            'speed': self.clock.speed,
+            'streams': len(self._streams),
+            'offset_seconds': self._now(),
+            'messages_served': self.messages_served,
+        }
+
+
+class ReplayRestExchange:
+    """Synchronous ccxt REST surface over a ReplayExchange."""
+
+    id = 'replay'
+
+    def __init__(self, replay: ReplayExchange, symbols: Iterable[str] = DEFAULT_SYMBOLS):
+        """
+        Initialize the REST stand-in.
+
+        Args:
+            replay: Streaming replay exchange sharing the source and clock
+            symbols: Market ids listed without a capture
+        """
+        self.replay = replay
+        self.options: Dict[str, Any] = {}
+        self.markets = replay.markets(symbols)
+
+    def load_markets(self, reload: bool = False) -> Dict[str, Dict[str, Any]]:
+        return self.markets
+
+    def _check(self, symbol: str) -> None:
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"replay does not have market symbol {symbol}")
+
+    def fetch_order_book(self, symbol: str, limit: Optional[int] = None,
+                         params: Optional[Dict] = None) -> Dict[str, Any]:
+        self._check(symbol)
+        return self.replay.order_book(symbol, limit)
+
+    def fetch_trades(self, symbol: str, since: Optional[int] = None,
+                     limit: Optional[int] = None,
+                     params: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        self._check(symbol)
+        return self.replay.recent_trades(symbol, limit)
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m',
+                    since: Optional[int] = None, limit: Optional[int] = None,
+                    params: Optional[Dict] = None) -> List[List[float]]:
+        self._check(symbol)
+        return self.replay.candles(symbol, timeframe, limit)
+
+    def fetch_tickers(self, symbols: Optional[List[str]] = None,
+                      params: Optional[Dict] = None) -> Dict[str, Dict[str, Any]]:
+        tickers = {}
+        for symbol in symbols or self.markets:
+            book = self.replay.order_book(symbol, 1)
+            last = (book['bids'][0][0] + book['asks'][0][0]) / 2 \
+                if book['bids'] and book['asks'] else None
+            quote_volume = random.Random(zlib.crc32(symbol.encode("utf-8"))).uniform(1e6, 1e9)
+            tickers[symbol] = {'symbol': symbol, 'last': last,
+                               'quoteVolume': quote_volume,
+                               'info': {'quoteVolume': f"{quote_volume:.2f}"}}
+        return tickers
+
+    def fetch_status(self, params: Optional[Dict] = None) -> Dict[str, Any]:
+        return {'status': 'ok', 'updated': int(time.time() * 1000)}
+
+
+def create_replay_exchange() -> ReplayExchange:
+    """Build the replay exchange configured by the EXCHANGE_REPLAY_* settings."""
+    capture = (CapturedMarket(settings.EXCHANGE_REPLAY_CAPTURE_DIR)
+               if settings.EXCHANGE_REPLAY_CAPTURE_DIR else None)
+    synthetic = None if capture is not None else SyntheticMarket(
+        settings.EXCHANGE_SYNTHETIC_LEVELS, settings.EXCHANGE_SYNTHETIC_BOOK_RATE,
+        settings.EXCHANGE_SYNTHETIC_TRADE_RATE)
+    return ReplayExchange(capture, synthetic, settings.EXCHANGE_REPLAY_SPEED,
+                          settings.EXCHANGE_REPLAY_LOOP)
+
+
+def create_replay_rest_exchange(replay: ReplayExchange) -> ReplayRestExchange:
+    """Build the REST stand-in for the EXCHANGE_REPLAY_SYMBOLS markets."""
+    symbols = [symbol.strip() for symbol in settings.EXCHANGE_REPLAY_SYMBOLS.split(",")
+               if symbol.strip()]
+    return ReplayRestExchange(replay, symbols or DEFAULT_SYMBOLS)
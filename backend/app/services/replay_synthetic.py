@@ -0,0 +1,267 @@
+"""
+Synthetic market: a parametric generator of exchange messages for replay.
+
+Generates ccxt-shaped books, trades and candles and Binance forceOrder
+frames around a seeded random-walk mid price per symbol. Content is
+deterministic: a symbol gets the same prices and amounts on every run
+regardless of how its streams interleave.
+"""
+
+import json
+import math
+import random
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.services.market_capture_service import (
+    STREAM_CANDLES,
+    STREAM_LIQUIDATIONS,
+    STREAM_ORDERBOOK,
+    STREAM_TRADES,
+)
+from app.services.replay_capture import Timed
+
+TIMEFRAME_SECONDS = {'1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+                     '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600,
+                     '8h': 28800, '12h': 43200, '1d': 86400, '1w': 604800}
+
+# Generator cadence besides the configurable book and trade rates
+CANDLE_RATE = 2.0  # Candle updates per second
+LIQUIDATION_RATE = 0.5  # forceOrder events per second
+PATH_STEP = 0.1  # Seconds between points of the mid price path
+PATH_VOLATILITY = 0.0003  # Log-return standard deviation per path step
+HISTORY_VOLATILITY = 0.02  # Cap on the per-candle log-return deviation of history
+TRADE_ID_BASE = 10 ** 9  # Generated trade ids: history below, stream above
+
+
+def iso_datetime(timestamp_ms: int) -> str:
+    """ccxt datetime string of a millisecond timestamp."""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%S.") + f"{timestamp_ms % 1000:03d}Z"
+
+
+def binance_market_id(symbol: str) -> str:
+    """Binance market id of a symbol ('BTC/USDT:USDT' -> 'BTCUSDT')."""
+    return symbol.split(":")[0].replace("/", "").upper()
+
+
+class SyntheticSymbol:
+    """Seeded mid price path and book shape for one symbol."""
+
+    def __init__(self, market_id: str, levels: int):
+        self.market_id = market_id
+        self.levels = levels
+        seed = zlib.crc32(market_id.encode("utf-8"))
+        rng = random.Random(seed)
+        start = 10 ** rng.uniform(-1, 4.7)
+        self.decimals = max(0, 4 - math.floor(math.log10(start)))
+        self.tick = 10 ** -self.decimals
+        self._path_rng = random.Random(seed + 1)
+        self._path = [start]
+        self.seed = seed
+
+    def mid_at(self, offset: float) -> float:
+        """Mid price at a replay offset (the path is extended on demand)."""
+        index = int(offset / PATH_STEP)
+        path = self._path
+        while len(path) <= index:
+            path.append(path[-1] * math.exp(self._path_rng.gauss(0, PATH_VOLATILITY)))
+        return path[index]
+
+    def price(self, index: int) -> float:
+        return round(index * self.tick, self.decimals)
+
+
+class SyntheticMarket:
+    """Parametric generator of exchange messages around SyntheticSymbol paths."""
+
+    def __init__(self, levels: int = 500, book_rate: float = 10.0,
+                 trade_rate: float = 20.0):
+        """
+        Initialize the generator.
+
+        Args:
+            levels: Book levels per side
+            book_rate: Order book updates per second per symbol
+            trade_rate: Trade batches per second per symbol
+        """
+        self.levels = levels
+        self.book_rate = book_rate
+        self.trade_rate = trade_rate
+        self._symbols: Dict[str, SyntheticSymbol] = {}
+
+    def symbol(self, key: str) -> SyntheticSymbol:
+        market_id = binance_market_id(key)
+        state = self._symbols.get(market_id)
+        if state is None:
+            state = self._symbols[market_id] = SyntheticSymbol(market_id, self.levels)
+        return state
+
+    def stream(self, stream: int, key: str, start_ms: int,
+               start: float = 0.0) -> Iterator[Timed]:
+        """
+        Endless generated messages of one stream.
+
+        Args:
+            stream: Stream code
+            key: Symbol, or symbol:timeframe for candles
+            start_ms: Wall time of the replay start, for message timestamps
+            start: Replay offset to join the stream at
+        """
+        if stream == STREAM_ORDERBOOK:
+            return self._books(key, start_ms, self._first(start, self.book_rate))
+        if stream == STREAM_TRADES:
+            return self._trades(key, start_ms, self._first(start, self.trade_rate))
+        if stream == STREAM_CANDLES:
+            symbol, timeframe = key.rsplit(":", 1)
+            return self._candles(symbol, timeframe, start_ms, self._first(start, CANDLE_RATE))
+        if stream == STREAM_LIQUIDATIONS:
+            return self._liquidations(key, start_ms, self._first(start, LIQUIDATION_RATE))
+        raise ValueError(f"Unknown stream {stream}")
+
+    @staticmethod
+    def _first(start: float, rate: float) -> int:
+        """Index of the first message due at or after a replay offset."""
+        return max(1, math.ceil(start * rate))
+
+    def book(self, symbol: str, offset: float, start_ms: int,
+             rng: Optional[random.Random] = None,
+             amounts: Optional[Dict[int, float]] = None, nonce: int = 0) -> Dict[str, Any]:
+        """A ccxt-shaped order book at a replay offset."""
+        state = self.symbol(symbol)
+        rng = rng or random.Random(state.seed + 2)
+        amounts = {} if amounts is None else amounts
+        mid_index = round(state.mid_at(offset) / state.tick)
+
+        def amount(index: int) -> float:
+            value = amounts.get(index)
+            if value is None:
+                value = amounts[index] = round(rng.lognormvariate(0, 1), 3) or 0.001
+            return value
+
+        timestamp = start_ms + int(offset * 1000)
+        return {
+            'symbol': symbol,
+            'bids': [[state.price(i), amount(i)]
+                     for i in range(mid_index - 1, mid_index - 1 - self.levels, -1)],
+            'asks': [[state.price(i), amount(i)]
+                     for i in range(mid_index + 1, mid_index + 1 + self.levels)],
+            'timestamp': timestamp,
+            'datetime': iso_datetime(timestamp),
+            'nonce': nonce,
+        }
+
+    def history(self, symbol: str, timeframe: str, end_ms: int,
+                limit: int) -> List[List[float]]:
+        """
+        Closed candles leading up to the replay start, oldest first.
+
+        The path is walked backwards from the starting mid price, so history
+        joins the live candles without a jump.
+        """
+        state = self.symbol(symbol)
+        rng = random.Random(state.seed + 6)
+        period_ms = TIMEFRAME_SECONDS.get(timeframe, 60) * 1000
+        sigma = min(HISTORY_VOLATILITY,
+                    PATH_VOLATILITY * math.sqrt(period_ms / 1000 / PATH_STEP))
+        close = state.mid_at(0.0)
+        open_time = end_ms - end_ms % period_ms
+        candles = []
+        for _ in range(limit):
+            open_time -= period_ms
+            open_ = close * math.exp(rng.gauss(0, sigma))
+            high = max(open_, close) * (1 + abs(rng.gauss(0, sigma / 2)))
+            low = min(open_, close) * (1 - abs(rng.gauss(0, sigma / 2)))
+            candles.append([open_time] + [round(price, state.decimals)
+                                          for price in (open_, high, low, close)]
+                           + [round(rng.expovariate(1.0) * 100, 3)])
+            close = open_
+        candles.reverse()
+        return candles
+
+    def _books(self, symbol: str, start_ms: int, first: int) -> Iterator[Timed]:
+        state = self.symbol(symbol)
+        rng = random.Random(state.seed + 2)
+        amounts: Dict[int, float] = {}
+        for n in range(first, 1 << 62):
+            offset = n / self.book_rate
+            book = self.book(symbol, offset, start_ms, rng, amounts, nonce=n)
+            yield offset, book
+            # Churn a few levels near the top for the next update
+            mid_index = round(state.mid_at(offset) / state.tick)
+            for _ in range(max(1, self.levels // 20)):
+                index = mid_index + rng.randint(-self.levels // 4, self.levels // 4)
+                amounts[index] = round(rng.lognormvariate(0, 1), 3) or 0.001
+            if len(amounts) > 4 * self.levels:
+                for index in [i for i in amounts if abs(i - mid_index) > 2 * self.levels]:
+                    del amounts[index]
+
+    def recent_trades(self, symbol: str, offset: float, end_ms: int,
+                      count: int) -> List[Dict[str, Any]]:
+        """Trades in the second before a replay offset, oldest first."""
+        state = self.symbol(symbol)
+        rng = random.Random(state.seed + 7)
+        mid_index = round(state.mid_at(offset) / state.tick)
+        return [self._trade(symbol, state, rng, mid_index, TRADE_ID_BASE - count + i,
+                            end_ms - (count - i) * 1000 // count)
+                for i in range(count)]
+
+    @staticmethod
+    def _trade(symbol: str, state: SyntheticSymbol, rng: random.Random,
+               mid_index: int, trade_id: int, timestamp: int) -> Dict[str, Any]:
+        side = 'buy' if rng.random() < 0.5 else 'sell'
+        price = state.price(mid_index + 1 if side == 'buy' else mid_index - 1)
+        amount = round(rng.expovariate(2.0), 3) or 0.001
+        return {
+            'info': {}, 'id': str(trade_id), 'timestamp': timestamp,
+            'datetime': iso_datetime(timestamp), 'symbol': symbol, 'order': None,
+            'type': None, 'side': side, 'takerOrMaker': 'taker',
+            'price': price, 'amount': amount, 'cost': price * amount,
+            'fee': None, 'fees': [],
+        }
+
+    def _trades(self, symbol: str, start_ms: int, first: int) -> Iterator[Timed]:
+        state = self.symbol(symbol)
+        rng = random.Random(state.seed + 3)
+        for n in range(first, 1 << 62):
+            offset = n / self.trade_rate
+            mid_index = round(state.mid_at(offset) / state.tick)
+            timestamp = start_ms + int(offset * 1000)
+            # At most three trades per batch, numbered by batch
+            yield offset, [self._trade(symbol, state, rng, mid_index,
+                                       TRADE_ID_BASE + n * 3 + i, timestamp)
+                           for i in range(rng.randint(1, 3))]
+
+    def _candles(self, symbol: str, timeframe: str, start_ms: int, first: int) -> Iterator[Timed]:
+        state = self.symbol(symbol)
+        rng = random.Random(state.seed + 4)
+        period_ms = TIMEFRAME_SECONDS.get(timeframe, 60) * 1000
+        candle: Optional[List[float]] = None
+        for n in range(first, 1 << 62):
+            offset = n / CANDLE_RATE
+            now_ms = start_ms + int(offset * 1000)
+            price = round(state.mid_at(offset), state.decimals)
+            open_time = now_ms - now_ms % period_ms
+            if candle is None or candle[0] != open_time:
+                candle = [open_time, price, price, price, price, 0.0]
+            candle[2] = max(candle[2], price)
+            candle[3] = min(candle[3], price)
+            candle[4] = price
+            candle[5] = round(candle[5] + rng.expovariate(1.0), 3)
+            yield offset, [list(candle)]
+
+    def _liquidations(self, symbol: str, start_ms: int, first: int) -> Iterator[Timed]:
+        state = self.symbol(symbol)
+        rng = random.Random(state.seed + 5)
+        for n in range(first, 1 << 62):
+            offset = n / LIQUIDATION_RATE
+            timestamp = start_ms + int(offset * 1000)
+            price = str(round(state.mid_at(offset), state.decimals))
+            amount = str(round(rng.expovariate(1.0), 3) or 0.001)
+            yield offset, json.dumps({
+                'e': 'forceOrder', 'E': timestamp,
+                'o': {'s': state.market_id, 'S': 'SELL' if rng.random() < 0.5 else 'BUY',
+                      'o': 'LIMIT', 'f': 'IOC', 'q': amount, 'p': price, 'ap': price,
+                      'X': 'FILLED', 'l': amount, 'z': amount, 'T': timestamp},
+            })
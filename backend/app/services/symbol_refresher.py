@@ -0,0 +1,248 @@
+"""
+Background refresher for symbol markets and tickers.
+
+Keeps SymbolService serving the last good snapshot while new markets and
+tickers are fetched off the event loop (stale-while-revalidate). New
+snapshots are swapped in atomically, and transient failures are retried
+with jittered exponential backoff.
+
+When a snapshot store is configured, the last compiled markets are read
+from disk on start, so symbols resolve before the exchange answers.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.services.symbol_service import SymbolService, symbol_service
+from app.services.symbol_snapshot_store import SymbolSnapshotStore
+
+logger = get_logger("symbol_refresher")
+
+
+class SymbolRefresher:
+    """Periodically revalidates SymbolService markets and tickers."""
+
+    def __init__(
+        self,
+        service: SymbolService,
+        markets_interval: float = 3600,
+        tickers_interval: float = 60,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 60.0,
+        max_retries: int = 5,
+        snapshot_store: Optional[SymbolSnapshotStore] = None,
+    ):
+        """
+        Initialize the refresher.
+
+        Args:
+            service: SymbolService to keep fresh
+            markets_interval: Seconds between markets reloads
+            tickers_interval: Seconds between ticker refreshes
+            retry_base_delay: First retry delay in seconds
+            retry_max_delay: Upper bound for retry delays in seconds
+            max_retries: Retries per refresh before waiting for the next interval
+            snapshot_store: Disk snapshot for warm starts (optional)
+        """
+        self._service = service
+        self._markets_interval = markets_interval
+        self._tickers_interval = tickers_interval
+        self._retry_base_delay = retry_base_delay
+        self._retry_max_delay = retry_max_delay
+        self._max_retries = max_retries
+        self._snapshot_store = snapshot_store
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+
+        self._stats: Dict[str, Any] = {
+            "markets_refreshes": 0,
+            "tickers_refreshes": 0,
+            "failures": 0,
+            "last_markets_refresh": None,
+            "last_tickers_refresh": None,
+            "last_error": None,
+            "first_ready_seconds": None,
+            "first_ready_source": None,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the background refresh task."""
+        if self.is_running:
+            return
+
+        self._started_at = time.monotonic()
+        await self.load_from_disk()
+
+        self._service._background_refresh_active = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Symbol refresher started (markets every {self._markets_interval}s, "
+            f"tickers every {self._tickers_interval}s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        self._service._background_refresh_active = False
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Symbol refresher stopped")
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Get the jittered retry delay for an attempt.
+
+        Reason: "equal jitter" keeps at least half of the exponential delay
+        while spreading retries so they do not hit the exchange in lockstep.
+
+        Args:
+            attempt: Retry attempt number, starting at 1
+
+        Returns:
+            Delay in seconds
+        """
+        cap = min(self._retry_max_delay, self._retry_base_delay * (2 ** (attempt - 1)))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    async def load_from_disk(self) -> bool:
+        """
+        Apply the disk snapshot if no markets are loaded yet.
+
+        Returns:
+            True if a snapshot was applied
+        """
+        if self._snapshot_store is None or self._service._markets_cache is not None:
+            return False
+
+        snapshot = await asyncio.to_thread(self._snapshot_store.load)
+        if snapshot is None:
+            return False
+
+        self._service.apply_markets_snapshot(snapshot)
+        self._service.get_all_symbols()  # Prebuild the /symbols list
+        self._mark_ready("disk")
+        return True
+
+    async def refresh_markets(self) -> None:
+        """Load markets in a worker thread, swap them in and persist them."""
+        snapshot = await asyncio.to_thread(self._service.load_markets_snapshot)
+        self._service.apply_markets_snapshot(snapshot)
+        self._service.get_all_symbols()  # Prebuild the /symbols list
+        self._mark_ready("exchange")
+
+        self._stats["markets_refreshes"] += 1
+        self._stats["last_markets_refresh"] = time.time()
+
+        if self._snapshot_store is not None:
+            try:
+                await asyncio.to_thread(self._snapshot_store.save, snapshot)
+            except OSError as e:
+                # The in-memory snapshot is already live; only warm starts suffer
+                logger.warning(f"Failed to save symbol snapshot: {str(e)}")
+
+    def _mark_ready(self, source: str) -> None:
+        """Record and log the time until symbols were first resolvable."""
+        if self._stats["first_ready_seconds"] is not None or self._started_at is None:
+            return
+
+        elapsed = time.monotonic() - self._started_at
+        self._stats["first_ready_seconds"] = elapsed
+        self._stats["first_ready_source"] = source
+        logger.info(f"Symbols ready {elapsed * 1000:.1f}ms after startup (source: {source})")
+
+    async def refresh_tickers(self) -> None:
+        """Fetch tickers in a worker thread and swap them in."""
+        tickers = await asyncio.to_thread(self._service.load_tickers)
+        self._service.apply_tickers(tickers)
+        self._service.get_all_symbols()  # Prebuild the /symbols list
+
+        self._stats["tickers_refreshes"] += 1
+        self._stats["last_tickers_refresh"] = time.time()
+
+    async def _refresh_with_retry(self, name: str,
+                                  refresh: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Run a refresh, retrying transient failures with jittered backoff.
+
+        Args:
+            name: Refresh name for logging
+            refresh: Coroutine function performing the refresh
+
+        Returns:
+            True if the refresh succeeded, False if retries were exhausted
+        """
+        for attempt in range(self._max_retries + 1):
+            try:
+                await refresh()
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failures"] += 1
+                self._stats["last_error"] = f"{name}: {str(e)}"
+                if attempt >= self._max_retries:
+                    logger.error(
+                        f"Symbol {name} refresh failed after {attempt + 1} attempts, "
+                        f"serving last good snapshot: {str(e)}"
+                    )
+                    return False
+
+                delay = self.backoff_delay(attempt + 1)
+                logger.warning(
+                    f"Symbol {name} refresh failed ({str(e)}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+        return False
+
+    async def _run(self) -> None:
+        """Refresh loop: markets and tickers on independent schedules."""
+        next_markets = 0.0
+        next_tickers = 0.0
+
+        while True:
+            now = time.monotonic()
+            if now >= next_markets:
+                await self._refresh_with_retry("markets", self.refresh_markets)
+                next_markets = time.monotonic() + self._markets_interval
+            if now >= next_tickers:
+                # Polled tickers are only a seed/fallback while the live stream is down
+                if not self._service.has_fresh_live_tickers():
+                    await self._refresh_with_retry("tickers", self.refresh_tickers)
+                next_tickers = time.monotonic() + self._tickers_interval
+
+            await asyncio.sleep(max(0.0, min(next_markets, next_tickers) - time.monotonic()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get refresher statistics.
+
+        Returns:
+            Dictionary with refresh counts, timestamps and last error
+        """
+        return {"running": self.is_running, **self._stats}
+
+
+# Global symbol refresher instance
+symbol_refresher = SymbolRefresher(
+    symbol_service,
+    markets_interval=settings.SYMBOL_MARKETS_REFRESH_INTERVAL,
+    tickers_interval=settings.SYMBOL_TICKERS_REFRESH_INTERVAL,
+    retry_max_delay=settings.SYMBOL_REFRESH_MAX_RETRY_DELAY,
+    snapshot_store=(SymbolSnapshotStore(settings.SYMBOL_SNAPSHOT_PATH)
+                    if settings.SYMBOL_SNAPSHOT_PATH else None),
+)
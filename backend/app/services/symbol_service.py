@@ -7,9 +7,20 @@ validating symbols, and providing suggestions for invalid symbols.
 
 import re
 import time
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Callable, Iterable, Tuple, TYPE_CHECKING
 from app.services.exchange_service import exchange_service
+from app.models.symbol_metadata import (
+    MarketsSnapshot,
+    SymbolMetadata,
+    parse_precision,
+    parse_tick_size,
+)
+from app.utils.decimal_utils import DecimalUtils
 from app.core.logging_config import get_logger
+from app.services.memory_accounting_service import memory_accounting_service
+
+if TYPE_CHECKING:
+    from app.services.ticker_stream_service import LiveTickerTable
 
 logger = get_logger("symbol_service")
 
@@ -22,6 +33,24 @@ class SymbolService:
         self._exchange_to_id_cache: Dict[str, str] = {}
         self._markets_cache: Optional[Dict[str, Any]] = None
         self._cache_initialized = False
+
+        # Compiled per-symbol metadata, indexed by both ID and exchange symbol
+        self._metadata_by_id: Dict[str, SymbolMetadata] = {}
+        self._metadata_by_symbol: Dict[str, SymbolMetadata] = {}
+
+        # Prebuilt /symbols response, replaced whenever markets or tickers change
+        self._symbols_list: Optional[List[Dict[str, Any]]] = None
+        self._symbols_list_time: Optional[float] = None
+        # Set while the background refresher owns markets/ticker freshness
+        self._background_refresh_active = False
+
+        # Live last price / quote volume table fed by the all-market ticker stream
+        self._live_tickers: Optional["LiveTickerTable"] = None
+        self._live_tickers_updated_at: Optional[float] = None
+        self._rows_by_id: Dict[str, Dict[str, Any]] = {}
+        self._symbols_list_dirty = False
+        # Called with each polled tickers snapshot as it is swapped in
+        self._tickers_listeners: List[Callable[[Dict[str, Any]], None]] = []
         
         # Ticker cache for volume24h calculation
         self._ticker_cache: Optional[Dict[str, Any]] = None
@@ -71,18 +100,7 @@ class SymbolService:
         try:
             exchange = exchange_service.get_exchange()
             markets = exchange.load_markets()
-            self._markets_cache = markets
-
-            # Build bidirectional caches
-            for market_symbol, market_info in markets.items():
-                market_id = market_info.get("id")
-                if market_id:
-                    # Cache: ID -> Exchange Symbol (e.g., BTCUSDT -> BTC/USDT)
-                    self._symbol_cache[market_id] = market_symbol
-                    # Cache: Exchange Symbol -> ID (e.g., BTC/USDT -> BTCUSDT)
-                    self._exchange_to_id_cache[market_symbol] = market_id
-
-            self._cache_initialized = True
+            self.apply_markets_snapshot(self.build_markets_snapshot(markets))
             logger.info(
                 f"Symbol cache initialized with {len(self._symbol_cache)} symbols from exchange"
             )
@@ -103,6 +121,204 @@ class SymbolService:
                 f"Symbol cache initialized with {len(self._symbol_cache)} fallback symbols for demo mode"
             )
 
+    def build_markets_snapshot(self, markets: Dict[str, Any]) -> MarketsSnapshot:
+        """
+        Build all symbol indexes for a load_markets() result.
+
+        Does not modify service state, so it is safe to run in a worker thread.
+
+        Args:
+            markets: ccxt markets dictionary keyed by exchange symbol
+
+        Returns:
+            MarketsSnapshot ready to be applied
+        """
+        symbol_cache: Dict[str, str] = {}
+        exchange_to_id: Dict[str, str] = {}
+        by_id: Dict[str, SymbolMetadata] = {}
+        by_symbol: Dict[str, SymbolMetadata] = {}
+
+        for market_symbol, market_info in markets.items():
+            market_id = market_info.get("id")
+            if not market_id:
+                continue
+            # Cache: ID -> Exchange Symbol (e.g., BTCUSDT -> BTC/USDT)
+            symbol_cache[market_id] = market_symbol
+            # Cache: Exchange Symbol -> ID (e.g., BTC/USDT -> BTCUSDT)
+            exchange_to_id[market_symbol] = market_id
+
+            metadata = self._compile_market(market_symbol, market_info)
+            if metadata is not None:
+                by_symbol[market_symbol] = metadata
+                by_id[metadata.id] = metadata
+
+        return MarketsSnapshot(markets, symbol_cache, exchange_to_id, by_id, by_symbol)
+
+    def load_markets_snapshot(self) -> MarketsSnapshot:
+        """
+        Reload markets from the exchange and build a snapshot (blocking).
+
+        Does not modify service state, so it is safe to run in a worker thread.
+
+        Returns:
+            MarketsSnapshot ready to be applied
+
+        Raises:
+            Exception: If markets cannot be loaded
+        """
+        exchange = exchange_service.get_exchange()
+        markets = exchange.load_markets(True)
+        if not markets:
+            raise ValueError("Exchange returned no markets")
+        return self.build_markets_snapshot(markets)
+
+    def apply_markets_snapshot(self, snapshot: MarketsSnapshot) -> None:
+        """
+        Swap in a new markets snapshot.
+
+        Reason: every index is replaced by plain attribute assignment with no
+        await in between, so coroutines on the event loop see either the old
+        or the new snapshot, never a mix.
+
+        Args:
+            snapshot: Snapshot built by build_markets_snapshot
+        """
+        self._markets_cache = snapshot.markets
+        self._symbol_cache = snapshot.symbol_cache
+        self._exchange_to_id_cache = snapshot.exchange_to_id
+        self._metadata_by_id = snapshot.metadata_by_id
+        self._metadata_by_symbol = snapshot.metadata_by_symbol
+        self._symbols_list = None
+        self._cache_initialized = True
+        logger.info(f"Compiled metadata for {len(snapshot.metadata_by_symbol)} symbols")
+
+    def _compile_all_metadata(self) -> None:
+        """Compile metadata records for every market in the markets cache."""
+        snapshot = self.build_markets_snapshot(self._markets_cache or {})
+        self._metadata_by_id = snapshot.metadata_by_id
+        self._metadata_by_symbol = snapshot.metadata_by_symbol
+
+    def _compile_market(self, exchange_symbol: str,
+                        market_info: Dict[str, Any]) -> Optional[SymbolMetadata]:
+        """
+        Compile a ccxt market definition into an immutable metadata record.
+
+        Args:
+            exchange_symbol: Exchange symbol the market is keyed by
+            market_info: ccxt market dictionary
+
+        Returns:
+            SymbolMetadata, or None if the market has no ID
+        """
+        market_id = market_info.get("id")
+        if not market_id:
+            return None
+
+        precision = market_info.get("precision") or {}
+        price_value = precision.get("price") if isinstance(precision, dict) else None
+        amount_value = precision.get("amount") if isinstance(precision, dict) else None
+
+        try:
+            price_precision = parse_precision(price_value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not extract pricePrecision for {exchange_symbol}: {e}")
+            price_precision = None
+        try:
+            amount_precision = parse_precision(amount_value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not extract amountPrecision for {exchange_symbol}: {e}")
+            amount_precision = None
+
+        if price_precision is None:
+            ladder: Tuple[float, ...] = ()
+        else:
+            ladder = tuple(DecimalUtils.generate_power_of_10_options(
+                base_precision=price_precision,
+                max_options=7
+            ))
+        rounding_options = self._limit_rounding_ladder(ladder, None)
+
+        price_decimals = max(0, min(price_precision, 8)) if price_precision is not None else 2
+        amount_decimals = (min(amount_precision, 8) if amount_precision is not None
+                           else min(price_precision, 6) if price_precision is not None else 2)
+
+        return SymbolMetadata(
+            id=market_id,
+            symbol=exchange_symbol,
+            base_asset=market_info.get("base"),
+            quote_asset=market_info.get("quote"),
+            active=market_info.get("active", True),
+            type=market_info.get("type"),
+            spot=market_info.get("spot", False),
+            future=market_info.get("future", False),
+            price_precision=price_precision,
+            amount_precision=amount_precision,
+            tick_size=parse_tick_size(price_value, price_precision),
+            amount_step=parse_tick_size(amount_value, amount_precision),
+            rounding_ladder=ladder,
+            rounding_options=rounding_options,
+            default_rounding=self._select_default_rounding(rounding_options),
+            price_format=tuple(self.generate_price_format(price_precision).items()),
+            price_format_spec=f".{price_decimals}f",
+            amount_format_spec=f".{max(2, amount_decimals)}f",
+        )
+
+    @staticmethod
+    def _limit_rounding_ladder(ladder: Tuple[float, ...],
+                               current_price: Optional[float]) -> Tuple[float, ...]:
+        """Apply the current-price limit (1/10th of price) to a rounding ladder."""
+        max_rounding = current_price / 10 if current_price else 1000
+        limited = []
+        for option in ladder:
+            if option > max_rounding:
+                break
+            limited.append(option)
+        return tuple(limited)
+
+    @staticmethod
+    def _select_default_rounding(options) -> float:
+        """Default rounding: third option if available, or second, or first."""
+        if len(options) >= 3:
+            return options[2]
+        if len(options) >= 2:
+            return options[1]
+        return options[0] if options else 0.01
+
+    def get_symbol_metadata(self, symbol: str) -> Optional[SymbolMetadata]:
+        """
+        Get compiled metadata for a symbol in O(1).
+
+        Args:
+            symbol: Symbol ID (e.g., 'BTCUSDT') or exchange symbol (e.g., 'BTC/USDT')
+
+        Returns:
+            SymbolMetadata or None if the symbol is unknown
+        """
+        metadata = self._metadata_by_symbol.get(symbol) or self._metadata_by_id.get(symbol)
+        if metadata is not None:
+            return metadata
+
+        self._initialize_cache()
+
+        # Compile on miss for markets loaded outside _initialize_cache
+        exchange_symbol = self.resolve_symbol_to_exchange_format(symbol)
+        if not exchange_symbol or not self._markets_cache:
+            return None
+        market_info = self._markets_cache.get(exchange_symbol)
+        if not market_info:
+            return None
+
+        return self._store_metadata(exchange_symbol, market_info)
+
+    def _store_metadata(self, exchange_symbol: str,
+                        market_info: Dict[str, Any]) -> Optional[SymbolMetadata]:
+        """Compile a single market and add it to both metadata indexes."""
+        metadata = self._compile_market(exchange_symbol, market_info)
+        if metadata is not None:
+            self._metadata_by_symbol[exchange_symbol] = metadata
+            self._metadata_by_id[metadata.id] = metadata
+        return metadata
+
     def _fetch_tickers(self) -> Dict[str, Any]:
         """
         Fetch ticker data with caching.
@@ -111,6 +327,10 @@ class SymbolService:
             Dict[str, Any]: Ticker data from exchange
         """
         current_time = time.time()
+
+        # The background refresher keeps tickers fresh; never block a request on them
+        if self._background_refresh_active:
+            return self._ticker_cache or {}
         
         # Check if we have valid cached data
         if (self._ticker_cache is not None and 
@@ -119,20 +339,59 @@ class SymbolService:
             return self._ticker_cache
         
         try:
-            exchange = exchange_service.get_exchange()
-            tickers = exchange.fetch_tickers()
-            
-            # Cache the result
-            self._ticker_cache = tickers
-            self._ticker_cache_time = current_time
-            
-            logger.info(f"Fetched and cached {len(tickers)} tickers")
+            tickers = self.load_tickers()
+            self.apply_tickers(tickers, current_time)
             return tickers
             
         except Exception as e:
             logger.error(f"Failed to fetch tickers: {str(e)}")
-            # Return empty dict on error
-            return {}
+            # Keep serving the last good tickers, or an empty dict if there are none
+            return self._ticker_cache or {}
+
+    def load_tickers(self) -> Dict[str, Any]:
+        """
+        Fetch all tickers from the exchange (blocking).
+
+        Does not modify service state, so it is safe to run in a worker thread.
+
+        Returns:
+            Dict[str, Any]: Ticker data from exchange
+
+        Raises:
+            Exception: If tickers cannot be fetched
+        """
+        exchange = exchange_service.get_exchange()
+        return exchange.fetch_tickers()
+
+    def apply_tickers(self, tickers: Dict[str, Any],
+                      fetched_at: Optional[float] = None) -> None:
+        """
+        Swap in a new tickers snapshot and invalidate the prebuilt symbol list.
+
+        Args:
+            tickers: Ticker data from exchange
+            fetched_at: Fetch timestamp (default: now)
+        """
+        self._ticker_cache = tickers
+        self._ticker_cache_time = fetched_at if fetched_at is not None else time.time()
+        for listener in list(self._tickers_listeners):
+            listener(tickers)
+        self._symbols_list = None
+        logger.info(f"Fetched and cached {len(tickers)} tickers")
+
+    def add_tickers_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a callback receiving every polled tickers snapshot.
+
+        Args:
+            listener: Called with the tickers before the symbol list is rebuilt
+        """
+        self._tickers_listeners.append(listener)
+
+    def remove_tickers_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Unregister a tickers listener (no-op if not registered)."""
+        if listener in self._tickers_listeners:
+            self._tickers_listeners.remove(listener)
 
     def get_all_symbols(self) -> List[Dict[str, Any]]:
         """
@@ -141,6 +400,10 @@ class SymbolService:
         This method centralizes all symbol filtering and processing logic,
         moving it from the HTTP endpoint to the Symbol Service for proper
         architecture where Symbol Service is the single source of truth.
+
+        The sorted list is prebuilt and served from memory. It is rebuilt
+        when markets or tickers are swapped, or, without the background
+        refresher, once the ticker cache TTL expires.
         
         Returns:
             List[Dict[str, Any]]: List of symbol information dictionaries
@@ -148,7 +411,118 @@ class SymbolService:
         Raises:
             Exception: If unable to fetch symbols from exchange
         """
-        logger.info("Getting all symbols from Symbol Service")
+        symbols = self._symbols_list
+        if symbols is not None and (
+            self._background_refresh_active
+            or time.time() - self._symbols_list_time < self._ticker_cache_ttl
+        ):
+            if self._symbols_list_dirty:
+                symbols = self._reorder_symbols_list()
+            return list(symbols)
+
+        symbols = self.build_symbols_list()
+        self._symbols_list = symbols
+        self._symbols_list_time = time.time()
+        self._rows_by_id = {row["id"]: row for row in symbols}
+        self._symbols_list_dirty = False
+        return list(symbols)
+
+    def attach_live_tickers(self, table: Optional["LiveTickerTable"]) -> None:
+        """
+        Use a live ticker table for volume and price instead of polled tickers.
+
+        Args:
+            table: Live ticker table, or None to detach
+        """
+        self._live_tickers = table
+        self._live_tickers_updated_at = None
+        self._symbols_list = None
+
+    def has_fresh_live_tickers(self, max_age: float = 30.0) -> bool:
+        """
+        Check whether the live ticker stream delivered data recently.
+
+        Args:
+            max_age: Maximum age in seconds of the last live update
+
+        Returns:
+            True if polled tickers are not needed
+        """
+        return (
+            self._live_tickers is not None
+            and self._live_tickers_updated_at is not None
+            and time.time() - self._live_tickers_updated_at < max_age
+        )
+
+    def apply_live_ticker_updates(self, changed_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Update symbol rows for symbols whose live volume changed.
+
+        Rows are replaced, not mutated, so lists already handed out stay
+        consistent. The sorted order is rebuilt lazily on the next read.
+
+        Args:
+            changed_ids: Symbol IDs updated in the live ticker table
+
+        Returns:
+            List of the updated rows
+        """
+        self._live_tickers_updated_at = time.time()
+        if self._live_tickers is None:
+            return []
+
+        changed_rows = []
+        for symbol_id in changed_ids:
+            row = self._rows_by_id.get(symbol_id)
+            entry = self._live_tickers.get(symbol_id)
+            if row is None or entry is None:
+                continue
+
+            volume24h = entry[1]
+            if row["volume24h"] == volume24h:
+                continue
+
+            new_row = dict(row)
+            new_row["volume24h"] = volume24h
+            new_row["volume24h_formatted"] = self.format_volume(volume24h)
+            self._rows_by_id[symbol_id] = new_row
+            changed_rows.append(new_row)
+
+        if changed_rows:
+            self._symbols_list_dirty = True
+        return changed_rows
+
+    def _reorder_symbols_list(self) -> List[Dict[str, Any]]:
+        """
+        Rebuild the symbol list order from the live table without sorting.
+
+        Reason: the live table keeps symbols ordered by volume incrementally,
+        so the list is an O(n) walk instead of an O(n log n) sort per update.
+        """
+        rows = self._rows_by_id
+        table = self._live_tickers
+        ordered = [rows[symbol_id] for symbol_id in table.ordered_ids() if symbol_id in rows]
+        # Symbols without live volume keep their previous relative order at the end
+        ordered.extend(
+            rows[row["id"]] for row in self._symbols_list
+            if not table.has_volume(row["id"]) and row["id"] in rows
+        )
+
+        self._symbols_list = ordered
+        self._symbols_list_dirty = False
+        return ordered
+
+    def build_symbols_list(self) -> List[Dict[str, Any]]:
+        """
+        Build the sorted symbol list from the current markets and tickers.
+
+        Returns:
+            List[Dict[str, Any]]: List of symbol information dictionaries
+
+        Raises:
+            Exception: If unable to fetch symbols from exchange
+        """
+        logger.info("Building symbol list in Symbol Service")
         
         self._initialize_cache()
         
@@ -190,39 +564,17 @@ class SymbolService:
                         volume24h = float(ticker["info"]["quoteVolume"])
                     except ValueError:
                         volume24h = None  # Handle cases where it might not be a valid number
+
+                # Prefer live values from the all-market ticker stream
+                live_entry = (self._live_tickers.get(market["id"])
+                              if self._live_tickers is not None else None)
+                if live_entry is not None:
+                    volume24h = live_entry[1]
                 
-                # Extract price precision
-                price_precision = None
-                try:
-                    if (
-                        market.get("precision")
-                        and market["precision"].get("price") is not None
-                    ):
-                        precision_value = market["precision"]["price"]
-                        if isinstance(precision_value, (int, float)):
-                            # If it's already an integer, use it directly
-                            if isinstance(precision_value, int):
-                                price_precision = precision_value
-                            else:
-                                # If it's a float like 1e-8, calculate decimal places
-                                if precision_value > 0 and precision_value < 1:
-                                    # Convert scientific notation to decimal places
-                                    price_precision = abs(
-                                        int(
-                                            round(
-                                                float(
-                                                    f"{precision_value:.10e}".split("e")[1]
-                                                )
-                                            )
-                                        )
-                                    )
-                                else:
-                                    # If it's a regular float, convert to int
-                                    price_precision = int(precision_value)
-                except (KeyError, TypeError, ValueError) as e:
-                    logger.warning(
-                        f"Could not extract pricePrecision for {market['symbol']}: {e}"
-                    )
+                # Precision is compiled once when markets are loaded
+                metadata = (self._metadata_by_symbol.get(market_id)
+                            or self._store_metadata(market_id, market))
+                price_precision = metadata.price_precision if metadata else None
                 
                 # Log warning if pricePrecision couldn't be determined
                 if price_precision is None:
@@ -237,11 +589,18 @@ class SymbolService:
                         current_price = float(ticker["last"])
                     except (ValueError, TypeError):
                         current_price = None
+                if live_entry is not None and live_entry[0]:
+                    current_price = live_entry[0]
                 
-                # Calculate rounding options using existing method
-                rounding_options, default_rounding = self.calculate_rounding_options(
-                    price_precision, current_price
-                )
+                # Limit the precompiled rounding ladder by current price
+                if metadata:
+                    rounding_options = list(self._limit_rounding_ladder(
+                        metadata.rounding_ladder, current_price))
+                    default_rounding = self._select_default_rounding(rounding_options)
+                else:
+                    rounding_options, default_rounding = self.calculate_rounding_options(
+                        price_precision, current_price
+                    )
                 
                 # Create symbol info dictionary
                 symbol_info = {
@@ -253,7 +612,8 @@ class SymbolService:
                     "volume24h": volume24h,
                     "volume24h_formatted": self.format_volume(volume24h),
                     "pricePrecision": price_precision,
-                    "priceFormat": self.generate_price_format(price_precision),
+                    "priceFormat": dict(metadata.price_format) if metadata
+                    else self.generate_price_format(price_precision),
                     "roundingOptions": rounding_options,
                     "defaultRounding": default_rounding,
                 }
@@ -388,6 +748,9 @@ class SymbolService:
         """
         Get detailed symbol information.
 
+        Served from compiled metadata; only the rounding options are adjusted
+        when a current price is given.
+
         Args:
             symbol_id: Symbol ID to get info for
             current_price: Current market price for rounding limit calculation
@@ -395,105 +758,19 @@ class SymbolService:
         Returns:
             Symbol information dict or None if not found
         """
-        self._initialize_cache()
-
-        exchange_symbol = self.resolve_symbol_to_exchange_format(symbol_id)
-        if not exchange_symbol or not self._markets_cache:
+        metadata = self.get_symbol_metadata(symbol_id)
+        if metadata is None:
             return None
 
-        market_info = self._markets_cache.get(exchange_symbol)
-        if not market_info:
-            return None
-
-        # Extract price precision from market info
-        price_precision = None
-        try:
-            if (
-                market_info.get("precision")
-                and market_info["precision"].get("price") is not None
-            ):
-                precision_value = market_info["precision"]["price"]
-                if isinstance(precision_value, (int, float)):
-                    # If it's already an integer, use it directly
-                    if isinstance(precision_value, int):
-                        price_precision = precision_value
-                    else:
-                        # If it's a float like 1e-8, calculate decimal places
-                        if precision_value > 0 and precision_value < 1:
-                            # Convert scientific notation to decimal places
-                            price_precision = abs(
-                                int(
-                                    round(
-                                        float(
-                                            f"{precision_value:.10e}".split("e")[1]
-                                        )
-                                    )
-                                )
-                            )
-                        else:
-                            # If it's a regular float, convert to int
-                            price_precision = int(precision_value)
-        except (KeyError, TypeError, ValueError) as e:
-            logger.warning(
-                f"Could not extract pricePrecision for {exchange_symbol}: {e}"
-            )
-
-        # Extract amount precision from market info
-        amount_precision = None
-        try:
-            if (
-                market_info.get("precision")
-                and market_info["precision"].get("amount") is not None
-            ):
-                precision_value = market_info["precision"]["amount"]
-                if isinstance(precision_value, (int, float)):
-                    # If it's already an integer, use it directly
-                    if isinstance(precision_value, int):
-                        amount_precision = precision_value
-                    else:
-                        # If it's a float like 1e-8, calculate decimal places
-                        if precision_value > 0 and precision_value < 1:
-                            # Convert scientific notation to decimal places
-                            amount_precision = abs(
-                                int(
-                                    round(
-                                        float(
-                                            f"{precision_value:.10e}".split("e")[1]
-                                        )
-                                    )
-                                )
-                            )
-                        else:
-                            # If it's a regular float, convert to int
-                            amount_precision = int(precision_value)
-        except (KeyError, TypeError, ValueError) as e:
-            logger.warning(
-                f"Could not extract amountPrecision for {exchange_symbol}: {e}"
-            )
-
-        # Calculate rounding options based on price precision and current price
-        rounding_options, default_rounding = self.calculate_rounding_options(
-            price_precision, current_price)
-
-        # Generate TradingView-compatible priceFormat object
-        price_format = self.generate_price_format(price_precision)
+        symbol_info = metadata.to_dict()
+        if current_price:
+            # Limit rounding options to 1/10th of the current price
+            rounding_options = self._limit_rounding_ladder(
+                metadata.rounding_ladder, current_price)
+            symbol_info["roundingOptions"] = list(rounding_options)
+            symbol_info["defaultRounding"] = self._select_default_rounding(rounding_options)
 
-        return {
-            "id": market_info.get("id"),
-            "symbol": exchange_symbol,
-            "base_asset": market_info.get("base"),
-            "quote_asset": market_info.get("quote"),
-            "active": market_info.get("active", True),
-            "type": market_info.get("type"),
-            "spot": market_info.get("spot", False),
-            "swap": market_info.get("type") == "swap",
-            "future": market_info.get("future", False),
-            "pricePrecision": price_precision,
-            "amountPrecision": amount_precision,
-            "roundingOptions": rounding_options,
-            "defaultRounding": default_rounding,
-            "priceFormat": price_format,
-        }
+        return symbol_info
 
     def generate_price_format(self, price_precision: Optional[int]) -> Dict[str, Any]:
         """
@@ -612,16 +889,23 @@ class SymbolService:
         return suggestions[:max_suggestions]
 
     def refresh_cache(self) -> None:
-        """Force refresh of symbol caches."""
+        """
+        Force refresh of symbol caches.
+
+        New markets and tickers are loaded first and swapped in only on
+        success, so a failed refresh keeps serving the last good data.
+        """
         logger.info("Refreshing symbol cache...")
-        self._cache_initialized = False
-        self._symbol_cache.clear()
-        self._exchange_to_id_cache.clear()
-        self._markets_cache = None
-        # Also clear ticker cache
-        self._ticker_cache = None
-        self._ticker_cache_time = None
-        self._initialize_cache()
+        try:
+            self.apply_markets_snapshot(self.load_markets_snapshot())
+        except Exception as e:
+            logger.error(f"Failed to refresh markets, keeping last snapshot: {str(e)}")
+            self._initialize_cache()
+
+        try:
+            self.apply_tickers(self.load_tickers())
+        except Exception as e:
+            logger.error(f"Failed to refresh tickers, keeping last snapshot: {str(e)}")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics for debugging."""
@@ -637,11 +921,16 @@ class SymbolService:
             "symbol_count": len(self._symbol_cache),
             "exchange_symbol_count": len(self._exchange_to_id_cache),
             "markets_loaded": self._markets_cache is not None,
+            "compiled_symbol_count": len(self._metadata_by_symbol),
             "ticker_cache_loaded": self._ticker_cache is not None,
             "ticker_cache_age_seconds": ticker_cache_age,
             "ticker_cache_ttl_seconds": self._ticker_cache_ttl,
+            "symbols_list_cached": self._symbols_list is not None,
+            "background_refresh_active": self._background_refresh_active,
         }
 
 
 # Global symbol service instance
 symbol_service = SymbolService()
+memory_accounting_service.register_source(
+    "symbols", lambda: {'shared': symbol_service})
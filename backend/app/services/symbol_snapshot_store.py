@@ -0,0 +1,106 @@
+"""
+Disk snapshot of compiled symbol metadata.
+
+After every successful markets load the compiled metadata is written to a
+small versioned JSON file. On restart it is read back before the exchange is
+contacted, so symbols resolve immediately while the background refresher
+revalidates them against the exchange.
+"""
+
+import json
+import os
+import time
+from typing import Optional
+
+from app.core.logging_config import get_logger
+from app.models.symbol_metadata import (
+    MarketsSnapshot,
+    SymbolMetadata,
+    snapshot_from_metadata,
+)
+
+logger = get_logger("symbol_snapshot_store")
+
+# Bump whenever SymbolMetadata fields or their meaning change
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class SymbolSnapshotStore:
+    """Reads and writes the versioned symbol metadata snapshot file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the snapshot store.
+
+        Args:
+            path: Snapshot file path
+        """
+        self.path = path
+
+    def save(self, snapshot: MarketsSnapshot) -> int:
+        """
+        Write a markets snapshot to disk (blocking).
+
+        Reason: the file is written next to the target and moved into place
+        with os.replace, so a crash mid-write never leaves a truncated
+        snapshot behind.
+
+        Args:
+            snapshot: Snapshot to persist
+
+        Returns:
+            Number of symbols written
+        """
+        payload = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "saved_at": time.time(),
+            "symbols": [metadata.to_record()
+                        for metadata in snapshot.metadata_by_symbol.values()],
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+        logger.info(f"Saved symbol snapshot with {len(payload['symbols'])} symbols to {self.path}")
+        return len(payload["symbols"])
+
+    def load(self) -> Optional[MarketsSnapshot]:
+        """
+        Read the snapshot from disk (blocking).
+
+        Returns:
+            MarketsSnapshot, or None if the file is missing, unreadable or
+            written by an incompatible version
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+
+            version = payload.get("format_version")
+            if version != SNAPSHOT_FORMAT_VERSION:
+                logger.info(
+                    f"Ignoring symbol snapshot with format version {version} "
+                    f"(expected {SNAPSHOT_FORMAT_VERSION})"
+                )
+                return None
+
+            records = [SymbolMetadata.from_record(record) for record in payload["symbols"]]
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable symbol snapshot {self.path}: {str(e)}")
+            return None
+
+        if not records:
+            return None
+
+        age = time.time() - payload.get("saved_at", 0)
+        logger.info(f"Loaded symbol snapshot with {len(records)} symbols ({age:.0f}s old)")
+        return snapshot_from_metadata(records)
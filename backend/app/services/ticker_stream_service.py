@@ -0,0 +1,315 @@
+"""
+All-market ticker stream service.
+
+Subscribes to the Binance futures all-market mini-ticker stream and keeps a
+compact per-symbol table of last price and 24h quote volume up to date. The
+symbol list served by SymbolService is reordered incrementally from this
+table, and changed rows are pushed to /ws/symbols subscribers.
+
+Polled fetch_tickers() results (the refresher's first poll lands after the
+stream has started) seed symbols the stream has not reported yet, and
+refresh every symbol while the stream is down.
+"""
+
+import asyncio
+import json
+import math
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import websockets
+from sortedcontainers import SortedList
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.services.symbol_service import SymbolService, symbol_service
+
+logger = get_logger("ticker_stream_service")
+
+
+class LiveTickerTable:
+    """
+    Compact last price / quote volume table with incremental volume ordering.
+
+    Values live in two parallel array('d') columns indexed by a per-symbol
+    slot, so an update is an in-place float store. A SortedList of
+    (-volume, symbol_id) keeps the volume ranking current in O(log n) per
+    update without re-sorting the whole list.
+    """
+
+    __slots__ = ('_slots', '_ids', '_last_price', '_quote_volume', '_order', 'version')
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._last_price = array('d')
+        self._quote_volume = array('d')
+        self._order = SortedList()
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _slot_for(self, symbol_id: str) -> int:
+        """Get the slot for a symbol, allocating one if needed."""
+        slot = self._slots.get(symbol_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._slots[symbol_id] = slot
+            self._ids.append(symbol_id)
+            self._last_price.append(math.nan)
+            self._quote_volume.append(math.nan)
+        return slot
+
+    def update(self, symbol_id: str, last_price: float, quote_volume: float) -> bool:
+        """
+        Update a symbol in place.
+
+        Args:
+            symbol_id: Symbol ID (e.g., 'BTCUSDT')
+            last_price: Last traded price
+            quote_volume: Rolling 24h quote asset volume
+
+        Returns:
+            True if the quote volume changed
+        """
+        slot = self._slot_for(symbol_id)
+        self._last_price[slot] = last_price
+
+        old_volume = self._quote_volume[slot]
+        if old_volume == quote_volume:
+            return False
+
+        if old_volume > 0:
+            self._order.remove((-old_volume, symbol_id))
+        if quote_volume > 0:
+            self._order.add((-quote_volume, symbol_id))
+        self._quote_volume[slot] = quote_volume
+        self.version += 1
+        return True
+
+    def get(self, symbol_id: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        """
+        Get (last_price, quote_volume) for a symbol.
+
+        Returns:
+            Tuple with None for unknown values, or None if the symbol is not tracked
+        """
+        slot = self._slots.get(symbol_id)
+        if slot is None:
+            return None
+        price = self._last_price[slot]
+        volume = self._quote_volume[slot]
+        return (None if math.isnan(price) else price,
+                None if math.isnan(volume) else volume)
+
+    def has_volume(self, symbol_id: str) -> bool:
+        """Whether the symbol has a positive live quote volume."""
+        slot = self._slots.get(symbol_id)
+        return slot is not None and self._quote_volume[slot] > 0
+
+    def ordered_ids(self) -> Iterator[str]:
+        """Iterate symbol IDs with positive volume, highest volume first."""
+        return (symbol_id for _, symbol_id in self._order)
+
+    def memory_bytes(self) -> int:
+        """Approximate memory used by the value columns."""
+        return (self._last_price.buffer_info()[1] + self._quote_volume.buffer_info()[1]) * 8
+
+
+class TickerStreamService:
+    """Maintains the live ticker table from the all-market mini-ticker stream."""
+
+    def __init__(self, service: SymbolService, base_url: Optional[str] = None):
+        """
+        Initialize the ticker stream service.
+
+        Args:
+            service: SymbolService to feed
+            base_url: Binance futures WebSocket base URL
+        """
+        self._service = service
+        self.base_url = base_url or settings.BINANCE_WS_BASE_URL
+        self.table = LiveTickerTable()
+        self.callbacks: List[Callable[[List[Dict[str, Any]]], Any]] = []
+        self.retry_delays = [1, 2, 5, 10, 30]  # Exponential backoff
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.messages_received = 0
+
+    @property
+    def stream_url(self) -> str:
+        """All-market mini-ticker stream URL."""
+        return f"{self.base_url}/ws/!miniTicker@arr"
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the stream task is running."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Seed the table from polled tickers and start streaming."""
+        if self.is_running:
+            return
+
+        self.seed_from_tickers(self._service._ticker_cache or {})
+        # Reason: at startup the refresher's first ticker poll has usually not
+        # landed yet, so the table is also seeded whenever polled tickers arrive.
+        self._service.add_tickers_listener(self._on_polled_tickers)
+        self._service.attach_live_tickers(self.table)
+        self._running = True
+        self._task = asyncio.create_task(self._maintain_connection())
+        logger.info(f"Ticker stream started: {self.stream_url}")
+
+    async def stop(self) -> None:
+        """Stop streaming and detach the live table."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._service.remove_tickers_listener(self._on_polled_tickers)
+        self._service.attach_live_tickers(None)
+        logger.info("Ticker stream stopped")
+
+    def seed_from_tickers(self, tickers: Dict[str, Any], only_missing: bool = False) -> int:
+        """
+        Seed the table from a polled fetch_tickers() result.
+
+        Args:
+            tickers: ccxt tickers keyed by exchange symbol
+            only_missing: Skip symbols the table already tracks
+
+        Returns:
+            Number of symbols seeded
+        """
+        seeded = 0
+        for exchange_symbol, ticker in tickers.items():
+            symbol_id = self._service._exchange_to_id_cache.get(exchange_symbol)
+            info = ticker.get("info") or {}
+            if not symbol_id or "quoteVolume" not in info:
+                continue
+            if only_missing and self.table.get(symbol_id) is not None:
+                continue
+            try:
+                self.table.update(symbol_id, float(ticker.get("last") or math.nan),
+                                  float(info["quoteVolume"]))
+                seeded += 1
+            except (TypeError, ValueError):
+                continue
+        return seeded
+
+    def _on_polled_tickers(self, tickers: Dict[str, Any]) -> None:
+        """Seed from a polled snapshot; stream values win while the stream is live."""
+        self.seed_from_tickers(tickers, only_missing=self._service.has_fresh_live_tickers())
+
+    def apply_mini_tickers(self, events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Apply a batch of mini-ticker events.
+
+        Args:
+            events: Binance 24hrMiniTicker events ('s' symbol, 'c' close, 'q' quote volume)
+
+        Returns:
+            Symbol rows whose volume changed
+        """
+        changed_ids = []
+        for event in events:
+            try:
+                symbol_id = event["s"]
+                changed = self.table.update(symbol_id, float(event["c"]), float(event["q"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if changed:
+                changed_ids.append(symbol_id)
+
+        return self._service.apply_live_ticker_updates(changed_ids)
+
+    def register_callback(self, callback: Callable[[List[Dict[str, Any]]], Any]) -> None:
+        """Register a callback receiving changed symbol rows."""
+        self.callbacks.append(callback)
+
+    def unregister_callback(self, callback: Callable[[List[Dict[str, Any]]], Any]) -> None:
+        """Unregister a changed-rows callback."""
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    async def _notify_callbacks(self, rows: List[Dict[str, Any]]) -> None:
+        """Send changed rows to all callbacks."""
+        for callback in list(self.callbacks):
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(rows)
+                else:
+                    callback(rows)
+            except Exception as e:
+                logger.error(f"Error in ticker stream callback: {e}")
+
+    async def _maintain_connection(self) -> None:
+        """Maintain WebSocket connection with reconnection logic"""
+        retry_count = 0
+
+        while self._running:
+            try:
+                await self._connect_and_listen()
+                retry_count = 0  # Reset on successful connection
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ticker stream error: {e}")
+
+                if not self._running:
+                    break
+
+                delay = self.retry_delays[min(retry_count, len(self.retry_delays) - 1)]
+                logger.info(f"Reconnecting ticker stream in {delay}s...")
+                await asyncio.sleep(delay)
+                retry_count += 1
+
+    async def _connect_and_listen(self) -> None:
+        """Connect to WebSocket and listen for messages"""
+        async with websockets.connect(self.stream_url) as websocket:
+            logger.info("Connected to all-market mini-ticker stream")
+
+            while self._running:
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), timeout=30)
+                except asyncio.TimeoutError:
+                    # The stream pushes every second; silence means a dead connection
+                    logger.warning("No ticker stream message in 30s, reconnecting")
+                    break
+                except websockets.ConnectionClosed:
+                    logger.warning("Ticker stream connection closed")
+                    break
+
+                events = json.loads(message)
+                if not isinstance(events, list):
+                    continue
+
+                self.messages_received += 1
+                rows = self.apply_mini_tickers(events)
+                if rows:
+                    await self._notify_callbacks(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get ticker stream statistics.
+
+        Returns:
+            Dictionary with stream state and table size
+        """
+        return {
+            "running": self.is_running,
+            "symbols": len(self.table),
+            "messages_received": self.messages_received,
+            "subscribers": len(self.callbacks),
+            "table_bytes": self.table.memory_bytes(),
+        }
+
+
+# Global ticker stream service instance
+ticker_stream_service = TickerStreamService(symbol_service)
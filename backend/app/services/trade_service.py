@@ -19,6 +19,9 @@ from app.core.logging_config import get_logger
 
 logger = get_logger("trade_service")
 
+# Column order of raw-mode trade rows (see TradeService.compact_trades)
+RAW_TRADE_FIELDS = ['id', 'price', 'amount', 'side', 'timestamp']
+
 
 class TradeService:
     """Service for fetching and formatting trade data."""
@@ -26,16 +29,18 @@ class TradeService:
     def __init__(self):
         pass
 
-    async def fetch_recent_trades(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+    async def fetch_recent_trades(self, symbol: str, limit: int = 100,
+                                  raw: bool = False) -> List[Any]:
         """
         Fetch recent trades for a symbol from the exchange.
 
         Args:
             symbol: Trading symbol in exchange format (e.g., 'BTC/USDT')
             limit: Maximum number of trades to fetch (default: 100)
+            raw: Return compact unformatted rows (see compact_trades)
 
         Returns:
-            List of formatted trade dictionaries
+            List of formatted trade dictionaries, or raw rows if raw is set
 
         Raises:
             ValueError: If symbol is not found
@@ -62,15 +67,11 @@ class TradeService:
                 logger.warning(f"No trades returned for {symbol}")
                 return []
 
-            # Format each trade
-            formatted_trades = []
-            for trade in trades:
-                try:
-                    formatted_trade = self.format_trade(trade, symbol_info)
-                    formatted_trades.append(formatted_trade)
-                except Exception as e:
-                    logger.warning(f"Failed to format trade {trade.get('id', 'unknown')}: {e}")
-                    continue
+            # Format all trades as one batch
+            if raw:
+                formatted_trades = self.compact_trades(trades)
+            else:
+                formatted_trades = self.format_trades(trades, symbol_info)
 
             # Return most recent trades first (newest at top)
             # Limit to requested number of trades
@@ -106,15 +107,7 @@ class TradeService:
             ValueError: If trade data is invalid
         """
         try:
-            # Validate required trade fields
-            required_fields = ['id', 'price', 'amount', 'side', 'timestamp']
-            for field in required_fields:
-                if field not in trade or trade[field] is None:
-                    raise ValueError(f"Missing required field: {field}")
-
-            # Extract precision from symbol info
-            price_precision = symbol_info.get('pricePrecision', 2)
-            amount_precision = symbol_info.get('amountPrecision', 8)
+            self._validate_trade(trade)
 
             # Format price and amount using the formatting service
             price_formatted = formatting_service.format_price(
@@ -126,36 +119,116 @@ class TradeService:
                 symbol_info
             )
 
-            # Format time as HH:MM:SS (local time)
-            try:
-                dt = datetime.fromtimestamp(trade['timestamp'] / 1000)
-                time_formatted = dt.strftime('%H:%M:%S')
-            except (ValueError, OSError) as e:
-                logger.warning(f"Invalid timestamp {trade['timestamp']}: {e}")
-                time_formatted = "Invalid"
-
-            # Validate side value
-            side = trade['side']
-            if side not in ['buy', 'sell']:
-                logger.warning(f"Invalid trade side '{side}', defaulting to 'buy'")
-                side = 'buy'
-
-            return {
-                'id': str(trade['id']),
-                'price': float(trade['price']),
-                'amount': float(trade['amount']),
-                'side': side,
-                'timestamp': int(trade['timestamp']),
-                'price_formatted': price_formatted,
-                'amount_formatted': amount_formatted,
-                'time_formatted': time_formatted
-            }
+            return self._build_trade(trade, price_formatted, amount_formatted)
 
         except (KeyError, TypeError, ValueError) as e:
             error_msg = f"Error formatting trade: {e}"
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+    def format_trades(self, trades: List[Dict[str, Any]],
+                      symbol_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Format a batch of trades, formatting prices and amounts as columns.
+
+        Output per trade is identical to format_trade. Invalid trades are
+        logged and skipped.
+
+        Args:
+            trades: Raw trades from CCXT
+            symbol_info: Symbol information with precision data
+
+        Returns:
+            Formatted trade dictionaries in input order
+        """
+        valid_trades = []
+        for trade in trades:
+            try:
+                self._validate_trade(trade)
+                valid_trades.append(trade)
+            except ValueError as e:
+                logger.warning(f"Failed to format trade {trade.get('id', 'unknown')}: {e}")
+
+        prices = formatting_service.format_price_column(
+            [trade['price'] for trade in valid_trades], symbol_info)
+        amounts = formatting_service.format_amount_column(
+            [trade['amount'] for trade in valid_trades], symbol_info)
+
+        formatted_trades = []
+        for trade, price_formatted, amount_formatted in zip(valid_trades, prices, amounts):
+            try:
+                formatted_trades.append(self._build_trade(trade, price_formatted, amount_formatted))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Failed to format trade {trade.get('id', 'unknown')}: {e}")
+        return formatted_trades
+
+    def compact_trades(self, trades: List[Dict[str, Any]]) -> List[List[Any]]:
+        """
+        Convert trades to compact raw-mode rows without formatting.
+
+        Rows follow RAW_TRADE_FIELDS: [id, price, amount, side, timestamp].
+        Accepts raw CCXT trades or already formatted trades. Invalid trades
+        are logged and skipped, as in format_trades.
+
+        Args:
+            trades: Trades with id, price, amount, side and timestamp
+
+        Returns:
+            Raw trade rows in input order
+        """
+        rows = []
+        for trade in trades:
+            try:
+                self._validate_trade(trade)
+                side = trade['side'] if trade['side'] in ('buy', 'sell') else 'buy'
+                rows.append([str(trade['id']), float(trade['price']), float(trade['amount']),
+                             side, int(trade['timestamp'])])
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Failed to convert trade {trade.get('id', 'unknown')}: {e}")
+        return rows
+
+    @staticmethod
+    def _validate_trade(trade: Dict[str, Any]) -> None:
+        """
+        Check that a raw trade has all required fields.
+
+        Raises:
+            ValueError: If a required field is missing
+        """
+        required_fields = ['id', 'price', 'amount', 'side', 'timestamp']
+        for field in required_fields:
+            if field not in trade or trade[field] is None:
+                raise ValueError(f"Missing required field: {field}")
+
+    @staticmethod
+    def _build_trade(trade: Dict[str, Any], price_formatted: str,
+                     amount_formatted: str) -> Dict[str, Any]:
+        """Build the formatted trade dictionary from a validated raw trade."""
+        # Format time as HH:MM:SS (local time)
+        try:
+            dt = datetime.fromtimestamp(trade['timestamp'] / 1000)
+            time_formatted = dt.strftime('%H:%M:%S')
+        except (ValueError, OSError) as e:
+            logger.warning(f"Invalid timestamp {trade['timestamp']}: {e}")
+            time_formatted = "Invalid"
+
+        # Validate side value
+        side = trade['side']
+        if side not in ['buy', 'sell']:
+            logger.warning(f"Invalid trade side '{side}', defaulting to 'buy'")
+            side = 'buy'
+
+        return {
+            'id': str(trade['id']),
+            'price': float(trade['price']),
+            'amount': float(trade['amount']),
+            'side': side,
+            'timestamp': int(trade['timestamp']),
+            'price_formatted': price_formatted,
+            'amount_formatted': amount_formatted,
+            'time_formatted': time_formatted
+        }
+
     def generate_mock_trades(self, symbol: str, count: int = 100) -> List[Dict[str, Any]]:
         """
         Generate mock trade data for testing and demo purposes.
@@ -182,7 +255,7 @@ class TradeService:
 
         base_price = 50000.0  # Base price for mock data
         current_time = int(time.time() * 1000)
-        trades = []
+        mock_trades = []
 
         for i in range(count):
             # Generate realistic price variation
@@ -198,24 +271,16 @@ class TradeService:
             # Create mock trade with decreasing timestamps (older trades first)
             trade_time = current_time - (i * random.randint(1000, 10000))  # 1-10 seconds apart
             
-            mock_trade = {
+            mock_trades.append({
                 'id': f"mock_{i}_{trade_time}",
                 'price': price,
                 'amount': amount,
                 'side': side,
                 'timestamp': trade_time
-            }
-
-            # Format the mock trade
-            try:
-                formatted_trade = self.format_trade(mock_trade, symbol_info)
-                trades.append(formatted_trade)
-            except Exception as e:
-                logger.warning(f"Failed to format mock trade {i}: {e}")
-                continue
+            })
 
         # Return in reverse order (newest first)
-        return trades[::-1]
+        return self.format_trades(mock_trades, symbol_info)[::-1]
 
     async def fetch_trades_with_fallback(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,362 @@
+"""
+Volume profile service for volume-by-price histograms.
+
+This service maintains an incrementally updated volume profile per symbol and
+trading session, built directly from the live trade stream.
+
+Features:
+- Sparse histogram keyed by integer price ticks (no float bucket keys)
+- O(1) update per trade
+- Coarser roundings served by merging tick buckets, never by rescanning trades
+- UTC day sessions with bounded retention per symbol
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
+
+from app.services.formatting_service import formatting_service
+from app.services.memory_accounting_service import memory_accounting_service
+
+logger = logging.getLogger(__name__)
+
+
+class VolumeProfile:
+    """
+    Sparse volume-by-price histogram for one symbol and session.
+
+    Buckets are keyed by integer tick index (price / tick_size), so the finest
+    resolution is the symbol's own tick. Each bucket stores [buy_volume,
+    sell_volume] in base asset units.
+    """
+
+    __slots__ = ('symbol', 'session', 'tick_size', '_buckets',
+                 'trade_count', 'total_volume', 'last_trade_timestamp')
+
+    def __init__(self, symbol: str, session: str, tick_size: float):
+        if tick_size <= 0:
+            raise ValueError("Tick size must be positive")
+
+        self.symbol = symbol
+        self.session = session
+        self.tick_size = tick_size
+        self._buckets: Dict[int, List[float]] = {}
+        self.trade_count = 0
+        self.total_volume = 0.0
+        self.last_trade_timestamp: Optional[int] = None
+
+    def add_trade(self, price: float, amount: float, side: str,
+                  timestamp: Optional[int] = None) -> None:
+        """
+        Add a single trade to the histogram.
+
+        Args:
+            price: Trade price
+            amount: Trade amount in base asset
+            side: 'buy' or 'sell' (taker side)
+            timestamp: Trade timestamp in milliseconds
+        """
+        if price <= 0 or amount <= 0:
+            return
+
+        # Reason: prices arrive on the tick grid, so rounding the quotient
+        # recovers the exact integer tick without Decimal arithmetic.
+        tick = int(round(price / self.tick_size))
+
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = [0.0, 0.0]
+            self._buckets[tick] = bucket
+
+        if side == 'sell':
+            bucket[1] += amount
+        else:
+            bucket[0] += amount
+
+        self.trade_count += 1
+        self.total_volume += amount
+        if timestamp is not None:
+            self.last_trade_timestamp = timestamp
+
+    def bucket_count(self) -> int:
+        """Get the number of non-empty tick buckets."""
+        return len(self._buckets)
+
+    def get_histogram(self, rounding: Optional[float] = None) -> List[Tuple[float, float, float]]:
+        """
+        Get the histogram at the requested rounding, lowest price first.
+
+        Coarser roundings are built by merging tick buckets, so the cost is
+        proportional to the number of populated ticks, not the number of trades.
+
+        Args:
+            rounding: Price bucket size (must be a whole multiple of the tick size)
+
+        Returns:
+            List of (price, buy_volume, sell_volume) tuples sorted by price
+        """
+        factor = self._rounding_factor(rounding)
+
+        if factor == 1:
+            merged = self._buckets
+        else:
+            merged: Dict[int, List[float]] = {}
+            for tick, (buy, sell) in self._buckets.items():
+                # Floor division keeps the bucket at the lower price bound,
+                # matching the bid-side rounding used by the order book
+                key = tick // factor
+                target = merged.get(key)
+                if target is None:
+                    merged[key] = [buy, sell]
+                else:
+                    target[0] += buy
+                    target[1] += sell
+
+        bucket_size = factor * self.tick_size
+        decimals = self._decimals_for(bucket_size)
+        return [
+            (round(key * bucket_size, decimals), buy, sell)
+            for key, (buy, sell) in sorted(merged.items())
+        ]
+
+    def _rounding_factor(self, rounding: Optional[float]) -> int:
+        """Convert a rounding value into a whole number of ticks."""
+        if rounding is None or rounding <= self.tick_size:
+            return 1
+
+        factor = int(round(rounding / self.tick_size))
+        if factor < 1 or abs(factor * self.tick_size - rounding) > self.tick_size * 1e-6:
+            raise ValueError(
+                f"Rounding {rounding} is not a multiple of tick size {self.tick_size}")
+        return factor
+
+    @staticmethod
+    def _decimals_for(step: float) -> int:
+        """Number of decimal places needed to represent multiples of step."""
+        decimals = 0
+        while decimals < 12 and abs(round(step, decimals) - step) > step * 1e-9:
+            decimals += 1
+        return decimals
+
+
+class VolumeProfileService:
+    """
+    Service managing volume profiles per symbol and UTC session.
+
+    Profiles are fed from the trades stream and read by the volume profile
+    REST endpoint.
+    """
+
+    def __init__(self, max_sessions_per_symbol: int = 2):
+        """
+        Initialize the volume profile service.
+
+        Args:
+            max_sessions_per_symbol: Number of sessions kept per symbol (default: 2)
+        """
+        self._profiles: Dict[Tuple[str, str], VolumeProfile] = {}
+        self._sessions: Dict[str, List[str]] = {}  # symbol -> sessions, oldest first
+        self._max_sessions_per_symbol = max_sessions_per_symbol
+
+    @staticmethod
+    def session_for_timestamp(timestamp_ms: Optional[int] = None) -> str:
+        """
+        Get the UTC session identifier for a timestamp.
+
+        Args:
+            timestamp_ms: Timestamp in milliseconds (default: now)
+
+        Returns:
+            Session identifier in YYYY-MM-DD format
+        """
+        if timestamp_ms is None:
+            dt = datetime.now(timezone.utc)
+        else:
+            dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+        return dt.strftime('%Y-%m-%d')
+
+    @staticmethod
+    def tick_size_for(symbol_info: Optional[Dict[str, Any]]) -> float:
+        """
+        Get the price tick size from symbol information.
+
+        Args:
+            symbol_info: Symbol information containing pricePrecision
+
+        Returns:
+            Tick size (defaults to 0.01 when precision is unknown)
+        """
+        if symbol_info and symbol_info.get('pricePrecision') is not None:
+            return 10 ** -int(symbol_info['pricePrecision'])
+        return 0.01
+
+    def _get_or_create_profile(self, symbol: str, session: str,
+                               tick_size: float) -> VolumeProfile:
+        """Get the profile for a symbol/session, creating it if needed."""
+        key = (symbol, session)
+        profile = self._profiles.get(key)
+        if profile is not None:
+            return profile
+
+        profile = VolumeProfile(symbol, session, tick_size)
+        self._profiles[key] = profile
+
+        sessions = self._sessions.setdefault(symbol, [])
+        sessions.append(session)
+        sessions.sort()
+        while len(sessions) > self._max_sessions_per_symbol:
+            expired = sessions.pop(0)
+            self._profiles.pop((symbol, expired), None)
+            logger.debug(f"Dropped expired volume profile session {expired} for {symbol}")
+
+        logger.info(f"Created volume profile for {symbol} session {session} "
+                    f"(tick_size={tick_size})")
+        return profile
+
+    def record_trades(self, symbol: str, trades: List[Dict[str, Any]],
+                      symbol_info: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Record raw trades into the volume profile of their session.
+
+        Args:
+            symbol: Trading symbol in exchange format
+            trades: Raw trades with price, amount, side and timestamp
+            symbol_info: Symbol information for tick size
+
+        Returns:
+            Number of trades recorded
+        """
+        tick_size = self.tick_size_for(symbol_info)
+        recorded = 0
+        profile = None
+
+        for trade in trades:
+            try:
+                price = float(trade['price'])
+                amount = float(trade['amount'])
+                timestamp = int(trade['timestamp'])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            session = self.session_for_timestamp(timestamp)
+            if profile is None or profile.session != session:
+                profile = self._get_or_create_profile(symbol, session, tick_size)
+
+            profile.add_trade(price, amount, trade.get('side', 'buy'), timestamp)
+            recorded += 1
+
+        return recorded
+
+    def get_profile(self, symbol: str, session: Optional[str] = None) -> Optional[VolumeProfile]:
+        """
+        Get the volume profile for a symbol and session.
+
+        Args:
+            symbol: Trading symbol in exchange format
+            session: Session identifier (default: latest session)
+
+        Returns:
+            VolumeProfile or None if no trades were recorded
+        """
+        if session is None:
+            sessions = self._sessions.get(symbol)
+            if not sessions:
+                return None
+            session = sessions[-1]
+        return self._profiles.get((symbol, session))
+
+    def build_profile_response(self, symbol: str, display_symbol: str,
+                               rounding: Optional[float] = None,
+                               session: Optional[str] = None,
+                               symbol_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the histogram payload for a symbol at the given rounding.
+
+        Args:
+            symbol: Trading symbol in exchange format
+            display_symbol: Symbol to report to the client
+            rounding: Price bucket size (default: symbol tick size)
+            session: Session identifier (default: latest session)
+            symbol_info: Symbol information for formatting
+
+        Returns:
+            Dictionary with histogram rows and summary fields
+
+        Raises:
+            ValueError: If rounding is not a multiple of the tick size
+        """
+        profile = self.get_profile(symbol, session)
+        tick_size = profile.tick_size if profile else self.tick_size_for(symbol_info)
+        effective_rounding = rounding if rounding is not None else tick_size
+
+        rows: List[Dict[str, Any]] = []
+        point_of_control = None
+        if profile:
+            formatter = formatting_service.get_formatter(symbol_info, effective_rounding)
+            max_volume = 0.0
+            for price, buy, sell in profile.get_histogram(effective_rounding):
+                total = buy + sell
+                rows.append({
+                    'price': price,
+                    'buy_volume': buy,
+                    'sell_volume': sell,
+                    'total_volume': total,
+                    'price_formatted': formatter.price(price),
+                    'total_volume_formatted': formatter.amount(total),
+                })
+                if total > max_volume:
+                    max_volume = total
+                    point_of_control = price
+
+        return {
+            'symbol': display_symbol,
+            'session': profile.session if profile else (session or self.session_for_timestamp()),
+            'rounding': effective_rounding,
+            'tick_size': tick_size,
+            'trade_count': profile.trade_count if profile else 0,
+            'total_volume': profile.total_volume if profile else 0.0,
+            'point_of_control': point_of_control,
+            'data': rows,
+        }
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        """
+        Clear stored profiles.
+
+        Args:
+            symbol: Only clear profiles for this symbol (default: all)
+        """
+        if symbol is None:
+            self._profiles.clear()
+            self._sessions.clear()
+            return
+
+        for session in self._sessions.pop(symbol, []):
+            self._profiles.pop((symbol, session), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get volume profile statistics.
+
+        Returns:
+            Dictionary with profile and bucket counts
+        """
+        return {
+            'profiles': len(self._profiles),
+            'symbols': len(self._sessions),
+            'total_buckets': sum(p.bucket_count() for p in self._profiles.values()),
+        }
+
+
+    def get_memory_objects(self) -> Dict[str, List[VolumeProfile]]:
+        """Session profiles per symbol, for memory accounting."""
+        profiles: Dict[str, List[VolumeProfile]] = {}
+        for (symbol, _), profile in list(self._profiles.items()):
+            profiles.setdefault(symbol, []).append(profile)
+        return profiles
+
+
+# Global volume profile service instance
+volume_profile_service = VolumeProfileService()
+memory_accounting_service.register_source(
+    "volume_profiles", volume_profile_service.get_memory_objects)
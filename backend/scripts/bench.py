@@ -0,0 +1,334 @@
+"""
+Micro-benchmarks for the backend hot paths, with regression thresholds.
+
+Times order book snapshot and delta updates, order book aggregation across
+limits and roundings (pyramid and walked books), the formatting service,
+liquidation volume aggregation, trade formatting, and JSON encoding of the
+typical WebSocket messages, all on fixed seeded fixtures (defined with
+the benchmarks in bench_cases.py).
+
+Timings depend on the machine, so a fixed pure-Python calibration workload
+is timed alongside each benchmark and results are stored and compared as a
+multiple of it ("relative cost"). A benchmark whose relative cost grew by more than
+the threshold (threshold_percent in the baseline file, or --threshold)
+fails the run:
+
+    cd backend
+    python scripts/bench.py                     # compare with the baseline
+    python scripts/bench.py -k aggregation      # only matching benchmarks
+    python scripts/bench.py --update-baseline   # record a new baseline
+
+Each timing is the best of --repeat samples, each sample running a
+benchmark for at least --min-time seconds with garbage collection and
+logging below ERROR disabled. A benchmark over the threshold is measured
+again (--retries) and fails only if its best attempt is still over it.
+Shared or busy machines add noise of their own; record baselines and
+compare on a quiet one.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scripts.bench_cases import Runner, benchmarks  # noqa: E402
+
+BASELINE_PATH = os.path.join(BACKEND_DIR, "scripts", "bench_baseline.json")
+# Bump whenever baseline fields or their meaning change
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 25.0
+DEFAULT_MIN_TIME = 0.1
+DEFAULT_REPEAT = 5
+# A regressed benchmark is measured again this many times before it fails
+DEFAULT_RETRIES = 1
+
+
+def calibration_workload(n: int) -> None:
+    """Fixed pure-Python work (arithmetic, dicts, lists, string formatting)."""
+    for _ in range(n):
+        counts: Dict[int, int] = {}
+        total = 0.0
+        items = []
+        for i in range(500):
+            total += i * 0.5
+            counts[i % 37] = counts.get(i % 37, 0) + 1
+            if i % 10 == 0:
+                items.append(f"{total:.2f}")
+        sorted(items)
+
+
+def _time(run: Runner, number: int) -> float:
+    """Seconds taken by run(number), with garbage collection disabled."""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        run(number)
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _autorange(run: Runner, min_time: float) -> Tuple[int, float]:
+    """Iterations (doubling) needed for run(number) to take min_time, and that time."""
+    number = 1
+    elapsed = _time(run, number)
+    while elapsed < min_time:
+        number *= 2
+        elapsed = _time(run, number)
+    return number, elapsed
+
+
+def measure(run: Runner, min_time: float = DEFAULT_MIN_TIME,
+            repeat: int = DEFAULT_REPEAT,
+            calibration_number: Optional[int] = None) -> Tuple[float, Optional[float]]:
+    """
+    Time one benchmark.
+
+    Args:
+        run: Runs the benchmark n times
+        min_time: Minimum seconds per sample; iterations double until reached
+        repeat: Samples taken
+        calibration_number: Calibration iterations to time before each
+            sample (none when None)
+
+    Returns:
+        (best time per iteration, best calibration time per iteration), in
+        nanoseconds
+    """
+    number, elapsed = _autorange(run, min_time)
+    samples = [elapsed]
+    calibration = []
+    for index in range(repeat):
+        # Reason: calibration samples are interleaved with the benchmark's,
+        # so a machine slowing down mid-run shifts both alike.
+        if calibration_number is not None:
+            calibration.append(_time(calibration_workload, calibration_number)
+                               / calibration_number)
+        if index:
+            samples.append(_time(run, number))
+    best_calibration = min(calibration) * 1e9 if calibration else None
+    return min(samples) / number * 1e9, best_calibration
+
+
+def run_benchmarks(names: Optional[List[str]] = None, min_time: float = DEFAULT_MIN_TIME,
+                   repeat: int = DEFAULT_REPEAT,
+                   progress: Optional[Callable[[str, float], None]] = None) -> Dict[str, Any]:
+    """
+    Run the selected benchmarks, each next to the calibration workload.
+
+    Args:
+        names: Benchmarks to run (all when None)
+        min_time: Minimum seconds per sample
+        repeat: Samples per benchmark
+        progress: Called with (name, ns) after each benchmark
+
+    Returns:
+        {"calibration_ns": ..., "results": {name: {"ns", "relative"}}}, where
+        relative is the benchmark time over the calibration time measured
+        alongside it
+    """
+    selected = [case for case in benchmarks() if names is None or case.name in names]
+    # Reason: hot paths log warnings for thin books or bad values; the
+    # fixtures avoid those, and handlers would otherwise dominate timings.
+    logging.disable(logging.WARNING)
+    loop = asyncio.new_event_loop()
+    try:
+        calibration_number, _ = _autorange(calibration_workload, min_time / 2)
+        calibrations = []
+        results = {}
+        for case in selected:
+            ns, calibration_ns = measure(case.setup(loop), min_time, repeat, calibration_number)
+            calibrations.append(calibration_ns)
+            results[case.name] = {'ns': round(ns, 1), 'relative': round(ns / calibration_ns, 6)}
+            if progress is not None:
+                progress(case.name, ns)
+    finally:
+        loop.close()
+        logging.disable(logging.NOTSET)
+    return {'calibration_ns': round(min(calibrations), 1) if calibrations else None,
+            'results': results}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float) -> List[Tuple[str, Optional[float], str]]:
+    """
+    Compare relative costs with the baseline.
+
+    Args:
+        baseline: Baseline file contents
+        current: run_benchmarks() output
+        threshold: Allowed growth of the relative cost, in percent
+
+    Returns:
+        (name, change percent or None, status) per current benchmark, where
+        status is "ok", "faster", "REGRESSED" or "new"
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            rows.append((name, None, "new"))
+            continue
+        change = (result['relative'] / base['relative'] - 1) * 100
+        if change > threshold:
+            status = "REGRESSED"
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, change, status))
+    return rows
+
+
+def keep_best(current: Dict[str, Any], retry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a retry into a run, keeping the lower relative cost per benchmark.
+
+    Reason: like the samples within a run, repeated runs only add noise on
+    top of the true cost, so the best one is the closest to it.
+    """
+    results = dict(current['results'])
+    for name, result in retry['results'].items():
+        if name not in results or result['relative'] < results[name]['relative']:
+            results[name] = result
+    return {**current, 'results': results}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """
+    Load a baseline file (an empty baseline if it does not exist).
+
+    Raises:
+        ValueError: If the file has another baseline version
+    """
+    if not os.path.exists(path):
+        return {'version': BASELINE_VERSION, 'threshold_percent': DEFAULT_THRESHOLD,
+                'results': {}}
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path} is not a version {BASELINE_VERSION} benchmark baseline")
+    return baseline
+
+
+def update_baseline(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a run into the baseline; benchmarks not run keep their entries.
+
+    Returns:
+        Updated baseline, with benchmarks in report order
+    """
+    results = {**baseline.get('results', {}), **current['results']}
+    order = [case.name for case in benchmarks()]
+    results = {name: results[name] for name in sorted(
+        results, key=lambda name: order.index(name) if name in order else len(order))}
+    return {
+        'version': BASELINE_VERSION,
+        'threshold_percent': baseline.get('threshold_percent', DEFAULT_THRESHOLD),
+        'recorded': {
+            'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git': _git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'calibration_ns': current['calibration_ns'],
+        },
+        'results': results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Hot path micro-benchmarks with regression thresholds")
+    parser.add_argument("-k", dest="filter", default=None,
+                        help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Allowed slowdown in percent (default: the baseline's "
+                             f"threshold_percent, else {DEFAULT_THRESHOLD:g})")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record this run as the baseline instead of comparing")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help="Minimum seconds per sample")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Samples per benchmark (the best one counts)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Times a regressed benchmark is measured again before failing")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    names = [case.name for case in benchmarks()
+             if args.filter is None or args.filter in case.name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print(f"No benchmark matches {args.filter!r}")
+        return 2
+
+    baseline = load_baseline(args.baseline)
+    width = max(len(name) for name in names)
+
+    def progress(name: str, ns: float) -> None:
+        if args.update_baseline:
+            print(f"{name:<{width}}  {ns / 1000:>11.1f} us")
+
+    current = run_benchmarks(names, args.min_time, args.repeat, progress)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(update_baseline(baseline, current), f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    threshold = (args.threshold if args.threshold is not None
+                 else baseline.get('threshold_percent', DEFAULT_THRESHOLD))
+    rows = compare(baseline, current, threshold)
+    for _ in range(args.retries):
+        regressed = [name for name, _, status in rows if status == "REGRESSED"]
+        if not regressed:
+            break
+        print(f"Measuring {len(regressed)} regressed benchmark(s) again")
+        current = keep_best(current, run_benchmarks(regressed, args.min_time, args.repeat))
+        rows = compare(baseline, current, threshold)
+    print(f"{'benchmark':<{width}}  {'time':>14}  {'change':>8}  status")
+    for name, change, status in rows:
+        shown = f"{change:+7.1f}%" if change is not None else f"{'-':>8}"
+        print(f"{name:<{width}}  {current['results'][name]['ns'] / 1000:>11.1f} us  "
+              f"{shown}  {status}")
+    regressed = [name for name, _, status in rows if status == "REGRESSED"]
+    print(f"\nCalibration {current['calibration_ns'] / 1000:.1f} us; changes are in "
+          f"calibration-relative cost, threshold {threshold:g}%")
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) regressed by more than {threshold:g}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
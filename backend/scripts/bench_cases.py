@@ -0,0 +1,336 @@
+"""
+Benchmark definitions for scripts/bench.py: seeded fixtures and the cases.
+
+Fixtures model a BTCUSDT-like market (order books, deltas, trades and
+liquidations) built from one seed, so every run times the same work. Each
+Benchmark's setup builds its fixtures on the benchmark event loop and
+returns run(n), which performs the timed step n times.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from app.core.config import settings
+from app.models.depth_index import DepthIndex
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.wall_index import WallIndex
+from app.services.formatting_service import formatting_service
+from app.services.liquidation_service import LiquidationService
+from app.services.orderbook_aggregation_service import OrderBookAggregationService
+from app.services.trade_service import TradeService
+
+# Fixtures: a BTCUSDT-like market around 50000 with a 0.1 tick
+SEED = 1337
+SYMBOL = "BTCUSDT"
+SYMBOL_INFO = {'symbol': SYMBOL, 'pricePrecision': 1, 'amountPrecision': 3,
+               'baseAsset': 'BTC', 'roundingOptions': [0.1, 1.0, 10.0, 100.0]}
+MID_PRICE = 50000.0
+TICK = 0.1
+TIMESTAMP_MS = 1_700_000_000_000
+BOOK_LEVELS = 5000  # Per side, for the aggregation books
+SNAPSHOT_LEVELS = 1000
+DELTA_CHANGES = 20  # Per side
+BATCH = 1000  # Values per formatting call, trades per trade batch
+LIQUIDATIONS = 10_000  # Spread over one day
+AGGREGATIONS = ((20, 0.1), (20, 10.0), (100, 1.0), (500, 0.1))
+
+Runner = Callable[[int], Any]
+
+
+class Benchmark(NamedTuple):
+    """A named benchmark; setup builds its fixtures and returns run(n)."""
+
+    name: str
+    setup: Callable[[asyncio.AbstractEventLoop], Runner]
+
+
+def _amount(rng: random.Random) -> float:
+    return round(rng.expovariate(0.5) + 0.001, 3)
+
+
+def _levels(rng: random.Random, count: int,
+            shift: int = 0) -> Tuple[List[OrderBookLevel], List[OrderBookLevel]]:
+    """Bid and ask levels around MID_PRICE, one tick apart."""
+    bids = [OrderBookLevel(round(MID_PRICE - TICK * (i + 1 + shift), 1), _amount(rng))
+            for i in range(count)]
+    asks = [OrderBookLevel(round(MID_PRICE + TICK * (i + shift), 1), _amount(rng))
+            for i in range(count)]
+    return bids, asks
+
+
+def _snapshot(rng: random.Random, count: int, shift: int = 0) -> OrderBookSnapshot:
+    bids, asks = _levels(rng, count, shift)
+    return OrderBookSnapshot(SYMBOL, bids, asks, TIMESTAMP_MS)
+
+
+def _deltas(rng: random.Random, count: int) -> List[Tuple[List[OrderBookLevel], List[OrderBookLevel]]]:
+    """Delta updates near the top of the book; about one change in ten removes a level."""
+    def side(sign: float, start: float) -> List[OrderBookLevel]:
+        return [OrderBookLevel(round(start + sign * TICK * rng.randrange(200), 1),
+                               0.0 if rng.random() < 0.1 else _amount(rng))
+                for _ in range(DELTA_CHANGES)]
+    return [(side(-1, MID_PRICE - TICK), side(1, MID_PRICE)) for _ in range(count)]
+
+
+def _book(pyramid: bool = False, indexed: bool = False) -> OrderBook:
+    """
+    Empty order book, optionally with the indexes the manager maintains.
+
+    Args:
+        pyramid: Maintain an aggregation pyramid over SYMBOL_INFO's roundings
+        indexed: Also maintain a depth index and a wall index
+    """
+    book = OrderBook(SYMBOL)
+    if pyramid or indexed:
+        book.set_pyramid_roundings(SYMBOL_INFO['roundingOptions'])
+    if indexed:
+        book.set_depth_index(DepthIndex(
+            TICK, settings.ORDERBOOK_DEPTH_BANDS, settings.ORDERBOOK_DEPTH_SWEEP_NOTIONALS,
+            settings.ORDERBOOK_DEPTH_INDEX_WIDTH))
+        book.set_wall_index(WallIndex(
+            settings.ORDERBOOK_WALLS_TOP_K, settings.ORDERBOOK_WALLS_MIN_Z_SCORE))
+    return book
+
+
+def _raw_trades(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    return [{'id': str(1_000_000 + i),
+             'price': round(MID_PRICE + TICK * rng.randint(-500, 500), 1),
+             'amount': _amount(rng),
+             'side': rng.choice(('buy', 'sell')),
+             'timestamp': TIMESTAMP_MS + i * 50}
+            for i in range(count)]
+
+
+def _liquidations(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    day_ms = 24 * 60 * 60 * 1000
+    return [{'timestamp': TIMESTAMP_MS + int(day_ms * i / count),
+             'side': rng.choice(('buy', 'sell')),
+             'cumulated_usd_size': round(rng.expovariate(1 / 20000), 2)}
+            for i in range(count)]
+
+
+def _run_async(loop: asyncio.AbstractEventLoop, step: Callable[[], Any]) -> Runner:
+    """run(n) awaiting step() n times on the benchmark event loop."""
+    async def batch(n: int) -> None:
+        for _ in range(n):
+            await step()
+    return lambda n: loop.run_until_complete(batch(n))
+
+
+def _run_sync(step: Callable[[], Any]) -> Runner:
+    def run(n: int) -> None:
+        for _ in range(n):
+            step()
+    return run
+
+
+def _setup_snapshot(indexed: bool) -> Callable[[asyncio.AbstractEventLoop], Runner]:
+    def setup(loop: asyncio.AbstractEventLoop) -> Runner:
+        rng = random.Random(SEED)
+        book = _book(indexed=indexed)
+        # Reason: alternating two snapshots (shifted by a few ticks) makes
+        # every update replace the book instead of rewriting identical levels.
+        snapshots = itertools.cycle([_snapshot(rng, SNAPSHOT_LEVELS),
+                                     _snapshot(rng, SNAPSHOT_LEVELS, shift=3)])
+        return _run_async(loop, lambda: book.update_snapshot(next(snapshots)))
+    return setup
+
+
+def _setup_delta(indexed: bool) -> Callable[[asyncio.AbstractEventLoop], Runner]:
+    def setup(loop: asyncio.AbstractEventLoop) -> Runner:
+        rng = random.Random(SEED)
+        book = _book(indexed=indexed)
+        loop.run_until_complete(book.update_snapshot(_snapshot(rng, SNAPSHOT_LEVELS)))
+        deltas = itertools.cycle(_deltas(rng, 500))
+
+        def step():
+            bids, asks = next(deltas)
+            return book.update_delta(bids, asks, TIMESTAMP_MS)
+        return _run_async(loop, step)
+    return setup
+
+
+def _setup_aggregation(limit: int, rounding: float,
+                       pyramid: bool) -> Callable[[asyncio.AbstractEventLoop], Runner]:
+    def setup(loop: asyncio.AbstractEventLoop) -> Runner:
+        book = _book(pyramid=pyramid)
+        loop.run_until_complete(book.update_snapshot(
+            _snapshot(random.Random(SEED), BOOK_LEVELS)))
+        service = OrderBookAggregationService()
+
+        def step():
+            # Measure the aggregation itself, not the per-version cache hit
+            service._cache.clear()
+            return service.aggregate_orderbook(book, limit, rounding, SYMBOL_INFO)
+        return _run_async(loop, step)
+    return setup
+
+
+def _formatting_values() -> Tuple[List[float], List[float], List[float]]:
+    rng = random.Random(SEED)
+    prices = [MID_PRICE + TICK * rng.randint(-5000, 5000) for _ in range(BATCH)]
+    amounts = [_amount(rng) for _ in range(BATCH)]
+    totals = list(itertools.accumulate(amounts))
+    return prices, amounts, totals
+
+
+def _setup_format_scalar(method: str) -> Callable[[asyncio.AbstractEventLoop], Runner]:
+    def setup(loop: asyncio.AbstractEventLoop) -> Runner:
+        prices, amounts, totals = _formatting_values()
+        if method == 'format_price':
+            return _run_sync(lambda: [formatting_service.format_price(value, SYMBOL_INFO, 1.0)
+                                      for value in prices])
+        values = amounts if method == 'format_amount' else totals
+        format_value = getattr(formatting_service, method)
+        return _run_sync(lambda: [format_value(value, SYMBOL_INFO) for value in values])
+    return setup
+
+
+def _setup_format_column(method: str) -> Callable[[asyncio.AbstractEventLoop], Runner]:
+    def setup(loop: asyncio.AbstractEventLoop) -> Runner:
+        prices, amounts, totals = _formatting_values()
+        if method == 'format_price_column':
+            return _run_sync(lambda: formatting_service.format_price_column(
+                prices, SYMBOL_INFO, 1.0))
+        values = amounts if method == 'format_amount_column' else totals
+        format_column = getattr(formatting_service, method)
+        return _run_sync(lambda: format_column(values, SYMBOL_INFO))
+    return setup
+
+
+def _setup_format_level(loop: asyncio.AbstractEventLoop) -> Runner:
+    prices, amounts, totals = _formatting_values()
+    levels = [{'price': price, 'amount': amount, 'cumulative': total}
+              for price, amount, total in zip(prices, amounts, totals)]
+    return _run_sync(lambda: [formatting_service.format_orderbook_level(level, SYMBOL_INFO)
+                              for level in levels])
+
+
+def _setup_get_formatter(loop: asyncio.AbstractEventLoop) -> Runner:
+    roundings = SYMBOL_INFO['roundingOptions'] * (BATCH // 4)
+    return _run_sync(lambda: [formatting_service.get_formatter(SYMBOL_INFO, rounding)
+                              for rounding in roundings])
+
+
+def _setup_liquidations(timeframe: str) -> Callable[[asyncio.AbstractEventLoop], Runner]:
+    def setup(loop: asyncio.AbstractEventLoop) -> Runner:
+        service = LiquidationService()
+        service.symbol_info_cache[SYMBOL] = SYMBOL_INFO
+        liquidations = _liquidations(random.Random(SEED), LIQUIDATIONS)
+        return _run_async(loop, lambda: service.aggregate_liquidations_for_timeframe(
+            liquidations, timeframe, SYMBOL))
+    return setup
+
+
+def _setup_format_trade(loop: asyncio.AbstractEventLoop) -> Runner:
+    service = TradeService()
+    trades = _raw_trades(random.Random(SEED), BATCH)
+    return _run_sync(lambda: [service.format_trade(trade, SYMBOL_INFO) for trade in trades])
+
+
+def _orderbook_message(loop: asyncio.AbstractEventLoop, limit: int, raw: bool) -> Dict[str, Any]:
+    """An orderbook_update as connection_manager sends it."""
+    book = _book()
+    loop.run_until_complete(book.update_snapshot(_snapshot(random.Random(SEED), BOOK_LEVELS)))
+    aggregated = loop.run_until_complete(OrderBookAggregationService().aggregate_orderbook(
+        book, limit, 0.1, SYMBOL_INFO, formatted=not raw))
+    bids, asks = aggregated['bids'], aggregated['asks']
+    if raw:
+        bids = [[level['price'], level['amount'], level['cumulative']] for level in bids]
+        asks = [[level['price'], level['amount'], level['cumulative']] for level in asks]
+    message = {
+        "type": "orderbook_update",
+        "symbol": SYMBOL,
+        "bids": bids,
+        "asks": asks,
+        "timestamp": aggregated['timestamp'],
+        "rounding": aggregated['rounding'],
+        "rounding_options": SYMBOL_INFO['roundingOptions'],
+        "market_depth_info": aggregated['market_depth_info'],
+        "aggregated": True,
+    }
+    if raw:
+        message["raw"] = True
+    return message
+
+
+def _trades_message(raw: bool) -> Dict[str, Any]:
+    """A 100-trade trades_update as the trades stream sends it."""
+    service = TradeService()
+    trades = service.format_trades(_raw_trades(random.Random(SEED), 100), SYMBOL_INFO)
+    message = {"type": "trades_update", "symbol": SYMBOL, "initial": False,
+               "timestamp": TIMESTAMP_MS}
+    if raw:
+        message["trades"] = service.compact_trades(trades)
+        message["raw"] = True
+    else:
+        message["trades"] = trades
+    return message
+
+
+def _liquidation_message() -> Dict[str, Any]:
+    raw = {'E': TIMESTAMP_MS, 'o': {'s': SYMBOL, 'S': 'SELL', 'z': '0.482', 'ap': '50012.3'}}
+    return {"type": "liquidation_order", "symbol": SYMBOL,
+            "data": LiquidationService().format_liquidation_data(raw, SYMBOL, SYMBOL_INFO),
+            "timestamp": "2023-11-14T22:13:20"}
+
+
+def _candle_message() -> Dict[str, Any]:
+    return {"type": "candle_update", "symbol": SYMBOL, "timeframe": "1m",
+            "timestamp": TIMESTAMP_MS, "time": TIMESTAMP_MS // 1000, "open": 49995.2,
+            "high": 50021.7, "low": 49988.1, "close": 50012.3, "volume": 125.754}
+
+
+def _setup_json(build: Callable[[asyncio.AbstractEventLoop], Dict[str, Any]]
+                ) -> Callable[[asyncio.AbstractEventLoop], Runner]:
+    def setup(loop: asyncio.AbstractEventLoop) -> Runner:
+        message = build(loop)
+        return _run_sync(lambda: json.dumps(message))
+    return setup
+
+
+def benchmarks() -> List[Benchmark]:
+    """All benchmarks, in report order."""
+    cases = []
+    for indexed, label in ((False, ""), (True, ", indexed")):
+        cases.append(Benchmark(f"orderbook.update_snapshot[{SNAPSHOT_LEVELS} levels{label}]",
+                               _setup_snapshot(indexed)))
+        cases.append(Benchmark(f"orderbook.update_delta[{DELTA_CHANGES}x2 changes{label}]",
+                               _setup_delta(indexed)))
+    for pyramid, label in ((False, "walk"), (True, "pyramid")):
+        for limit, rounding in AGGREGATIONS:
+            cases.append(Benchmark(
+                f"aggregation.aggregate_orderbook[{label}, limit={limit}, rounding={rounding:g}]",
+                _setup_aggregation(limit, rounding, pyramid)))
+    for method in ('format_price', 'format_amount', 'format_total'):
+        cases.append(Benchmark(f"formatting.{method}[{BATCH} values]",
+                               _setup_format_scalar(method)))
+    for method in ('format_price_column', 'format_amount_column', 'format_total_column'):
+        cases.append(Benchmark(f"formatting.{method}[{BATCH} values]",
+                               _setup_format_column(method)))
+    cases.append(Benchmark(f"formatting.format_orderbook_level[{BATCH} levels]",
+                           _setup_format_level))
+    cases.append(Benchmark(f"formatting.get_formatter[{BATCH} calls]", _setup_get_formatter))
+    for timeframe in ('1m', '1h'):
+        cases.append(Benchmark(
+            f"liquidations.aggregate_liquidations_for_timeframe[{LIQUIDATIONS} orders, {timeframe}]",
+            _setup_liquidations(timeframe)))
+    cases.append(Benchmark(f"trades.format_trade[{BATCH} trades]", _setup_format_trade))
+    cases.extend([
+        Benchmark("json.orderbook_update[20 levels]",
+                  _setup_json(lambda loop: _orderbook_message(loop, 20, raw=False))),
+        Benchmark("json.orderbook_update[500 levels]",
+                  _setup_json(lambda loop: _orderbook_message(loop, 500, raw=False))),
+        Benchmark("json.orderbook_update[500 levels, raw]",
+                  _setup_json(lambda loop: _orderbook_message(loop, 500, raw=True))),
+        Benchmark("json.trades_update[100 trades]",
+                  _setup_json(lambda loop: _trades_message(raw=False))),
+        Benchmark("json.trades_update[100 trades, raw]",
+                  _setup_json(lambda loop: _trades_message(raw=True))),
+        Benchmark("json.liquidation_order", _setup_json(lambda loop: _liquidation_message())),
+        Benchmark("json.candle_update", _setup_json(lambda loop: _candle_message())),
+    ])
+    return cases
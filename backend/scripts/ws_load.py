@@ -0,0 +1,446 @@
+"""
+End-to-end WebSocket load generator and latency harness.
+
+Starts the app (uvicorn) against the offline replay exchange
+(EXCHANGE_BACKEND=replay), opens many orderbook, trades, candles and
+liquidation WebSocket clients with varied limit, rounding, timeframe and
+raw-mode parameters, and records for a fixed measurement window:
+
+- latency: receive time minus the exchange timestamp carried in each
+  message (order book timestamp, newest trade, liquidation time), as
+  percentiles per stream. Candle updates carry no exchange time and only
+  count towards throughput.
+- throughput: messages and bytes per second per stream
+- server CPU and RSS, sampled once per second
+
+Clients run in several worker processes so the client side does not become
+the bottleneck; a worker busy for more than CLIENT_SATURATION of the window
+is flagged in the report, since its latencies then include its own backlog.
+
+The machine-readable JSON report can be compared across commits:
+
+    cd backend
+    python scripts/ws_load.py --clients 2000 --duration 60 --report before.json
+    python scripts/ws_load.py --clients 2000 --duration 60 --report after.json
+    python scripts/ws_load.py --compare before.json after.json
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from scripts.ws_load_client import (  # noqa: E402
+    STREAMS,
+    ClientSpec,
+    LatencyHistogram,
+    StreamStats,
+    raise_file_limit,
+    round_or_none,
+    worker_main,
+)
+
+# Bump whenever report fields or their meaning change
+REPORT_VERSION = 1
+
+DEFAULT_MIX = "orderbook=0.55,trades=0.2,candles=0.15,liquidations=0.1"
+DEFAULT_SYMBOLS = "BTCUSDT,ETHUSDT,SOLUSDT,XRPUSDT,DOGEUSDT"
+ORDERBOOK_LIMITS = (5, 10, 20, 50, 100, 500, 1000)
+CANDLE_TIMEFRAMES = ("1m", "5m", "15m", "1h")
+CONTAINER_WIDTHS = (400, 800, 1200, 1920)
+
+# Share of the window a client worker may be busy before it skews latency
+CLIENT_SATURATION = 0.9
+SERVER_START_TIMEOUT = 60.0
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'orderbook=0.6,trades=0.4' into normalized stream shares."""
+    shares = {}
+    for item in mix.split(","):
+        stream, _, share = item.partition("=")
+        stream = stream.strip()
+        if stream not in STREAMS:
+            raise ValueError(f"Unknown stream {stream!r} (expected one of {', '.join(STREAMS)})")
+        shares[stream] = float(share)
+    total = sum(shares.values())
+    if total <= 0:
+        raise ValueError("Stream shares must add up to more than 0")
+    return {stream: share / total for stream, share in shares.items()}
+
+
+def plan_clients(count: int, mix: Dict[str, float], symbols: List[Dict[str, Any]],
+                 raw_share: float, seed: int) -> List[ClientSpec]:
+    """
+    Deterministic client list for a run.
+
+    Args:
+        count: Number of clients
+        mix: Stream shares (see parse_mix)
+        symbols: Symbol records with 'id' and 'roundingOptions'
+        raw_share: Share of clients using raw-numbers mode
+        seed: Random seed for parameter choices
+
+    Returns:
+        Client specs, interleaved across streams
+    """
+    rng = random.Random(seed)
+    streams = list(mix)
+    weights = [mix[stream] for stream in streams]
+    clients = []
+    for _ in range(count):
+        stream = rng.choices(streams, weights)[0]
+        symbol = rng.choice(symbols)
+        raw = rng.random() < raw_share
+        if stream == "orderbook":
+            options = symbol.get("roundingOptions") or [0.01]
+            path = (f"/api/v1/ws/orderbook/{symbol['id']}?limit={rng.choice(ORDERBOOK_LIMITS)}"
+                    f"&rounding={rng.choice(options)}")
+        elif stream == "trades":
+            path = f"/api/v1/ws/trades/{symbol['id']}"
+        elif stream == "candles":
+            path = (f"/api/v1/ws/candles/{symbol['id']}/{rng.choice(CANDLE_TIMEFRAMES)}"
+                    f"?container_width={rng.choice(CONTAINER_WIDTHS)}")
+        else:
+            path = f"/api/v1/ws/liquidations/{symbol['id']}"
+        if raw and stream != "candles":
+            path += ("&" if "?" in path else "?") + "raw=true"
+        clients.append(ClientSpec(stream, path))
+    return clients
+
+
+class ServerMonitor:
+    """Samples server process CPU and RSS from a background thread."""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.samples: List[Tuple[float, float, float]] = []  # (time, cpu %, rss MB)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self.process.cpu_percent(None)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                processes = [self.process] + self.process.children(recursive=True)
+                cpu = sum(p.cpu_percent(None) for p in processes)
+                rss = sum(p.memory_info().rss for p in processes) / 1024 / 1024
+            except psutil.Error:
+                return
+            self.samples.append((time.time(), cpu, rss))
+
+    def summary(self, window: Tuple[float, float]) -> Dict[str, Any]:
+        inside = [(cpu, rss) for at, cpu, rss in self.samples
+                  if window[0] / 1000 <= at <= window[1] / 1000]
+        if not inside:
+            return {"samples": 0}
+        cpu = sorted(sample[0] for sample in inside)
+        rss = [sample[1] for sample in inside]
+        return {
+            "samples": len(inside),
+            "cpu_percent": {"mean": round_or_none(sum(cpu) / len(cpu), 1),
+                            "p95": round_or_none(cpu[min(len(cpu) - 1, math.ceil(len(cpu) * 0.95) - 1)], 1),
+                            "max": round_or_none(cpu[-1], 1)},
+            "rss_mb": {"start": round_or_none(rss[0], 1), "max": round_or_none(max(rss), 1),
+                       "end": round_or_none(rss[-1], 1)},
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get_json(url: str) -> Any:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_server(args: argparse.Namespace, port: int, log_path: str) -> subprocess.Popen:
+    """Start the app on the replay exchange and wait until it is healthy."""
+    env = {
+        **os.environ,
+        "EXCHANGE_BACKEND": "replay",
+        "EXCHANGE_REPLAY_SPEED": str(args.speed),
+        "EXCHANGE_REPLAY_CAPTURE_DIR": args.capture_dir or "",
+        "EXCHANGE_REPLAY_SYMBOLS": args.symbols,
+        # Reason: replayed markets and books must never become the warm
+        # start state of a real run
+        "SYMBOL_SNAPSHOT_PATH": "",
+        "ORDERBOOK_STATE_PATH": "",
+        "MARKET_CAPTURE": "false",
+        "TICKER_STREAM_ENABLED": "false",
+        "LOG_LEVEL": args.server_log_level,
+    }
+    for item in args.server_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+
+    os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+    log = open(log_path, "w")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited during startup, see {log_path}")
+        try:
+            _get_json(f"http://127.0.0.1:{port}/health")
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"Server not healthy after {SERVER_START_TIMEOUT:.0f}s, see {log_path}")
+
+
+def _git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def build_report(args: argparse.Namespace, results: List[Dict[str, Any]],
+                 server: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge worker results into the report."""
+    streams = {}
+    total_messages = total_bytes = total_connected = total_clients = 0
+    errors: Counter = Counter()
+    for stream in STREAMS:
+        merged = StreamStats()
+        for result in results:
+            state = result["streams"][stream]
+            merged.clients += state["clients"]
+            merged.connected += state["connected"]
+            merged.messages += state["messages"]
+            merged.bytes += state["bytes"]
+            merged.errors.update(state["errors"])
+            merged.latency.merge(LatencyHistogram.from_state(state["latency"]))
+        if merged.clients == 0:
+            continue
+        streams[stream] = {
+            "clients": merged.clients,
+            "connected": merged.connected,
+            "messages": merged.messages,
+            "messages_per_second": round_or_none(merged.messages / args.duration, 1),
+            "mb_per_second": round_or_none(merged.bytes / args.duration / 1024 / 1024, 3),
+            "latency_ms": merged.latency.summary(),
+            "errors": dict(merged.errors),
+        }
+        total_messages += merged.messages
+        total_bytes += merged.bytes
+        total_connected += merged.connected
+        total_clients += merged.clients
+        errors.update(merged.errors)
+
+    busy = [result["busy"] for result in results]
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_revision(),
+        "host": {"cpus": os.cpu_count(), "python": platform.python_version(),
+                 "platform": platform.platform()},
+        "config": {
+            "clients": args.clients, "duration": args.duration, "ramp": args.ramp,
+            "warmup": args.warmup, "mix": parse_mix(args.mix), "raw_share": args.raw_share,
+            "symbols": args.symbols.split(","), "speed": args.speed,
+            "source": "capture" if args.capture_dir else "synthetic",
+            "workers": args.workers, "seed": args.seed,
+        },
+        "totals": {
+            "clients": total_clients,
+            "connected": total_connected,
+            "messages_per_second": round_or_none(total_messages / args.duration, 1),
+            "mb_per_second": round_or_none(total_bytes / args.duration / 1024 / 1024, 3),
+            "errors": dict(errors),
+        },
+        "streams": streams,
+        "server": server,
+        "client": {"worker_busy_max": round_or_none(max(busy, default=0.0), 3),
+                   "saturated": any(b > CLIENT_SATURATION for b in busy)},
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one load test and return its report."""
+    raise_file_limit()
+    port = args.port or _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = start_server(args, port, args.server_log)
+    try:
+        available = {record["id"]: record for record in _get_json(f"{base}/api/v1/symbols")}
+        symbols = [available.get(symbol, {"id": symbol}) for symbol in args.symbols.split(",")]
+        clients = plan_clients(args.clients, parse_mix(args.mix), symbols,
+                               args.raw_share, args.seed)
+
+        start = time.time() + 1.0
+        window = ((start + args.ramp + args.warmup) * 1000,
+                  (start + args.ramp + args.warmup + args.duration) * 1000)
+        monitor = ServerMonitor(server.pid)
+        monitor.start()
+
+        context = multiprocessing.get_context("spawn")
+        results_queue = context.Queue()
+        workers = [context.Process(target=worker_main, daemon=True, args=(
+            clients[i::args.workers], f"ws://127.0.0.1:{port}", start, args.ramp,
+            window, results_queue)) for i in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        print(f"{args.clients} clients on {args.workers} workers, measuring "
+              f"{args.duration:.0f}s after {args.ramp:.0f}s ramp and {args.warmup:.0f}s warmup")
+        results = [results_queue.get(timeout=window[1] / 1000 - time.time() + 120)
+                   for _ in workers]
+        for worker in workers:
+            worker.join()
+        monitor.stop()
+        return build_report(args, results, monitor.summary(window))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def _metrics(report: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Flatten the metrics worth comparing."""
+    metrics = {"total msgs/s": report["totals"]["messages_per_second"]}
+    for stream, stats in report["streams"].items():
+        metrics[f"{stream} msgs/s"] = stats["messages_per_second"]
+        for key in ("p50", "p99", "p99.9"):
+            metrics[f"{stream} latency {key} ms"] = stats["latency_ms"].get(key)
+    server = report.get("server", {})
+    if server.get("samples"):
+        metrics["server cpu mean %"] = server["cpu_percent"]["mean"]
+        metrics["server rss max MB"] = server["rss_mb"]["max"]
+    return metrics
+
+
+def compare_reports(base: Dict[str, Any], new: Dict[str, Any]) -> List[Tuple[str, Any, Any, Optional[float]]]:
+    """
+    Compare two reports metric by metric.
+
+    Returns:
+        (metric, base value, new value, change in percent) rows
+    """
+    base_metrics = _metrics(base)
+    new_metrics = _metrics(new)
+    rows = []
+    for name in list(base_metrics) + [n for n in new_metrics if n not in base_metrics]:
+        old, value = base_metrics.get(name), new_metrics.get(name)
+        change = (value - old) / old * 100 if old and value is not None else None
+        rows.append((name, old, value, change))
+    return rows
+
+
+def _print_comparison(base_path: str, new_path: str) -> None:
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    if base["config"] != new["config"]:
+        print("warning: the reports were run with different configurations")
+    print(f"{'metric':<36}{'base':>12}{'new':>12}{'change':>10}")
+    for name, old, value, change in compare_reports(base, new):
+        shown = "" if change is None else f"{change:+.1f}%"
+        print(f"{name:<36}{'-' if old is None else old:>12}{'-' if value is None else value:>12}"
+              f"{shown:>10}")
+
+
+def _print_summary(report: Dict[str, Any]) -> None:
+    totals = report["totals"]
+    print(f"{totals['connected']}/{totals['clients']} connected, "
+          f"{totals['messages_per_second']} msgs/s, {totals['mb_per_second']} MB/s")
+    for stream, stats in report["streams"].items():
+        latency = stats["latency_ms"]
+        print(f"  {stream:<13}{stats['messages_per_second']:>10} msgs/s  "
+              f"p50 {latency['p50']} ms  p99 {latency['p99']} ms  max {latency['max']} ms")
+    server = report["server"]
+    if server.get("samples"):
+        print(f"  server cpu {server['cpu_percent']['mean']}% mean, "
+              f"rss {server['rss_mb']['max']} MB max")
+    if report["client"]["saturated"]:
+        print("warning: a client worker was saturated; add --workers or reduce --clients")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000, help="WebSocket clients")
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    parser.add_argument("--ramp", type=float, default=10.0, help="Seconds to open all clients")
+    parser.add_argument("--warmup", type=float, default=5.0,
+                        help="Seconds between the last client and the window")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Stream shares of the clients")
+    parser.add_argument("--raw-share", type=float, default=0.25,
+                        help="Share of clients in raw-numbers mode")
+    parser.add_argument("--symbols", default=DEFAULT_SYMBOLS, help="Comma-separated market ids")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed (1 = real time, N = N times faster, 0 = unpaced)")
+    parser.add_argument("--capture-dir", default="", help="Replay this market data capture")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Client worker processes")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for client parameters")
+    parser.add_argument("--port", type=int, default=0, help="Server port (free port if 0)")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra server environment (repeatable)")
+    parser.add_argument("--server-log-level", default="WARNING", help="Server LOG_LEVEL")
+    parser.add_argument("--server-log", default="data/ws_load_server.log",
+                        help="Server output file")
+    parser.add_argument("--report", default="data/ws_load_report.json", help="Report path")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="Compare two reports instead of running")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.compare:
+        _print_comparison(*args.compare)
+        return 0
+
+    report = run(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    _print_summary(report)
+    print(f"report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Client side of the WebSocket load harness (see ws_load.py).
+
+Worker processes open the planned WebSocket clients, read their streams
+and collect per-stream message counts, bytes, errors and latency, the
+receive time minus the exchange timestamp carried in each message. Latency
+goes into mergeable log-bucketed histograms, so worker results combine
+into exact report percentiles at about 1% resolution.
+"""
+
+import asyncio
+import json
+import math
+import resource
+import time
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import websockets
+
+STREAMS = ("orderbook", "trades", "candles", "liquidations")
+
+# Latency histogram resolution: bucket bounds grow by 1%
+HISTOGRAM_GROWTH = 1.01
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class ClientSpec(NamedTuple):
+    """One WebSocket client: its stream and request path."""
+
+    stream: str
+    path: str
+
+
+class LatencyHistogram:
+    """Mergeable log-bucketed latency histogram (about 1% resolution)."""
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Counter = Counter(counts or {})
+        self.count = sum(self.counts.values())
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @staticmethod
+    def bucket(latency_ms: float) -> int:
+        return int(math.log1p(max(0.0, latency_ms)) / math.log(HISTOGRAM_GROWTH))
+
+    @staticmethod
+    def upper_bound(bucket: int) -> float:
+        return math.expm1((bucket + 1) * math.log(HISTOGRAM_GROWTH))
+
+    def record(self, latency_ms: float) -> None:
+        self.counts[self.bucket(latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        if latency_ms > self.max_ms:
+            self.max_ms = latency_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Upper bound of the bucket holding the percentile (None if empty)."""
+        if self.count == 0:
+            return None
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.upper_bound(bucket), self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        result = {f"p{p:g}": round_or_none(self.percentile(p)) for p in PERCENTILES}
+        result["mean"] = round_or_none(self.total_ms / self.count) if self.count else None
+        result["max"] = round_or_none(self.max_ms) if self.count else None
+        result["count"] = self.count
+        return result
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"counts": dict(self.counts), "total_ms": self.total_ms, "max_ms": self.max_ms}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(state["counts"])
+        histogram.total_ms = state["total_ms"]
+        histogram.max_ms = state["max_ms"]
+        return histogram
+
+
+def round_or_none(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def message_latency(message: Dict[str, Any], received_ms: float) -> Optional[float]:
+    """
+    Receive time minus the exchange timestamp of a server message.
+
+    Args:
+        message: Decoded server message
+        received_ms: Client receive time (unix ms)
+
+    Returns:
+        Latency in ms, or None for messages without an exchange timestamp
+        (initial snapshots, candles, descriptors, errors)
+    """
+    kind = message.get("type")
+    if kind == "orderbook_update":
+        timestamp = message.get("timestamp")
+    elif kind == "trades_update" and not message.get("initial"):
+        trades = message.get("trades") or []
+        if not trades:
+            return None
+        # Raw mode rows are [id, price, amount, side, timestamp]
+        timestamp = max(trade[4] if isinstance(trade, list) else trade["timestamp"]
+                        for trade in trades)
+    elif kind == "liquidation_order" and isinstance(message.get("data"), dict):
+        timestamp = message["data"].get("timestamp")
+    else:
+        return None
+    return received_ms - timestamp if timestamp else None
+
+
+class StreamStats:
+    """Per-stream counters collected by a worker."""
+
+    def __init__(self):
+        self.clients = 0
+        self.connected = 0
+        self.messages = 0
+        self.bytes = 0
+        self.errors: Counter = Counter()
+        self.latency = LatencyHistogram()
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"clients": self.clients, "connected": self.connected,
+                "messages": self.messages, "bytes": self.bytes,
+                "errors": dict(self.errors), "latency": self.latency.to_state()}
+
+
+async def _run_client(spec: ClientSpec, url: str, window: Tuple[float, float],
+                      stats: StreamStats) -> None:
+    try:
+        async with websockets.connect(url + spec.path, max_size=None, open_timeout=30,
+                                      ping_interval=None, close_timeout=1) as websocket:
+            stats.connected += 1
+            while True:
+                text = await websocket.recv()
+                received_ms = time.time() * 1000
+                if received_ms < window[0]:
+                    continue
+                if received_ms >= window[1]:
+                    return
+                stats.messages += 1
+                stats.bytes += len(text)
+                latency = message_latency(json.loads(text), received_ms)
+                if latency is not None:
+                    stats.latency.record(latency)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        stats.errors[type(e).__name__] += 1
+
+
+async def _run_worker(clients: List[ClientSpec], url: str, start: float, ramp: float,
+                      window: Tuple[float, float]) -> Dict[str, Any]:
+    stats = {stream: StreamStats() for stream in STREAMS}
+    tasks = []
+    for index, spec in enumerate(clients):
+        # Reason: clients open evenly over the ramp, like users arriving,
+        # instead of a connection storm that measures accept() alone
+        delay = start + ramp * index / max(1, len(clients)) - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        stats[spec.stream].clients += 1
+        tasks.append(asyncio.create_task(_run_client(spec, url, window, stats[spec.stream])))
+
+    await asyncio.sleep(max(0.0, window[0] / 1000 - time.time()))
+    cpu_start = time.process_time()
+    await asyncio.sleep(max(0.0, window[1] / 1000 - time.time()))
+    busy = (time.process_time() - cpu_start) / ((window[1] - window[0]) / 1000)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {"streams": {stream: s.to_state() for stream, s in stats.items()},
+            "busy": busy}
+
+
+def worker_main(clients: List[ClientSpec], url: str, start: float, ramp: float,
+                window: Tuple[float, float], results: Any) -> None:
+    """Worker process entry point: run its clients and put the result on the queue."""
+    raise_file_limit()
+    results.put(asyncio.run(_run_worker(clients, url, start, ramp, window)))
+
+
+def raise_file_limit() -> None:
+    """Allow as many sockets as the hard limit permits."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
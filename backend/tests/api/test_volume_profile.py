@@ -0,0 +1,66 @@
+"""
+Tests for Volume Profile API endpoints
+
+Tests the REST API endpoint serving volume-by-price histograms.
+"""
+
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from app.main import app
+from app.services.volume_profile_service import VolumeProfileService
+
+client = TestClient(app)
+
+SYMBOL_INFO = {'pricePrecision': 1, 'amountPrecision': 3}
+
+
+class TestVolumeProfileAPI:
+    """Test suite for volume profile API endpoint"""
+
+    def _service_with_trades(self):
+        service = VolumeProfileService()
+        service.record_trades('BTCUSDT', [
+            {'price': 100.1, 'amount': 1.0, 'side': 'buy', 'timestamp': 1704067200000},
+            {'price': 100.7, 'amount': 2.0, 'side': 'sell', 'timestamp': 1704067201000},
+        ], SYMBOL_INFO)
+        return service
+
+    def test_get_volume_profile_success(self):
+        """Test histogram is returned at the requested rounding"""
+        with patch('app.api.v1.endpoints.volume_profile.volume_profile_service',
+                   self._service_with_trades()), \
+             patch('app.api.v1.endpoints.volume_profile.symbol_service') as mock_symbols:
+            mock_symbols.resolve_symbol_to_exchange_format.return_value = 'BTCUSDT'
+            mock_symbols.get_symbol_info.return_value = SYMBOL_INFO
+
+            response = client.get("/api/v1/volume-profile/BTCUSDT?rounding=1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['symbol'] == 'BTCUSDT'
+        assert data['session'] == '2024-01-01'
+        assert len(data['data']) == 1
+        assert data['data'][0]['price'] == 100.0
+        assert data['data'][0]['total_volume'] == 3.0
+        assert data['point_of_control'] == 100.0
+
+    def test_get_volume_profile_unknown_symbol(self):
+        """Test unknown symbols are rejected"""
+        with patch('app.api.v1.endpoints.volume_profile.symbol_service') as mock_symbols:
+            mock_symbols.resolve_symbol_to_exchange_format.return_value = None
+
+            response = client.get("/api/v1/volume-profile/NOPEUSDT")
+
+        assert response.status_code == 400
+
+    def test_get_volume_profile_invalid_rounding(self):
+        """Test rounding that is not a multiple of the tick size is rejected"""
+        with patch('app.api.v1.endpoints.volume_profile.volume_profile_service',
+                   self._service_with_trades()), \
+             patch('app.api.v1.endpoints.volume_profile.symbol_service') as mock_symbols:
+            mock_symbols.resolve_symbol_to_exchange_format.return_value = 'BTCUSDT'
+            mock_symbols.get_symbol_info.return_value = SYMBOL_INFO
+
+            response = client.get("/api/v1/volume-profile/BTCUSDT?rounding=0.25")
+
+        assert response.status_code == 400
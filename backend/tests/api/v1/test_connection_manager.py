@@ -464,6 +464,202 @@ class TestConnectionManagerFormattedFields:
             assert sent_data['asks'] == mock_aggregated_data['asks']
 
 
+class TestConnectionManagerRawMode:
+    """Test cases for raw-numbers mode (client-side formatting)."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.connection_manager = ConnectionManager()
+
+    @pytest.mark.asyncio
+    async def test_connect_orderbook_raw_sends_descriptor_first(self):
+        """Raw orderbook connections receive the formatting descriptor before any update."""
+        mock_websocket = AsyncMock()
+        self.connection_manager.connect = AsyncMock()
+        symbol_data = {'pricePrecision': 1, 'amountPrecision': 3}
+
+        with patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_orderbook_manager:
+            mock_orderbook_manager.register_connection = AsyncMock()
+            mock_orderbook_manager.get_symbol_data = AsyncMock(return_value=symbol_data)
+
+            await self.connection_manager.connect_orderbook(
+                mock_websocket, "BTC/USDT", "BTCUSDT", 20, 10.0, raw=True)
+
+            mock_orderbook_manager.register_connection.assert_called_once_with(
+                f"BTC/USDT:{id(mock_websocket)}", "BTC/USDT", 20, 10.0, raw=True)
+
+        message = json.loads(mock_websocket.send_text.call_args[0][0])
+        assert message['type'] == 'format_descriptor'
+        assert message['symbol'] == 'BTCUSDT'
+        assert message['descriptor']['price']['decimals'] == 0
+        assert message['descriptor']['amount']['decimals'] == 3
+        self.connection_manager.connect.assert_called_once_with(
+            mock_websocket, "BTC/USDT", "orderbook", "BTCUSDT", raw=True)
+
+    @pytest.mark.asyncio
+    async def test_broadcast_aggregated_orderbook_raw_levels(self):
+        """Raw connections receive compact [price, amount, cumulative] levels."""
+        mock_websocket = AsyncMock()
+        connection_id = "BTCUSDT:raw"
+        self.connection_manager._connection_metadata = {
+            connection_id: {
+                'websocket': mock_websocket,
+                'symbol': 'BTCUSDT',
+                'display_symbol': 'BTCUSDT',
+                'raw': True
+            }
+        }
+        aggregated_data = {
+            'symbol': 'BTCUSDT',
+            'bids': [{'price': 50000.0, 'amount': 1.5, 'cumulative': 1.5}],
+            'asks': [{'price': 50001.0, 'amount': 2.0, 'cumulative': 2.0}],
+            'timestamp': 1640995200000,
+            'rounding': 1.0
+        }
+
+        with patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_orderbook_manager:
+            mock_orderbook_manager.get_aggregated_orderbook = AsyncMock(return_value=aggregated_data)
+            await self.connection_manager._broadcast_aggregated_orderbook(connection_id)
+
+        sent_data = json.loads(mock_websocket.send_text.call_args[0][0])
+        assert sent_data['raw'] is True
+        assert sent_data['bids'] == [[50000.0, 1.5, 1.5]]
+        assert sent_data['asks'] == [[50001.0, 2.0, 2.0]]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_aggregated_orderbook_includes_index_metrics(self):
+        """Depth and wall index metrics from the manager ship with the update."""
+        connection_id = "BTCUSDT:depth"
+        mock_websocket = AsyncMock()
+        self.connection_manager._connection_metadata = {
+            connection_id: {'websocket': mock_websocket, 'display_symbol': 'BTCUSDT'}
+        }
+        depth = {'mid': 50000.5, 'step': 0.1, 'bands': [], 'sweeps': []}
+        walls = {'bids': [{'price': 49000.0, 'amount': 80.0, 'z_score': 6.5}], 'asks': []}
+        aggregated_data = {
+            'symbol': 'BTCUSDT',
+            'bids': [{'price': 50000.0, 'amount': 1.5, 'cumulative': 1.5}],
+            'asks': [{'price': 50001.0, 'amount': 2.0, 'cumulative': 2.0}],
+            'timestamp': 1640995200000,
+            'rounding': 1.0,
+            'depth': depth,
+            'walls': walls
+        }
+
+        with patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_orderbook_manager:
+            mock_orderbook_manager.get_aggregated_orderbook = AsyncMock(return_value=aggregated_data)
+            await self.connection_manager._broadcast_aggregated_orderbook(connection_id)
+
+        sent_data = json.loads(mock_websocket.send_text.call_args[0][0])
+        assert sent_data['depth'] == depth
+        assert sent_data['walls'] == walls
+
+    @pytest.mark.asyncio
+    async def test_broadcast_to_stream_routes_raw_payload(self):
+        """Raw connections get raw_data, others get data; each payload is serialized once."""
+        formatted_ws = AsyncMock()
+        raw_ws = AsyncMock()
+        stream_key = "BTCUSDT:trades"
+        self.connection_manager.active_connections[stream_key] = [formatted_ws, raw_ws]
+        self.connection_manager.raw_connections.add(id(raw_ws))
+
+        assert self.connection_manager.has_formatted_connections(stream_key)
+
+        with patch('app.api.v1.endpoints.connection_manager.json.dumps',
+                   wraps=json.dumps) as mock_dumps:
+            await self.connection_manager.broadcast_to_stream(
+                stream_key, {"trades": "formatted"}, {"trades": "raw"})
+            assert mock_dumps.call_count == 2
+
+        assert json.loads(formatted_ws.send_text.call_args[0][0]) == {"trades": "formatted"}
+        assert json.loads(raw_ws.send_text.call_args[0][0]) == {"trades": "raw"}
+
+        self.connection_manager.active_connections[stream_key].remove(formatted_ws)
+        assert not self.connection_manager.has_formatted_connections(stream_key)
+
+    def test_disconnect_clears_raw_flag(self):
+        """Disconnecting a raw connection forgets its raw flag."""
+        raw_ws = AsyncMock()
+        stream_key = "BTCUSDT:trades"
+        self.connection_manager.active_connections[stream_key] = [raw_ws]
+        self.connection_manager.stream_key_types[stream_key] = "trades"
+        self.connection_manager.raw_connections.add(id(raw_ws))
+
+        self.connection_manager.disconnect(raw_ws, stream_key)
+
+        assert not self.connection_manager.is_raw(raw_ws)
+
+
+class TestConnectionManagerKeepWarm:
+    """Test keeping orderbook streams warm after the last client leaves."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.connection_manager = ConnectionManager()
+
+    async def _running_stream(self, symbol):
+        """Register one orderbook client with a live placeholder stream task."""
+        websocket = AsyncMock()
+        task = asyncio.create_task(asyncio.sleep(10))
+        self.connection_manager.active_connections[symbol] = [websocket]
+        self.connection_manager.stream_key_types[symbol] = "orderbook"
+        self.connection_manager.symbol_active_streams[symbol] = {symbol}
+        self.connection_manager.streaming_tasks[symbol] = task
+        return websocket, task
+
+    @pytest.mark.asyncio
+    async def test_last_disconnect_keeps_warm_stream_running(self):
+        """The stream keeps running while the manager keeps the book warm."""
+        websocket, task = await self._running_stream("BTCUSDT")
+
+        with patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_orderbook_manager:
+            mock_orderbook_manager.is_warm.return_value = True
+            self.connection_manager.disconnect(websocket, "BTCUSDT")
+
+        assert "BTCUSDT" in self.connection_manager.warm_streams
+        assert self.connection_manager.streaming_tasks["BTCUSDT"] is task
+        assert self.connection_manager._orderbook_stream_active("BTCUSDT")
+        await asyncio.sleep(0)
+        assert not task.cancelled()
+
+        # The book is evicted: the stream stops
+        self.connection_manager.release_warm_stream("BTCUSDT")
+        await asyncio.sleep(0)
+
+        assert "BTCUSDT" not in self.connection_manager.warm_streams
+        assert "BTCUSDT" not in self.connection_manager.streaming_tasks
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_last_disconnect_stops_cold_stream(self):
+        """Without a warm book the stream stops immediately."""
+        websocket, task = await self._running_stream("BTCUSDT")
+
+        with patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_orderbook_manager:
+            mock_orderbook_manager.is_warm.return_value = False
+            self.connection_manager.disconnect(websocket, "BTCUSDT")
+
+        await asyncio.sleep(0)
+        assert "BTCUSDT" not in self.connection_manager.warm_streams
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_reconnect_reuses_warm_stream(self):
+        """A reconnect during the grace period reuses the running stream."""
+        websocket, task = await self._running_stream("BTCUSDT")
+        with patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_orderbook_manager:
+            mock_orderbook_manager.is_warm.return_value = True
+            self.connection_manager.disconnect(websocket, "BTCUSDT")
+
+        with patch.object(self.connection_manager, "_start_streaming") as mock_start_streaming:
+            await self.connection_manager.connect(AsyncMock(), "BTCUSDT", "orderbook")
+
+        mock_start_streaming.assert_not_called()
+        assert "BTCUSDT" not in self.connection_manager.warm_streams
+        assert self.connection_manager.streaming_tasks["BTCUSDT"] is task
+        task.cancel()
+
+
 class TestConnectionManagerRaceConditionFixes:
     """Test cases for race condition fixes in WebSocket connection management."""
     
@@ -0,0 +1,65 @@
+"""
+Unit tests for the liquidity heatmap WebSocket endpoint.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import WebSocketDisconnect
+
+from app.api.v1.endpoints.heatmap_ws import heatmap_stream
+from app.services.liquidity_heatmap_service import LiquidityHeatmapService
+
+
+class TestHeatmapWebSocket:
+    """Test heatmap WebSocket endpoint functionality."""
+
+    @pytest.mark.asyncio
+    @patch("app.api.v1.endpoints.heatmap_ws.symbol_service")
+    async def test_columns_are_batched_and_callback_removed(self, mock_symbol_service):
+        """Pending columns are sent together, pings answered, callback removed."""
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = "BTC/USDT:USDT"
+        service = LiquidityHeatmapService(MagicMock(), buckets=4, slices=10)
+        mock_websocket = AsyncMock()
+        mock_websocket.client_state.name = "CONNECTED"
+        received = asyncio.Event()
+        replies = iter(['{"type": "ping"}'])
+
+        async def receive_text():
+            reply = next(replies, None)
+            if reply is not None:
+                return reply
+            for second in range(2):
+                await service._notify_callbacks(
+                    "BTC/USDT:USDT", {'timestamp': second * 1000, 'amounts': [0.0] * 4})
+            await received.wait()
+            raise WebSocketDisconnect()
+
+        async def send_json(message):
+            if message["type"] == "heatmap_update":
+                received.set()
+
+        mock_websocket.receive_text.side_effect = receive_text
+        mock_websocket.send_json.side_effect = send_json
+
+        with patch("app.api.v1.endpoints.heatmap_ws.liquidity_heatmap_service", service):
+            await asyncio.wait_for(heatmap_stream(mock_websocket, "BTCUSDT"), timeout=2)
+
+        sent = [call.args[0] for call in mock_websocket.send_json.call_args_list]
+        assert {"type": "pong"} in sent
+        updates = [message for message in sent if message["type"] == "heatmap_update"]
+        assert updates[0]["symbol"] == "BTCUSDT"
+        assert [column['timestamp'] for column in updates[0]["columns"]] == [0, 1000]
+        assert service.callbacks == {}
+
+    @pytest.mark.asyncio
+    @patch("app.api.v1.endpoints.heatmap_ws.symbol_service")
+    async def test_unknown_symbol_closes(self, mock_symbol_service):
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = None
+        mock_websocket = AsyncMock()
+
+        await heatmap_stream(mock_websocket, "NOPE")
+
+        mock_websocket.close.assert_called_once()
+        assert "not found" in mock_websocket.send_text.call_args.args[0]
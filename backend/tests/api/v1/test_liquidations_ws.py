@@ -331,4 +331,71 @@ class TestLiquidationsWebSocket:
                                 assert data["data"] == []  # Empty when API fails
                                 
                                 # Verify API was attempted
-                                mock_fetch.assert_called_once()
\ No newline at end of file
+                                mock_fetch.assert_called_once()
+    @pytest.mark.asyncio
+    async def test_liquidation_websocket_raw_mode(self):
+        """Raw mode drops formatted strings and sends a formatting descriptor"""
+        client = TestClient(app)
+        
+        from app.api.v1.endpoints import liquidations_ws
+        liquidations_ws.liquidations_cache.clear()
+        liquidations_ws.historical_loaded.clear()
+        
+        mock_historical = [{
+            "symbol": "BTCUSDT",
+            "side": "SELL",
+            "quantity": "0.1",
+            "quantityFormatted": "0.100",
+            "priceUsdt": "4500.0",
+            "priceUsdtFormatted": "4,500",
+            "timestamp": 1609459200000,
+            "displayTime": "12:00:00"
+        }]
+        symbol_info = {'symbol': 'BTCUSDT', 'pricePrecision': 1, 'amountPrecision': 3}
+        
+        with patch('app.services.symbol_service.symbol_service.validate_symbol_exists', return_value=True):
+            with patch('app.services.symbol_service.symbol_service.resolve_symbol_to_exchange_format', return_value="BTCUSDT"):
+                with patch('app.services.symbol_service.symbol_service.get_symbol_info', return_value=symbol_info):
+                    with patch('app.services.liquidation_service.liquidation_service.fetch_historical_liquidations', 
+                               return_value=mock_historical):
+                        with patch('app.services.liquidation_service.liquidation_service.connect_to_liquidation_stream'):
+                            
+                            with client.websocket_connect("/api/v1/ws/liquidations/BTCUSDT?raw=true") as websocket:
+                                data = websocket.receive_json()
+                                
+                                assert data["raw"] is True
+                                assert data["descriptor"]["amount"]["decimals"] == 3
+                                assert data["data"] == [{
+                                    "symbol": "BTCUSDT",
+                                    "side": "SELL",
+                                    "quantity": "0.1",
+                                    "priceUsdt": "4500.0",
+                                    "timestamp": 1609459200000
+                                }]
+                            
+                            # The shared cache keeps the formatted rows for other clients
+                            with client.websocket_connect("/api/v1/ws/liquidations/BTCUSDT") as websocket:
+                                data = websocket.receive_json()
+                                assert data["data"][0]["priceUsdtFormatted"] == "4,500"
+                                assert "descriptor" not in data
+    
+    def test_volume_message_raw(self):
+        """Raw volume messages drop the *_volume_formatted strings"""
+        from app.api.v1.endpoints.liquidations_ws import _volume_message
+        
+        row = {
+            "time": 1609459200, "buy_volume": "10", "sell_volume": "5",
+            "total_volume": "15", "delta_volume": "5",
+            "buy_volume_formatted": "10.00", "sell_volume_formatted": "5.00",
+            "total_volume_formatted": "15.00", "delta_volume_formatted": "5.00",
+            "count": 2, "timestamp_ms": 1609459200000
+        }
+        
+        raw = _volume_message("BTCUSDT", "1m", [row], True, raw=True)
+        formatted = _volume_message("BTCUSDT", "1m", [row], True, raw=False)
+        
+        assert raw["type"] == formatted["type"] == "liquidation_volume"
+        assert raw["raw"] is True
+        assert "buy_volume_formatted" not in raw["data"][0]
+        assert formatted["data"][0]["buy_volume_formatted"] == "10.00"
+        assert raw["data"][0]["total_volume"] == formatted["data"][0]["total_volume"]
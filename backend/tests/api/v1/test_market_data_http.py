@@ -287,6 +287,96 @@ class TestOrderBookEndpoint:
         assert "Failed to fetch order book" in response.json()["detail"]
 
 
+class TestOrderBookDepthEndpoint:
+    """Test cases for the /api/v1/orderbook/{symbol}/depth endpoint."""
+
+    @patch("app.api.v1.endpoints.market_data_http.orderbook_manager")
+    @patch("app.api.v1.endpoints.market_data_http.symbol_service")
+    def test_get_depth_success(self, mock_symbol_service, mock_orderbook_manager):
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = "BTC/USDT:USDT"
+        mock_orderbook_manager.get_depth_metrics = AsyncMock(return_value={
+            'mid': 50000.05, 'step': 0.1,
+            'bands': [{'pct': 1.0, 'bid_amount': 3.0, 'ask_amount': 4.0,
+                       'bid_notional': 150000.0, 'ask_notional': 200000.0}],
+            'sweeps': [],
+        })
+
+        response = client.get("/api/v1/orderbook/BTCUSDT/depth?sweep=0.5,2")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["symbol"] == "BTCUSDT"
+        assert data["bands"][0]["ask_amount"] == 4.0
+        mock_orderbook_manager.get_depth_metrics.assert_called_once_with(
+            "BTC/USDT:USDT", [0.5, 2.0])
+
+    @patch("app.api.v1.endpoints.market_data_http.orderbook_manager")
+    @patch("app.api.v1.endpoints.market_data_http.symbol_service")
+    def test_get_depth_without_live_book(self, mock_symbol_service, mock_orderbook_manager):
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = "BTC/USDT:USDT"
+        mock_orderbook_manager.get_depth_metrics = AsyncMock(return_value=None)
+
+        response = client.get("/api/v1/orderbook/BTCUSDT/depth")
+
+        assert response.status_code == 404
+        mock_orderbook_manager.get_depth_metrics.assert_called_once_with("BTC/USDT:USDT", None)
+
+    @patch("app.api.v1.endpoints.market_data_http.symbol_service")
+    def test_get_depth_invalid_sweep(self, mock_symbol_service):
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = "BTC/USDT:USDT"
+
+        assert client.get("/api/v1/orderbook/BTCUSDT/depth?sweep=abc").status_code == 400
+        assert client.get("/api/v1/orderbook/BTCUSDT/depth?sweep=1,-2").status_code == 400
+
+    @patch("app.api.v1.endpoints.market_data_http.symbol_service")
+    def test_get_depth_unknown_symbol(self, mock_symbol_service):
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = None
+
+        assert client.get("/api/v1/orderbook/NOPE/depth").status_code == 404
+
+
+class TestOrderBookHeatmapEndpoint:
+    """Test cases for the /api/v1/orderbook/{symbol}/heatmap endpoint."""
+
+    def _heatmap(self):
+        from app.models.liquidity_heatmap import LiquidityHeatmap
+        heatmap = LiquidityHeatmap(buckets=4, slices=8, range_pct=2.0)
+        heatmap.first_index(100.0)
+        heatmap.append(1000, 100.0, 98, [1.0, 2.0, 3.0, 4.0])
+        heatmap.append(2000, 101.0, 99, [5.0, 6.0, 7.0, 8.0])
+        return heatmap
+
+    @patch("app.api.v1.endpoints.market_data_http.liquidity_heatmap_service")
+    @patch("app.api.v1.endpoints.market_data_http.symbol_service")
+    def test_get_heatmap_window(self, mock_symbol_service, mock_heatmap_service):
+        from app.models.liquidity_heatmap import HEATMAP_HEADER
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = "BTC/USDT:USDT"
+        mock_heatmap_service.get_heatmap.return_value = self._heatmap()
+
+        response = client.get("/api/v1/orderbook/BTCUSDT/heatmap?start=1500&low=100&high=101")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/octet-stream"
+        _, _, _, slices, buckets, step, first_index = HEATMAP_HEADER.unpack_from(response.content)
+        assert (slices, buckets, step, first_index) == (1, 2, 1.0, 100)
+        mock_heatmap_service.get_heatmap.assert_called_once_with("BTC/USDT:USDT")
+
+    @patch("app.api.v1.endpoints.market_data_http.liquidity_heatmap_service")
+    @patch("app.api.v1.endpoints.market_data_http.symbol_service")
+    def test_get_heatmap_errors(self, mock_symbol_service, mock_heatmap_service):
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = "BTC/USDT:USDT"
+        mock_heatmap_service.get_heatmap.return_value = self._heatmap()
+
+        assert client.get("/api/v1/orderbook/BTCUSDT/heatmap?low=101&high=100").status_code == 400
+        assert client.get("/api/v1/orderbook/BTCUSDT/heatmap?start=5000").status_code == 404
+
+        mock_heatmap_service.get_heatmap.return_value = None
+        assert client.get("/api/v1/orderbook/BTCUSDT/heatmap").status_code == 404
+
+        mock_symbol_service.resolve_symbol_to_exchange_format.return_value = None
+        assert client.get("/api/v1/orderbook/NOPE/heatmap").status_code == 404
+
+
 class TestCandlesEndpoint:
     """Test cases for the /api/v1/candles/{symbol} endpoint."""
 
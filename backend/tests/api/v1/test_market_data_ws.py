@@ -47,7 +47,7 @@ class TestWebSocketOrderbook:
             "BTCUSDT"
         )
         mock_connection_manager.connect_orderbook.assert_called_once_with(
-            mock_websocket, "BTC/USDT", "BTCUSDT", 20, 0.01
+            mock_websocket, "BTC/USDT", "BTCUSDT", 20, 0.01, raw=False
         )
         mock_connection_manager.disconnect_orderbook.assert_called_once_with(
             mock_websocket, "BTC/USDT"
@@ -432,7 +432,7 @@ class TestWebSocketIntegration:
 
             # Verify both connections were handled
             mock_connection_manager.connect_orderbook.assert_called_once_with(
-                mock_websocket1, "BTC/USDT", "BTCUSDT", 20, 0.01
+                mock_websocket1, "BTC/USDT", "BTCUSDT", 20, 0.01, raw=False
             )
             mock_connection_manager.connect.assert_called_once_with(
                 mock_websocket2, "ETH/USDT:1m", "candles", display_symbol="ETHUSDT"
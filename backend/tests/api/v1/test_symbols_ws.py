@@ -0,0 +1,65 @@
+"""
+Unit tests for the symbols WebSocket endpoint.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import WebSocketDisconnect
+
+from app.api.v1.endpoints.symbols_ws import symbols_stream
+from app.services.ticker_stream_service import TickerStreamService
+
+
+class TestSymbolsWebSocket:
+    """Test symbols WebSocket endpoint functionality."""
+
+    @pytest.mark.asyncio
+    @patch("app.api.v1.endpoints.symbols_ws.symbol_service")
+    async def test_snapshot_then_pong_and_cleanup(self, mock_symbol_service):
+        """Snapshot is sent first, pings are answered, callback is removed."""
+        mock_symbol_service.get_all_symbols.return_value = [{"id": "BTCUSDT"}]
+        stream = TickerStreamService(MagicMock(), base_url="wss://example")
+
+        mock_websocket = AsyncMock()
+        mock_websocket.receive_text.side_effect = ['{"type": "ping"}', WebSocketDisconnect()]
+
+        with patch("app.api.v1.endpoints.symbols_ws.ticker_stream_service", stream):
+            await symbols_stream(mock_websocket)
+
+        sent = [call.args[0] for call in mock_websocket.send_json.call_args_list]
+        assert sent[0]["type"] == "symbols_snapshot"
+        assert sent[0]["data"] == [{"id": "BTCUSDT"}]
+        assert {"type": "pong"} in sent
+        assert stream.callbacks == []
+
+    @pytest.mark.asyncio
+    @patch("app.api.v1.endpoints.symbols_ws.symbol_service")
+    async def test_changed_rows_are_coalesced(self, mock_symbol_service):
+        """Only the latest row per symbol is sent in an update."""
+        mock_symbol_service.get_all_symbols.return_value = []
+        stream = TickerStreamService(MagicMock(), base_url="wss://example")
+        mock_websocket = AsyncMock()
+        mock_websocket.client_state.name = "CONNECTED"
+        received = asyncio.Event()
+
+        async def receive_text():
+            await stream._notify_callbacks([{"id": "BTCUSDT", "volume24h": 1.0}])
+            await stream._notify_callbacks([{"id": "BTCUSDT", "volume24h": 2.0}])
+            await received.wait()
+            raise WebSocketDisconnect()
+
+        async def send_json(message):
+            if message["type"] == "symbols_update":
+                received.set()
+
+        mock_websocket.receive_text.side_effect = receive_text
+        mock_websocket.send_json.side_effect = send_json
+
+        with patch("app.api.v1.endpoints.symbols_ws.ticker_stream_service", stream):
+            await asyncio.wait_for(symbols_stream(mock_websocket), timeout=2)
+
+        updates = [call.args[0] for call in mock_websocket.send_json.call_args_list
+                   if call.args[0]["type"] == "symbols_update"]
+        assert updates[0]["data"] == [{"id": "BTCUSDT", "volume24h": 2.0}]
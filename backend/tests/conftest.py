@@ -11,6 +11,7 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel, Session
 
+from app.core.config import settings
 from app.core.database import get_session
 from app.models.bot import Bot
 
@@ -22,6 +23,17 @@ TEST_DATABASE_URL = os.getenv(
 TEST_ASYNC_DATABASE_URL = TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def no_orderbook_state_file():
+    """Keep order book managers from reading or writing the real state file."""
+    from app.services.orderbook_manager import orderbook_manager
+    # Reason: session scope so class-scoped fixtures building managers are covered too
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "ORDERBOOK_STATE_PATH", "")
+        monkeypatch.setattr(orderbook_manager, "_state_store", None)
+        yield
+
+
 @pytest_asyncio.fixture(scope="function")
 async def test_engine():
     """Create a test database engine."""
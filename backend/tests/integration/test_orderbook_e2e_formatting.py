@@ -19,6 +19,14 @@ from app.services.orderbook_manager import OrderBookManager
 from app.models.orderbook import OrderBook, OrderBookSnapshot, OrderBookLevel
 
 
+def _serve_levels(orderbook, snapshot):
+    """Serve a snapshot's levels through OrderBook.iter_levels on a mock book."""
+    orderbook.iter_levels = MagicMock(side_effect=lambda: (
+        iter(sorted(((level.price, level.amount) for level in snapshot.bids), reverse=True)),
+        iter(sorted((level.price, level.amount) for level in snapshot.asks))))
+    orderbook.pyramid = None
+
+
 class TestOrderBookE2EFormatting:
     """Test end-to-end order book formatting data flow."""
     
@@ -88,7 +96,7 @@ class TestOrderBookE2EFormatting:
         mock_orderbook = AsyncMock(spec=OrderBook)
         mock_orderbook.symbol = symbol
         mock_orderbook.timestamp = 1640995200000
-        mock_orderbook.get_snapshot.return_value = snapshot
+        _serve_levels(mock_orderbook, snapshot)
         
         # Test the aggregation service with formatting
         aggregated_result = await self.aggregation_service.aggregate_orderbook(
@@ -231,7 +239,7 @@ class TestOrderBookE2EFormatting:
         mock_orderbook = AsyncMock(spec=OrderBook)
         mock_orderbook.symbol = 'TESTUSDT'
         mock_orderbook.timestamp = 1640995200000
-        mock_orderbook.get_snapshot.return_value = snapshot
+        _serve_levels(mock_orderbook, snapshot)
         
         # Aggregate with formatting
         aggregated_result = await self.aggregation_service.aggregate_orderbook(
@@ -308,7 +316,7 @@ class TestOrderBookE2EFormatting:
         mock_orderbook = AsyncMock(spec=OrderBook)
         mock_orderbook.symbol = symbol
         mock_orderbook.timestamp = 1640995200000
-        mock_orderbook.get_snapshot.return_value = snapshot
+        _serve_levels(mock_orderbook, snapshot)
         
         # Test aggregation with invalid data - should not crash
         try:
@@ -362,7 +370,7 @@ class TestOrderBookE2EFormatting:
         mock_orderbook = AsyncMock(spec=OrderBook)
         mock_orderbook.symbol = symbol
         mock_orderbook.timestamp = 1640995200000
-        mock_orderbook.get_snapshot.return_value = snapshot
+        _serve_levels(mock_orderbook, snapshot)
         
         symbol_data = {
             'symbol': symbol,
@@ -12,6 +12,14 @@ from app.api.v1.endpoints.connection_manager import ConnectionManager
 from app.models.orderbook import OrderBook, OrderBookLevel
 
 
+def _serve_levels(orderbook, snapshot):
+    """Serve a snapshot's levels through OrderBook.iter_levels on a mock book."""
+    orderbook.iter_levels = MagicMock(side_effect=lambda: (
+        iter(sorted(((level.price, level.amount) for level in snapshot.bids), reverse=True)),
+        iter(sorted((level.price, level.amount) for level in snapshot.asks))))
+    orderbook.pyramid = None
+
+
 class TestOrderBookFullFlow:
     """
     Integration tests for the complete orderbook flow from CCXT Pro to frontend display.
@@ -205,7 +213,7 @@ class TestOrderBookFullFlow:
                 mock_snapshot = MagicMock()
                 mock_snapshot.bids = [MagicMock(price=50000.0, amount=1.0)]
                 mock_snapshot.asks = [MagicMock(price=50001.0, amount=1.0)]
-                mock_orderbook.get_snapshot.return_value = mock_snapshot
+                _serve_levels(mock_orderbook, mock_snapshot)
                 mock_orderbook.symbol = symbol
                 mock_orderbook.timestamp = time.time() * 1000
                 mock_orderbook_class.return_value = mock_orderbook
@@ -303,7 +311,7 @@ class TestOrderBookFullFlow:
                     MagicMock(price=50003.4, amount=3.4)
                 ]
                 
-                mock_orderbook.get_snapshot.return_value = mock_snapshot
+                _serve_levels(mock_orderbook, mock_snapshot)
                 mock_orderbook.symbol = symbol
                 mock_orderbook.timestamp = time.time() * 1000
                 mock_orderbook_class.return_value = mock_orderbook
@@ -358,7 +366,7 @@ class TestOrderBookFullFlow:
                 mock_snapshot = MagicMock()
                 mock_snapshot.bids = [MagicMock(price=50000.0 - i*0.1, amount=i+1) for i in range(50)]
                 mock_snapshot.asks = [MagicMock(price=50001.0 + i*0.1, amount=i+1) for i in range(50)]
-                mock_orderbook.get_snapshot.return_value = mock_snapshot
+                _serve_levels(mock_orderbook, mock_snapshot)
                 mock_orderbook.symbol = symbol
                 mock_orderbook.timestamp = time.time() * 1000
                 mock_orderbook_class.return_value = mock_orderbook
@@ -400,7 +408,7 @@ class TestOrderBookFullFlow:
                 mock_snapshot = MagicMock()
                 mock_snapshot.bids = [MagicMock(price=50000.0, amount=1.0)]
                 mock_snapshot.asks = [MagicMock(price=50001.0, amount=1.0)]
-                mock_orderbook.get_snapshot.return_value = mock_snapshot
+                _serve_levels(mock_orderbook, mock_snapshot)
                 mock_orderbook.symbol = symbol
                 mock_orderbook.timestamp = time.time() * 1000
                 mock_orderbook_class.return_value = mock_orderbook
@@ -456,7 +464,7 @@ class TestOrderBookFullFlow:
                     base_price = 50000 if 'BTC' in symbol else 3000 if 'ETH' in symbol else 1
                     mock_snapshot.bids = [MagicMock(price=base_price, amount=1.0)]
                     mock_snapshot.asks = [MagicMock(price=base_price + 1, amount=1.0)]
-                    mock_orderbook.get_snapshot.return_value = mock_snapshot
+                    _serve_levels(mock_orderbook, mock_snapshot)
                     mock_orderbook.symbol = symbol
                     mock_orderbook.timestamp = time.time() * 1000
                     return mock_orderbook
@@ -588,7 +596,7 @@ class TestOrderBookFullFlow:
             with patch('app.services.orderbook_manager.OrderBook') as mock_orderbook_class:
                 mock_orderbook = AsyncMock()
                 # Make aggregation fail
-                mock_orderbook.get_snapshot.side_effect = Exception("Aggregation error")
+                mock_orderbook.iter_levels = MagicMock(side_effect=Exception("Aggregation error"))
                 mock_orderbook_class.return_value = mock_orderbook
                 
                 # Establish connection
@@ -617,7 +625,7 @@ class TestOrderBookFullFlow:
                 mock_snapshot = MagicMock()
                 mock_snapshot.bids = [MagicMock(price=50000.0, amount=1.0)]
                 mock_snapshot.asks = [MagicMock(price=50001.0, amount=1.0)]
-                mock_orderbook.get_snapshot.return_value = mock_snapshot
+                _serve_levels(mock_orderbook, mock_snapshot)
                 mock_orderbook.symbol = symbol
                 mock_orderbook.timestamp = time.time() * 1000
                 mock_orderbook_class.return_value = mock_orderbook
@@ -660,7 +668,7 @@ class TestOrderBookFullFlow:
                 mock_snapshot = MagicMock()
                 mock_snapshot.bids = [MagicMock(price=50000.0, amount=1.0)]
                 mock_snapshot.asks = [MagicMock(price=50001.0, amount=1.0)]
-                mock_orderbook.get_snapshot.return_value = mock_snapshot
+                _serve_levels(mock_orderbook, mock_snapshot)
                 mock_orderbook.symbol = symbol
                 mock_orderbook.timestamp = time.time() * 1000
                 mock_orderbook_class.return_value = mock_orderbook
@@ -0,0 +1,123 @@
+"""
+Worst-case aggregation latency: lazy bucket walk vs the old retry loop.
+
+The old aggregation fetched `limit * multiplier` levels through get_snapshot,
+bucketed them and, with too few buckets, doubled the multiplier and started
+over (up to 5 times). At the coarsest rounding a deep book cannot fill the
+requested buckets, so it paid for the whole book on every attempt. The walk
+reads each level at most once and stops as soon as the buckets are filled.
+"""
+
+import asyncio
+import random
+import statistics
+import time
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.services.orderbook_aggregation_service import OrderBookAggregationService
+from app.services.symbol_service import symbol_service
+
+LEVELS_PER_SIDE = 5000
+LIMIT = 20
+ROUNDS = 20
+# BTC-like symbol: 0.1 tick, price precision 1
+ROUNDING_OPTIONS, DEFAULT_ROUNDING = symbol_service.calculate_rounding_options(1, 50000.0)
+WORST_ROUNDING = max(ROUNDING_OPTIONS)
+
+
+def _deep_book() -> OrderBook:
+    rng = random.Random(5)
+    orderbook = OrderBook("BTCUSDT")
+    asyncio.run(orderbook.update_snapshot(OrderBookSnapshot(
+        symbol="BTCUSDT",
+        bids=[OrderBookLevel(round(50000.0 - i * 0.1, 1), round(rng.uniform(0.001, 5), 3))
+              for i in range(LEVELS_PER_SIDE)],
+        asks=[OrderBookLevel(round(50000.1 + i * 0.1, 1), round(rng.uniform(0.001, 5), 3))
+              for i in range(LEVELS_PER_SIDE)],
+        timestamp=1640995200000)))
+    return orderbook
+
+
+async def _retry_loop(service, orderbook, limit, rounding):
+    """The replaced get_snapshot retry-with-doubling loop, bucket lists only."""
+    multiplier = max(100, int(rounding * 100)) if rounding >= 1 else 100
+    for _ in range(5):
+        snapshot = await orderbook.get_snapshot(limit * multiplier)
+        raw_bids = [{'price': level.price, 'amount': level.amount}
+                    for level in snapshot.bids if level.amount > 1e-10]
+        raw_asks = [{'price': level.price, 'amount': level.amount}
+                    for level in snapshot.asks if level.amount > 1e-10]
+        bids = service.get_exact_levels(raw_bids, False, limit, rounding)
+        asks = service.get_exact_levels(raw_asks, True, limit, rounding)
+        if len(bids) >= limit and len(asks) >= limit:
+            break
+        multiplier *= 2
+    # The old path aggregated both sides once more for market depth info
+    service.analyze_market_depth(raw_bids, raw_asks, limit, rounding)
+    return bids, asks
+
+
+def _walk(service, orderbook, limit, rounding):
+    bid_levels, ask_levels = orderbook.iter_levels()
+    bids, _, _ = service.walk_buckets(bid_levels, False, limit, rounding)
+    asks, _, _ = service.walk_buckets(ask_levels, True, limit, rounding)
+    return bids, asks
+
+
+async def _full_aggregation(service, orderbook, limit, rounding):
+    # A fresh service per run keeps the cache out of the measurement
+    return await OrderBookAggregationService().aggregate_orderbook(
+        orderbook, limit, rounding, formatted=False)
+
+
+def _time_ms(function) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+class TestAggregationWalkPerformance:
+    """Compare bucket extraction at the largest and the default rounding."""
+
+    @pytest.fixture(scope="class")
+    def results(self):
+        service = OrderBookAggregationService()
+        orderbook = _deep_book()
+        results = {}
+        for rounding in (WORST_ROUNDING, DEFAULT_ROUNDING):
+            results[rounding] = {
+                'retry_loop': _time_ms(lambda: asyncio.run(
+                    _retry_loop(service, orderbook, LIMIT, rounding))),
+                'walk': _time_ms(lambda: _walk(service, orderbook, LIMIT, rounding)),
+                'aggregate_orderbook': _time_ms(lambda: asyncio.run(
+                    _full_aggregation(service, orderbook, LIMIT, rounding))),
+            }
+        return service, orderbook, results
+
+    def test_report(self, results):
+        _, _, timings = results
+        for rounding, by_method in timings.items():
+            print(f"rounding={rounding}: " + ", ".join(
+                f"{method} p50 {ms:.2f}ms" for method, ms in by_method.items()))
+
+    def test_walk_matches_retry_loop(self, results):
+        service, orderbook, _ = results
+        for rounding in ROUNDING_OPTIONS:
+            assert _walk(service, orderbook, LIMIT, rounding) == asyncio.run(
+                _retry_loop(service, orderbook, LIMIT, rounding))
+
+    def test_worst_case_rounding_is_faster(self, results):
+        _, _, timings = results
+        worst = timings[WORST_ROUNDING]
+        # The retry loop reads the whole book five times plus the depth pass
+        assert worst['walk'] < worst['retry_loop'] / 3
+
+    def test_default_rounding_is_not_slower(self, results):
+        _, _, timings = results
+        default = timings[DEFAULT_ROUNDING]
+        assert default['walk'] < default['retry_loop']
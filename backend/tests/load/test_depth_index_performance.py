@@ -0,0 +1,127 @@
+"""
+Per-tick cost of liquidity-band and sweep metrics: level walk vs depth index.
+
+Replays a ccxt-style stream (the full 1000-level book on every tick, a few
+levels changed per tick) and computes depth within ±0.5/1/2% of mid plus
+the cost of sweeping three sizes on both sides after every tick, once by
+walking the levels and once from the Fenwick-tree depth index.
+"""
+
+import asyncio
+import random
+import statistics
+import time
+
+import pytest
+
+from app.models.depth_index import DepthIndex
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+
+LEVELS_PER_SIDE = 1000
+CHANGED_PER_TICK = 20
+TICKS = 100
+BANDS = (0.5, 1.0, 2.0)
+SWEEP_UNITS = [1.0, 50.0, 200.0]
+
+
+def _ticks(seed: int = 9):
+    rng = random.Random(seed)
+    # Sparse book (one level every 1.0) so the bands cut through it
+    bids = {round(5000.0 - i * 1.0, 1): round(rng.uniform(0.001, 5), 3)
+            for i in range(LEVELS_PER_SIDE)}
+    asks = {round(5000.1 + i * 1.0, 1): round(rng.uniform(0.001, 5), 3)
+            for i in range(LEVELS_PER_SIDE)}
+    snapshots = []
+    for _ in range(TICKS):
+        for side in (bids, asks):
+            for price in rng.sample(sorted(side), CHANGED_PER_TICK):
+                side[price] = round(rng.uniform(0.001, 5), 3)
+        snapshots.append(OrderBookSnapshot(
+            "BTCUSDT",
+            [OrderBookLevel(price, amount) for price, amount in bids.items()],
+            [OrderBookLevel(price, amount) for price, amount in asks.items()],
+            1640995200000))
+    return snapshots
+
+
+def _walk_metrics(orderbook: OrderBook):
+    """The same figures by walking both sides of the book."""
+    bids, asks = (list(levels) for levels in orderbook.iter_levels())
+    mid = (bids[0][0] + asks[0][0]) / 2
+    bands = []
+    for pct in BANDS:
+        bands.append((
+            sum(amount for price, amount in bids if price >= mid * (1 - pct / 100)),
+            sum(amount for price, amount in asks if price <= mid * (1 + pct / 100))))
+    sweeps = []
+    for units in SWEEP_UNITS:
+        for levels in (asks, bids):
+            remaining, cost = units, 0.0
+            for price, amount in levels:
+                take = min(amount, remaining)
+                cost += take * price
+                remaining -= take
+                if remaining <= 0:
+                    break
+            sweeps.append(cost)
+    return bands, sweeps
+
+
+def _index_metrics(orderbook: OrderBook):
+    metrics = orderbook.get_depth_metrics(SWEEP_UNITS)
+    bands = [(band['bid_amount'], band['ask_amount']) for band in metrics['bands']]
+    sweeps = [cost for sweep in metrics['sweeps']
+              for cost in (sweep['buy']['cost'], sweep['sell']['cost'])]
+    return bands, sweeps
+
+
+async def _replay(snapshots, indexed: bool):
+    orderbook = OrderBook("BTCUSDT")
+    if indexed:
+        orderbook.set_depth_index(DepthIndex(0.1, BANDS))
+    update_ms, metrics_ms, results = [], [], []
+    for snapshot in snapshots:
+        start = time.perf_counter()
+        await orderbook.update_snapshot(snapshot)
+        middle = time.perf_counter()
+        results.append(_index_metrics(orderbook) if indexed else _walk_metrics(orderbook))
+        end = time.perf_counter()
+        update_ms.append((middle - start) * 1000)
+        metrics_ms.append((end - middle) * 1000)
+    return {
+        'update_ms': statistics.median(update_ms),
+        'metrics_ms': statistics.median(metrics_ms),
+        'tick_ms': statistics.median(u + m for u, m in zip(update_ms, metrics_ms)),
+        'results': results,
+    }
+
+
+class TestDepthIndexPerformance:
+    """Compare per-tick update plus depth metrics cost."""
+
+    @pytest.fixture(scope="class")
+    def results(self):
+        snapshots = _ticks()
+        return {
+            'walk': asyncio.run(_replay(snapshots, indexed=False)),
+            'index': asyncio.run(_replay(snapshots, indexed=True)),
+        }
+
+    def test_report(self, results):
+        for mode, result in results.items():
+            print(f"{mode}: update p50 {result['update_ms']:.2f}ms, "
+                  f"metrics p50 {result['metrics_ms']:.3f}ms, "
+                  f"tick p50 {result['tick_ms']:.2f}ms")
+
+    def test_same_figures(self, results):
+        for (walk_bands, walk_sweeps), (index_bands, index_sweeps) in zip(
+                results['walk']['results'], results['index']['results']):
+            # Step is the tick here, so band edges are exact
+            assert index_bands == [pytest.approx(band) for band in walk_bands]
+            assert index_sweeps == pytest.approx(walk_sweeps)
+
+    def test_metrics_are_log_n_reads(self, results):
+        assert results['index']['metrics_ms'] < results['walk']['metrics_ms'] / 5
+
+    def test_tick_is_cheaper(self, results):
+        assert results['index']['tick_ms'] < results['walk']['tick_ms']
@@ -0,0 +1,276 @@
+"""
+Load tests for compiled formatters.
+
+Compares compiled formatters against the previous per-value formatting path
+(string cache key, RLock, time() and sort-based eviction) on order book and
+liquidation workloads, and checks both produce identical strings.
+"""
+
+import math
+import random
+import threading
+import time
+
+import pytest
+
+from app.services.formatting_service import FormattingService
+
+
+class LegacyFormatter:
+    """Reference implementation: the string-keyed, RLock-guarded cache path."""
+
+    def __init__(self, max_cache_size: int = 10000, cache_ttl: float = 300.0):
+        self._cache = {}
+        self._cache_lock = threading.RLock()
+        self._max_cache_size = max_cache_size
+        self._cache_ttl = cache_ttl
+
+    def _key(self, method, value, symbol_info, rounding=None):
+        symbol = symbol_info.get('symbol', 'DEFAULT') if symbol_info else 'DEFAULT'
+        precision_key = ''
+        if symbol_info:
+            precision_key = (f"{symbol_info.get('pricePrecision', 2)}:"
+                             f"{symbol_info.get('amountPrecision', 8)}")
+        rounding_key = f"{rounding}" if rounding is not None else "default"
+        return f"{method}:{symbol}:{precision_key}:{rounding_key}:{value}"
+
+    def _get(self, key):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.time() - entry[1] < self._cache_ttl:
+                return entry[0]
+            return None
+
+    def _set(self, key, value):
+        with self._cache_lock:
+            if len(self._cache) >= self._max_cache_size:
+                oldest = sorted(self._cache.items(), key=lambda x: x[1][1])
+                for old_key, _ in oldest[:max(1, len(self._cache) // 5)]:
+                    del self._cache[old_key]
+            self._cache[key] = (value, time.time())
+
+    def format_price(self, value, symbol_info=None, rounding=None):
+        if value is None or value == 0:
+            return "0.00"
+        key = self._key('price', value, symbol_info, rounding)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        try:
+            if rounding is not None and rounding > 0:
+                if abs(value) < 0.00001 and (rounding >= 0.0001 or abs(value) < rounding / 2):
+                    result = f"{value:.2e}"
+                elif rounding >= 1.0:
+                    if value == int(value):
+                        result = str(int(value))
+                    else:
+                        result = f"{value:.0f}" if rounding >= 10 else f"{value:.1f}"
+                elif rounding >= 0.1:
+                    result = f"{value:.1f}"
+                elif rounding >= 0.01:
+                    result = f"{value:.2f}"
+                elif rounding >= 0.001:
+                    result = f"{value:.3f}"
+                else:
+                    decimal_places = max(2, -int(math.floor(math.log10(rounding))))
+                    result = f"{value:.{decimal_places}f}"
+            else:
+                price_precision = 2
+                if symbol_info and 'pricePrecision' in symbol_info:
+                    price_precision = symbol_info['pricePrecision']
+                if abs(value) < 0.00001:
+                    result = f"{value:.2e}"
+                else:
+                    result = f"{value:.{price_precision}f}"
+            self._set(key, result)
+            return result
+        except (ValueError, TypeError, OverflowError):
+            return str(value)
+
+    def format_amount(self, value, symbol_info=None):
+        if value is None or value == 0:
+            return "0.00"
+        key = self._key('amount', value, symbol_info)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        try:
+            amount_precision = FormattingService().get_amount_precision(symbol_info)
+            if abs(value) < 0.00001:
+                result = f"{value:.2e}"
+            elif abs(value) >= 1000000:
+                result = f"{value / 1000000:.2f}M"
+            elif abs(value) >= 1000:
+                result = f"{value / 1000:.2f}K"
+            else:
+                result = f"{value:.{max(2, amount_precision)}f}"
+            self._set(key, result)
+            return result
+        except (ValueError, TypeError, OverflowError):
+            return str(value)
+
+    def format_total(self, value, symbol_info=None):
+        if value is None or value == 0:
+            return "0.00"
+        key = self._key('total', value, symbol_info)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        try:
+            if abs(value) >= 1000000:
+                result = f"{value / 1000000:.2f}M"
+            elif abs(value) >= 1000:
+                result = f"{value / 1000:.2f}K"
+            elif abs(value) < 0.00001:
+                result = f"{value:.2e}"
+            elif abs(value) < 0.01:
+                result = f"{value:.4f}"
+            else:
+                result = f"{value:.2f}"
+            self._set(key, result)
+            return result
+        except (ValueError, TypeError, OverflowError):
+            return str(value)
+
+
+SYMBOLS = [
+    {'symbol': 'BTC/USDT', 'pricePrecision': 1, 'amountPrecision': 3},
+    {'symbol': 'ETH/USDT', 'pricePrecision': 2, 'amountPrecision': 3},
+    {'symbol': 'SHIB/USDT', 'pricePrecision': 8, 'amountPrecision': 0},
+    {'symbol': 'DOGE/USDT', 'pricePrecision': 5},
+    {'symbol': 'X/USDT'},
+    None,
+]
+
+ROUNDINGS = [None, 0.00000001, 0.00001, 0.001, 0.01, 0.1, 1.0, 10.0, 100.0]
+
+
+def _orderbook_levels(count: int, seed: int = 7):
+    """Generate aggregated order book levels around a mid price."""
+    rng = random.Random(seed)
+    levels = []
+    for i in range(count):
+        price = round(50000 + rng.uniform(-500, 500), 1)
+        amount = round(rng.expovariate(2.0), 3)
+        levels.append((price, amount, amount * (i + 1)))
+    return levels
+
+
+def _liquidation_volumes(count: int, seed: int = 11):
+    """Generate liquidation bucket volumes in USDT, including empty buckets."""
+    rng = random.Random(seed)
+    return [0.0 if rng.random() < 0.3 else rng.lognormvariate(8, 2) for _ in range(count)]
+
+
+class TestFormattingPerformance:
+    """Benchmark compiled formatters against the legacy cached path."""
+
+    @pytest.fixture
+    def service(self):
+        return FormattingService()
+
+    def test_compiled_matches_legacy(self, service):
+        """Compiled and column formatters must produce exactly the legacy strings."""
+        legacy = LegacyFormatter()
+        rng = random.Random(3)
+        values = [0.0, 1e-9, -3e-6, 0.000004, 0.00009, 0.004, 0.5, 1.0, 12.0, 999.995,
+                  1000.0, 123456.78, 5e6, -42.5, float('inf'), float('nan')]
+        values += [rng.lognormvariate(0, 6) for _ in range(300)]
+
+        for symbol_info in SYMBOLS:
+            for value in values:
+                for rounding in ROUNDINGS:
+                    assert service.format_price(value, symbol_info, rounding) == \
+                        legacy.format_price(value, symbol_info, rounding), (value, symbol_info, rounding)
+                assert service.format_amount(value, symbol_info) == \
+                    legacy.format_amount(value, symbol_info), (value, symbol_info)
+                assert service.format_total(value, symbol_info) == \
+                    legacy.format_total(value, symbol_info), (value, symbol_info)
+
+            for rounding in ROUNDINGS:
+                assert service.format_price_column(values, symbol_info, rounding) == \
+                    [legacy.format_price(v, symbol_info, rounding) for v in values]
+            assert service.format_amount_column(values, symbol_info) == \
+                [legacy.format_amount(v, symbol_info) for v in values]
+            assert service.format_total_column(values, symbol_info) == \
+                [legacy.format_total(v, symbol_info) for v in values]
+
+    def test_orderbook_workload(self, service):
+        """Aggregated order book levels: price, amount and cumulative per level."""
+        symbol_info = SYMBOLS[0]
+        rounding = 1.0
+        levels = _orderbook_levels(20000)
+        legacy = LegacyFormatter()
+
+        start = time.perf_counter()
+        for price, amount, cumulative in levels:
+            legacy.format_price(price, symbol_info, rounding)
+            legacy.format_amount(amount, symbol_info)
+            legacy.format_total(cumulative, symbol_info)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for price, amount, cumulative in levels:
+            service.format_price(price, symbol_info, rounding)
+            service.format_amount(amount, symbol_info)
+            service.format_total(cumulative, symbol_info)
+        service_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        formatter = service.get_formatter(symbol_info, rounding)
+        for price, amount, cumulative in levels:
+            formatter.price(price)
+            formatter.amount(amount)
+            formatter.total(cumulative)
+        compiled_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, len(levels), 50):
+            ladder = levels[offset:offset + 50]
+            service.format_price_column([level[0] for level in ladder], symbol_info, rounding)
+            service.format_amount_column([level[1] for level in ladder], symbol_info)
+            service.format_total_column([level[2] for level in ladder], symbol_info)
+        column_time = time.perf_counter() - start
+
+        per_level = 1e6 / len(levels)
+        print(f"Legacy cached path: {legacy_time * per_level:.2f}us/level")
+        print(f"FormattingService wrappers: {service_time * per_level:.2f}us/level")
+        print(f"Compiled formatter: {compiled_time * per_level:.2f}us/level")
+        print(f"Column formatting (50-level ladders): {column_time * per_level:.2f}us/level")
+
+        assert service_time < legacy_time
+        assert compiled_time < service_time
+        assert column_time < service_time
+
+    def test_liquidation_workload(self, service):
+        """Liquidation volume buckets: four totals per bucket."""
+        symbol_info = SYMBOLS[1]
+        volumes = _liquidation_volumes(20000)
+        legacy = LegacyFormatter()
+
+        start = time.perf_counter()
+        for volume in volumes:
+            for value in (volume, volume / 2, volume * 1.5, volume / 3):
+                legacy.format_total(value, symbol_info)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        format_total = service.get_formatter(symbol_info).total
+        for volume in volumes:
+            for value in (volume, volume / 2, volume * 1.5, volume / 3):
+                format_total(value)
+        compiled_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, len(volumes), 500):
+            series = volumes[offset:offset + 500]
+            for factor in (1, 0.5, 1.5, 1 / 3):
+                service.format_total_column([volume * factor for volume in series], symbol_info)
+        column_time = time.perf_counter() - start
+
+        per_bucket = 1e6 / len(volumes)
+        print(f"Legacy cached path: {legacy_time * per_bucket:.2f}us/bucket")
+        print(f"Compiled formatter: {compiled_time * per_bucket:.2f}us/bucket")
+        print(f"Column formatting (500-bucket series): {column_time * per_bucket:.2f}us/bucket")
+
+        assert compiled_time < legacy_time
@@ -0,0 +1,94 @@
+"""
+Per-sample cost of a liquidity heatmap column: full scan vs windowed walk.
+
+Samples a 5000-level book (levels every 1.0 around 50000, so ±2% of the
+mid holds about 1000 of them per side) once by bucketing every level and
+once through LiquidityHeatmapService.sample, which walks only the levels
+inside the heatmap window with the aggregation kernel.
+"""
+
+import asyncio
+import math
+import random
+import statistics
+import time
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.services.liquidity_heatmap_service import LiquidityHeatmapService
+from app.services.orderbook_aggregation_service import OrderBookAggregationService
+
+LEVELS_PER_SIDE = 5000
+SAMPLES = 50
+
+
+class _Manager:
+    def __init__(self, orderbook):
+        self.orderbook = orderbook
+        self.walk_buckets = OrderBookAggregationService().walk_buckets
+
+    def get_orderbooks(self):
+        return {"BTCUSDT": self.orderbook}
+
+
+async def _orderbook():
+    rng = random.Random(5)
+    orderbook = OrderBook("BTCUSDT")
+    await orderbook.update_snapshot(OrderBookSnapshot(
+        "BTCUSDT",
+        [OrderBookLevel(round(50000.0 - i * 1.0, 1), round(rng.uniform(0.001, 5), 3))
+         for i in range(LEVELS_PER_SIDE)],
+        [OrderBookLevel(round(50000.1 + i * 1.0, 1), round(rng.uniform(0.001, 5), 3))
+         for i in range(LEVELS_PER_SIDE)],
+        1640995200000))
+    return orderbook
+
+
+def _scan_column(orderbook, first_index, step, buckets):
+    amounts = [0.0] * buckets
+    bids, asks = orderbook.iter_levels()
+    for is_ask, levels in ((False, bids), (True, asks)):
+        for price, amount in levels:
+            index = (math.ceil(price / step - 1e-9) if is_ask
+                     else math.floor(price / step + 1e-9)) - first_index
+            if 0 <= index < buckets:
+                amounts[index] += amount
+    return amounts
+
+
+async def _measure():
+    orderbook = await _orderbook()
+    service = LiquidityHeatmapService(_Manager(orderbook), buckets=200, slices=SAMPLES)
+    walk_ms, scan_ms = [], []
+    for sample in range(SAMPLES):
+        start = time.perf_counter()
+        column = await service.sample("BTCUSDT", orderbook, sample * 1000)
+        middle = time.perf_counter()
+        scanned = _scan_column(orderbook, column['first_index'], column['step'], 200)
+        end = time.perf_counter()
+        walk_ms.append((middle - start) * 1000)
+        scan_ms.append((end - middle) * 1000)
+    return {
+        'walk_ms': statistics.median(walk_ms),
+        'scan_ms': statistics.median(scan_ms),
+        'column': column['amounts'],
+        'scanned': scanned,
+    }
+
+
+class TestHeatmapSamplingPerformance:
+    """Compare per-sample cost of building a heatmap column."""
+
+    @pytest.fixture(scope="class")
+    def results(self):
+        return asyncio.run(_measure())
+
+    def test_report(self, results):
+        print(f"walk p50 {results['walk_ms']:.2f}ms, scan p50 {results['scan_ms']:.2f}ms")
+
+    def test_same_column(self, results):
+        assert results['column'] == pytest.approx(results['scanned'])
+
+    def test_walk_is_cheaper(self, results):
+        assert results['walk_ms'] < results['scan_ms']
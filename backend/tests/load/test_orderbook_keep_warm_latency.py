@@ -0,0 +1,133 @@
+"""
+Reconnect-to-first-frame latency for warm and cold order books.
+
+Drives ConnectionManager.connect_orderbook against a scripted exchange whose
+1000-level REST snapshot takes SNAPSHOT_LATENCY and whose stream pushes an
+update every UPDATE_INTERVAL. A cold connect waits for the snapshot; a
+reconnect within the keep-warm period reuses the live book and stream and
+gets its first frame immediately.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.api.v1.endpoints.connection_manager import ConnectionManager
+from app.services.orderbook_manager import OrderBookManager
+from app.services.orderbook_sync_service import OrderBookSyncService
+
+SYMBOL = "BTC/USDT:USDT"
+SNAPSHOT_LATENCY = 0.15
+UPDATE_INTERVAL = 0.1
+ROUNDS = 5
+
+
+class FrameRecorder:
+    """WebSocket stand-in that records when the first orderbook frame arrives."""
+
+    def __init__(self):
+        self.connected_at = time.perf_counter()
+        self.first_frame_at = None
+        self.first_frame = asyncio.Event()
+
+    async def send_text(self, text: str) -> None:
+        if self.first_frame_at is None and json.loads(text).get('type') == 'orderbook_update':
+            self.first_frame_at = time.perf_counter()
+            self.first_frame.set()
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.first_frame_at - self.connected_at) * 1000
+
+
+def _exchange():
+    nonce = 0
+
+    def book():
+        nonlocal nonce
+        nonce += 1
+        return {
+            'bids': [[50000.0 - i * 0.1, 1.0] for i in range(1000)],
+            'asks': [[50000.1 + i * 0.1, 1.0] for i in range(1000)],
+            'timestamp': int(time.time() * 1000),
+            'nonce': nonce,
+        }
+
+    async def fetch_order_book(symbol, limit=None):
+        await asyncio.sleep(SNAPSHOT_LATENCY)
+        return book()
+
+    async def watch_order_book(symbol):
+        await asyncio.sleep(UPDATE_INTERVAL)
+        return book()
+
+    exchange_pro = MagicMock()
+    exchange_pro.fetch_order_book = AsyncMock(side_effect=fetch_order_book)
+    exchange_pro.watch_order_book = AsyncMock(side_effect=watch_order_book)
+    return exchange_pro
+
+
+async def _reconnect_latencies(keep_warm_seconds: float):
+    """Connect, disconnect and reconnect ROUNDS times; return latencies and snapshot fetches."""
+    manager = OrderBookManager.__new__(OrderBookManager)
+    manager._initialized = False
+    manager.__init__()
+    manager._keep_warm_seconds = keep_warm_seconds
+    connection_manager = ConnectionManager()
+    manager.add_eviction_listener(connection_manager.release_warm_stream)
+    exchange_pro = _exchange()
+    latencies = []
+
+    with patch('app.api.v1.endpoints.connection_manager.exchange_service') as mock_exchange_service, \
+            patch('app.api.v1.endpoints.connection_manager.orderbook_manager', manager), \
+            patch('app.api.v1.endpoints.connection_manager.orderbook_sync_service',
+                  OrderBookSyncService()):
+        mock_exchange_service.get_exchange_pro.return_value = exchange_pro
+
+        for _ in range(ROUNDS + 1):
+            websocket = FrameRecorder()
+            await connection_manager.connect_orderbook(websocket, SYMBOL, "BTCUSDT", 20, 0.1)
+            await asyncio.wait_for(websocket.first_frame.wait(), timeout=5)
+            latencies.append(websocket.latency_ms)
+            await connection_manager.disconnect_orderbook(websocket, SYMBOL)
+            await asyncio.sleep(0.01)  # A page reload
+
+        for task in list(connection_manager.streaming_tasks.values()):
+            task.cancel()
+        await manager.shutdown()
+
+    # The first connect is cold in both modes; the rest are reconnects
+    return latencies[1:], exchange_pro.fetch_order_book.await_count
+
+
+class TestKeepWarmLatency:
+    """Compare reconnect-to-first-frame latency with and without keep-warm."""
+
+    @pytest.fixture(scope="class")
+    def results(self):
+        return {
+            'warm': asyncio.run(_reconnect_latencies(keep_warm_seconds=30)),
+            'cold': asyncio.run(_reconnect_latencies(keep_warm_seconds=0)),
+        }
+
+    def test_report(self, results):
+        for mode, (latencies, fetches) in results.items():
+            print(f"{mode}: reconnect-to-first-frame p50 {statistics.median(latencies):.1f}ms, "
+                  f"max {max(latencies):.1f}ms, {fetches} snapshot fetches")
+
+    def test_warm_reconnect_skips_snapshot(self, results):
+        _, warm_fetches = results['warm']
+        _, cold_fetches = results['cold']
+        assert warm_fetches == 1
+        assert cold_fetches == ROUNDS + 1
+
+    def test_warm_reconnect_is_faster(self, results):
+        warm, _ = results['warm']
+        cold, _ = results['cold']
+        # Cold reconnects pay the REST snapshot; warm ones get the live book
+        assert min(cold) >= SNAPSHOT_LATENCY * 1000 * 0.9
+        assert max(warm) < SNAPSHOT_LATENCY * 1000 / 2
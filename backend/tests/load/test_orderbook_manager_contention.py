@@ -0,0 +1,153 @@
+"""
+Contention benchmark for OrderBookManager lock sharding.
+
+Runs one broadcast round for 100 symbols x 20 clients while one symbol's
+aggregation is slow, and measures how long the other symbols wait. With
+per-symbol shards they finish without waiting for the slow symbol; with a
+single manager-wide lock (the previous design, emulated below) every
+symbol queues behind it.
+"""
+
+import asyncio
+import gc
+import statistics
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services.orderbook_manager import OrderBookManager
+
+NUM_SYMBOLS = 100
+CLIENTS_PER_SYMBOL = 20
+SLOW_SYMBOL = "PAIR0USDT"
+SLOW_AGGREGATION_SECONDS = 0.2
+
+
+class FakeOrderBook(str):
+    """Order book stand-in: the symbol itself, without level indexes."""
+
+    def set_wall_index(self, index):
+        pass
+
+    def get_index_metrics(self):
+        return {}
+
+
+class FakeAggregationService:
+    """Aggregation stand-in with a cache and a configurable slow symbol."""
+
+    def __init__(self):
+        self._cache = {}
+
+    async def aggregate_orderbook(self, orderbook, limit, rounding,
+                                  symbol_data=None, formatted=True):
+        key = (orderbook, limit, rounding, formatted)
+        if key in self._cache:
+            return self._cache[key]
+        if orderbook == SLOW_SYMBOL:
+            await asyncio.sleep(SLOW_AGGREGATION_SECONDS)
+        else:
+            await asyncio.sleep(0)
+        self._cache[key] = {'symbol': orderbook, 'bids': [], 'asks': []}
+        return self._cache[key]
+
+    async def warm_cache_for_symbol(self, symbol, orderbook, symbol_data=None, params=()):
+        return 0
+
+    async def get_cache_metrics(self):
+        return {}
+
+
+class GlobalLockManager(OrderBookManager):
+    """The previous design: every aggregation holds one manager-wide lock."""
+
+    def __init__(self):
+        super().__init__()
+        self._global_lock = asyncio.Lock()
+
+    async def get_aggregated_orderbook(self, connection_id):
+        async with self._global_lock:
+            return await super().get_aggregated_orderbook(connection_id)
+
+
+def _new_manager(cls):
+    """Create an isolated manager instance (bypassing the singleton)."""
+    manager = object.__new__(cls)
+    manager._initialized = False
+    manager.__init__()
+    manager._aggregation_service = FakeAggregationService()
+    return manager
+
+
+async def _broadcast_round(manager):
+    """
+    Aggregate for every client of every symbol concurrently.
+
+    Returns:
+        Per-client latency in seconds for the symbols other than SLOW_SYMBOL
+    """
+    latencies = []
+
+    async def client(connection_id, symbol):
+        start = time.perf_counter()
+        await manager.get_aggregated_orderbook(connection_id)
+        if symbol != SLOW_SYMBOL:
+            latencies.append(time.perf_counter() - start)
+
+    # Reason: Schedule the slow symbol first so a shared lock would make
+    # every other symbol queue behind it.
+    await asyncio.gather(*[
+        client(f"{symbol}:{i}", symbol)
+        for symbol in [f"PAIR{s}USDT" for s in range(NUM_SYMBOLS)]
+        for i in range(CLIENTS_PER_SYMBOL)
+    ])
+    return latencies
+
+
+async def _run(cls):
+    manager = _new_manager(cls)
+    # Reason: The fake aggregation keys its cache by the order book, so
+    # the symbol string stands in for a real OrderBook.
+    with patch('app.services.orderbook_manager.OrderBook', side_effect=FakeOrderBook):
+        for s in range(NUM_SYMBOLS):
+            symbol = f"PAIR{s}USDT"
+            for i in range(CLIENTS_PER_SYMBOL):
+                await manager.register_connection(f"{symbol}:{i}", symbol, 20, 1.0)
+        # Reason: Latency is measured from each client's start, so the round
+        # must launch all clients at once. Garbage collection over the heap
+        # left by earlier tests spread the launch over ~150ms in full-suite
+        # runs, letting late clients skip most of the slow symbol's wait.
+        gc.collect()
+        gc.disable()
+        try:
+            latencies = await _broadcast_round(manager)
+        finally:
+            gc.enable()
+    await manager.shutdown()
+    return latencies
+
+
+class TestOrderBookManagerContention:
+    """Compare per-symbol shards against a single manager-wide lock."""
+
+    @pytest.mark.asyncio
+    async def test_slow_symbol_does_not_block_others(self):
+        sharded = await _run(OrderBookManager)
+        global_lock = await _run(GlobalLockManager)
+
+        def summary(latencies):
+            ordered = sorted(latencies)
+            return (statistics.median(ordered) * 1000,
+                    ordered[int(len(ordered) * 0.99) - 1] * 1000)
+
+        sharded_p50, sharded_p99 = summary(sharded)
+        global_p50, global_p99 = summary(global_lock)
+        print(f"{NUM_SYMBOLS} symbols x {CLIENTS_PER_SYMBOL} clients, "
+              f"one {SLOW_AGGREGATION_SECONDS * 1000:.0f}ms symbol: "
+              f"sharded p50={sharded_p50:.2f}ms p99={sharded_p99:.2f}ms; "
+              f"global lock p50={global_p50:.2f}ms p99={global_p99:.2f}ms")
+
+        assert len(sharded) == (NUM_SYMBOLS - 1) * CLIENTS_PER_SYMBOL
+        assert global_p50 >= SLOW_AGGREGATION_SECONDS * 1000 * 0.9
+        assert sharded_p99 < SLOW_AGGREGATION_SECONDS * 1000
@@ -12,6 +12,14 @@ from app.api.v1.endpoints.connection_manager import ConnectionManager
 from app.models.orderbook import OrderBook, OrderBookLevel
 
 
+def _serve_levels(orderbook, snapshot):
+    """Serve a snapshot's levels through OrderBook.iter_levels on a mock book."""
+    orderbook.iter_levels = MagicMock(side_effect=lambda: (
+        iter(sorted(((level.price, level.amount) for level in snapshot.bids), reverse=True)),
+        iter(sorted((level.price, level.amount) for level in snapshot.asks))))
+    orderbook.pyramid = None
+
+
 class TestOrderBookPerformance:
     """
     Load tests for orderbook performance validation.
@@ -71,7 +79,8 @@ class TestOrderBookPerformance:
         mock_snapshot = MagicMock()
         mock_snapshot.bids = bids
         mock_snapshot.asks = asks
-        orderbook.get_snapshot.return_value = mock_snapshot
+        _serve_levels(orderbook, mock_snapshot)
+        orderbook.get_index_metrics.return_value = {}  # No level indexes
         
         return orderbook
 
@@ -0,0 +1,101 @@
+"""
+Per-tick cost with and without the aggregation pyramid.
+
+Replays a ccxt-style stream (the full 1000-level book on every tick, a few
+levels changed per tick) into an order book with one subscriber per
+rounding option and aggregates every subscription for each new version,
+as the broadcast loop does.
+"""
+
+import asyncio
+import random
+import statistics
+import time
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.services.orderbook_aggregation_service import OrderBookAggregationService
+
+LEVELS_PER_SIDE = 1000
+CHANGED_PER_TICK = 20
+TICKS = 100
+LIMIT = 20
+ROUNDINGS = [0.1, 1.0, 10.0, 100.0, 1000.0]
+
+
+def _ticks(seed: int = 8):
+    rng = random.Random(seed)
+    bids = {round(50000.0 - i * 0.1, 1): round(rng.uniform(0.001, 5), 3)
+            for i in range(LEVELS_PER_SIDE)}
+    asks = {round(50000.1 + i * 0.1, 1): round(rng.uniform(0.001, 5), 3)
+            for i in range(LEVELS_PER_SIDE)}
+    snapshots = []
+    for _ in range(TICKS):
+        for side in (bids, asks):
+            for price in rng.sample(sorted(side), CHANGED_PER_TICK):
+                side[price] = round(rng.uniform(0.001, 5), 3)
+        snapshots.append(OrderBookSnapshot(
+            "BTCUSDT",
+            [OrderBookLevel(price, amount) for price, amount in bids.items()],
+            [OrderBookLevel(price, amount) for price, amount in asks.items()],
+            1640995200000))
+    return snapshots
+
+
+async def _replay(snapshots, pyramid: bool):
+    orderbook = OrderBook("BTCUSDT")
+    if pyramid:
+        orderbook.set_pyramid_roundings(ROUNDINGS)
+    service = OrderBookAggregationService()
+    update_ms, aggregate_ms, results = [], [], []
+    for snapshot in snapshots:
+        start = time.perf_counter()
+        await orderbook.update_snapshot(snapshot)
+        middle = time.perf_counter()
+        results.append([await service.aggregate_orderbook(orderbook, LIMIT, rounding,
+                                                          formatted=False)
+                        for rounding in ROUNDINGS])
+        end = time.perf_counter()
+        update_ms.append((middle - start) * 1000)
+        aggregate_ms.append((end - middle) * 1000)
+    return {
+        'update_ms': statistics.median(update_ms),
+        'aggregate_ms': statistics.median(aggregate_ms),
+        'tick_ms': statistics.median(u + a for u, a in zip(update_ms, aggregate_ms)),
+        'results': results,
+    }
+
+
+class TestPyramidPerformance:
+    """Compare per-tick update plus aggregation cost."""
+
+    @pytest.fixture(scope="class")
+    def results(self):
+        snapshots = _ticks()
+        return {
+            'walk': asyncio.run(_replay(snapshots, pyramid=False)),
+            'pyramid': asyncio.run(_replay(snapshots, pyramid=True)),
+        }
+
+    def test_report(self, results):
+        for mode, result in results.items():
+            print(f"{mode}: update p50 {result['update_ms']:.2f}ms, "
+                  f"aggregate {len(ROUNDINGS)} roundings p50 {result['aggregate_ms']:.2f}ms, "
+                  f"tick p50 {result['tick_ms']:.2f}ms")
+
+    def test_same_buckets(self, results):
+        for walk_tick, pyramid_tick in zip(results['walk']['results'],
+                                           results['pyramid']['results']):
+            for walk, pyramid in zip(walk_tick, pyramid_tick):
+                for side in ('bids', 'asks'):
+                    assert [level['price'] for level in pyramid[side]] == [
+                        level['price'] for level in walk[side]]
+                    assert [level['amount'] for level in pyramid[side]] == pytest.approx(
+                        [level['amount'] for level in walk[side]])
+
+    def test_aggregation_is_a_top_n_read(self, results):
+        assert results['pyramid']['aggregate_ms'] < results['walk']['aggregate_ms'] / 3
+
+    def test_tick_is_cheaper(self, results):
+        assert results['pyramid']['tick_ms'] < results['walk']['tick_ms']
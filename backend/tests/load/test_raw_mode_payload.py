@@ -0,0 +1,127 @@
+"""
+Load tests for raw-numbers WebSocket mode.
+
+Measures the server CPU and payload bytes saved when clients format numbers
+themselves: formatted order book and trade messages versus the compact raw
+messages sent with ?raw=true.
+"""
+
+import json
+import random
+import time
+
+from app.services.formatting_service import FormattingService
+from app.services.trade_service import TradeService
+
+SYMBOL_INFO = {'symbol': 'BTC/USDT', 'pricePrecision': 1, 'amountPrecision': 3}
+ROUNDING = 1.0
+ITERATIONS = 200
+
+
+def _ladder(count: int, seed: int = 5):
+    """Generate aggregated order book levels with cumulative totals."""
+    rng = random.Random(seed)
+    levels = []
+    cumulative = 0.0
+    for i in range(count):
+        amount = round(rng.expovariate(0.5), 3)
+        cumulative += amount
+        levels.append({'price': 50000.0 - i, 'amount': amount, 'cumulative': cumulative})
+    return levels
+
+
+def _trades(count: int, seed: int = 9):
+    """Generate raw CCXT-style trades."""
+    rng = random.Random(seed)
+    return [{
+        'id': str(1000000 + i),
+        'price': round(50000 + rng.uniform(-50, 50), 1),
+        'amount': round(rng.expovariate(5.0), 3),
+        'side': rng.choice(['buy', 'sell']),
+        'timestamp': 1736267157000 + i * 37
+    } for i in range(count)]
+
+
+def _formatted_orderbook_message(service, bids, asks):
+    """Server work for a formatted orderbook update: format columns, then serialize."""
+    sides = []
+    for levels in (bids, asks):
+        levels = [dict(level) for level in levels]
+        prices = service.format_price_column([level['price'] for level in levels], SYMBOL_INFO, ROUNDING)
+        amounts = service.format_amount_column([level['amount'] for level in levels], SYMBOL_INFO)
+        totals = service.format_total_column([level['cumulative'] for level in levels], SYMBOL_INFO)
+        for level, price, amount, total in zip(levels, prices, amounts, totals):
+            level['price_formatted'] = price
+            level['amount_formatted'] = amount
+            level['cumulative_formatted'] = total
+        sides.append(levels)
+    return json.dumps({"type": "orderbook_update", "bids": sides[0], "asks": sides[1]})
+
+
+def _raw_orderbook_message(bids, asks):
+    """Server work for a raw orderbook update: compact levels, then serialize."""
+    return json.dumps({
+        "type": "orderbook_update",
+        "bids": [[level['price'], level['amount'], level['cumulative']] for level in bids],
+        "asks": [[level['price'], level['amount'], level['cumulative']] for level in asks],
+        "raw": True
+    })
+
+
+def _time_per_message(build) -> float:
+    """Average seconds per message for a message builder."""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        build()
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+class TestRawModePayload:
+    """Compare formatted and raw-mode messages."""
+
+    def test_orderbook_update(self):
+        service = FormattingService()
+        bids = _ladder(100)
+        asks = _ladder(100, seed=6)
+
+        formatted = _formatted_orderbook_message(service, bids, asks)
+        raw = _raw_orderbook_message(bids, asks)
+        formatted_time = _time_per_message(lambda: _formatted_orderbook_message(service, bids, asks))
+        raw_time = _time_per_message(lambda: _raw_orderbook_message(bids, asks))
+
+        print(f"Orderbook (100x2 levels): formatted {len(formatted)} bytes, "
+              f"{formatted_time * 1e6:.0f}us; raw {len(raw)} bytes, {raw_time * 1e6:.0f}us")
+
+        assert len(raw) < len(formatted) / 2
+        assert raw_time < formatted_time
+
+    def test_trades_update(self):
+        trade_service = TradeService()
+        trades = _trades(100)
+
+        def formatted_message():
+            return json.dumps({"type": "trades_update",
+                               "trades": trade_service.format_trades(trades, SYMBOL_INFO)})
+
+        def raw_message():
+            return json.dumps({"type": "trades_update",
+                               "trades": trade_service.compact_trades(trades), "raw": True})
+
+        formatted = formatted_message()
+        raw = raw_message()
+        formatted_time = _time_per_message(formatted_message)
+        raw_time = _time_per_message(raw_message)
+
+        print(f"Trades (100): formatted {len(formatted)} bytes, {formatted_time * 1e6:.0f}us; "
+              f"raw {len(raw)} bytes, {raw_time * 1e6:.0f}us")
+
+        assert len(raw) < len(formatted) / 2
+        assert raw_time < formatted_time
+
+    def test_descriptor_is_small(self):
+        """The one-off descriptor costs far less than one formatted update saves."""
+        descriptor = json.dumps(FormattingService().get_format_descriptor(SYMBOL_INFO, ROUNDING))
+
+        print(f"Descriptor: {len(descriptor)} bytes")
+
+        assert len(descriptor) < 1024
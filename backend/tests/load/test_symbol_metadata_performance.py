@@ -0,0 +1,110 @@
+"""
+Load tests for compiled symbol metadata lookups.
+
+Compares the compiled metadata path against re-deriving symbol info from
+raw market data, and checks both produce identical results.
+"""
+
+import time
+
+import pytest
+
+from app.services.symbol_service import SymbolService
+
+
+def _build_markets(count: int = 500):
+    """Generate a synthetic markets dict with mixed precision formats."""
+    price_precisions = [0.1, 0.01, 0.0001, 1e-7, 1, 2]
+    amount_precisions = [0.001, 1.0, 3]
+    markets = {}
+    for i in range(count):
+        symbol = f"C{i}/USDT:USDT"
+        markets[symbol] = {
+            "id": f"C{i}USDT",
+            "symbol": symbol,
+            "base": f"C{i}",
+            "quote": "USDT",
+            "active": True,
+            "type": "swap",
+            "spot": False,
+            "precision": {
+                "price": price_precisions[i % len(price_precisions)],
+                "amount": amount_precisions[i % len(amount_precisions)],
+            },
+        }
+    return markets
+
+
+def _uncompiled_symbol_info(service: SymbolService, market, current_price=None):
+    """Reference implementation: derive symbol info from raw market data."""
+    from app.models.symbol_metadata import parse_precision
+
+    price_precision = parse_precision(market["precision"]["price"])
+    amount_precision = parse_precision(market["precision"]["amount"])
+    rounding_options, default_rounding = service.calculate_rounding_options(
+        price_precision, current_price)
+    return {
+        "id": market["id"],
+        "symbol": market["symbol"],
+        "base_asset": market["base"],
+        "quote_asset": market["quote"],
+        "active": market["active"],
+        "type": market["type"],
+        "spot": market["spot"],
+        "swap": market["type"] == "swap",
+        "future": False,
+        "pricePrecision": price_precision,
+        "amountPrecision": amount_precision,
+        "roundingOptions": rounding_options,
+        "defaultRounding": default_rounding,
+        "priceFormat": service.generate_price_format(price_precision),
+    }
+
+
+class TestSymbolMetadataPerformance:
+    """Benchmark compiled metadata lookups."""
+
+    @pytest.fixture
+    def service(self):
+        markets = _build_markets()
+        service = SymbolService()
+        service._markets_cache = markets
+        for exchange_symbol, market in markets.items():
+            service._symbol_cache[market["id"]] = exchange_symbol
+            service._exchange_to_id_cache[exchange_symbol] = market["id"]
+        service._compile_all_metadata()
+        service._cache_initialized = True
+        return service
+
+    def test_compiled_matches_uncompiled(self, service):
+        """Compiled lookups must return exactly what raw parsing returns."""
+        for market in service._markets_cache.values():
+            for current_price in (None, 0.3, 5.0, 50000.0):
+                assert service.get_symbol_info(market["id"], current_price) == \
+                    _uncompiled_symbol_info(service, market, current_price)
+
+    def test_lookup_latency(self, service):
+        """Compiled lookup by ID and exchange symbol vs raw parsing."""
+        markets = list(service._markets_cache.values()) * 20
+
+        start = time.perf_counter()
+        for market in markets:
+            _uncompiled_symbol_info(service, market)
+        uncompiled = (time.perf_counter() - start) / len(markets)
+
+        start = time.perf_counter()
+        for market in markets:
+            service.get_symbol_info(market["id"])
+        compiled_info = (time.perf_counter() - start) / len(markets)
+
+        start = time.perf_counter()
+        for market in markets:
+            service.get_symbol_metadata(market["symbol"])
+        compiled_metadata = (time.perf_counter() - start) / len(markets)
+
+        print(f"Uncompiled symbol info: {uncompiled * 1e6:.2f}us/call")
+        print(f"Compiled symbol info: {compiled_info * 1e6:.2f}us/call")
+        print(f"Compiled metadata: {compiled_metadata * 1e6:.3f}us/call")
+
+        assert compiled_info < uncompiled
+        assert compiled_metadata < compiled_info
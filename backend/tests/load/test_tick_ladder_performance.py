@@ -0,0 +1,115 @@
+"""
+Benchmark the tick ladder order book against the SortedDict OrderBook.
+
+Measures memory per 1000 levels, delta update throughput, full snapshot
+load time and view materialization for a dense book on a 0.1 tick grid.
+"""
+
+import asyncio
+import random
+import time
+import tracemalloc
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.tick_ladder_orderbook import TickLadderOrderBook
+
+TICK = 0.1
+LEVELS_PER_SIDE = 1000
+MID_TICK = 500000  # 50000.0
+DELTA_BATCHES = 2000
+LEVELS_PER_DELTA = 10
+
+
+def _dense_snapshot(seed: int = 3) -> OrderBookSnapshot:
+    rng = random.Random(seed)
+    return OrderBookSnapshot(
+        symbol="BTCUSDT",
+        bids=[OrderBookLevel(round((MID_TICK - 1 - i) * TICK, 1), round(rng.uniform(0.001, 5), 3))
+              for i in range(LEVELS_PER_SIDE)],
+        asks=[OrderBookLevel(round((MID_TICK + 1 + i) * TICK, 1), round(rng.uniform(0.001, 5), 3))
+              for i in range(LEVELS_PER_SIDE)],
+        timestamp=1640995200000
+    )
+
+
+def _deltas(seed: int = 4):
+    rng = random.Random(seed)
+    batches = []
+    for _ in range(DELTA_BATCHES):
+        bids = [OrderBookLevel(round((MID_TICK - rng.randint(1, 300)) * TICK, 1),
+                               rng.choice([0, round(rng.uniform(0.001, 5), 3)]))
+                for _ in range(LEVELS_PER_DELTA)]
+        asks = [OrderBookLevel(round((MID_TICK + rng.randint(1, 300)) * TICK, 1),
+                               rng.choice([0, round(rng.uniform(0.001, 5), 3)]))
+                for _ in range(LEVELS_PER_DELTA)]
+        batches.append((bids, asks))
+    return batches
+
+
+def _new_book(kind: str) -> OrderBook:
+    if kind == "ladder":
+        return TickLadderOrderBook("BTCUSDT", TICK, width=4096)
+    return OrderBook("BTCUSDT")
+
+
+def _measure(kind: str, snapshot: OrderBookSnapshot, deltas) -> dict:
+    async def run():
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        book = _new_book(kind)
+        await book.update_snapshot(snapshot)
+        memory = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for _ in range(20):
+            await book.update_snapshot(snapshot)
+        snapshot_time = (time.perf_counter() - start) / 20
+
+        start = time.perf_counter()
+        for bids, asks in deltas:
+            await book.update_delta(bids, asks, 1640995200000)
+        delta_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for bids, asks in deltas[:200]:
+            await book.update_delta(bids, asks, 1640995200000)
+            book.get_view()
+        view_time = (time.perf_counter() - start) / 200
+
+        return {
+            'memory_per_1000_levels': memory / (2 * LEVELS_PER_SIDE / 1000),
+            'snapshot_ms': snapshot_time * 1000,
+            'level_updates_per_sec': DELTA_BATCHES * LEVELS_PER_DELTA * 2 / delta_time,
+            'update_and_view_us': view_time * 1e6,
+        }
+
+    return asyncio.run(run())
+
+
+class TestTickLadderPerformance:
+    """Compare the tick ladder with the SortedDict order book."""
+
+    @pytest.fixture(scope="class")
+    def results(self):
+        snapshot = _dense_snapshot()
+        deltas = _deltas()
+        return {kind: _measure(kind, snapshot, deltas) for kind in ("sorted", "ladder")}
+
+    def test_report(self, results):
+        for kind, metrics in results.items():
+            print(f"{kind:>6}: {metrics['memory_per_1000_levels'] / 1024:.1f} KB/1000 levels, "
+                  f"snapshot {metrics['snapshot_ms']:.2f}ms, "
+                  f"{metrics['level_updates_per_sec'] / 1e6:.2f}M level updates/s, "
+                  f"update+view {metrics['update_and_view_us']:.0f}us")
+
+    def test_ladder_uses_less_memory(self, results):
+        assert (results['ladder']['memory_per_1000_levels']
+                < results['sorted']['memory_per_1000_levels'])
+
+    def test_ladder_updates_faster(self, results):
+        assert (results['ladder']['level_updates_per_sec']
+                > results['sorted']['level_updates_per_sec'])
+        assert results['ladder']['snapshot_ms'] < results['sorted']['snapshot_ms']
@@ -0,0 +1,101 @@
+"""
+Per-tick cost of finding the largest levels: full scan vs wall index.
+
+Replays a stream of small deltas against a 1000-level book and reads the
+top 5 levels per side after every tick, once with heapq.nlargest over all
+levels and once from the incremental wall index.
+"""
+
+import asyncio
+import heapq
+import random
+import statistics
+import time
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.wall_index import WallIndex
+
+LEVELS_PER_SIDE = 1000
+CHANGED_PER_TICK = 10
+TICKS = 500
+TOP_K = 5
+
+
+def _stream(seed: int = 11):
+    rng = random.Random(seed)
+    bids = [(round(5000.0 - i * 0.1, 1), round(rng.uniform(0.001, 5), 3))
+            for i in range(LEVELS_PER_SIDE)]
+    asks = [(round(5000.1 + i * 0.1, 1), round(rng.uniform(0.001, 5), 3))
+            for i in range(LEVELS_PER_SIDE)]
+    snapshot = OrderBookSnapshot(
+        "BTCUSDT",
+        [OrderBookLevel(price, amount) for price, amount in bids],
+        [OrderBookLevel(price, amount) for price, amount in asks],
+        1640995200000)
+    deltas = []
+    for _ in range(TICKS):
+        deltas.append(tuple(
+            [OrderBookLevel(levels[rng.randrange(LEVELS_PER_SIDE)][0],
+                            rng.choice([0, round(rng.uniform(0.001, 50), 3)]))
+             for _ in range(CHANGED_PER_TICK // 2)]
+            for levels in (bids, asks)))
+    return snapshot, deltas
+
+
+def _scan_walls(orderbook: OrderBook):
+    return [[amount for _, amount in heapq.nlargest(TOP_K, levels, key=lambda level: level[1])]
+            for levels in orderbook.iter_levels()]
+
+
+def _index_walls(orderbook: OrderBook):
+    index = orderbook.wall_index
+    return [[amount for _, amount in index.top(is_ask)] for is_ask in (False, True)]
+
+
+async def _replay(snapshot, deltas, indexed: bool):
+    orderbook = OrderBook("BTCUSDT")
+    if indexed:
+        orderbook.set_wall_index(WallIndex(TOP_K))
+    await orderbook.update_snapshot(snapshot)
+    read_ms, tick_ms, results = [], [], []
+    for bids, asks in deltas:
+        start = time.perf_counter()
+        await orderbook.update_delta(bids, asks, 1640995200000)
+        middle = time.perf_counter()
+        results.append(_index_walls(orderbook) if indexed else _scan_walls(orderbook))
+        end = time.perf_counter()
+        read_ms.append((end - middle) * 1000)
+        tick_ms.append((end - start) * 1000)
+    return {
+        'read_ms': statistics.median(read_ms),
+        'tick_ms': statistics.median(tick_ms),
+        'results': results,
+    }
+
+
+class TestWallIndexPerformance:
+    """Compare per-tick update plus top-K read cost."""
+
+    @pytest.fixture(scope="class")
+    def results(self):
+        snapshot, deltas = _stream()
+        return {
+            'scan': asyncio.run(_replay(snapshot, deltas, indexed=False)),
+            'index': asyncio.run(_replay(snapshot, deltas, indexed=True)),
+        }
+
+    def test_report(self, results):
+        for mode, result in results.items():
+            print(f"{mode}: read p50 {result['read_ms']:.3f}ms, "
+                  f"tick p50 {result['tick_ms']:.3f}ms")
+
+    def test_same_walls(self, results):
+        assert results['index']['results'] == results['scan']['results']
+
+    def test_read_avoids_full_scan(self, results):
+        assert results['index']['read_ms'] < results['scan']['read_ms'] / 5
+
+    def test_tick_is_cheaper(self, results):
+        assert results['index']['tick_ms'] < results['scan']['tick_ms']
@@ -0,0 +1,209 @@
+"""
+Tests for the Fenwick-tree depth index.
+"""
+
+import random
+
+import pytest
+
+from app.models.depth_index import DepthIndex, FenwickTree
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.tick_ladder_orderbook import TickLadderOrderBook
+
+
+def _levels(pairs):
+    return [OrderBookLevel(price=price, amount=amount) for price, amount in pairs]
+
+
+def _random_book(rng, levels=300, mid=5000.0):
+    bids = [(round(mid - i * 0.1, 1), round(rng.uniform(0.001, 5), 3)) for i in range(levels)]
+    asks = [(round(mid + 0.1 + i * 0.1, 1), round(rng.uniform(0.001, 5), 3)) for i in range(levels)]
+    return bids, asks
+
+
+def _brute_band(levels, is_ask, mid, pct):
+    if is_ask:
+        inside = [(p, a) for p, a in levels if p <= mid * (1 + pct / 100) + 1e-9]
+    else:
+        inside = [(p, a) for p, a in levels if p >= mid * (1 - pct / 100) - 1e-9]
+    return sum(a for _, a in inside), sum(p * a for p, a in inside)
+
+
+def _brute_sweep(levels, units):
+    """Cost and last price of consuming units from the best level outward."""
+    remaining, cost = units, 0.0
+    for price, amount in levels:
+        take = min(amount, remaining)
+        cost += take * price
+        remaining -= take
+        if remaining <= 1e-12:
+            return cost, price
+    return cost, None
+
+
+def _assert_matches_levels(orderbook, pcts=(0.5, 1.0, 2.0), sweep_units=(0.5, 3.0, 40.0)):
+    bids, asks = (list(levels) for levels in orderbook.iter_levels())
+    index = orderbook.depth_index
+    mid = (bids[0][0] + asks[0][0]) / 2
+    for pct in pcts:
+        assert index.band_depth(False, mid, pct) == pytest.approx(_brute_band(bids, False, mid, pct))
+        assert index.band_depth(True, mid, pct) == pytest.approx(_brute_band(asks, True, mid, pct))
+    for units in sweep_units:
+        for is_ask, levels in ((True, asks), (False, bids)):
+            cost, price = _brute_sweep(levels, units)
+            result = index.sweep(is_ask, units)
+            assert result['cost'] == pytest.approx(cost)
+            assert result['price'] == pytest.approx(price)
+
+
+class TestFenwickTree:
+    """Test prefix sums and search against brute force."""
+
+    def test_prefix_and_search(self):
+        rng = random.Random(1)
+        values = [0.0] * 100
+        tree = FenwickTree(100)
+        for _ in range(500):
+            slot = rng.randrange(100)
+            delta = rng.uniform(-1, 2) if values[slot] > 1 else rng.uniform(0, 2)
+            values[slot] += delta
+            tree.add(slot, delta)
+
+        for slot in range(-1, 101):
+            assert tree.prefix(slot) == pytest.approx(sum(values[:max(0, slot + 1)]))
+        for target in (0.5, 10.0, sum(values) * 0.7):
+            slot = tree.search(target)
+            assert sum(values[:slot + 1]) >= target - 1e-9
+            assert sum(values[:slot]) < target
+        assert tree.search(sum(values) + 1) == 100
+
+
+class TestDepthIndexSetup:
+    """Test step and window selection."""
+
+    def test_step_is_tick_while_window_spans_bands(self):
+        index = DepthIndex(0.1, bands=(0.5, 2.0), width=4096)
+        index.load([(4999.9, 1.0)], [(5000.1, 1.0)])
+        assert index.step == 0.1
+
+    def test_step_coarsens_for_wide_bands(self):
+        index = DepthIndex(0.1, bands=(0.5, 2.0), width=4096)
+        index.load([(49999.9, 1.0)], [(50000.1, 1.0)])
+        # A quarter window of 1024 steps must span 2% of 50000
+        assert index.step == 1.0
+
+    def test_rejects_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            DepthIndex(0)
+        with pytest.raises(ValueError):
+            DepthIndex(0.1, bands=())
+        with pytest.raises(ValueError):
+            DepthIndex(0.1, width=4)
+
+    def test_empty_index_answers_nothing(self):
+        index = DepthIndex(0.1)
+        index.load([], [])
+
+        assert index.metrics(None, None) is None
+        assert index.sweep(True, 1.0)['complete'] is False
+        assert index.band_depth(True, 100.0, 1.0) == (0.0, 0.0)
+
+
+class TestOrderBookDepthIndex:
+    """Test the index kept by OrderBook updates."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("make_book", [
+        lambda: OrderBook("BTCUSDT"),
+        lambda: TickLadderOrderBook("BTCUSDT", 0.1, width=512),
+    ])
+    async def test_random_updates_match_levels(self, make_book):
+        rng = random.Random(2)
+        orderbook = make_book()
+        orderbook.set_depth_index(DepthIndex(0.1, width=4096))
+        bids, asks = _random_book(rng)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+        _assert_matches_levels(orderbook)
+
+        for _ in range(200):
+            await orderbook.update_delta(
+                _levels((round(5000.0 - rng.randint(0, 400) * 0.1, 1),
+                         rng.choice([0, round(rng.uniform(0.001, 5), 3)])) for _ in range(5)),
+                _levels((round(5000.1 + rng.randint(0, 400) * 0.1, 1),
+                         rng.choice([0, round(rng.uniform(0.001, 5), 3)])) for _ in range(5)),
+                1640995200000)
+        _assert_matches_levels(orderbook)
+
+        # Streamed snapshots are applied as differences
+        bids, asks = _random_book(rng, levels=250)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+        _assert_matches_levels(orderbook)
+        assert orderbook.depth_index.rebuild_count == 1
+
+    @pytest.mark.asyncio
+    async def test_window_follows_the_mid(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook.set_depth_index(DepthIndex(0.1, width=8192))
+        rng = random.Random(3)
+        bids, asks = _random_book(rng)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+
+        # The mid moves 6% up, out of the window's central half
+        bids, asks = _random_book(rng, mid=5300.0)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+
+        assert orderbook.depth_index.rebuild_count == 2
+        _assert_matches_levels(orderbook)
+
+    @pytest.mark.asyncio
+    async def test_levels_outside_window_end_a_sweep(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook.set_depth_index(DepthIndex(0.1, bands=(1.0,), width=64))
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels([(99.9, 1.0)]), _levels([(100.1, 1.0), (150.0, 5.0)]),
+            1640995200000))
+
+        result = orderbook.depth_index.sweep(True, 3.0)
+
+        assert result['complete'] is False
+        assert result['filled'] == pytest.approx(1.0)
+        assert orderbook.depth_index.get_stats()['outside_amount'] == [0.0, 5.0]
+
+    @pytest.mark.asyncio
+    async def test_metrics_are_computed_once_per_version(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook.set_depth_index(DepthIndex(0.1, sweep_notionals=(5000.0,), width=4096))
+        assert orderbook.get_depth_metrics() is None
+
+        bids, asks = _random_book(random.Random(4))
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+        metrics = orderbook.get_depth_metrics()
+
+        assert orderbook.get_depth_metrics() is metrics
+        assert [band['pct'] for band in metrics['bands']] == [0.5, 1.0, 2.0]
+        sweep = metrics['sweeps'][0]
+        assert sweep['units'] == pytest.approx(5000.0 / metrics['mid'])
+        assert sweep['buy']['slippage_pct'] >= 0
+        assert sweep['sell']['slippage_pct'] >= 0
+
+        await orderbook.update_delta(_levels([(4999.0, 7.0)]), [], 1640995200000)
+        assert orderbook.get_depth_metrics() is not metrics
+        # Explicit sizes are computed on demand
+        assert orderbook.get_depth_metrics([1.0])['sweeps'][0]['units'] == 1.0
+
+    def test_no_index_no_metrics(self):
+        orderbook = OrderBook("BTCUSDT")
+        assert orderbook.get_depth_metrics() is None
+
+    def test_memory_estimate_includes_index(self):
+        orderbook = OrderBook("BTCUSDT")
+        without = orderbook.get_memory_bytes()
+
+        orderbook.set_depth_index(DepthIndex(0.1, width=1024))
+
+        assert orderbook.get_memory_bytes() >= without + 4 * 1024 * 8
@@ -0,0 +1,137 @@
+"""
+Tests for the liquidity heatmap ring buffer.
+"""
+
+import struct
+from array import array
+
+import pytest
+
+from app.models.liquidity_heatmap import (
+    COLUMN_HEADER_BYTES,
+    HEATMAP_HEADER,
+    HEATMAP_MAGIC,
+    LiquidityHeatmap,
+    MAX_WINDOW_CELLS,
+    encode_window,
+    heatmap_step,
+)
+
+
+def _column(heatmap, value):
+    return [float(value)] * heatmap.buckets
+
+
+class TestHeatmapStep:
+    """Test the 1-2-5 price grid step."""
+
+    @pytest.mark.parametrize("mid,expected", [
+        (50000.0, 10.0),    # ±2% over 100 buckets needs 10
+        (3000.0, 1.0),      # needs 0.6
+        (0.25, 0.00005),    # needs 0.00005
+        (120.0, 0.05),      # needs 0.024
+    ])
+    def test_smallest_step_covering_range(self, mid, expected):
+        assert heatmap_step(mid, 200, 2.0) == expected
+
+    def test_step_is_fixed_by_first_sample(self):
+        heatmap = LiquidityHeatmap(buckets=10, slices=4, range_pct=5.0)
+
+        assert heatmap.first_index(100.0) == 100 - 5
+        assert heatmap.step == 1.0
+        assert heatmap.first_index(1000.0) == 1000 - 5
+        assert heatmap.step == 1.0
+
+    def test_rejects_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            LiquidityHeatmap(buckets=1)
+        with pytest.raises(ValueError):
+            LiquidityHeatmap(slices=0)
+        with pytest.raises(ValueError):
+            LiquidityHeatmap(range_pct=0)
+
+
+class TestHeatmapRing:
+    """Test column storage and windows."""
+
+    def test_ring_keeps_latest_slices(self):
+        heatmap = LiquidityHeatmap(buckets=4, slices=3)
+        first = heatmap.first_index(100.0)
+        for second in range(5):
+            heatmap.append(second * 1000, 100.0, first, _column(heatmap, second))
+
+        window = heatmap.window()
+
+        assert len(heatmap) == 3
+        assert window['timestamps'] == [2000, 3000, 4000]
+        assert list(window['amounts']) == [2.0] * 4 + [3.0] * 4 + [4.0] * 4
+
+    def test_columns_line_up_on_common_price_axis(self):
+        heatmap = LiquidityHeatmap(buckets=4, slices=8, range_pct=2.0)
+        heatmap.first_index(100.0)
+        heatmap.append(1000, 100.0, 98, [1.0, 2.0, 3.0, 4.0])
+        heatmap.append(2000, 101.0, 99, [5.0, 6.0, 7.0, 8.0])
+
+        window = heatmap.window()
+
+        assert window['first_index'] == 98
+        assert window['buckets'] == 5
+        assert list(window['amounts']) == [1.0, 2.0, 3.0, 4.0, 0.0,
+                                           0.0, 5.0, 6.0, 7.0, 8.0]
+
+    def test_time_and_price_crop(self):
+        heatmap = LiquidityHeatmap(buckets=4, slices=8, range_pct=2.0)
+        heatmap.first_index(100.0)
+        heatmap.append(1000, 100.0, 98, [1.0, 2.0, 3.0, 4.0])
+        heatmap.append(2000, 101.0, 99, [5.0, 6.0, 7.0, 8.0])
+
+        window = heatmap.window(start=1500, low=100.0, high=101.0)
+
+        assert window['timestamps'] == [2000]
+        assert window['first_index'] == 100
+        assert list(window['amounts']) == [6.0, 7.0]
+        assert heatmap.window(start=3000) is None
+
+    def test_window_guards(self):
+        heatmap = LiquidityHeatmap(buckets=4, slices=8)
+        assert heatmap.window() is None
+
+        first = heatmap.first_index(100.0)
+        heatmap.append(1000, 100.0, first, _column(heatmap, 1))
+        with pytest.raises(ValueError):
+            heatmap.window(low=101.0, high=100.0)
+        with pytest.raises(ValueError):
+            heatmap.window(low=heatmap.step, high=heatmap.step * (MAX_WINDOW_CELLS + 1))
+        with pytest.raises(ValueError):
+            heatmap.append(2000, 100.0, first, [1.0])
+
+    def test_memory_is_preallocated_and_bounded(self):
+        heatmap = LiquidityHeatmap(buckets=200, slices=3600)
+        before = heatmap.get_memory_bytes()
+        first = heatmap.first_index(100.0)
+        for second in range(4000):
+            heatmap.append(second, 100.0, first, _column(heatmap, 1))
+
+        assert heatmap.get_memory_bytes() == before == 3600 * (200 * 4 + COLUMN_HEADER_BYTES)
+
+
+class TestEncodeWindow:
+    """Test the binary window layout."""
+
+    def test_round_trip(self):
+        heatmap = LiquidityHeatmap(buckets=4, slices=8, range_pct=2.0)
+        heatmap.first_index(100.0)
+        heatmap.append(1000, 100.5, 98, [1.0, 2.0, 3.0, 4.5])
+        heatmap.append(2000, 101.5, 99, [5.0, 6.0, 7.0, 8.0])
+
+        payload = encode_window(heatmap.window())
+
+        magic, version, _, slices, buckets, step, first_index = HEATMAP_HEADER.unpack_from(payload)
+        assert (magic, version, slices, buckets, step, first_index) == (
+            HEATMAP_MAGIC, 1, 2, 5, 1.0, 98)
+        offset = HEATMAP_HEADER.size
+        assert struct.unpack_from("<2q", payload, offset) == (1000, 2000)
+        assert struct.unpack_from("<2d", payload, offset + 16) == (100.5, 101.5)
+        amounts = array("f", payload[offset + 32:])
+        assert len(payload) == offset + 32 + slices * buckets * 4
+        assert list(amounts) == [1.0, 2.0, 3.0, 4.5, 0.0, 0.0, 5.0, 6.0, 7.0, 8.0]
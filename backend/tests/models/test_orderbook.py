@@ -0,0 +1,140 @@
+"""
+Tests for the OrderBook model's copy-on-write versioned views.
+"""
+
+import dataclasses
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+
+
+def _snapshot(symbol: str, bids, asks, timestamp: float = 1640995200000) -> OrderBookSnapshot:
+    return OrderBookSnapshot(
+        symbol=symbol,
+        bids=[OrderBookLevel(price=p, amount=a) for p, a in bids],
+        asks=[OrderBookLevel(price=p, amount=a) for p, a in asks],
+        timestamp=timestamp
+    )
+
+
+class TestOrderBookView:
+    """Test versioned view publication and lock-free reads."""
+
+    @pytest.mark.asyncio
+    async def test_version_increments_per_update(self):
+        orderbook = OrderBook("BTCUSDT")
+        assert orderbook.version == 0
+
+        await orderbook.update_snapshot(_snapshot("BTCUSDT", [(100.0, 1.0)], [(101.0, 1.0)]))
+        assert orderbook.version == 1
+
+        await orderbook.update_delta([OrderBookLevel(price=99.0, amount=2.0)], [], 1640995201000)
+        assert orderbook.version == 2
+
+    @pytest.mark.asyncio
+    async def test_view_is_ordered_and_immutable(self):
+        orderbook = OrderBook("BTCUSDT")
+        await orderbook.update_snapshot(_snapshot(
+            "BTCUSDT", [(99.0, 1.0), (100.0, 2.0)], [(102.0, 1.0), (101.0, 3.0)]))
+
+        view = orderbook.get_view()
+
+        assert view.version == orderbook.version
+        assert view.bids == ((100.0, 2.0), (99.0, 1.0))
+        assert view.asks == ((101.0, 3.0), (102.0, 1.0))
+        assert view.top_bids(1) == ((100.0, 2.0),)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            view.version = 5
+
+    @pytest.mark.asyncio
+    async def test_old_view_survives_updates(self):
+        """A reader holding a view keeps a consistent copy while the book changes."""
+        orderbook = OrderBook("BTCUSDT")
+        await orderbook.update_snapshot(_snapshot("BTCUSDT", [(100.0, 1.0)], [(101.0, 1.0)]))
+        view = orderbook.get_view()
+
+        await orderbook.update_delta(
+            [OrderBookLevel(price=100.0, amount=0)], [OrderBookLevel(price=100.5, amount=4.0)],
+            1640995201000)
+
+        assert view.bids == ((100.0, 1.0),)
+        new_view = orderbook.get_view()
+        assert new_view.version == view.version + 1
+        assert new_view.bids == ()
+        assert new_view.asks == ((100.5, 4.0), (101.0, 1.0))
+
+    @pytest.mark.asyncio
+    async def test_view_is_shared_until_next_update(self):
+        orderbook = OrderBook("BTCUSDT")
+        await orderbook.update_snapshot(_snapshot("BTCUSDT", [(100.0, 1.0)], [(101.0, 1.0)]))
+
+        assert orderbook.get_view() is orderbook.get_view()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_reads_only_limit_levels(self):
+        orderbook = OrderBook("BTCUSDT")
+        await orderbook.update_snapshot(_snapshot(
+            "BTCUSDT",
+            [(100.0 - i, 1.0) for i in range(50)],
+            [(101.0 + i, 1.0) for i in range(50)]))
+
+        snapshot = await orderbook.get_snapshot(5)
+
+        assert [level.price for level in snapshot.bids] == [100.0, 99.0, 98.0, 97.0, 96.0]
+        assert [level.price for level in snapshot.asks] == [101.0, 102.0, 103.0, 104.0, 105.0]
+        assert await orderbook.get_best_bid_ask() == (100.0, 101.0)
+
+    @pytest.mark.asyncio
+    async def test_shallow_reads_do_not_copy_the_book(self):
+        orderbook = OrderBook("BTCUSDT")
+        await orderbook.update_snapshot(_snapshot(
+            "BTCUSDT",
+            [(1000.0 - i * 0.1, 1.0) for i in range(2000)],
+            [(1001.0 + i * 0.1, 1.0) for i in range(2000)]))
+
+        assert await orderbook.get_best_bid_ask() == (1000.0, 1001.0)
+        snapshot = await orderbook.get_snapshot(20)
+        aggregated = await orderbook.get_aggregated_view(2, 1.0)
+
+        assert len(snapshot.bids) == len(snapshot.asks) == 20
+        assert len(aggregated['bids']) == 20
+        # The full view for this version was never built
+        assert orderbook._view.version != orderbook.version
+
+        view = orderbook.get_view()
+        assert orderbook.top_levels(20) == (view.top_bids(20), view.top_asks(20))
+        assert len((await orderbook.get_snapshot()).bids) == 2000
+
+    @pytest.mark.asyncio
+    async def test_readers_do_not_take_the_lock(self):
+        orderbook = OrderBook("BTCUSDT")
+        await orderbook.update_snapshot(_snapshot("BTCUSDT", [(100.0, 1.0)], [(101.0, 1.0)]))
+
+        async with orderbook._lock:
+            snapshot = await orderbook.get_snapshot(10)
+            aggregated = await orderbook.get_aggregated_view(1, 1.0)
+
+        assert snapshot.bids[0].price == 100.0
+        assert aggregated['asks'] == [{'price': 101.0, 'amount': 1.0}]
+
+
+class TestIterLevels:
+    """Test lazy walks over the live book."""
+
+    @pytest.mark.asyncio
+    async def test_walks_from_best_price(self):
+        orderbook = OrderBook("BTCUSDT")
+        await orderbook.update_snapshot(_snapshot(
+            "BTCUSDT", [(99.0, 1.0), (100.0, 2.0), (98.0, 4.0)], [(102.0, 1.0), (101.0, 3.0)]))
+
+        bids, asks = orderbook.iter_levels()
+
+        assert next(bids) == (100.0, 2.0)
+        assert next(bids) == (99.0, 1.0)
+        assert list(asks) == [(101.0, 3.0), (102.0, 1.0)]
+
+    def test_empty_book(self):
+        bids, asks = OrderBook("BTCUSDT").iter_levels()
+
+        assert list(bids) == [] and list(asks) == []
@@ -0,0 +1,214 @@
+"""
+Tests for the multi-resolution aggregation pyramid.
+"""
+
+import copy
+import random
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.orderbook_pyramid import ASKS, BIDS, OrderBookPyramid
+from app.models.tick_ladder_orderbook import TickLadderOrderBook
+from app.services.orderbook_aggregation_service import OrderBookAggregationService
+
+ROUNDINGS = [0.1, 1.0, 10.0, 100.0]
+
+
+def _levels(pairs):
+    return [OrderBookLevel(price=price, amount=amount) for price, amount in pairs]
+
+
+def _random_book(rng, levels=300):
+    bids = [(round(5000.0 - i * 0.1, 1), round(rng.uniform(0.001, 5), 3)) for i in range(levels)]
+    asks = [(round(5000.1 + i * 0.1, 1), round(rng.uniform(0.001, 5), 3)) for i in range(levels)]
+    return bids, asks
+
+
+def _assert_matches_walk(orderbook, limit=15):
+    """Every pyramid level equals a fresh walk over the raw levels."""
+    service = OrderBookAggregationService()
+    for rounding in orderbook.pyramid.roundings:
+        for is_ask, levels in zip((False, True), orderbook.iter_levels()):
+            expected, _, _ = service.walk_buckets(levels, is_ask, limit, rounding)
+            actual, _, _ = orderbook.pyramid.top(is_ask, limit, rounding)
+            assert [bucket['price'] for bucket in actual] == [bucket['price'] for bucket in expected]
+            assert [bucket['amount'] for bucket in actual] == pytest.approx(
+                [bucket['amount'] for bucket in expected])
+
+
+class TestRoundingChain:
+    """Test which roundings a pyramid maintains."""
+
+    def test_power_of_ten_ladder(self):
+        assert OrderBookPyramid.rounding_chain([10, 0.1, 1, 100, 0.1]) == [0.1, 1.0, 10.0, 100.0]
+
+    def test_skips_roundings_that_do_not_nest(self):
+        assert OrderBookPyramid.rounding_chain([0.1, 0.25, 0.5, 1.0, 0, -1]) == [0.1, 0.5, 1.0]
+
+    def test_requires_a_rounding(self):
+        with pytest.raises(ValueError):
+            OrderBookPyramid([])
+
+    def test_level_lookup_tolerates_float_noise(self):
+        pyramid = OrderBookPyramid(ROUNDINGS)
+
+        assert pyramid.level_for(0.1 * 3 / 3) == 0
+        assert pyramid.level_for(100.0) == 3
+        assert pyramid.level_for(0.5) is None
+        with pytest.raises(ValueError):
+            pyramid.top(False, 10, 0.5)
+
+
+class TestPyramidUpdates:
+    """Test that levels stay equal to a fresh aggregation."""
+
+    def test_load_matches_walk(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook._bids.update(_random_book(random.Random(1))[0])
+        orderbook._asks.update(_random_book(random.Random(1))[1])
+
+        orderbook.set_pyramid_roundings(ROUNDINGS)
+
+        _assert_matches_walk(orderbook)
+
+    def test_coarser_levels_merge_the_level_below(self):
+        pyramid = OrderBookPyramid([0.5, 1.0, 10.0])
+        pyramid.load([(19.9, 1.0), (19.4, 2.0), (11.0, 4.0)], [(20.1, 1.0), (20.6, 3.0)])
+
+        assert pyramid.top(False, 10, 0.5)[0] == [
+            {'price': 19.5, 'amount': 1.0}, {'price': 19.0, 'amount': 2.0},
+            {'price': 11.0, 'amount': 4.0}]
+        assert pyramid.top(False, 10, 1.0)[0] == [
+            {'price': 19.0, 'amount': 3.0}, {'price': 11.0, 'amount': 4.0}]
+        assert pyramid.top(False, 10, 10.0)[0] == [{'price': 10.0, 'amount': 7.0}]
+        # Asks round up
+        assert pyramid.top(True, 10, 1.0)[0] == [
+            {'price': 21.0, 'amount': 4.0}]
+
+    def test_delta_touches_one_bucket_per_level(self):
+        pyramid = OrderBookPyramid(ROUNDINGS)
+        bids, asks = _random_book(random.Random(2))
+        pyramid.load(bids, asks)
+        before = copy.deepcopy(pyramid._buckets)
+
+        pyramid.apply_changes([(BIDS, 4987.3, dict(bids)[4987.3], 9.0)])
+
+        for level, buckets in enumerate(pyramid._buckets[BIDS]):
+            changed = [index for index in buckets if buckets[index] != before[BIDS][level][index]]
+            assert len(changed) == 1
+        assert pyramid._buckets[ASKS] == before[ASKS]
+
+    def test_removing_last_level_deletes_bucket_path(self):
+        pyramid = OrderBookPyramid(ROUNDINGS)
+        pyramid.load([(1234.5, 0.3), (1234.4, 0.1)], [])
+
+        pyramid.apply_changes([(BIDS, 1234.5, 0.3, 0.0), (BIDS, 1234.4, 0.1, 0.0)])
+
+        assert all(len(buckets) == 0 for buckets in pyramid._buckets[BIDS])
+        assert pyramid.top(False, 10, 100.0) == ([], 0, True)
+
+    def test_dust_is_not_served(self):
+        pyramid = OrderBookPyramid([1.0])
+        pyramid.load([(100.5, 1e-7), (99.5, 2.0), (98.5, 1e-12)], [])
+
+        buckets, covered, exhausted = pyramid.top(False, 10, 1.0)
+
+        assert buckets == [{'price': 99.0, 'amount': 2.0}]
+        assert covered == 2
+        assert exhausted
+
+
+class TestOrderBookPyramidIntegration:
+    """Test the pyramid kept by OrderBook updates."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("make_book", [
+        lambda: OrderBook("BTCUSDT"),
+        lambda: TickLadderOrderBook("BTCUSDT", 0.1, width=512),
+    ])
+    async def test_random_updates_match_walk(self, make_book):
+        rng = random.Random(4)
+        orderbook = make_book()
+        orderbook.set_pyramid_roundings(ROUNDINGS)
+        bids, asks = _random_book(rng)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+
+        for _ in range(200):
+            await orderbook.update_delta(
+                _levels((round(5000.0 - rng.randint(0, 400) * 0.1, 1),
+                         rng.choice([0, round(rng.uniform(0.001, 5), 3)])) for _ in range(5)),
+                _levels((round(5000.1 + rng.randint(0, 400) * 0.1, 1),
+                         rng.choice([0, round(rng.uniform(0.001, 5), 3)])) for _ in range(5)),
+                1640995200000)
+        _assert_matches_walk(orderbook)
+
+        # A full snapshot replaces everything
+        bids, asks = _random_book(rng, levels=50)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+        _assert_matches_walk(orderbook)
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_applied_as_a_difference(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook.set_pyramid_roundings(ROUNDINGS)
+        bids, asks = _random_book(random.Random(3))
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+        finest = orderbook.pyramid._buckets[BIDS][0]
+        before = {index: (id(bucket), list(bucket)) for index, bucket in finest.items()}
+
+        bids[5] = (bids[5][0], 42.0)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+
+        # Every bucket object survives; only the changed level's bucket moved
+        assert {index: id(bucket) for index, bucket in finest.items()} == {
+            index: bucket_id for index, (bucket_id, _) in before.items()}
+        changed = [index for index, bucket in finest.items() if bucket != before[index][1]]
+        assert [finest[index][0] for index in changed] == [42.0]
+
+    def test_unchanged_roundings_keep_the_pyramid(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook.set_pyramid_roundings(ROUNDINGS)
+        pyramid = orderbook.pyramid
+
+        orderbook.set_pyramid_roundings(list(reversed(ROUNDINGS)))
+        assert orderbook.pyramid is pyramid
+
+        orderbook.set_pyramid_roundings(None)
+        assert orderbook.pyramid is None
+
+    @pytest.mark.asyncio
+    async def test_aggregate_orderbook_reads_the_pyramid(self):
+        rng = random.Random(5)
+        bids, asks = _random_book(rng)
+        snapshot = OrderBookSnapshot("BTCUSDT", _levels(bids), _levels(asks), 1640995200000)
+        plain = OrderBook("BTCUSDT")
+        with_pyramid = OrderBook("BTCUSDT")
+        with_pyramid.set_pyramid_roundings(ROUNDINGS)
+        await plain.update_snapshot(snapshot)
+        await with_pyramid.update_snapshot(snapshot)
+
+        for rounding in (0.1, 10.0, 0.5):
+            expected = await OrderBookAggregationService().aggregate_orderbook(plain, 20, rounding)
+            actual = await OrderBookAggregationService().aggregate_orderbook(
+                with_pyramid, 20, rounding)
+            for side in ('bids', 'asks'):
+                assert [level['price'] for level in actual[side]] == [
+                    level['price'] for level in expected[side]]
+                assert [level['cumulative'] for level in actual[side]] == pytest.approx(
+                    [level['cumulative'] for level in expected[side]])
+            assert actual['market_depth_info']['actual_levels'] == (
+                expected['market_depth_info']['actual_levels'])
+
+    def test_memory_estimate_includes_pyramid(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook._bids.update(_random_book(random.Random(6))[0])
+        without = orderbook.get_memory_bytes()
+
+        orderbook.set_pyramid_roundings(ROUNDINGS)
+
+        assert orderbook.get_memory_bytes() > without
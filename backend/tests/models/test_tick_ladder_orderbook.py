@@ -0,0 +1,173 @@
+"""
+Tests for the array-backed tick ladder order book.
+
+The ladder must behave exactly like the SortedDict OrderBook; these tests
+drive both with the same updates and compare the published views.
+"""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.tick_ladder_orderbook import (
+    BACKEND_SORTED,
+    BACKEND_TICK_LADDER,
+    TickLadderOrderBook,
+    create_orderbook,
+    tick_size_from_symbol_data,
+)
+
+
+def _levels(pairs):
+    return [OrderBookLevel(price=price, amount=amount) for price, amount in pairs]
+
+
+def _snapshot(bids, asks) -> OrderBookSnapshot:
+    return OrderBookSnapshot(symbol="BTCUSDT", bids=_levels(bids), asks=_levels(asks),
+                             timestamp=1640995200000)
+
+
+class TestTickLadderOrderBook:
+    """Test ladder storage, best price tracking and recentering."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_view_matches_sorted_book(self):
+        ladder = TickLadderOrderBook("BTCUSDT", 0.1, width=64)
+        sorted_book = OrderBook("BTCUSDT")
+        snapshot = _snapshot(
+            [(50000.0, 1.0), (49999.9, 2.0), (49999.7, 0.0), (49990.0, 3.0)],
+            [(50000.1, 1.5), (50000.3, 2.5)])
+
+        await ladder.update_snapshot(snapshot)
+        await sorted_book.update_snapshot(snapshot)
+
+        assert ladder.get_view().bids == sorted_book.get_view().bids
+        assert ladder.get_view().asks == sorted_book.get_view().asks
+        assert await ladder.get_best_bid_ask() == (50000.0, 50000.1)
+        assert await ladder.get_levels_count() == (3, 2)
+
+    @pytest.mark.asyncio
+    async def test_best_bid_tracks_removals(self):
+        ladder = TickLadderOrderBook("BTCUSDT", 0.1, width=64)
+        await ladder.update_snapshot(_snapshot(
+            [(100.0, 1.0), (99.8, 1.0)], [(100.1, 1.0), (100.4, 1.0)]))
+
+        await ladder.update_delta(_levels([(100.0, 0)]), _levels([(100.1, 0)]), 1640995201000)
+
+        assert await ladder.get_best_bid_ask() == (99.8, 100.4)
+
+    @pytest.mark.asyncio
+    async def test_off_grid_and_far_prices_use_outliers(self):
+        ladder = TickLadderOrderBook("BTCUSDT", 0.1, width=64)
+        await ladder.update_snapshot(_snapshot([(100.0, 1.0)], [(100.1, 1.0)]))
+
+        await ladder.update_delta(_levels([(99.95, 2.0), (50.0, 3.0)]), [], 1640995201000)
+
+        assert ladder.get_view().bids == ((100.0, 1.0), (99.95, 2.0), (50.0, 3.0))
+        assert dict(ladder._bids) == {99.95: 2.0, 50.0: 3.0}
+
+    @pytest.mark.asyncio
+    async def test_recenters_when_price_drifts(self):
+        ladder = TickLadderOrderBook("BTCUSDT", 1.0, width=64)
+        await ladder.update_snapshot(_snapshot([(1000.0, 1.0), (990.0, 1.0)], [(1001.0, 1.0)]))
+        anchor = ladder._anchor
+
+        # Move the market 40 ticks up, beyond the central half of the window
+        await ladder.update_delta(_levels([(1040.0, 1.0), (1000.0, 0)]),
+                                  _levels([(1041.0, 1.0), (1001.0, 0)]), 1640995201000)
+
+        assert ladder.recenter_count == 1
+        assert ladder._anchor > anchor
+        assert ladder.get_view().bids == ((1040.0, 1.0), (990.0, 1.0))
+        assert await ladder.get_best_bid_ask() == (1040.0, 1041.0)
+
+    @pytest.mark.asyncio
+    async def test_random_updates_match_sorted_book(self):
+        rng = random.Random(7)
+        ladder = TickLadderOrderBook("BTCUSDT", 0.5, width=32)
+        sorted_book = OrderBook("BTCUSDT")
+        mid = 2000
+
+        for _ in range(500):
+            mid += rng.randint(-4, 4)
+            bids = _levels((0.5 * (mid - rng.randint(1, 40)), rng.choice([0, 1.0, 2.5]))
+                           for _ in range(rng.randint(0, 4)))
+            asks = _levels((0.5 * (mid + rng.randint(1, 40)), rng.choice([0, 1.0, 2.5]))
+                           for _ in range(rng.randint(0, 4)))
+            await ladder.update_delta(bids, asks, 1640995200000)
+            await sorted_book.update_delta(bids, asks, 1640995200000)
+
+            assert ladder.get_view().bids == sorted_book.get_view().bids
+            assert ladder.get_view().asks == sorted_book.get_view().asks
+            assert await ladder.get_best_bid_ask() == await sorted_book.get_best_bid_ask()
+
+        assert ladder.recenter_count > 0
+
+    @pytest.mark.asyncio
+    async def test_snapshot_limit_is_a_slice(self):
+        ladder = TickLadderOrderBook("BTCUSDT", 0.01, width=1024)
+        await ladder.update_snapshot(_snapshot(
+            [(round(10.0 - i * 0.01, 2), 1.0) for i in range(200)],
+            [(round(10.01 + i * 0.01, 2), 1.0) for i in range(200)]))
+
+        snapshot = await ladder.get_snapshot(3)
+
+        assert [level.price for level in snapshot.bids] == [10.0, 9.99, 9.98]
+        assert [level.price for level in snapshot.asks] == [10.01, 10.02, 10.03]
+
+    @pytest.mark.asyncio
+    async def test_iter_levels_matches_view(self):
+        rng = random.Random(11)
+        # Wider than one walk chunk, with outliers on both sides of the window
+        ladder = TickLadderOrderBook("BTCUSDT", 0.1, width=1024)
+        await ladder.update_snapshot(_snapshot(
+            [(round(1000.0 - i * 0.1, 1), rng.choice([0, 1.0, 2.0])) for i in range(600)]
+            + [(900.05, 1.0), (500.0, 2.0)],
+            [(round(1000.1 + i * 0.1, 1), rng.choice([0, 1.0, 2.0])) for i in range(600)]
+            + [(1000.15, 3.0), (2000.0, 2.0)]))
+
+        bids, asks = ladder.iter_levels()
+
+        assert tuple(bids) == ladder.get_view().bids
+        assert tuple(asks) == ladder.get_view().asks
+
+    def test_iter_levels_on_empty_ladder(self):
+        bids, asks = TickLadderOrderBook("BTCUSDT", 0.1, width=64).iter_levels()
+
+        assert list(bids) == [] and list(asks) == []
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            TickLadderOrderBook("BTCUSDT", 0)
+        with pytest.raises(ValueError):
+            TickLadderOrderBook("BTCUSDT", 0.1, width=4)
+
+
+class TestCreateOrderbook:
+    """Test backend selection."""
+
+    def test_sorted_backend(self):
+        orderbook = create_orderbook("BTCUSDT", BACKEND_SORTED, {'tickSize': 0.1})
+        assert type(orderbook) is OrderBook
+
+    def test_tick_ladder_backend(self):
+        orderbook = create_orderbook("BTCUSDT", BACKEND_TICK_LADDER, {'tickSize': 0.1}, width=128)
+        assert isinstance(orderbook, TickLadderOrderBook)
+        assert orderbook.width == 128
+
+    def test_falls_back_without_tick_size(self):
+        orderbook = create_orderbook("BTCUSDT", BACKEND_TICK_LADDER, None)
+        assert type(orderbook) is OrderBook
+
+    def test_falls_back_without_numpy(self):
+        with patch('app.models.tick_ladder_orderbook.np', None):
+            orderbook = create_orderbook("BTCUSDT", BACKEND_TICK_LADDER, {'tickSize': 0.1})
+        assert type(orderbook) is OrderBook
+
+    def test_tick_size_from_symbol_data(self):
+        assert tick_size_from_symbol_data({'tickSize': 0.5, 'pricePrecision': 1}) == 0.5
+        assert tick_size_from_symbol_data({'pricePrecision': 2}) == 0.01
+        assert tick_size_from_symbol_data({'pricePrecision': None}) is None
+        assert tick_size_from_symbol_data({}) is None
@@ -0,0 +1,163 @@
+"""
+Tests for the incremental wall (largest level) index.
+"""
+
+import heapq
+import random
+
+import pytest
+
+from app.models.level_changes import ASKS, BIDS
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.tick_ladder_orderbook import TickLadderOrderBook
+from app.models.wall_index import COMPACT_FACTOR, COMPACT_SLACK, WallIndex
+
+
+def _levels(pairs):
+    return [OrderBookLevel(price=price, amount=amount) for price, amount in pairs]
+
+
+def _random_book(rng, levels=300):
+    bids = [(round(5000.0 - i * 0.1, 1), round(rng.uniform(0.001, 5), 3)) for i in range(levels)]
+    asks = [(round(5000.1 + i * 0.1, 1), round(rng.uniform(0.001, 5), 3)) for i in range(levels)]
+    return bids, asks
+
+
+def _assert_matches_levels(orderbook):
+    """Wall amounts equal the largest amounts of a full scan."""
+    index = orderbook.wall_index
+    for is_ask, levels in zip((False, True), orderbook.iter_levels()):
+        levels = dict(levels)
+        expected = heapq.nlargest(index.top_k, levels.values())
+        walls = index.top(is_ask)
+        assert [amount for _, amount in walls] == expected
+        assert all(levels[price] == amount for price, amount in walls)
+
+
+class TestWallIndexUpdates:
+    """Test that the walls stay equal to a full scan."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("make_book", [
+        lambda: OrderBook("BTCUSDT"),
+        lambda: TickLadderOrderBook("BTCUSDT", 0.1, width=512),
+    ])
+    async def test_random_updates_match_scan(self, make_book):
+        rng = random.Random(1)
+        orderbook = make_book()
+        orderbook.set_wall_index(WallIndex(top_k=5))
+        bids, asks = _random_book(rng)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+        _assert_matches_levels(orderbook)
+
+        for _ in range(300):
+            await orderbook.update_delta(
+                _levels((round(5000.0 - rng.randint(0, 400) * 0.1, 1),
+                         rng.choice([0, round(rng.uniform(0.001, 9), 3)])) for _ in range(5)),
+                _levels((round(5000.1 + rng.randint(0, 400) * 0.1, 1),
+                         rng.choice([0, round(rng.uniform(0.001, 9), 3)])) for _ in range(5)),
+                1640995200000)
+            _assert_matches_levels(orderbook)
+
+        bids, asks = _random_book(rng, levels=100)
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels(bids), _levels(asks), 1640995200000))
+        _assert_matches_levels(orderbook)
+
+    @pytest.mark.asyncio
+    async def test_removed_wall_is_not_reported(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook.set_wall_index(WallIndex(top_k=2))
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels([(100.0, 50.0), (99.9, 1.0), (99.8, 2.0)]), [], 1640995200000))
+
+        await orderbook.update_delta(_levels([(100.0, 0)]), [], 1640995200000)
+        assert orderbook.wall_index.top(False) == [(99.8, 2.0), (99.9, 1.0)]
+
+        # A shrunk level falls back in line; the stale larger entry is dropped
+        await orderbook.update_delta(_levels([(100.0, 40.0)]), [], 1640995200000)
+        await orderbook.update_delta(_levels([(100.0, 1.5)]), [], 1640995200000)
+        assert orderbook.wall_index.top(False) == [(99.8, 2.0), (100.0, 1.5)]
+
+    def test_heap_is_compacted(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook._bids.update({100.0 - i: 1.0 for i in range(10)})
+        index = WallIndex()
+        orderbook.set_wall_index(index)
+
+        rng = random.Random(2)
+        for _ in range(2000):
+            price = 100.0 - rng.randrange(10)
+            previous = orderbook._bids[price]
+            orderbook._bids[price] = round(rng.uniform(0.1, 5), 3)
+            index.apply_changes([(BIDS, price, previous, orderbook._bids[price])])
+
+        assert index.compactions > 0
+        assert len(index._heaps[BIDS]) <= COMPACT_FACTOR * 10 + COMPACT_SLACK
+        assert index.get_stats()['live_levels'] == [10, 0]
+
+    def test_rejects_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            WallIndex(top_k=0)
+        with pytest.raises(ValueError):
+            WallIndex(rolling_levels=0)
+
+
+class TestWallZScore:
+    """Test the z-score against the rolling level size."""
+
+    def _index(self, min_z_score):
+        orderbook = OrderBook("BTCUSDT")
+        rng = random.Random(3)
+        orderbook._asks.update({round(100.0 + i * 0.1, 1): round(rng.uniform(0.9, 1.1), 3)
+                                for i in range(200)})
+        orderbook._asks[105.0] = 25.0
+        orderbook.set_wall_index(WallIndex(top_k=3, min_z_score=min_z_score))
+        return orderbook.wall_index
+
+    def test_outlier_stands_out(self):
+        index = self._index(0.0)
+        walls = index.walls()['asks']
+
+        assert walls[0]['price'] == 105.0
+        assert walls[0]['z_score'] > 5
+        assert len(walls) == 3
+        assert walls[1]['z_score'] < walls[0]['z_score']
+
+    def test_threshold_reports_outliers_only(self):
+        index = self._index(3.0)
+
+        assert [wall['price'] for wall in index.walls()['asks']] == [105.0]
+        assert index.walls()['bids'] == []
+        assert index.z_score(False, 10.0) == 0.0  # No bid sizes seen
+
+    def test_rolling_mean_follows_changes(self):
+        index = WallIndex(rolling_levels=10)
+        index.load([], [], lambda is_ask, price: 0.0)
+        for step in range(100):
+            index.apply_changes([(ASKS, 100.0 + step, 0.0, 10.0)])
+
+        assert index.get_stats()['rolling_mean'][ASKS] == pytest.approx(10.0)
+
+
+class TestIndexMetrics:
+    """Test the per-version metrics published with book updates."""
+
+    @pytest.mark.asyncio
+    async def test_walls_are_published_once_per_version(self):
+        orderbook = OrderBook("BTCUSDT")
+        orderbook.set_wall_index(WallIndex(top_k=1))
+        assert orderbook.get_index_metrics() == {}
+
+        await orderbook.update_snapshot(OrderBookSnapshot(
+            "BTCUSDT", _levels([(99.9, 3.0), (99.8, 1.0)]), _levels([(100.1, 2.0)]),
+            1640995200000))
+        metrics = orderbook.get_index_metrics()
+
+        assert orderbook.get_index_metrics() is metrics
+        assert [wall['price'] for wall in metrics['walls']['bids']] == [99.9]
+        assert 'depth' not in metrics
+
+        await orderbook.update_delta(_levels([(99.8, 4.0)]), [], 1640995200000)
+        assert [wall['price'] for wall in orderbook.get_index_metrics()['walls']['bids']] == [99.8]
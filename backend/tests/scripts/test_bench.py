@@ -0,0 +1,111 @@
+"""
+Tests for the hot path micro-benchmarks (scripts/bench.py, scripts/bench_cases.py).
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from scripts.bench import (
+    BASELINE_PATH,
+    compare,
+    keep_best,
+    load_baseline,
+    main,
+    measure,
+    update_baseline,
+)
+from scripts.bench_cases import benchmarks
+
+
+def _run(results):
+    return {"calibration_ns": 100.0,
+            "results": {name: {"ns": relative * 100, "relative": relative}
+                        for name, relative in results.items()}}
+
+
+class TestCompare:
+    """Test threshold checks against the baseline."""
+
+    def test_statuses(self):
+        baseline = {"results": {"a": {"relative": 1.0}, "b": {"relative": 1.0},
+                                "c": {"relative": 1.0}}}
+
+        rows = compare(baseline, _run({"a": 1.1, "b": 1.5, "c": 0.5, "d": 1.0}), 25)
+
+        assert [(name, status) for name, _, status in rows] == [
+            ("a", "ok"), ("b", "REGRESSED"), ("c", "faster"), ("d", "new")]
+        assert rows[1][1] == pytest.approx(50)
+
+    def test_keep_best(self):
+        merged = keep_best(_run({"a": 2.0, "b": 1.0}), _run({"a": 1.5, "b": 1.2}))
+
+        assert merged["results"]["a"]["relative"] == 1.5
+        assert merged["results"]["b"]["relative"] == 1.0
+
+    def test_update_keeps_unmeasured_entries(self):
+        baseline = {"threshold_percent": 10, "results": {"old": {"ns": 1, "relative": 1}}}
+        name = benchmarks()[0].name
+
+        updated = update_baseline(baseline, _run({name: 2.0}))
+
+        assert updated["threshold_percent"] == 10
+        assert list(updated["results"]) == [name, "old"]
+
+
+class TestMeasure:
+    """Test the timer."""
+
+    def test_scales_with_work(self):
+        def run(n):
+            for _ in range(n):
+                sum(range(2000))
+
+        def run_twice(n):
+            run(2 * n)
+
+        single, _ = measure(run, min_time=0.01, repeat=3)
+        double, calibration = measure(run_twice, min_time=0.01, repeat=3,
+                                      calibration_number=1)
+
+        assert 1.3 < double / single < 3
+        assert calibration > 0
+
+
+class TestBenchmarks:
+    """Every benchmark builds its fixtures and runs."""
+
+    def test_baseline_covers_every_benchmark(self):
+        assert set(load_baseline(BASELINE_PATH)["results"]) == {
+            case.name for case in benchmarks()}
+
+    @pytest.mark.parametrize("case", benchmarks(), ids=lambda case: case.name)
+    def test_runs(self, case):
+        loop = asyncio.new_event_loop()
+        try:
+            case.setup(loop)(2)
+        finally:
+            loop.close()
+
+
+class TestMain:
+    """Test the command line."""
+
+    def test_regression_fails(self, tmp_path, capsys):
+        path = tmp_path / "baseline.json"
+        args = ["-k", "json.candle_update", "--baseline", str(path),
+                "--min-time", "0.01", "--repeat", "2"]
+        assert main(args + ["--update-baseline"]) == 0
+
+        baseline = json.loads(path.read_text())
+        assert list(baseline["results"]) == ["json.candle_update"]
+        baseline["results"]["json.candle_update"]["relative"] /= 10
+        path.write_text(json.dumps(baseline))
+
+        assert main(args + ["--retries", "0"]) == 1
+        assert "REGRESSED" in capsys.readouterr().out
+        assert main(args + ["--threshold", "10000"]) == 0
+
+    def test_unknown_filter(self):
+        assert main(["-k", "no-such-benchmark"]) == 2
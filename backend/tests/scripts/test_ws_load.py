@@ -0,0 +1,147 @@
+"""
+Tests for the WebSocket load harness (scripts/ws_load.py, scripts/ws_load_client.py).
+"""
+
+import pytest
+
+from scripts.ws_load import (
+    build_report,
+    compare_reports,
+    parse_args,
+    parse_mix,
+    plan_clients,
+    run,
+)
+from scripts.ws_load_client import LatencyHistogram, message_latency
+
+SYMBOLS = [{"id": "BTCUSDT", "roundingOptions": [0.1, 1, 10]},
+           {"id": "ETHUSDT", "roundingOptions": [0.01, 0.1]}]
+
+
+def _worker_result(latencies, stream="orderbook", busy=0.2):
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    streams = {name: {"clients": 0, "connected": 0, "messages": 0, "bytes": 0,
+                      "errors": {}, "latency": LatencyHistogram().to_state()}
+               for name in ("orderbook", "trades", "candles", "liquidations")}
+    streams[stream] = {"clients": 2, "connected": 2, "messages": len(latencies),
+                       "bytes": 100 * len(latencies), "errors": {"TimeoutError": 1},
+                       "latency": histogram.to_state()}
+    return {"streams": streams, "busy": busy}
+
+
+class TestLatencyHistogram:
+    """Test the mergeable latency histogram."""
+
+    def test_percentiles_within_resolution(self):
+        histogram = LatencyHistogram()
+        for latency in range(1, 1001):
+            histogram.record(float(latency))
+
+        assert histogram.percentile(50) == pytest.approx(500, rel=0.02)
+        assert histogram.percentile(99) == pytest.approx(990, rel=0.02)
+        assert histogram.percentile(100) == 1000
+        assert histogram.summary()["mean"] == pytest.approx(500.5)
+
+    def test_merge_matches_single_histogram(self):
+        whole, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for latency in range(1, 2001):
+            whole.record(latency / 10)
+            (first if latency % 2 else second).record(latency / 10)
+
+        merged = LatencyHistogram.from_state(first.to_state())
+        merged.merge(LatencyHistogram.from_state(second.to_state()))
+
+        assert merged.summary() == whole.summary()
+
+    def test_empty(self):
+        assert LatencyHistogram().summary()["p99"] is None
+
+
+class TestMessageLatency:
+    """Test exchange timestamp extraction per message type."""
+
+    @pytest.mark.parametrize("message,expected", [
+        ({"type": "orderbook_update", "timestamp": 1000}, 50),
+        ({"type": "trades_update", "initial": False,
+          "trades": [{"timestamp": 990}, {"timestamp": 1000}]}, 50),
+        ({"type": "trades_update", "raw": True,
+          "trades": [["1", 100.0, 1.0, "buy", 1000]]}, 50),
+        ({"type": "liquidation_order", "data": {"timestamp": 1000}}, 50),
+        ({"type": "trades_update", "initial": True, "trades": [{"timestamp": 1000}]}, None),
+        ({"type": "liquidation_order", "data": [], "initial": True}, None),
+        ({"type": "candle_update", "timestamp": 0}, None),
+        ({"type": "format_descriptor"}, None),
+    ])
+    def test_latency(self, message, expected):
+        assert message_latency(message, 1050.0) == expected
+
+
+class TestClientPlan:
+    """Test the client mix."""
+
+    def test_mix_is_normalized(self):
+        assert parse_mix("orderbook=3,trades=1") == {"orderbook": 0.75, "trades": 0.25}
+        with pytest.raises(ValueError):
+            parse_mix("depth=1")
+
+    def test_plan_is_deterministic_and_varied(self):
+        clients = plan_clients(400, parse_mix("orderbook=0.5,trades=0.3,candles=0.2"),
+                               SYMBOLS, raw_share=0.25, seed=7)
+
+        assert clients == plan_clients(400, parse_mix("orderbook=0.5,trades=0.3,candles=0.2"),
+                                       SYMBOLS, raw_share=0.25, seed=7)
+        orderbook = [c.path for c in clients if c.stream == "orderbook"]
+        assert 150 < len(orderbook) < 250
+        assert len({path.split("?")[1] for path in orderbook}) > 20
+        assert all("rounding=0.01" not in path for path in orderbook if "BTCUSDT" in path)
+        assert any("raw=true" in path for path in orderbook)
+        assert all("raw=true" not in c.path for c in clients if c.stream == "candles")
+        assert not any(c.stream == "liquidations" for c in clients)
+
+
+class TestReport:
+    """Test report building and comparison."""
+
+    def test_report_merges_workers(self):
+        args = parse_args(["--duration", "10", "--mix", "orderbook=1", "--workers", "2"])
+        report = build_report(args, [_worker_result([10.0] * 90), _worker_result([100.0] * 10)],
+                              {"samples": 0})
+
+        orderbook = report["streams"]["orderbook"]
+        assert list(report["streams"]) == ["orderbook"]
+        assert (orderbook["clients"], orderbook["messages"]) == (4, 100)
+        assert orderbook["messages_per_second"] == 10.0
+        assert orderbook["latency_ms"]["p50"] == pytest.approx(10, rel=0.02)
+        assert orderbook["latency_ms"]["p99"] == pytest.approx(100, rel=0.02)
+        assert report["totals"]["errors"] == {"TimeoutError": 2}
+        assert report["client"]["saturated"] is False
+
+    def test_compare(self):
+        args = parse_args(["--duration", "10", "--mix", "orderbook=1"])
+        base = build_report(args, [_worker_result([10.0] * 100)], {"samples": 0})
+        new = build_report(args, [_worker_result([20.0] * 100)], {"samples": 0})
+
+        rows = {name: change for name, _, _, change in compare_reports(base, new)}
+
+        assert rows["orderbook latency p50 ms"] == pytest.approx(100, rel=0.05)
+        assert rows["orderbook msgs/s"] == 0
+
+
+@pytest.mark.slow
+class TestEndToEnd:
+    """Run the harness against the app on the replay exchange."""
+
+    def test_small_run(self, tmp_path):
+        args = parse_args(["--clients", "8", "--duration", "3", "--ramp", "1",
+                           "--warmup", "1", "--workers", "1", "--raw-share", "0.5",
+                           "--mix", "orderbook=0.5,trades=0.25,liquidations=0.25",
+                           "--server-log", str(tmp_path / "server.log")])
+
+        report = run(args)
+
+        assert report["totals"]["connected"] == 8
+        assert report["streams"]["orderbook"]["latency_ms"]["count"] > 0
+        assert report["server"]["samples"] >= 1
+        assert report["server"]["rss_mb"]["max"] > 0
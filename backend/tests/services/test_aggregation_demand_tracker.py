@@ -0,0 +1,67 @@
+"""
+Tests for the aggregation parameter demand tracker.
+"""
+
+from unittest.mock import patch
+
+from app.services.aggregation_demand_tracker import AggregationDemandTracker
+
+
+class TestAggregationDemandTracker:
+    """Test demand histogram and hot parameter selection."""
+
+    def test_counts_live_and_total_subscriptions(self):
+        tracker = AggregationDemandTracker()
+        tracker.subscribe("BTCUSDT", 20, 1.0)
+        tracker.subscribe("BTCUSDT", 20, 1.0)
+        tracker.unsubscribe("BTCUSDT", 20, 1.0)
+
+        [entry] = tracker.get_stats("BTCUSDT")["BTCUSDT"]
+        assert (entry['live'], entry['count']) == (1, 2)
+
+    def test_unknown_unsubscribe_is_ignored(self):
+        tracker = AggregationDemandTracker()
+        tracker.unsubscribe("BTCUSDT", 20, 1.0)
+
+        assert tracker.get_stats() == {}
+
+    def test_left_combinations_stay_hot_for_the_window(self):
+        tracker = AggregationDemandTracker(window_seconds=60)
+        with patch('app.services.aggregation_demand_tracker.time.monotonic', return_value=1000.0):
+            tracker.subscribe("BTCUSDT", 20, 1.0)
+            tracker.subscribe("BTCUSDT", 50, 10.0)
+            tracker.unsubscribe("BTCUSDT", 50, 10.0)
+
+        with patch('app.services.aggregation_demand_tracker.time.monotonic', return_value=1059.0):
+            assert set(tracker.hot_params("BTCUSDT")) == {(20, 1.0, True), (50, 10.0, True)}
+
+        with patch('app.services.aggregation_demand_tracker.time.monotonic', return_value=1061.0):
+            # Live combinations never expire
+            assert tracker.hot_params("BTCUSDT") == [(20, 1.0, True)]
+
+    def test_filters_by_rounding_options(self):
+        tracker = AggregationDemandTracker()
+        tracker.subscribe("BTCUSDT", 20, 0.1)
+        tracker.subscribe("BTCUSDT", 20, 0.25)
+
+        # 0.30000000000000004 style float noise still matches
+        assert tracker.hot_params("BTCUSDT", [0.1 * 3 / 3, 1.0]) == [(20, 0.1, True)]
+        assert len(tracker.hot_params("BTCUSDT")) == 2
+
+    def test_orders_live_first_then_by_popularity_and_caps(self):
+        tracker = AggregationDemandTracker(max_combinations=2)
+        for _ in range(5):
+            tracker.subscribe("BTCUSDT", 100, 1.0)
+            tracker.unsubscribe("BTCUSDT", 100, 1.0)
+        tracker.subscribe("BTCUSDT", 20, 1.0)
+        tracker.subscribe("BTCUSDT", 50, 1.0, formatted=False)
+        tracker.subscribe("BTCUSDT", 50, 1.0, formatted=False)
+
+        assert tracker.hot_params("BTCUSDT") == [(50, 1.0, False), (20, 1.0, True)]
+
+    def test_symbols_are_independent(self):
+        tracker = AggregationDemandTracker()
+        tracker.subscribe("BTCUSDT", 20, 1.0)
+
+        assert tracker.hot_params("ETHUSDT") == []
+        assert list(tracker.get_stats()) == ["BTCUSDT"]
@@ -7,6 +7,14 @@ from app.services.orderbook_aggregation_service import OrderBookAggregationServi
 from app.models.orderbook import OrderBook, OrderBookSnapshot, OrderBookLevel
 
 
+def _serve_levels(orderbook, snapshot):
+    """Serve a snapshot's levels through OrderBook.iter_levels on a mock book."""
+    orderbook.iter_levels = MagicMock(side_effect=lambda: (
+        iter(sorted(((level.price, level.amount) for level in snapshot.bids), reverse=True)),
+        iter(sorted((level.price, level.amount) for level in snapshot.asks))))
+    orderbook.pyramid = None
+
+
 class TestCachingMechanism:
     """
     Comprehensive unit tests for the caching mechanism in OrderBookAggregationService.
@@ -37,7 +45,7 @@ class TestCachingMechanism:
             MagicMock(price=50002.0, amount=2.5),
             MagicMock(price=50003.0, amount=3.5)
         ]
-        orderbook.get_snapshot.return_value = mock_snapshot
+        _serve_levels(orderbook, mock_snapshot)
         
         return orderbook
 
@@ -54,15 +62,15 @@ class TestCachingMechanism:
             assert "1.0" in key
             assert ":" in key  # Delimiter
 
-        def test_cache_key_timestamp_rounding(self, service):
-            """Test that timestamps are rounded to nearest second."""
-            key1 = service._generate_cache_key("BTCUSDT", 10, 1.0, 1640995200.123)
-            key2 = service._generate_cache_key("BTCUSDT", 10, 1.0, 1640995200.789)
-            key3 = service._generate_cache_key("BTCUSDT", 10, 1.0, 1640995201.123)
+        def test_cache_key_book_version(self, service):
+            """Test that keys follow the order book version."""
+            key1 = service._generate_cache_key("BTCUSDT", 10, 1.0, 7)
+            key2 = service._generate_cache_key("BTCUSDT", 10, 1.0, 7)
+            key3 = service._generate_cache_key("BTCUSDT", 10, 1.0, 8)
             
-            # Same second should produce same key
+            # Same version should produce same key
             assert key1 == key2
-            # Different second should produce different key
+            # Every applied update should produce a new key
             assert key1 != key3
 
         def test_cache_key_parameter_sensitivity(self, service):
@@ -361,13 +369,24 @@ class TestCachingMechanism:
             # Mock to avoid actual cache warming delays
             mock_orderbook.latest_snapshot = True
             
-            # Perform cache warming
-            await service.warm_cache_for_symbol(symbol, mock_orderbook, symbol_data)
+            # Perform cache warming for the requested combinations
+            params = [(10, 1.0, True), (20, 10.0, True)]
+            warmed = await service.warm_cache_for_symbol(symbol, mock_orderbook, symbol_data, params)
             
-            # Verify that cache warming was attempted
-            # (Cache should have some entries for common combinations)
             metrics = await service.get_cache_metrics()
-            assert metrics['cache_size'] > 0
+            assert warmed == 2
+            assert metrics['cache_size'] == 2
+
+        @pytest.mark.asyncio
+        async def test_cache_warming_skips_cached_combinations(self, service, mock_orderbook):
+            """Test warming again for the same book version computes nothing."""
+            params = [(10, 1.0, True)]
+            mock_orderbook.latest_snapshot = True
+
+            assert await service.warm_cache_for_symbol("BTCUSDT", mock_orderbook, None, params) == 1
+            snapshots_taken = mock_orderbook.iter_levels.call_count
+            assert await service.warm_cache_for_symbol("BTCUSDT", mock_orderbook, None, params) == 0
+            assert mock_orderbook.iter_levels.call_count == snapshots_taken
 
         @pytest.mark.asyncio
         async def test_cache_warming_error_handling(self, service, mock_orderbook):
@@ -375,12 +394,12 @@ class TestCachingMechanism:
             symbol = "BTCUSDT"
             
             # Make orderbook operations raise exceptions
-            mock_orderbook.get_snapshot.side_effect = Exception("Test error")
+            mock_orderbook.iter_levels.side_effect = Exception("Test error")
             mock_orderbook.latest_snapshot = True
             
             # Cache warming should not raise exceptions
             try:
-                await service.warm_cache_for_symbol(symbol, mock_orderbook, None)
+                await service.warm_cache_for_symbol(symbol, mock_orderbook, None, [(10, 1.0, True)])
             except Exception as e:
                 pytest.fail(f"Cache warming should handle errors gracefully, but raised: {e}")
 
@@ -407,16 +426,16 @@ class TestCachingMechanism:
             result1 = await service.aggregate_orderbook(mock_orderbook, 10, 1.0)
             
             # Verify call was made to orderbook
-            mock_orderbook.get_snapshot.assert_called_once()
+            mock_orderbook.iter_levels.assert_called_once()
             
             # Reset mock to track subsequent calls
-            mock_orderbook.get_snapshot.reset_mock()
+            mock_orderbook.iter_levels.reset_mock()
             
             # Second call with same parameters should use cache
             result2 = await service.aggregate_orderbook(mock_orderbook, 10, 1.0)
             
-            # Should not call get_snapshot again (using cache)
-            mock_orderbook.get_snapshot.assert_not_called()
+            # Should not walk the book again (using cache)
+            mock_orderbook.iter_levels.assert_not_called()
             
             # Results should be identical
             assert result1 == result2
@@ -428,13 +447,13 @@ class TestCachingMechanism:
             result1 = await service.aggregate_orderbook(mock_orderbook, 10, 1.0)
             
             # Reset mock
-            mock_orderbook.get_snapshot.reset_mock()
+            mock_orderbook.iter_levels.reset_mock()
             
             # Second call with different parameters should miss cache
             result2 = await service.aggregate_orderbook(mock_orderbook, 20, 1.0)  # Different limit
             
-            # Should call get_snapshot again (cache miss)
-            mock_orderbook.get_snapshot.assert_called_once()
+            # Should walk the book again (cache miss)
+            mock_orderbook.iter_levels.assert_called_once()
 
         @pytest.mark.asyncio
         async def test_aggregation_cache_expired(self, service, mock_orderbook):
@@ -449,13 +468,13 @@ class TestCachingMechanism:
             await asyncio.sleep(0.02)
             
             # Reset mock
-            mock_orderbook.get_snapshot.reset_mock()
+            mock_orderbook.iter_levels.reset_mock()
             
             # Second call should miss expired cache
             result2 = await service.aggregate_orderbook(mock_orderbook, 10, 1.0)
             
-            # Should call get_snapshot again (expired cache)
-            mock_orderbook.get_snapshot.assert_called_once()
+            # Should walk the book again (expired cache)
+            mock_orderbook.iter_levels.assert_called_once()
 
     class TestCacheConcurrency:
         """Test cache behavior under concurrent access."""
@@ -494,10 +513,10 @@ class TestCachingMechanism:
             first_result = results[0]
             assert all(result == first_result for result in results)
             
-            # Should have called get_snapshot at least once but not 5 times
+            # Should have walked the book at least once but not 5 times
             # (due to caching)
-            assert mock_orderbook.get_snapshot.call_count >= 1
-            assert mock_orderbook.get_snapshot.call_count < 5
+            assert mock_orderbook.iter_levels.call_count >= 1
+            assert mock_orderbook.iter_levels.call_count < 5
 
         @pytest.mark.asyncio
         async def test_cache_metrics_thread_safety(self, service):
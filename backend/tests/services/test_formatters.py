@@ -0,0 +1,141 @@
+"""
+Unit tests for compiled formatters and the formatter cache.
+"""
+
+import json
+
+from app.services.formatters import (
+    MISSING,
+    FormatterCache,
+    PriceFormatter,
+    SymbolFormatter,
+)
+from app.services.formatting_service import FormattingService
+
+
+class TestSymbolFormatter:
+    """Test cases for SymbolFormatter."""
+
+    def test_key_ignores_symbol_name(self):
+        btc = {'symbol': 'BTC/USDT', 'pricePrecision': 2, 'amountPrecision': 3}
+        eth = {'symbol': 'ETH/USDT', 'pricePrecision': 2, 'amountPrecision': 3}
+
+        assert SymbolFormatter.key_for(btc, 0.1) == SymbolFormatter.key_for(eth, 0.1)
+        assert SymbolFormatter.key_for(btc, 0.1) != SymbolFormatter.key_for(btc, 1.0)
+
+    def test_key_distinguishes_missing_from_none(self):
+        assert SymbolFormatter.key_for({}) == (MISSING, MISSING, None)
+        assert SymbolFormatter.key_for({'pricePrecision': None}) == (None, MISSING, None)
+
+    def test_formatters(self):
+        formatter = SymbolFormatter(2, 3, 10.0)
+
+        assert formatter.price(50010.0) == "50010"
+        assert formatter.price(50012.5) == "50012"
+        assert formatter.amount(1.23456) == "1.235"
+        assert formatter.amount(1500) == "1.50K"
+        assert formatter.total(0.005) == "0.0050"
+
+    def test_invalid_value_falls_back_to_str(self):
+        assert PriceFormatter(2, 1.0)(float('inf')) == "inf"
+        assert PriceFormatter(None)(1.5) == "1.5"
+
+
+class TestFormatterCache:
+    """Test cases for FormatterCache."""
+
+    def test_reuses_compiled_formatter(self):
+        cache = FormatterCache(max_size=4)
+        key = (2, 3, 0.1)
+
+        assert cache.get(key) is cache.get(key)
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_bounded_lru_eviction(self):
+        cache = FormatterCache(max_size=2)
+        first = cache.get((2, 3, 0.1))
+        cache.get((2, 3, 1.0))
+        cache.get((2, 3, 0.1))  # Touch the first key
+        cache.get((2, 3, 10.0))  # Evicts 1.0, the least recently used
+
+        assert len(cache) == 2
+        assert cache.get((2, 3, 0.1)) is first
+        assert cache.misses == 3
+
+    def test_service_exposes_formatter_stats(self):
+        service = FormattingService()
+        service.clear_cache()
+        info = {'symbol': 'BTC/USDT', 'pricePrecision': 1, 'amountPrecision': 3}
+
+        service.format_price(50000.0, info, 1.0)
+        service.format_amount(0.5, info)
+
+        stats = service.get_cache_stats()
+        assert stats['cache_size'] == 2
+        assert stats['max_cache_size'] > 0
+
+
+class TestColumnFormatting:
+    """Column formatting must match per-value formatting exactly."""
+
+    VALUES = [0.0, None, 1e-9, -3e-6, 0.000004, 0.00009, 0.004, 0.5, 1.0, 12.0, 999.995,
+              1000.0, -2500.5, 123456.78, 5e6, -42.5, 50000.0, 50012.5]
+
+    def test_price_column_matches_per_value(self):
+        for rounding in (None, 0.00000001, 0.001, 0.1, 1.0, 10.0):
+            formatter = SymbolFormatter(2, 3, rounding).price
+            assert formatter.format_column(self.VALUES) == [formatter(v) for v in self.VALUES]
+
+    def test_amount_and_total_columns_match_per_value(self):
+        formatter = SymbolFormatter(1, 3)
+        assert formatter.amount.format_column(self.VALUES) == \
+            [formatter.amount(v) for v in self.VALUES]
+        assert formatter.total.format_column(self.VALUES) == \
+            [formatter.total(v) for v in self.VALUES]
+
+    def test_invalid_values_fall_back_per_value(self):
+        formatter = SymbolFormatter(2, 3, 1.0)
+        values = [1.0, float('inf'), "invalid", 2.5]
+
+        assert formatter.price.format_column(values) == ["1", "inf", "invalid", "2.5"]
+        assert formatter.amount.format_column(values) == [formatter.amount(v) for v in values]
+
+    def test_service_column_methods(self):
+        service = FormattingService()
+        info = {'pricePrecision': 1, 'amountPrecision': 3}
+
+        assert service.format_price_column([50000.0, 50000.5], info, 0.1) == ["50000.0", "50000.5"]
+        assert service.format_amount_column([0.1234, 1500.0], info) == ["0.123", "1.50K"]
+        assert service.format_total_column([], info) == []
+
+
+class TestFormatDescriptor:
+    """The descriptor carries everything a client needs to format raw numbers."""
+
+    def test_price_descriptor_follows_rounding(self):
+        coarse = SymbolFormatter(1, 3, 10.0).describe()['price']
+        fine = SymbolFormatter(1, 3, 0.00000001).describe()['price']
+
+        assert coarse['decimals'] == 0
+        assert coarse['wholeAsInteger'] is True
+        assert coarse['scientificBelowHalfRounding'] is None
+        assert fine['decimals'] == 8
+        assert fine['scientificBelowHalfRounding'] == 0.000000005
+
+    def test_precision_descriptor(self):
+        descriptor = SymbolFormatter(5, MISSING).describe()
+
+        assert descriptor['price']['rounding'] is None
+        assert descriptor['price']['decimals'] == 5
+        assert descriptor['amount']['decimals'] == 5
+        assert descriptor['total']['smallDecimals'] == 4
+        assert PriceFormatter(None).describe()['decimals'] is None
+
+    def test_descriptor_is_json_compatible(self):
+        service = FormattingService()
+        info = {'pricePrecision': 2, 'amountPrecision': 3}
+        descriptor = service.get_format_descriptor(info, 0.01)
+
+        assert json.loads(json.dumps(descriptor))['amount']['compact'] == [[1000000, "M"], [1000, "K"]]
+        assert descriptor == service.get_formatter(info, 0.01).describe()
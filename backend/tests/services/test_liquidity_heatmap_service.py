@@ -0,0 +1,114 @@
+"""
+Tests for the liquidity heatmap sampling service.
+"""
+
+import math
+import random
+from decimal import Decimal
+
+import pytest
+
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.tick_ladder_orderbook import TickLadderOrderBook
+from app.services.liquidity_heatmap_service import LiquidityHeatmapService
+from app.services.orderbook_aggregation_service import OrderBookAggregationService
+
+
+class FakeManager:
+    """OrderBook Manager stand-in serving a fixed set of books."""
+
+    def __init__(self, orderbooks):
+        self.orderbooks = orderbooks
+        self.walk_buckets = OrderBookAggregationService().walk_buckets
+
+    def get_orderbooks(self):
+        return dict(self.orderbooks)
+
+
+def _levels(pairs):
+    return [OrderBookLevel(price=price, amount=amount) for price, amount in pairs]
+
+
+async def _book(make_book, levels=600, mid=100.0, seed=1):
+    rng = random.Random(seed)
+    orderbook = make_book()
+    await orderbook.update_snapshot(OrderBookSnapshot(
+        "BTCUSDT",
+        _levels((round(mid - i * 0.01, 2), round(rng.uniform(0.1, 5), 3)) for i in range(levels)),
+        _levels((round(mid + 0.01 + i * 0.01, 2), round(rng.uniform(0.1, 5), 3))
+                for i in range(levels)),
+        1640995200000))
+    return orderbook
+
+
+def _scan_column(orderbook, first_index, step, buckets):
+    """Bucket every level: bids round down and asks round up, like the order book view."""
+    amounts = [0.0] * buckets
+    decimal_step = Decimal(str(step))
+    for rounding, levels in ((math.floor, orderbook.iter_levels()[0]),
+                             (math.ceil, orderbook.iter_levels()[1])):
+        for price, amount in levels:
+            index = rounding(Decimal(str(price)) / decimal_step) - first_index
+            if 0 <= index < buckets:
+                amounts[index] += amount
+    return amounts
+
+
+class TestHeatmapSampling:
+    """Test columns sampled from live books."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("make_book", [
+        lambda: OrderBook("BTCUSDT"),
+        lambda: TickLadderOrderBook("BTCUSDT", 0.01, width=2048),
+    ])
+    async def test_column_matches_full_scan(self, make_book):
+        orderbook = await _book(make_book)
+        service = LiquidityHeatmapService(
+            FakeManager({"BTCUSDT": orderbook}), buckets=40, slices=10, range_pct=2.0)
+
+        column = await service.sample("BTCUSDT", orderbook, 1000)
+
+        # ±2% of 100.005 over 20 buckets a side needs 0.10005
+        assert column['step'] == 0.2
+        assert column['first_index'] == 500 - 20
+        assert column['amounts'] == pytest.approx(
+            _scan_column(orderbook, column['first_index'], column['step'], 40))
+        # Levels outside the ±2% window are not counted
+        assert sum(column['amounts']) < sum(amount for side in orderbook.iter_levels()
+                                            for _, amount in side)
+
+    @pytest.mark.asyncio
+    async def test_sample_all_feeds_callbacks(self):
+        orderbook = await _book(lambda: OrderBook("BTCUSDT"))
+        one_sided = OrderBook("ETHUSDT")
+        await one_sided.update_snapshot(OrderBookSnapshot(
+            "ETHUSDT", _levels([(10.0, 1.0)]), [], 1640995200000))
+        service = LiquidityHeatmapService(
+            FakeManager({"BTCUSDT": orderbook, "ETHUSDT": one_sided}), buckets=40, slices=2)
+        received = []
+        service.register_callback("BTCUSDT", received.append)
+
+        for second in range(3):
+            assert await service.sample_all(1000 * second) == 1
+
+        assert [column['timestamp'] for column in received] == [0, 1000, 2000]
+        assert service.get_heatmap("BTCUSDT").window()['timestamps'] == [1000, 2000]
+        assert service.get_heatmap("ETHUSDT") is None
+        assert service.get_stats()['heatmaps']['BTCUSDT']['columns'] == 2
+
+        service.unregister_callback("BTCUSDT", received.append)
+        assert service.callbacks == {}
+
+    @pytest.mark.asyncio
+    async def test_evicted_book_drops_heatmap(self):
+        orderbook = await _book(lambda: OrderBook("BTCUSDT"))
+        manager = FakeManager({"BTCUSDT": orderbook})
+        service = LiquidityHeatmapService(manager, buckets=40, slices=2)
+        await service.sample_all(0)
+
+        del manager.orderbooks["BTCUSDT"]
+        service.drop_symbol("BTCUSDT")
+
+        assert service.get_memory_objects() == {}
+        assert await service.sample_all(1000) == 0
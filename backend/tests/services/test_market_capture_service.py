@@ -0,0 +1,251 @@
+"""
+Tests for market data capture to rotating segment files.
+"""
+
+import gzip
+import json
+import os
+import time
+
+import ccxt.pro
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.market_capture_service import (
+    STREAM_LIQUIDATIONS,
+    STREAM_ORDERBOOK,
+    STREAM_TRADES,
+    MarketCaptureService,
+    list_segments,
+    read_capture,
+    read_segment,
+)
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+def _book(nonce, bid=100.0, ask=101.0):
+    return {'bids': [[bid, 1.0]], 'asks': [[ask, 2.0]], 'timestamp': 1640995200000,
+            'nonce': nonce, 'symbol': 'BTC/USDT:USDT'}
+
+
+@pytest.fixture
+def capture(tmp_path):
+    service = MarketCaptureService(str(tmp_path / "capture"))
+    yield service
+    service.stop()
+
+
+class TestMarketCapture:
+    """Test capturing and reading back messages."""
+
+    def test_messages_round_trip_in_order(self, capture):
+        capture.start()
+        book = _book(1)
+        capture.record(STREAM_ORDERBOOK, "BTC/USDT:USDT", book)
+        book['bids'][0][1] = 5.0  # Mutated in place after capture, like ccxt books
+        capture.record(STREAM_TRADES, "BTC/USDT:USDT", [{'id': '7', 'price': 100.5,
+                                                        'amount': 0.25, 'side': 'buy'}])
+        capture.record(STREAM_LIQUIDATIONS, "BTCUSDT", '{"e":"forceOrder"}')
+        capture.stop()
+
+        messages = list(read_capture(capture.directory))
+
+        assert [(m.stream, m.key) for m in messages] == [
+            (STREAM_ORDERBOOK, "BTC/USDT:USDT"),
+            (STREAM_TRADES, "BTC/USDT:USDT"),
+            (STREAM_LIQUIDATIONS, "BTCUSDT"),
+        ]
+        assert messages[0].payload == _book(1)
+        assert messages[1].payload[0]['price'] == 100.5
+        assert json.loads(messages[2].payload) == {"e": "forceOrder"}
+        assert messages[0].received_ns <= messages[1].received_ns <= messages[2].received_ns
+        assert capture.get_stats()['messages'] == 3
+
+    def test_nothing_recorded_until_started(self, capture):
+        capture.record(STREAM_ORDERBOOK, "BTC/USDT:USDT", _book(1))
+
+        assert capture.get_stats()['pending'] == 0
+        assert list_segments(capture.directory) == []
+
+    def test_segments_rotate_by_size(self, tmp_path):
+        capture = MarketCaptureService(str(tmp_path / "capture"), segment_bytes=2000)
+        capture.start()
+        for nonce in range(200):
+            capture.record(STREAM_ORDERBOOK, "BTC/USDT:USDT", _book(nonce))
+            if nonce % 20 == 19:
+                capture._wakeup.set()
+                while capture.get_stats()['pending']:
+                    time.sleep(0.001)
+        capture.stop()
+
+        segments = list_segments(capture.directory)
+        assert len(segments) > 1
+        assert [m.payload['nonce'] for m in read_capture(capture.directory)] == list(range(200))
+        # Every segment is a complete gzip file on its own
+        assert sum(1 for _ in read_segment(segments[0])) > 0
+
+    def test_restart_never_overwrites_segments(self, tmp_path):
+        directory = str(tmp_path / "capture")
+        for nonce in range(2):
+            capture = MarketCaptureService(directory)
+            capture.start()
+            capture.record(STREAM_ORDERBOOK, "BTC/USDT:USDT", _book(nonce))
+            capture.stop()
+
+        assert len(list_segments(directory)) == 2
+        assert [m.payload['nonce'] for m in read_capture(directory)] == [0, 1]
+
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path):
+        capture = MarketCaptureService(str(tmp_path / "capture"), max_pending=5)
+        capture.enabled = True  # Writer not running: nothing drains the queue
+        for nonce in range(8):
+            capture.record(STREAM_ORDERBOOK, "BTC/USDT:USDT", _book(nonce))
+
+        stats = capture.get_stats()
+        assert (stats['pending'], stats['dropped']) == (5, 3)
+
+    def test_truncated_segment_yields_complete_messages(self, capture):
+        capture.start()
+        for nonce in range(50):
+            capture.record(STREAM_ORDERBOOK, "BTC/USDT:USDT", _book(nonce))
+        capture.stop()
+        path = list_segments(capture.directory)[0]
+        with gzip.open(path, "rb") as f:
+            data = f.read()
+        with gzip.open(path, "wb") as f:
+            f.write(data[:len(data) * 2 // 3])
+
+        nonces = [m.payload['nonce'] for m in read_segment(path)]
+
+        assert 0 < len(nonces) < 50
+        assert nonces == list(range(len(nonces)))
+
+    def test_foreign_file_is_rejected(self, tmp_path):
+        path = tmp_path / "capture-x.ofcap.gz"
+        with gzip.open(path, "wb") as f:
+            f.write(b"not a capture")
+
+        with pytest.raises(ValueError):
+            list(read_segment(str(path)))
+        assert os.path.exists(path)
+
+
+class TestOrderBookChanges:
+    """Test capturing ccxt order books as the level changes ccxt applies."""
+
+    @pytest.fixture
+    def exchange(self, capture):
+        exchange = ccxt.pro.binance()
+        capture.track_order_book_changes(exchange)
+        capture.start()
+        return exchange
+
+    @staticmethod
+    def _ccxt_book(exchange, depth=3):
+        return exchange.order_book({
+            'bids': [[100.0, 1.0], [99.0, 2.0], [98.0, 3.0]],
+            'asks': [[101.0, 1.0], [102.0, 2.0], [103.0, 3.0]],
+            'timestamp': 1640995200000, 'nonce': 1, 'symbol': SYMBOL}, depth)
+
+    @staticmethod
+    def _update(exchange, book, bids, asks):
+        """Apply a depth update the way ccxt does and return the delivered book."""
+        exchange.handle_deltas(book['bids'], bids)
+        exchange.handle_deltas(book['asks'], asks)
+        book['nonce'] += 1
+        return book.limit()
+
+    @staticmethod
+    def _as_delivered(book):
+        return {**book, 'bids': [list(level) for level in book['bids']],
+                'asks': [list(level) for level in book['asks']]}
+
+    def test_updates_are_captured_as_changes(self, capture, exchange):
+        book = self._ccxt_book(exchange)
+        delivered = []
+        capture.record(STREAM_ORDERBOOK, SYMBOL, book)
+        delivered.append(self._as_delivered(book))
+        capture._wakeup.set()
+        while capture.get_stats()['pending']:
+            time.sleep(0.001)
+        # Changed, removed and new levels; the new best bid pushes the
+        # worst bid past the book's depth
+        for bids, asks in (([['99', '5']], [['102', '0']]),
+                           ([['100.5', '4']], [['104', '1']])):
+            capture.record(STREAM_ORDERBOOK, SYMBOL, self._update(exchange, book, bids, asks))
+            delivered.append(self._as_delivered(book))
+        capture.stop()
+
+        messages = list(read_capture(capture.directory))
+
+        assert [m.stream for m in messages] == [STREAM_ORDERBOOK] * 3
+        assert [m.payload for m in messages] == delivered
+        assert delivered[-1]['bids'] == [[100.5, 4.0], [100.0, 1.0], [99.0, 5.0]]
+        assert capture.get_stats()['orderbook_changes'] == 2
+
+    def test_every_segment_starts_from_a_whole_book(self, tmp_path):
+        capture = MarketCaptureService(str(tmp_path / "capture"), segment_bytes=1)
+        exchange = ccxt.pro.binance()
+        capture.track_order_book_changes(exchange)
+        capture.start()
+        book = self._ccxt_book(exchange)
+        delivered = []
+        for nonce in range(4):
+            if nonce:
+                self._update(exchange, book, [['99', str(nonce)]], [])
+            capture.record(STREAM_ORDERBOOK, SYMBOL, book)
+            delivered.append(self._as_delivered(book))
+            capture._wakeup.set()
+            while capture.get_stats()['pending']:
+                time.sleep(0.001)
+        capture.stop()
+
+        segments = list_segments(capture.directory)
+        assert len(segments) == 4
+        assert [m.payload for m in read_segment(segments[-1])] == [delivered[-1]]
+        assert [m.payload for m in read_capture(capture.directory)] == delivered
+
+    def test_replaced_or_dropped_books_are_captured_whole(self, capture, exchange):
+        book = self._ccxt_book(exchange)
+        capture.record(STREAM_ORDERBOOK, SYMBOL, book)
+        # ccxt resubscribed: a new book object
+        book = self._ccxt_book(exchange)
+        capture.record(STREAM_ORDERBOOK, SYMBOL, book)
+        capture.max_pending = 0
+        capture.record(STREAM_ORDERBOOK, SYMBOL, self._update(exchange, book, [['99', '7']], []))
+        capture.max_pending = 10
+        capture.record(STREAM_ORDERBOOK, SYMBOL, self._update(exchange, book, [['98', '7']], []))
+        capture.stop()
+
+        messages = list(read_capture(capture.directory))
+
+        assert capture.get_stats()['dropped'] == 1
+        assert capture.get_stats()['orderbook_changes'] == 0
+        assert messages[-1].payload == self._as_delivered(book)
+
+    def test_books_of_untracked_exchanges_are_captured_whole(self, capture):
+        capture.start()
+        book = _book(1)
+        capture.record(STREAM_ORDERBOOK, SYMBOL, book)
+        book['bids'][0][1] = 5.0
+        capture.record(STREAM_ORDERBOOK, SYMBOL, book)
+        capture.stop()
+
+        assert [m.payload['bids'] for m in read_capture(capture.directory)] == [
+            [[100.0, 1.0]], [[100.0, 5.0]]]
+
+
+class TestMarketCaptureStatsEndpoint:
+    """Test GET /api/v1/market-capture-stats."""
+
+    client = TestClient(app)
+
+    def test_stats(self):
+        response = self.client.get("/api/v1/market-capture-stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['capture']['enabled'] is False
+        assert 'dropped' in data['capture']
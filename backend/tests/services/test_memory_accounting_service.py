@@ -0,0 +1,173 @@
+"""
+Tests for memory accounting of order books and caches.
+"""
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.services.memory_accounting_service import (
+    MemoryAccountingService,
+    deep_sizeof,
+    group_by_symbol,
+    memory_accounting_service,
+)
+from app.services.orderbook_aggregation_service import OrderBookAggregationService
+
+
+def _orderbook(levels: int = 1000) -> OrderBook:
+    orderbook = OrderBook("BTCUSDT")
+    asyncio.run(orderbook.update_snapshot(OrderBookSnapshot(
+        symbol="BTCUSDT",
+        bids=[OrderBookLevel(50000.0 - i * 0.1, 1.0 + i) for i in range(levels)],
+        asks=[OrderBookLevel(50000.1 + i * 0.1, 1.0 + i) for i in range(levels)],
+        timestamp=1640995200000)))
+    return orderbook
+
+
+class TestDeepSizeof:
+    """Test the recursive size walk."""
+
+    def test_counts_nested_containers(self):
+        inner = [1.5, 2.5]
+        data = {'a': inner, 'b': (inner, "text")}
+
+        expected = (sys.getsizeof(data) + sys.getsizeof('a') + sys.getsizeof('b')
+                    + sys.getsizeof(inner) + sys.getsizeof(1.5) + sys.getsizeof(2.5)
+                    + sys.getsizeof(data['b']) + sys.getsizeof("text"))
+        assert deep_sizeof(data) == expected
+
+    def test_shared_objects_count_once(self):
+        shared = list(range(1000, 2000))
+        seen = set()
+
+        first = deep_sizeof({'x': shared}, seen)
+        second = deep_sizeof({'y': shared}, seen)
+
+        assert first > deep_sizeof(shared) > second
+
+    def test_orderbook_size_tracks_real_allocation(self):
+        gc.collect()
+        tracemalloc.start()
+        orderbook = _orderbook()
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        measured = deep_sizeof(orderbook)
+        # Close to what was really allocated, and far above the old 32 bytes
+        # per level estimate
+        assert 0.8 * allocated < measured < 1.25 * allocated
+        assert measured > 2000 * 32 * 2
+        # The cheap per-level estimate used for the memory budget agrees
+        assert 0.7 * measured < orderbook.get_memory_bytes() < 1.3 * measured
+
+    def test_does_not_walk_into_foreign_objects(self):
+        orderbook = OrderBook("BTCUSDT")
+        # The lock references the event loop machinery; it is sized shallowly
+        assert deep_sizeof(orderbook._lock) == sys.getsizeof(orderbook._lock)
+
+
+class TestGrouping:
+    """Test per-symbol grouping of string cache keys."""
+
+    def test_group_by_symbol_keeps_colons_in_symbols(self):
+        cache = {"BTC/USDT:USDT:1m": 1, "BTC/USDT:USDT:5m": 2, "ETHUSDT:1m": 3}
+
+        assert group_by_symbol(cache, 1) == {
+            "BTC/USDT:USDT": {"BTC/USDT:USDT:1m": 1, "BTC/USDT:USDT:5m": 2},
+            "ETHUSDT": {"ETHUSDT:1m": 3},
+        }
+
+    def test_aggregation_cache_grouped_by_symbol(self):
+        service = OrderBookAggregationService()
+        service._cache = {
+            "BTC/USDT:USDT:20:1.0:7": ({}, 0.0),
+            "BTC/USDT:USDT:20:1.0:7:raw": ({}, 0.0),
+            "ETHUSDT:10:0.1:3": ({}, 0.0),
+        }
+
+        grouped = service.get_memory_objects()
+
+        assert set(grouped) == {"BTC/USDT:USDT", "ETHUSDT"}
+        assert len(grouped["BTC/USDT:USDT"]) == 2
+
+
+class TestSample:
+    """Test the per-subsystem and per-symbol breakdown."""
+
+    def test_breakdown_per_subsystem_and_symbol(self):
+        service = MemoryAccountingService()
+        books = {"BTCUSDT": _orderbook(100), "ETHUSDT": _orderbook(10)}
+        service.register_source("orderbooks", lambda: books)
+        service.register_source("trades", lambda: {"BTCUSDT": [list(range(100))]})
+
+        sample = service.sample()
+
+        orderbooks = sample['subsystems']['orderbooks']
+        assert orderbooks['entries']['BTCUSDT'] > orderbooks['entries']['ETHUSDT'] > 0
+        assert sample['symbols']['BTCUSDT']['total_bytes'] == (
+            sample['symbols']['BTCUSDT']['orderbooks'] + sample['symbols']['BTCUSDT']['trades'])
+        assert sample['total_bytes'] == sum(
+            info['total_bytes'] for info in sample['subsystems'].values())
+        assert sample['process']['peak_rss_bytes'] > 0
+
+    def test_filters(self):
+        service = MemoryAccountingService()
+        service.register_source("orderbooks", lambda: {"BTCUSDT": [1.0], "ETHUSDT": [2.0]})
+        service.register_source("trades", lambda: {"BTCUSDT": [3.0]})
+
+        sample = service.sample(subsystem="orderbooks", symbol="ETHUSDT")
+
+        assert list(sample['subsystems']) == ["orderbooks"]
+        assert list(sample['symbols']) == ["ETHUSDT"]
+
+    def test_failing_source_is_reported(self):
+        service = MemoryAccountingService()
+        service.register_source("broken", lambda: 1 / 0)
+
+        sample = service.sample()
+
+        assert sample['subsystems']['broken']['total_bytes'] == 0
+        assert 'division by zero' in sample['subsystems']['broken']['error']
+
+    def test_tracemalloc_top_sites(self):
+        service = MemoryAccountingService()
+        assert service.sample()['tracemalloc'] is None
+
+        tracemalloc.start()
+        try:
+            books = [_orderbook(200)]
+            sample = service.sample(top_allocations=3)
+        finally:
+            tracemalloc.stop()
+
+        assert sample['tracemalloc']['app_bytes'] > 0
+        assert len(sample['tracemalloc']['top']) <= 3
+        assert all(site['location'].startswith(("models", "services"))
+                   for site in sample['tracemalloc']['top'])
+
+
+class TestMemoryStatsEndpoint:
+    """Test GET /api/v1/memory-stats."""
+
+    client = TestClient(app)
+
+    def test_all_registered_subsystems_are_reported(self):
+        response = self.client.get("/api/v1/memory-stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        for subsystem in ("orderbooks", "aggregation_cache", "formatters", "liquidations",
+                          "liquidation_feed", "chart_time_ranges", "trade_buffers"):
+            assert subsystem in data['subsystems']
+        assert set(data['subsystems']) == set(memory_accounting_service.get_subsystems())
+
+    def test_unknown_subsystem(self):
+        response = self.client.get("/api/v1/memory-stats?subsystem=nope")
+
+        assert response.status_code == 404
@@ -8,6 +8,14 @@ from app.services.orderbook_aggregation_service import OrderBookAggregationServi
 from app.models.orderbook import OrderBook, OrderBookLevel
 
 
+def _serve_levels(orderbook, snapshot):
+    """Serve a snapshot's levels through OrderBook.iter_levels on a mock book."""
+    orderbook.iter_levels = MagicMock(side_effect=lambda: (
+        iter(sorted(((level.price, level.amount) for level in snapshot.bids), reverse=True)),
+        iter(sorted((level.price, level.amount) for level in snapshot.asks))))
+    orderbook.pyramid = None
+
+
 class TestOrderBookAggregationService:
     """
     Comprehensive unit tests for OrderBookAggregationService.
@@ -210,6 +218,49 @@ class TestOrderBookAggregationService:
             # Should return only available levels (2), not pad to 5
             assert len(result) <= 2
 
+    class TestWalkBuckets:
+        """Test the lazy bucket walk used by aggregate_orderbook."""
+
+        @staticmethod
+        def _walk_order(levels, is_ask):
+            return sorted(((level['price'], level['amount']) for level in levels),
+                          reverse=not is_ask)
+
+        def test_matches_exact_levels(self, service, sample_bids, sample_asks):
+            for rounding in [0.25, 0.5, 1.0, 10.0]:
+                for depth in [1, 3, 10]:
+                    for levels, is_ask in ((sample_bids, False), (sample_asks, True)):
+                        buckets, _, _ = service.walk_buckets(
+                            iter(self._walk_order(levels, is_ask)), is_ask, depth, rounding)
+                        assert buckets == service.get_exact_levels(levels, is_ask, depth, rounding)
+
+        def test_stops_once_limit_is_filled(self, service):
+            def levels():
+                price = 50000.0
+                while True:  # A book deeper than anything the walk may read
+                    yield price, 1.0
+                    price = round(price - 0.1, 1)
+
+            buckets, walked, exhausted = service.walk_buckets(levels(), False, 3, 1.0)
+
+            assert [bucket['price'] for bucket in buckets] == [50000.0, 49999.0, 49998.0]
+            assert [round(bucket['amount'], 6) for bucket in buckets] == [1.0, 10.0, 10.0]
+            # The first level of the fourth bucket ends the walk
+            assert walked == 22
+            assert not exhausted
+
+        def test_skips_dust_and_reports_exhaustion(self, service):
+            levels = [(101.0, 1e-12), (100.5, 2.0), (99.5, 1e-7), (98.0, 0.0)]
+
+            buckets, walked, exhausted = service.walk_buckets(iter(levels), False, 10, 1.0)
+
+            assert buckets == [{'price': 100.0, 'amount': 2.0}]
+            assert walked == 4
+            assert exhausted
+
+        def test_zero_limit(self, service):
+            assert service.walk_buckets(iter([(100.0, 1.0)]), True, 0, 1.0) == ([], 0, False)
+
     class TestCumulativeTotals:
         """Test cumulative total calculations."""
 
@@ -411,15 +462,15 @@ class TestOrderBookAggregationService:
         @pytest.mark.asyncio
         async def test_cache_key_generation(self, service):
             """Test cache key generation consistency."""
-            key1 = service._generate_cache_key("BTCUSDT", 10, 1.0, 1640995200.123)
-            key2 = service._generate_cache_key("BTCUSDT", 10, 1.0, 1640995200.789)
+            key1 = service._generate_cache_key("BTCUSDT", 10, 1.0, 3)
+            key2 = service._generate_cache_key("BTCUSDT", 10, 1.0, 3)
             
-            # Should be the same due to timestamp rounding
+            # Should be the same for the same book version
             assert key1 == key2
             
-            key3 = service._generate_cache_key("BTCUSDT", 10, 1.0, 1640995201.123)
+            key3 = service._generate_cache_key("BTCUSDT", 10, 1.0, 4)
             
-            # Should be different due to different second
+            # Should be different once the book has changed
             assert key1 != key3
 
         @pytest.mark.asyncio
@@ -459,7 +510,7 @@ class TestOrderBookAggregationService:
                 MagicMock(price=50002.0, amount=2.5),
                 MagicMock(price=50003.0, amount=3.5)
             ]
-            mock_orderbook.get_snapshot.return_value = mock_snapshot
+            _serve_levels(mock_orderbook, mock_snapshot)
             
             # Test aggregation
             result = await service.aggregate_orderbook(
@@ -492,7 +543,7 @@ class TestOrderBookAggregationService:
             mock_snapshot = MagicMock()
             mock_snapshot.bids = [MagicMock(price=50000.0, amount=1.0)]
             mock_snapshot.asks = [MagicMock(price=50001.0, amount=1.0)]
-            mock_orderbook.get_snapshot.return_value = mock_snapshot
+            _serve_levels(mock_orderbook, mock_snapshot)
             
             # First call
             result1 = await service.aggregate_orderbook(mock_orderbook, 5, 1.0)
@@ -503,8 +554,8 @@ class TestOrderBookAggregationService:
             # Results should be identical
             assert result1 == result2
             
-            # Verify cache was used (should only call get_snapshot once)
-            assert mock_orderbook.get_snapshot.call_count == 1
+            # Verify cache was used (should only walk the book once)
+            assert mock_orderbook.iter_levels.call_count == 1
 
         @pytest.mark.asyncio
         async def test_cache_warming(self, service, mock_orderbook):
@@ -513,14 +564,15 @@ class TestOrderBookAggregationService:
             mock_snapshot = MagicMock()
             mock_snapshot.bids = [MagicMock(price=50000.0, amount=1.0)]
             mock_snapshot.asks = [MagicMock(price=50001.0, amount=1.0)]
-            mock_orderbook.get_snapshot.return_value = mock_snapshot
+            _serve_levels(mock_orderbook, mock_snapshot)
             mock_orderbook.latest_snapshot = True
             
             # Warm cache
             await service.warm_cache_for_symbol(
                 "BTCUSDT", 
                 mock_orderbook, 
-                {'pricePrecision': 2}
+                {'pricePrecision': 2},
+                [(10, 1.0, True), (10, 1.0, False)]
             )
             
             # Verify cache has entries
@@ -566,7 +618,7 @@ class TestOrderBookAggregationService:
             mock_snapshot = MagicMock()
             mock_snapshot.bids = []
             mock_snapshot.asks = []
-            mock_orderbook.get_snapshot.return_value = mock_snapshot
+            _serve_levels(mock_orderbook, mock_snapshot)
             
             result = await service.aggregate_orderbook(mock_orderbook, 5, 1.0)
             
@@ -619,7 +671,7 @@ class TestOrderBookAggregationService:
                 MagicMock(price=50001.25, amount=0.003456),
                 MagicMock(price=50002.00, amount=0.001000)
             ]
-            mock_orderbook.get_snapshot.return_value = mock_snapshot
+            _serve_levels(mock_orderbook, mock_snapshot)
             
             # Symbol data with precision info
             symbol_data = {
@@ -684,7 +736,7 @@ class TestOrderBookAggregationService:
             mock_snapshot = MagicMock()
             mock_snapshot.bids = [MagicMock(price=3000.0, amount=1.5)]
             mock_snapshot.asks = [MagicMock(price=3001.0, amount=2.0)]
-            mock_orderbook.get_snapshot.return_value = mock_snapshot
+            _serve_levels(mock_orderbook, mock_snapshot)
             
             # Test aggregation without symbol_data
             result = await service.aggregate_orderbook(
@@ -716,6 +768,32 @@ class TestOrderBookAggregationService:
                 assert 'amount_formatted' not in ask
                 assert 'cumulative_formatted' not in ask
 
+        @pytest.mark.asyncio
+        async def test_aggregate_orderbook_raw_skips_formatting(self):
+            """Raw-mode aggregation skips formatting and is cached apart from formatted results."""
+            service = OrderBookAggregationService()
+
+            mock_orderbook = AsyncMock(spec=OrderBook)
+            mock_orderbook.symbol = "BTCUSDT"
+            mock_orderbook.timestamp = 1640995200000
+            mock_snapshot = MagicMock()
+            mock_snapshot.bids = [MagicMock(price=50000.12, amount=0.001234)]
+            mock_snapshot.asks = [MagicMock(price=50001.25, amount=0.003456)]
+            _serve_levels(mock_orderbook, mock_snapshot)
+            symbol_data = {'pricePrecision': 2, 'amountPrecision': 8}
+
+            with patch('app.services.orderbook_aggregation_service.formatting_service') as mock_formatting:
+                raw = await service.aggregate_orderbook(
+                    mock_orderbook, limit=1, rounding=0.5, symbol_data=symbol_data, formatted=False)
+                mock_formatting.format_price_column.assert_not_called()
+
+            formatted = await service.aggregate_orderbook(
+                mock_orderbook, limit=1, rounding=0.5, symbol_data=symbol_data)
+
+            assert 'price_formatted' not in raw['bids'][0]
+            assert 'price_formatted' in formatted['bids'][0]
+            assert raw['bids'][0]['price'] == formatted['bids'][0]['price']
+
     @pytest.mark.asyncio
     async def test_aggregate_orderbook_includes_time_formatted(self):
         """Test that aggregated orderbook includes time_formatted field."""
@@ -1,10 +1,12 @@
 import pytest
+import pytest_asyncio
 import asyncio
 import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.services.orderbook_manager import OrderBookManager, orderbook_manager
-from app.models.orderbook import OrderBook
+from app.services.orderbook_manager import OrderBookManager, SymbolShard, orderbook_manager
+from app.models.orderbook import OrderBook, OrderBookLevel, OrderBookSnapshot
+from app.models.tick_ladder_orderbook import TickLadderOrderBook
 
 
 class TestOrderBookManager:
@@ -13,7 +15,7 @@ class TestOrderBookManager:
     Tests singleton pattern, connection lifecycle, and memory management.
     """
 
-    @pytest.fixture
+    @pytest_asyncio.fixture
     async def manager(self):
         """Create a fresh manager instance for each test."""
         # Create a new instance for testing (bypass singleton for testing)
@@ -47,12 +49,12 @@ class TestOrderBookManager:
         def test_initialization_once(self):
             """Test that initialization only happens once."""
             manager1 = OrderBookManager()
-            initial_orderbooks = manager1._orderbooks
+            initial_shards = manager1._shards
             
             manager2 = OrderBookManager()
             
             # Should be the same object reference
-            assert manager2._orderbooks is initial_orderbooks
+            assert manager2._shards is initial_shards
 
     class TestConnectionRegistration:
         """Test connection registration and management."""
@@ -81,11 +83,11 @@ class TestOrderBookManager:
                 assert 'connected_at' in manager._connection_params[connection_id]
                 
                 # Verify symbol tracking
-                assert symbol in manager._connections
-                assert connection_id in manager._connections[symbol]
+                assert symbol in manager._shards
+                assert connection_id in manager._shards[symbol].connections
                 
                 # Verify orderbook creation
-                assert symbol in manager._orderbooks
+                assert symbol in manager._shards
                 assert orderbook is not None
 
         @pytest.mark.asyncio
@@ -105,9 +107,9 @@ class TestOrderBookManager:
                 
                 # Should reuse the same orderbook
                 assert orderbook1 is orderbook2
-                assert len(manager._connections[symbol]) == 2
-                assert "conn_1" in manager._connections[symbol]
-                assert "conn_2" in manager._connections[symbol]
+                assert len(manager._shards[symbol].connections) == 2
+                assert "conn_1" in manager._shards[symbol].connections
+                assert "conn_2" in manager._shards[symbol].connections
                 
                 # Should only create one orderbook
                 mock_orderbook_class.assert_called_once()
@@ -124,9 +126,9 @@ class TestOrderBookManager:
                 await manager.register_connection("conn_2", "ETHUSDT", 10, 0.1)
                 
                 # Should create separate orderbooks
-                assert "BTCUSDT" in manager._orderbooks
-                assert "ETHUSDT" in manager._orderbooks
-                assert len(manager._orderbooks) == 2
+                assert "BTCUSDT" in manager._shards
+                assert "ETHUSDT" in manager._shards
+                assert len(manager._shards) == 2
                 assert mock_orderbook_class.call_count == 2
 
     class TestConnectionUnregistration:
@@ -148,13 +150,14 @@ class TestOrderBookManager:
                 
                 # Verify cleanup
                 assert connection_id not in manager._connection_params
-                assert connection_id not in manager._connections[symbol]
+                assert connection_id not in await manager.get_connections_for_symbol(symbol)
 
         @pytest.mark.asyncio
         async def test_unregister_last_connection_removes_orderbook(self, manager):
-            """Test that removing the last connection removes the orderbook."""
+            """Test that removing the last connection removes the orderbook without keep-warm."""
             connection_id = "conn_1"
             symbol = "BTCUSDT"
+            manager._keep_warm_seconds = 0
             
             with patch('app.services.orderbook_manager.OrderBook') as mock_orderbook_class:
                 mock_orderbook = AsyncMock(spec=OrderBook)
@@ -165,8 +168,7 @@ class TestOrderBookManager:
                 await manager.unregister_connection(connection_id)
                 
                 # Orderbook should be removed in non-persistent mode
-                assert symbol not in manager._orderbooks
-                assert symbol not in manager._connections
+                assert symbol not in manager._shards
 
         @pytest.mark.asyncio
         async def test_unregister_with_remaining_connections(self, manager):
@@ -185,9 +187,9 @@ class TestOrderBookManager:
                 await manager.unregister_connection("conn_1")
                 
                 # Orderbook should remain as other connection exists
-                assert symbol in manager._orderbooks
-                assert "conn_2" in manager._connections[symbol]
-                assert "conn_1" not in manager._connections[symbol]
+                assert symbol in manager._shards
+                assert "conn_2" in manager._shards[symbol].connections
+                assert "conn_1" not in manager._shards[symbol].connections
 
         @pytest.mark.asyncio
         async def test_unregister_nonexistent_connection(self, manager):
@@ -230,7 +232,7 @@ class TestOrderBookManager:
                 await manager.unregister_connection(connection_id)
                 
                 # Orderbook should remain in persistent mode
-                assert symbol in manager._orderbooks
+                assert symbol in manager._shards
 
     class TestParameterUpdates:
         """Test connection parameter updates."""
@@ -362,6 +364,7 @@ class TestOrderBookManager:
             
             with patch('app.services.orderbook_manager.OrderBook') as mock_orderbook_class:
                 mock_orderbook = AsyncMock(spec=OrderBook)
+                mock_orderbook.get_index_metrics.return_value = {}  # No level indexes
                 mock_orderbook_class.return_value = mock_orderbook
                 
                 # Mock aggregation service
@@ -401,71 +404,249 @@ class TestOrderBookManager:
             assert symbol in manager._symbol_data
             assert manager._symbol_data[symbol] == symbol_data
 
+    class TestOrderBookBackend:
+        """Test order book storage backend selection."""
+
+        def _manager(self):
+            manager = OrderBookManager.__new__(OrderBookManager)
+            manager._initialized = False
+            manager.__init__()
+            return manager
+
+        def test_sorted_backend_by_default(self):
+            manager = self._manager()
+            with patch('app.services.orderbook_manager.settings') as mock_settings:
+                mock_settings.ORDERBOOK_BACKEND = "sorted"
+                mock_settings.ORDERBOOK_WALLS = False
+                orderbook = manager._new_orderbook("BTCUSDT")
+
+            assert type(orderbook) is OrderBook
+
+        def test_tick_ladder_backend_uses_symbol_tick_size(self):
+            manager = self._manager()
+            manager._symbol_data["BTCUSDT"] = {'pricePrecision': 1, 'tickSize': 0.1}
+            with patch('app.services.orderbook_manager.settings') as mock_settings:
+                mock_settings.ORDERBOOK_BACKEND = "tick_ladder"
+                mock_settings.ORDERBOOK_TICK_LADDER_WIDTH = 256
+                mock_settings.ORDERBOOK_DEPTH_INDEX = False
+                mock_settings.ORDERBOOK_WALLS = False
+                orderbook = manager._new_orderbook("BTCUSDT")
+
+            assert isinstance(orderbook, TickLadderOrderBook)
+            assert orderbook.tick_size == 0.1
+            assert orderbook.width == 256
+
+        def test_pyramid_over_rounding_options(self):
+            manager = self._manager()
+            manager._symbol_data["BTCUSDT"] = {'roundingOptions': [0.1, 1.0, 10.0, 0.25]}
+            with patch('app.services.orderbook_manager.settings') as mock_settings:
+                mock_settings.ORDERBOOK_BACKEND = "sorted"
+                mock_settings.ORDERBOOK_PYRAMID = True
+                mock_settings.ORDERBOOK_WALLS = False
+                orderbook = manager._new_orderbook("BTCUSDT")
+
+                mock_settings.ORDERBOOK_PYRAMID = False
+                assert manager._new_orderbook("BTCUSDT").pyramid is None
+
+            assert orderbook.pyramid.roundings == [0.1, 1.0, 10.0]
+
+        def test_symbol_data_enables_pyramid_on_live_book(self):
+            manager = self._manager()
+            orderbook = asyncio.run(manager.register_connection("conn_1", "BTCUSDT", 20, 1.0))
+            assert orderbook.pyramid is None
+
+            asyncio.run(manager.update_symbol_data(
+                "BTCUSDT", {'pricePrecision': 1, 'roundingOptions': [0.1, 1.0, 10.0]}))
+
+            assert orderbook.pyramid.roundings == [0.1, 1.0, 10.0]
+            assert "BTCUSDT" in asyncio.run(manager.get_stats())['pyramids']
+
+        def test_depth_index_over_tick_size(self):
+            manager = self._manager()
+            manager._symbol_data["BTCUSDT"] = {'pricePrecision': 1}
+            with patch('app.services.orderbook_manager.settings') as mock_settings:
+                mock_settings.ORDERBOOK_BACKEND = "sorted"
+                mock_settings.ORDERBOOK_PYRAMID = False
+                mock_settings.ORDERBOOK_DEPTH_INDEX = True
+                mock_settings.ORDERBOOK_DEPTH_BANDS = [1.0]
+                mock_settings.ORDERBOOK_DEPTH_SWEEP_NOTIONALS = [1000.0]
+                mock_settings.ORDERBOOK_DEPTH_INDEX_WIDTH = 1024
+                mock_settings.ORDERBOOK_WALLS = False
+                orderbook = manager._new_orderbook("BTCUSDT")
+
+                mock_settings.ORDERBOOK_DEPTH_INDEX = False
+                assert manager._new_orderbook("BTCUSDT").depth_index is None
+
+            assert orderbook.depth_index.tick_size == pytest.approx(0.1)
+            assert orderbook.depth_index.bands == (1.0,)
+            assert orderbook.depth_index.width == 1024
+
+        def test_aggregated_orderbook_carries_depth_metrics(self):
+            manager = self._manager()
+            asyncio.run(manager.register_connection("conn_1", "BTCUSDT", 5, 1.0))
+            orderbook = asyncio.run(manager.get_orderbook("BTCUSDT"))
+            asyncio.run(orderbook.update_snapshot(OrderBookSnapshot(
+                "BTCUSDT",
+                [OrderBookLevel(round(100.0 - i * 0.1, 1), 1.0) for i in range(50)],
+                [OrderBookLevel(round(100.1 + i * 0.1, 1), 1.0) for i in range(50)],
+                1640995200000)))
+            assert 'depth' not in asyncio.run(manager.get_aggregated_orderbook("conn_1"))
+
+            asyncio.run(manager.update_symbol_data("BTCUSDT", {'pricePrecision': 1}))
+            result = asyncio.run(manager.get_aggregated_orderbook("conn_1"))
+
+            assert result['depth'] is orderbook.get_depth_metrics()
+            assert all('depth' not in data
+                       for data, _ in manager._aggregation_service._cache.values())
+            assert asyncio.run(manager.get_depth_metrics("BTCUSDT", [2.0]))['sweeps'][0][
+                'buy']['cost'] == pytest.approx(100.1 + 100.2)
+            assert asyncio.run(manager.get_depth_metrics("ETHUSDT")) is None
+            assert "BTCUSDT" in asyncio.run(manager.get_stats())['depth_indexes']
+
+        def test_wall_index_from_settings(self):
+            manager = self._manager()
+            with patch('app.services.orderbook_manager.settings') as mock_settings:
+                mock_settings.ORDERBOOK_BACKEND = "sorted"
+                mock_settings.ORDERBOOK_WALLS = True
+                mock_settings.ORDERBOOK_WALLS_TOP_K = 3
+                mock_settings.ORDERBOOK_WALLS_MIN_Z_SCORE = 2.0
+                orderbook = manager._new_orderbook("BTCUSDT")
+
+                mock_settings.ORDERBOOK_WALLS = False
+                assert manager._new_orderbook("BTCUSDT").wall_index is None
+
+            assert orderbook.wall_index.top_k == 3
+            assert orderbook.wall_index.min_z_score == 2.0
+
+        def test_aggregated_orderbook_carries_walls(self):
+            manager = self._manager()
+            asyncio.run(manager.register_connection("conn_1", "BTCUSDT", 5, 1.0))
+            orderbook = asyncio.run(manager.get_orderbook("BTCUSDT"))
+            asyncio.run(orderbook.update_snapshot(OrderBookSnapshot(
+                "BTCUSDT",
+                [OrderBookLevel(round(100.0 - i * 0.1, 1), 9.0 if i == 30 else 1.0)
+                 for i in range(50)],
+                [OrderBookLevel(round(100.1 + i * 0.1, 1), 1.0) for i in range(50)],
+                1640995200000)))
+
+            result = asyncio.run(manager.get_aggregated_orderbook("conn_1"))
+
+            assert result['walls']['bids'][0]['price'] == 97.0
+            assert "BTCUSDT" in asyncio.run(manager.get_stats())['wall_indexes']
+
+    class TestKeepWarm:
+        """Test the keep-warm grace period after the last connection leaves."""
+
+        @pytest.mark.asyncio
+        async def test_last_connection_keeps_orderbook_warm(self, manager):
+            """Test that the orderbook outlives its last connection during the grace period."""
+            manager._keep_warm_seconds = 30
+
+            await manager.register_connection("conn_1", "BTCUSDT", 10, 1.0)
+            orderbook = await manager.get_orderbook("BTCUSDT")
+            await manager.unregister_connection("conn_1")
+
+            assert manager.is_warm("BTCUSDT")
+            assert await manager.get_orderbook("BTCUSDT") is orderbook
+
+            # Reconnecting reuses the same book and ends the grace period
+            assert await manager.register_connection("conn_2", "BTCUSDT", 10, 1.0) is orderbook
+            assert not manager.is_warm("BTCUSDT")
+            assert manager._shards["BTCUSDT"].expiry_task is None
+
+        @pytest.mark.asyncio
+        async def test_warm_orderbook_expires(self, manager):
+            """Test that an idle orderbook is evicted when the grace period ends."""
+            manager._keep_warm_seconds = 0.01
+            evicted = []
+            manager.add_eviction_listener(evicted.append)
+
+            await manager.register_connection("conn_1", "BTCUSDT", 10, 1.0)
+            await manager.unregister_connection("conn_1")
+            await asyncio.sleep(0.05)
+
+            assert "BTCUSDT" not in manager._shards
+            assert evicted == ["BTCUSDT"]
+            assert (await manager.get_stats())['evictions']['expired'] == 1
+
+        @pytest.mark.asyncio
+        async def test_reconnect_cancels_expiry(self, manager):
+            """Test that a reconnect during the grace period prevents eviction."""
+            manager._keep_warm_seconds = 0.02
+
+            await manager.register_connection("conn_1", "BTCUSDT", 10, 1.0)
+            await manager.unregister_connection("conn_1")
+            await manager.register_connection("conn_2", "BTCUSDT", 10, 1.0)
+            await asyncio.sleep(0.05)
+
+            assert "BTCUSDT" in manager._shards
+            assert manager._shards["BTCUSDT"].connections == {"conn_2"}
+
     class TestMemoryManagement:
-        """Test memory management and cleanup."""
+        """Test idle-LRU eviction under the memory budget."""
+
+        @staticmethod
+        def _book_of_size(symbol, size):
+            orderbook = AsyncMock(spec=OrderBook)
+            orderbook.symbol = symbol
+            orderbook.get_memory_bytes = MagicMock(return_value=size)
+            return orderbook
 
         @pytest.mark.asyncio
-        async def test_memory_cleanup_triggers(self, manager):
-            """Test that memory cleanup triggers at threshold."""
-            # Set low limits for testing
-            manager._max_orderbooks = 5
-            manager._cleanup_threshold = 0.6  # 60% = 3 orderbooks
-            
+        async def test_evicts_least_recently_used_idle_books(self, manager):
+            """Test that the oldest idle books go first when over budget."""
+            manager._keep_warm_seconds = 30
+            manager._memory_budget_bytes = 250
+
             with patch('app.services.orderbook_manager.OrderBook') as mock_orderbook_class:
-                mock_orderbook = AsyncMock(spec=OrderBook)
-                mock_orderbook_class.return_value = mock_orderbook
-                
-                # Register connections to trigger cleanup
-                for i in range(4):  # Exceeds 3 (60% of 5)
-                    await manager.register_connection(f"conn_{i}", f"SYMBOL{i}", 10, 1.0)
-                
-                # Should trigger memory check
-                assert len(manager._orderbooks) <= manager._max_orderbooks
+                mock_orderbook_class.side_effect = lambda symbol: self._book_of_size(symbol, 100)
+
+                for symbol in ("OLD", "NEWER"):
+                    await manager.register_connection(f"{symbol}_conn", symbol, 10, 1.0)
+                    await manager.unregister_connection(f"{symbol}_conn")
+                # Two idle books fit into the budget
+                assert set(manager._shards) == {"OLD", "NEWER"}
+
+                await manager.register_connection("NEW_conn", "NEW", 10, 1.0)
+
+            assert set(manager._shards) == {"NEWER", "NEW"}
+            assert (await manager.get_stats())['evictions']['memory'] == 1
 
         @pytest.mark.asyncio
-        async def test_cleanup_old_orderbooks(self, manager):
-            """Test cleanup of orderbooks with no connections."""
+        async def test_books_with_connections_are_never_evicted(self, manager):
+            """Test that only idle books count as eviction candidates."""
+            manager._memory_budget_bytes = 1
+
             with patch('app.services.orderbook_manager.OrderBook') as mock_orderbook_class:
-                mock_orderbook = AsyncMock(spec=OrderBook)
-                mock_orderbook_class.return_value = mock_orderbook
-                
-                # Register and unregister to create orphaned orderbook
-                await manager.register_connection("conn_1", "BTCUSDT", 10, 1.0)
-                await manager.unregister_connection("conn_1")
-                
-                # Manually add an orderbook without connections
-                manager._orderbooks["ORPHANED"] = mock_orderbook
-                
-                # Run cleanup
-                await manager._cleanup_old_orderbooks()
-                
-                # Orphaned orderbook should be removed
-                assert "ORPHANED" not in manager._orderbooks
+                mock_orderbook_class.side_effect = lambda symbol: self._book_of_size(symbol, 100)
+
+                for i in range(3):
+                    await manager.register_connection(f"conn_{i}", f"SYMBOL{i}", 10, 1.0)
+
+            assert len(manager._shards) == 3
 
         @pytest.mark.asyncio
-        async def test_no_cleanup_in_persistent_mode(self, manager):
-            """Test that cleanup doesn't happen in persistent mode."""
+        async def test_no_eviction_in_persistent_mode(self, manager):
+            """Test that persistent books are neither kept warm nor evicted."""
             await manager.set_persistent_mode(True)
-            
+            manager._memory_budget_bytes = 1
+
             with patch('app.services.orderbook_manager.OrderBook') as mock_orderbook_class:
-                mock_orderbook = AsyncMock(spec=OrderBook)
-                mock_orderbook_class.return_value = mock_orderbook
-                
-                # Add orderbook without connections
-                manager._orderbooks["PERSISTENT"] = mock_orderbook
-                
-                # Run cleanup
-                await manager._cleanup_old_orderbooks()
-                
-                # Should not be removed in persistent mode
-                assert "PERSISTENT" in manager._orderbooks
+                mock_orderbook_class.side_effect = lambda symbol: self._book_of_size(symbol, 100)
+
+                await manager.register_connection("conn_1", "PERSISTENT", 10, 1.0)
+                await manager.unregister_connection("conn_1")
+                await manager.register_connection("conn_2", "OTHER", 10, 1.0)
+
+            assert "PERSISTENT" in manager._shards
+            assert not manager.is_warm("PERSISTENT")
 
     class TestCacheWarming:
         """Test cache warming functionality."""
 
         @pytest.mark.asyncio
         async def test_warm_cache_for_symbol(self, manager):
-            """Test cache warming for a symbol."""
+            """Test cache warming for a symbol uses the parameters clients subscribed with."""
             symbol = "BTCUSDT"
             
             with patch('app.services.orderbook_manager.OrderBook') as mock_orderbook_class:
@@ -475,14 +656,49 @@ class TestOrderBookManager:
                 # Mock aggregation service
                 manager._aggregation_service.warm_cache_for_symbol = AsyncMock()
                 
-                # Register connection (should trigger cache warming)
+                # Registering does not warm the still empty book
                 await manager.register_connection("conn_1", symbol, 10, 1.0)
-                
-                # Allow async task to run
+                await asyncio.sleep(0.01)
+                assert not manager._aggregation_service.warm_cache_for_symbol.called
+
+                await manager.warm_cache_for_symbol(symbol)
                 await asyncio.sleep(0.01)
                 
-                # Should have called cache warming
-                assert manager._aggregation_service.warm_cache_for_symbol.called
+                # Should have warmed the subscribed combination only
+                manager._aggregation_service.warm_cache_for_symbol.assert_awaited_once_with(
+                    symbol, mock_orderbook, None, [(10, 1.0, True)])
+
+        @pytest.mark.asyncio
+        async def test_precompute_follows_recent_demand(self, manager):
+            """Test precompute covers live and recently left parameters within rounding options."""
+            symbol = "BTCUSDT"
+            await manager.update_symbol_data(symbol, {'roundingOptions': [0.1, 1.0, 10.0]})
+            manager._aggregation_service.warm_cache_for_symbol = AsyncMock(return_value=2)
+
+            await manager.register_connection("conn_1", symbol, 20, 1.0)
+            await manager.register_connection("conn_2", symbol, 50, 10.0, raw=True)
+            # A rounding the symbol does not offer is never precomputed
+            await manager.register_connection("conn_3", symbol, 20, 0.01)
+            # conn_1 switches rounding; 1.0 stays hot for the demand window
+            await manager.update_connection_params("conn_1", rounding=0.1)
+
+            assert await manager.precompute_aggregations(symbol) == 2
+
+            params = manager._aggregation_service.warm_cache_for_symbol.call_args[0][3]
+            assert set(params) == {(20, 1.0, True), (20, 0.1, True), (50, 10.0, False)}
+            # Live combinations come first, recently left ones after them
+            assert params[-1] == (20, 1.0, True)
+            assert manager.get_demand_stats(symbol)[symbol]
+
+        @pytest.mark.asyncio
+        async def test_walk_buckets(self, manager):
+            """Test the manager exposes the aggregation walk."""
+            levels = iter([(100.4, 1.0), (100.2, 2.0), (99.6, 3.0)])
+
+            buckets, walked, exhausted = manager.walk_buckets(levels, False, 5, 1.0)
+
+            assert buckets == [{'price': 100.0, 'amount': 3.0}, {'price': 99.0, 'amount': 3.0}]
+            assert (walked, exhausted) == (3, True)
 
     class TestStatistics:
         """Test statistics and monitoring."""
@@ -535,8 +751,7 @@ class TestOrderBookManager:
                 await manager.update_symbol_data("BTCUSDT", {'pricePrecision': 2})
                 
                 # Verify data exists
-                assert len(manager._orderbooks) > 0
-                assert len(manager._connections) > 0
+                assert len(manager._shards) > 0
                 assert len(manager._connection_params) > 0
                 assert len(manager._symbol_data) > 0
                 
@@ -544,8 +759,7 @@ class TestOrderBookManager:
                 await manager.shutdown()
                 
                 # All data should be cleared
-                assert len(manager._orderbooks) == 0
-                assert len(manager._connections) == 0
+                assert len(manager._shards) == 0
                 assert len(manager._connection_params) == 0
                 assert len(manager._symbol_data) == 0
 
@@ -571,10 +785,10 @@ class TestOrderBookManager:
                 await asyncio.gather(*tasks)
                 
                 # Should have 10 connections for the same symbol
-                assert len(manager._connections["BTCUSDT"]) == 10
+                assert len(manager._shards["BTCUSDT"].connections) == 10
                 assert len(manager._connection_params) == 10
                 # Should only create one orderbook
-                assert len(manager._orderbooks) == 1
+                assert len(manager._shards) == 1
 
         @pytest.mark.asyncio
         async def test_concurrent_parameter_updates(self, manager):
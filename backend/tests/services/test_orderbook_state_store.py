@@ -0,0 +1,212 @@
+"""
+Unit tests for the Order Book State Store.
+
+Tests the binary order book file written on shutdown and its use by the
+OrderBook Manager on startup.
+"""
+
+import random
+import struct
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.models.orderbook import OrderBook
+from app.services.orderbook_manager import OrderBookManager
+from app.services.orderbook_state_store import (
+    FILE_HEADER,
+    STATE_FORMAT_VERSION,
+    STATE_MAGIC,
+    OrderBookStateStore,
+    SavedOrderBook,
+)
+from app.services.orderbook_sync_service import OrderBookSyncService
+
+
+def _saved_book(symbol="BTCUSDT", levels=500, nonce=123456789, seed=3):
+    rng = random.Random(seed)
+    return SavedOrderBook(
+        symbol=symbol,
+        nonce=nonce,
+        timestamp=1640995200123,
+        bids=[(round(50000.0 - i * 0.1, 1), round(rng.uniform(0.001, 50), 3))
+              for i in range(levels)],
+        asks=[(round(50000.1 + i * 0.1, 1), round(rng.uniform(0.001, 50), 3))
+              for i in range(levels)])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OrderBookStateStore(str(tmp_path / "data" / "orderbook_state.bin"))
+
+
+class TestOrderBookStateStore:
+    """Test cases for OrderBookStateStore."""
+
+    def test_round_trip_is_exact(self, store):
+        books = [
+            _saved_book(),
+            SavedOrderBook("PEPEUSDT", None, 1640995200.5,
+                           bids=[(round(0.0000123 - i * 1e-10, 10), 1e9 + i) for i in range(20)],
+                           asks=[(round(0.0000124 + i * 1e-10, 10), 12345678.5) for i in range(20)]),
+            SavedOrderBook("ETHUSDT", 7, 1.5, bids=[], asks=[(3000.25, 0.001)]),
+        ]
+
+        assert store.save(books) == 3
+        loaded = store.load()
+
+        assert list(loaded) == ["BTCUSDT", "PEPEUSDT", "ETHUSDT"]
+        for book in books:
+            restored = loaded[book.symbol]
+            assert restored.bids == book.bids
+            assert restored.asks == book.asks
+            assert (restored.nonce, restored.timestamp) == (book.nonce, book.timestamp)
+            assert restored.saved_at == pytest.approx(time.time(), abs=5)
+
+    def test_file_is_compact(self, store):
+        store.save([_saved_book(levels=1000)])
+
+        with open(store.path, "rb") as f:
+            size = len(f.read())
+        # 2000 levels of two int64 columns, before compression
+        assert size < 2000 * 16
+
+    def test_missing_file_loads_nothing(self, store):
+        assert store.load() == {}
+
+    def test_other_format_version_is_ignored(self, store):
+        store.save([_saved_book()])
+        with open(store.path, "r+b") as f:
+            f.write(FILE_HEADER.pack(STATE_MAGIC, STATE_FORMAT_VERSION + 1, 0, time.time(), 1))
+
+        assert store.load() == {}
+
+    def test_corrupt_file_is_ignored(self, store):
+        store.save([_saved_book()])
+        with open(store.path, "rb") as f:
+            data = f.read()
+        with open(store.path, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        assert store.load() == {}
+
+    def test_truncated_levels_are_ignored(self, store):
+        store.save([_saved_book()])
+        with open(store.path, "r+b") as f:
+            header = bytearray(f.read(FILE_HEADER.size))
+            struct.pack_into("<I", header, FILE_HEADER.size - 4, 2)
+            f.seek(0)
+            f.write(header)
+
+        assert store.load() == {}
+
+    def test_unencodable_book_is_skipped(self, store):
+        huge = SavedOrderBook("HUGEUSDT", 1, 1.0, bids=[(1e300, 1.0)])
+
+        assert store.save([huge, _saved_book()]) == 1
+        assert list(store.load()) == ["BTCUSDT"]
+
+
+class TestSavedOrderBook:
+    """Test the consistency check used before restoring."""
+
+    def test_sorted_uncrossed_book_is_consistent(self):
+        assert _saved_book().is_consistent()
+
+    @pytest.mark.parametrize("bids,asks", [
+        ([(100.0, 1.0), (101.0, 1.0)], [(102.0, 1.0)]),  # Bids ascending
+        ([(100.0, 1.0)], [(103.0, 1.0), (102.0, 1.0)]),  # Asks descending
+        ([(101.0, 1.0)], [(100.0, 1.0)]),  # Crossed
+        ([(100.0, 0.0)], [(101.0, 1.0)]),  # Empty level
+        ([(float("nan"), 1.0)], []),
+    ])
+    def test_inconsistent_books(self, bids, asks):
+        assert not SavedOrderBook("BTCUSDT", 1, 1.0, bids=bids, asks=asks).is_consistent()
+
+
+class TestManagerState:
+    """Test saving on shutdown and restoring new books."""
+
+    def _manager(self, path, max_age=120.0):
+        with patch('app.services.orderbook_manager.settings') as mock_settings:
+            mock_settings.ORDERBOOK_KEEP_WARM_SECONDS = 30.0
+            mock_settings.ORDERBOOK_MEMORY_BUDGET_MB = 64.0
+            mock_settings.AGGREGATION_DEMAND_WINDOW_SECONDS = 300.0
+            mock_settings.AGGREGATION_PRECOMPUTE_MAX = 8
+            mock_settings.ORDERBOOK_STATE_PATH = path
+            mock_settings.ORDERBOOK_STATE_MAX_AGE_SECONDS = max_age
+            manager = OrderBookManager.__new__(OrderBookManager)
+            manager._initialized = False
+            manager.__init__()
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_shutdown_saves_and_startup_restores(self, store):
+        sync_service = OrderBookSyncService()
+        sync_service.mark_synced("BTCUSDT", 555)
+        saved = _saved_book(levels=50)
+        manager = self._manager(store.path)
+        with patch('app.services.orderbook_manager.orderbook_sync_service', sync_service):
+            orderbook = await manager.register_connection("conn_1", "BTCUSDT", 20, 0.1)
+            await orderbook.update_snapshot(saved.to_snapshot())
+            await manager.register_connection("conn_2", "ETHUSDT", 20, 0.1)  # Still empty
+            await manager.shutdown()
+
+        assert manager._state_stats['saved'] == 1
+
+        restarted = self._manager(store.path)
+        assert await restarted.load_saved_state() == 1
+        new_book = OrderBook("BTCUSDT")
+        restored = await restarted.restore_orderbook("BTCUSDT", new_book)
+
+        assert restored.nonce == 555
+        bids, asks = new_book.iter_levels()
+        assert (list(bids), list(asks)) == (saved.bids, saved.asks)
+        assert new_book.timestamp == saved.timestamp
+        # Each saved book is restored once
+        assert await restarted.restore_orderbook("BTCUSDT", OrderBook("BTCUSDT")) is None
+        assert (await restarted.get_stats())['saved_state']['restored'] == 1
+
+    @pytest.mark.asyncio
+    async def test_resyncing_book_is_not_saved(self, store):
+        manager = self._manager(store.path)
+        orderbook = await manager.register_connection("conn_1", "BTCUSDT", 20, 0.1)
+        await orderbook.update_snapshot(_saved_book(levels=5).to_snapshot())
+        with patch('app.services.orderbook_manager.orderbook_sync_service') as sync_service:
+            sync_service.is_resyncing.return_value = True
+            await manager.shutdown()
+
+        assert store.load() == {}
+
+    @pytest.mark.asyncio
+    async def test_old_state_falls_back_to_rest(self, store):
+        store.save([_saved_book(), _saved_book("ETHUSDT")])
+        manager = self._manager(store.path, max_age=60.0)
+        await manager.load_saved_state()
+        for book in manager._saved_books.values():
+            book.saved_at -= 61
+
+        assert await manager.restore_orderbook("BTCUSDT", OrderBook("BTCUSDT")) is None
+        assert manager._state_stats['expired'] == 2
+        assert manager._saved_books == {}
+
+    @pytest.mark.asyncio
+    async def test_inconsistent_state_falls_back_to_rest(self, store):
+        crossed = SavedOrderBook("BTCUSDT", 1, 1.0, bids=[(101.0, 1.0)], asks=[(100.0, 1.0)])
+        store.save([crossed])
+        manager = self._manager(store.path)
+        await manager.load_saved_state()
+        orderbook = OrderBook("BTCUSDT")
+
+        assert await manager.restore_orderbook("BTCUSDT", orderbook) is None
+        assert manager._state_stats['inconsistent'] == 1
+        assert list(orderbook.iter_levels()[0]) == []
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_path(self):
+        manager = self._manager("")
+
+        assert await manager.load_saved_state() == 0
+        assert await manager.restore_orderbook("BTCUSDT", OrderBook("BTCUSDT")) is None
+        await manager.shutdown()
@@ -0,0 +1,225 @@
+"""
+Tests for order book sequence tracking and background resync.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import ccxt
+import pytest
+
+from app.api.v1.endpoints.connection_manager import ConnectionManager
+from app.models.orderbook import OrderBook
+from app.services.orderbook_state_store import SavedOrderBook
+from app.services.orderbook_sync_service import (
+    OrderBookSyncService,
+    SEQ_DUPLICATE,
+    SEQ_GAP,
+    SEQ_OK,
+    SEQ_OUT_OF_ORDER,
+    SEQ_STALE,
+)
+
+
+def _book(nonce, bid=100.0, ask=101.0, timestamp=1640995200000):
+    return {'bids': [[bid, 1.0]], 'asks': [[ask, 1.0]], 'timestamp': timestamp, 'nonce': nonce}
+
+
+class TestSequenceChecks:
+    """Test update id classification."""
+
+    def test_increasing_ids_are_ok(self):
+        service = OrderBookSyncService()
+
+        assert service.check_update("BTC/USDT", 100) == SEQ_OK
+        assert service.check_update("BTC/USDT", 105) == SEQ_OK
+        assert service.get_stats("BTC/USDT")["BTC/USDT"]['last_nonce'] == 105
+
+    def test_duplicate_and_out_of_order(self):
+        service = OrderBookSyncService()
+        service.check_update("BTC/USDT", 100)
+
+        assert service.check_update("BTC/USDT", 100) == SEQ_DUPLICATE
+        assert service.check_update("BTC/USDT", 99) == SEQ_OUT_OF_ORDER
+
+        stats = service.get_stats("BTC/USDT")["BTC/USDT"]
+        assert stats['duplicates'] == 1
+        assert stats['out_of_order'] == 1
+
+    def test_gaps_reported_by_the_exchange_client(self):
+        service = OrderBookSyncService()
+        service.check_update("BTC/USDT", 100)
+
+        # Merged ccxt books skip ids between updates; only ordering is checked
+        assert service.check_update("BTC/USDT", 130) == SEQ_OK
+        service.record_gap("BTC/USDT")
+        assert service.get_stats()["BTC/USDT"]['gaps'] == 1
+
+    def test_updates_older_than_snapshot_are_stale(self):
+        service = OrderBookSyncService()
+        service.mark_synced("BTC/USDT", 200)
+
+        assert service.check_update("BTC/USDT", 150) == SEQ_STALE
+        assert service.check_update("BTC/USDT", 201) == SEQ_OK
+
+    def test_missing_ids_are_not_checked(self):
+        service = OrderBookSyncService()
+
+        assert service.check_update("BTC/USDT", None) == SEQ_OK
+        assert service.check_update("BTC/USDT", None) == SEQ_OK
+
+
+class TestResync:
+    """Test background resync bookkeeping."""
+
+    @pytest.mark.asyncio
+    async def test_resync_records_recovery(self):
+        service = OrderBookSyncService()
+        fetch = AsyncMock(return_value=500)
+
+        task = service.request_resync("BTC/USDT", SEQ_GAP, fetch)
+        assert service.is_resyncing("BTC/USDT")
+        # A second request while one is running is ignored
+        assert service.request_resync("BTC/USDT", SEQ_GAP, fetch) is None
+
+        await task
+
+        stats = service.get_stats("BTC/USDT")["BTC/USDT"]
+        assert not stats['resyncing']
+        assert stats['resync_count'] == 1
+        assert stats['last_reason'] == SEQ_GAP
+        assert stats['last_recovery_ms'] is not None
+        assert stats['last_nonce'] == 500
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_resync_retries_failed_snapshot(self):
+        service = OrderBookSyncService()
+        fetch = AsyncMock(side_effect=[Exception("timeout"), 42])
+
+        with patch('app.services.orderbook_sync_service.RESYNC_RETRY_DELAY', 0.01):
+            await service.request_resync("BTC/USDT", "error", fetch)
+
+        assert fetch.await_count == 2
+        assert service.get_stats("BTC/USDT")["BTC/USDT"]['last_nonce'] == 42
+
+    @pytest.mark.asyncio
+    async def test_reset_cancels_running_resync(self):
+        service = OrderBookSyncService()
+
+        async def slow_fetch():
+            await asyncio.sleep(10)
+
+        task = service.request_resync("BTC/USDT", SEQ_GAP, slow_fetch)
+        await asyncio.sleep(0)
+        service.reset("BTC/USDT")
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not service.is_resyncing("BTC/USDT")
+
+
+class TestStreamResync:
+    """Test gap handling in ConnectionManager._stream_orderbook."""
+
+    SYMBOL = "BTC/USDT:USDT"
+    REST_LATENCY = 0.05
+
+    async def _run_stream(self, updates, saved=None):
+        """Run the stream over scripted watch results; return book, sync service, exchange.
+
+        A `saved` book is restored in place of the initial REST snapshot.
+        """
+        connection_manager = ConnectionManager()
+        connection_manager.active_connections[self.SYMBOL] = [MagicMock()]
+        orderbook = OrderBook(self.SYMBOL)
+        sync_service = OrderBookSyncService()
+        pending = list(updates)
+
+        async def fetch_order_book(symbol, limit=None):
+            await asyncio.sleep(self.REST_LATENCY)
+            return _book(1000, bid=90.0, ask=91.0)
+
+        async def watch_order_book(symbol):
+            await asyncio.sleep(0)
+            if not pending:
+                # Let the background resync finish, then end the stream
+                await asyncio.sleep(self.REST_LATENCY * 3)
+                connection_manager.active_connections[self.SYMBOL] = []
+                return _book(1000)  # Same id as the resync snapshot: skipped
+            update = pending.pop(0)
+            if isinstance(update, Exception):
+                raise update
+            return update
+
+        exchange_pro = MagicMock()
+        exchange_pro.fetch_order_book = AsyncMock(side_effect=fetch_order_book)
+        exchange_pro.watch_order_book = AsyncMock(side_effect=watch_order_book)
+
+        with patch('app.api.v1.endpoints.connection_manager.exchange_service') as mock_exchange_service, \
+                patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_manager, \
+                patch('app.api.v1.endpoints.connection_manager.orderbook_sync_service', sync_service), \
+                patch.object(connection_manager, '_broadcast_to_all_symbol_connections', AsyncMock()), \
+                patch.object(connection_manager, 'broadcast_to_symbol', AsyncMock()):
+            mock_exchange_service.get_exchange_pro.return_value = exchange_pro
+            mock_manager.get_orderbook = AsyncMock(return_value=orderbook)
+
+            async def restore_orderbook(symbol, book):
+                if saved is not None:
+                    await book.update_snapshot(saved.to_snapshot())
+                return saved
+
+            mock_manager.restore_orderbook = AsyncMock(side_effect=restore_orderbook)
+            sync_service.reset = MagicMock()  # Keep the final state for assertions
+            await connection_manager._stream_orderbook(self.SYMBOL)
+
+        return orderbook, sync_service, exchange_pro
+
+    @pytest.mark.asyncio
+    async def test_out_of_order_update_triggers_resync(self):
+        orderbook, sync_service, exchange_pro = await self._run_stream([
+            _book(1001, bid=100.0, ask=101.0),
+            _book(999, bid=50.0, ask=51.0),  # Out of order: must never be applied
+            _book(1002, bid=100.5, ask=101.5),  # Arrives during resync: skipped
+        ])
+
+        stats = sync_service.get_stats(self.SYMBOL)[self.SYMBOL]
+        assert stats['out_of_order'] == 1
+        assert stats['resync_count'] == 1
+        # Initial fetch plus one resync snapshot
+        assert exchange_pro.fetch_order_book.await_count == 2
+        # The resync snapshot is the last consistent version
+        assert await orderbook.get_best_bid_ask() == (90.0, 91.0)
+        # Recovery costs one REST round trip, a fraction of the old 5 s sleep
+        assert stats['last_recovery_ms'] < 1000
+
+    @pytest.mark.asyncio
+    async def test_exchange_gap_error_resyncs_without_sleeping(self):
+        orderbook, sync_service, exchange_pro = await self._run_stream([
+            _book(1001),
+            ccxt.InvalidNonce("binance orderbook out of sync"),
+        ])
+
+        stats = sync_service.get_stats(self.SYMBOL)[self.SYMBOL]
+        assert stats['gaps'] == 1
+        assert stats['resync_count'] == 1
+        assert stats['errors'] == 0
+        assert stats['last_recovery_ms'] < 1000
+
+    @pytest.mark.asyncio
+    async def test_restored_book_replaces_initial_rest_snapshot(self):
+        saved = SavedOrderBook(self.SYMBOL, 990, 1640995200000,
+                               bids=[(95.0, 2.0)], asks=[(96.0, 2.0)], saved_at=0.0)
+        orderbook, sync_service, exchange_pro = await self._run_stream([
+            _book(985, bid=50.0, ask=51.0),  # Contained in the saved book: skipped
+            _book(1000, bid=100.0, ask=101.0),
+        ], saved=saved)
+
+        stats = sync_service.get_stats(self.SYMBOL)[self.SYMBOL]
+        # Only our own snapshot is saved; ccxt's subscription snapshot is
+        # inside watch_order_book
+        assert exchange_pro.fetch_order_book.await_count == 0
+        assert stats['stale'] == 1
+        assert stats['resync_count'] == 0
+        # The stream caught the restored book up
+        assert await orderbook.get_best_bid_ask() == (100.0, 101.0)
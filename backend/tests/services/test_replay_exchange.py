@@ -0,0 +1,384 @@
+"""
+Tests for the offline replay exchange.
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import ccxt
+import pytest
+
+from app.api.v1.endpoints.connection_manager import ConnectionManager
+from app.models.orderbook import OrderBook
+from app.services.exchange_service import ExchangeService
+from app.services.market_capture_service import (
+    STREAM_LIQUIDATIONS,
+    STREAM_ORDERBOOK,
+    STREAM_ORDERBOOK_SNAPSHOT,
+    STREAM_TRADES,
+    MarketCaptureService,
+)
+from app.services.orderbook_sync_service import OrderBookSyncService
+from app.services.replay_capture import CapturedMarket
+from app.services.replay_exchange import ReplayExchange, ReplayRestExchange
+from app.services.replay_synthetic import SyntheticMarket
+from app.services.symbol_service import SymbolService
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+def _synthetic(speed=0, levels=50):
+    return ReplayExchange(synthetic=SyntheticMarket(levels=levels), speed=speed)
+
+
+def _book(nonce, bid=100.0, ask=101.0):
+    return {'bids': [[bid, 1.0]], 'asks': [[ask, 1.0]], 'timestamp': 1640995200000,
+            'nonce': nonce, 'symbol': SYMBOL}
+
+
+@pytest.fixture
+def capture_dir(tmp_path):
+    """A capture of one snapshot, three book updates and two trade batches."""
+    directory = str(tmp_path / "capture")
+    capture = MarketCaptureService(directory)
+    capture.start()
+    capture.record(STREAM_ORDERBOOK_SNAPSHOT, SYMBOL, _book(100))
+    for nonce in (101, 102, 103):
+        time.sleep(0.01)
+        capture.record(STREAM_ORDERBOOK, SYMBOL, _book(nonce, bid=100.0 + nonce - 100))
+        capture.record(STREAM_TRADES, SYMBOL, [{'id': str(nonce), 'price': 100.5}])
+    capture.stop()
+    return directory
+
+
+class TestSyntheticMarket:
+    """Test the parametric generator."""
+
+    @pytest.mark.asyncio
+    async def test_books_are_deterministic_and_well_formed(self):
+        first, second = _synthetic(), _synthetic()
+
+        books = [await first.watch_order_book(SYMBOL) for _ in range(20)]
+        again = [await second.watch_order_book(SYMBOL) for _ in range(20)]
+
+        assert [(b['bids'], b['asks']) for b in books] == [(b['bids'], b['asks']) for b in again]
+        assert [b['nonce'] for b in books] == list(range(1, 21))
+        for book in books:
+            bids = [price for price, _ in book['bids']]
+            asks = [price for price, _ in book['asks']]
+            assert len(bids) == len(asks) == 50
+            assert bids == sorted(bids, reverse=True)
+            assert asks == sorted(asks)
+            assert bids[0] < asks[0]
+            assert all(amount > 0 for _, amount in book['bids'] + book['asks'])
+
+    @pytest.mark.asyncio
+    async def test_content_does_not_depend_on_interleaving(self):
+        first, second = _synthetic(), _synthetic()
+
+        trades = [await first.watch_trades(SYMBOL) for _ in range(10)]
+        mixed = []
+        for _ in range(10):
+            await second.watch_order_book(SYMBOL)
+            await second.watch_ohlcv(SYMBOL, '1m')
+            mixed.append(await second.watch_trades(SYMBOL))
+
+        assert [[(t['price'], t['amount'], t['side']) for t in batch] for batch in trades] == \
+            [[(t['price'], t['amount'], t['side']) for t in batch] for batch in mixed]
+
+    @pytest.mark.asyncio
+    async def test_snapshot_precedes_the_next_update(self):
+        exchange = _synthetic()
+        for _ in range(5):
+            await exchange.watch_order_book(SYMBOL)
+
+        snapshot = await exchange.fetch_order_book(SYMBOL, limit=10)
+        update = await exchange.watch_order_book(SYMBOL)
+
+        assert snapshot['nonce'] == 5
+        assert update['nonce'] == 6
+        assert len(snapshot['bids']) == len(snapshot['asks']) == 10
+
+    @pytest.mark.asyncio
+    async def test_candles_follow_the_timeframe(self):
+        exchange = _synthetic()
+
+        candles = [(await exchange.watch_ohlcv(SYMBOL, '1m'))[0] for _ in range(5)]
+
+        for open_time, open_, high, low, close, volume in candles:
+            assert open_time % 60_000 == 0
+            assert low <= min(open_, close) <= max(open_, close) <= high
+            assert volume > 0
+
+    @pytest.mark.asyncio
+    async def test_liquidation_socket_yields_force_orders(self):
+        exchange = _synthetic()
+
+        async with exchange.connect_liquidations("BTCUSDT") as websocket:
+            message = json.loads(await websocket.recv())
+            await websocket.ping()
+
+        assert message['e'] == 'forceOrder'
+        assert message['o']['s'] == 'BTCUSDT'
+        assert float(message['o']['q']) > 0
+
+
+class TestReplaySpeed:
+    """Test pacing on the shared replay clock."""
+
+    @pytest.mark.asyncio
+    async def test_as_fast_as_possible(self):
+        exchange = _synthetic(speed=0)
+        start = time.perf_counter()
+
+        for _ in range(200):  # 20 s of books at 10 updates/s
+            await exchange.watch_order_book(SYMBOL)
+
+        assert time.perf_counter() - start < 5
+        assert exchange.get_stats()['offset_seconds'] == pytest.approx(20.0)
+
+    @pytest.mark.asyncio
+    async def test_speed_multiplier_is_honoured(self):
+        exchange = _synthetic(speed=20)
+        start = time.perf_counter()
+
+        for _ in range(20):  # 2 s of books, 0.1 s at 20x
+            await exchange.watch_order_book(SYMBOL)
+
+        assert 0.09 <= time.perf_counter() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_late_stream_joins_at_the_current_position(self):
+        exchange = _synthetic(speed=20)
+        await exchange.watch_order_book(SYMBOL)
+        await asyncio.sleep(0.15)  # 3 s of replay time
+
+        start = time.perf_counter()
+        trades = await exchange.watch_trades(SYMBOL)
+
+        assert time.perf_counter() - start < 0.05
+        assert int(trades[0]['id']) > 10 ** 9 + 3 * 50
+
+    @pytest.mark.asyncio
+    async def test_timestamps_are_due_times(self):
+        exchange = _synthetic(speed=1)
+
+        book = await exchange.watch_order_book(SYMBOL)
+        async with exchange.connect_liquidations("BTCUSDT") as websocket:
+            liquidation = json.loads(await websocket.recv())
+
+        now = time.time() * 1000
+        assert book['timestamp'] == pytest.approx(now - 1900, abs=150)
+        assert liquidation['E'] == liquidation['o']['T'] == pytest.approx(now, abs=150)
+
+
+class TestCapturedMarket:
+    """Test replaying a market data capture."""
+
+    @pytest.mark.asyncio
+    async def test_streams_replay_in_capture_order(self, capture_dir):
+        exchange = ReplayExchange(CapturedMarket(capture_dir), speed=0, loop=False)
+
+        snapshot = await exchange.fetch_order_book(SYMBOL)
+        books = [await exchange.watch_order_book(SYMBOL) for _ in range(3)]
+        trades = [await exchange.watch_trades(SYMBOL) for _ in range(3)]
+
+        assert snapshot['nonce'] == 100
+        assert [b['nonce'] for b in books] == [101, 102, 103]
+        assert [t[0]['id'] for t in trades] == ['101', '102', '103']
+
+    @pytest.mark.asyncio
+    async def test_loop_starts_over_later_in_replay_time(self, capture_dir):
+        exchange = ReplayExchange(CapturedMarket(capture_dir), speed=0, loop=True)
+
+        books = [await exchange.watch_order_book(SYMBOL) for _ in range(6)]
+        offsets = exchange._offsets[(STREAM_ORDERBOOK, SYMBOL)]
+
+        # The second pass continues the update ids after the capture's span
+        assert [b['nonce'] for b in books] == [101, 102, 103, 105, 106, 107]
+        assert offsets > exchange.capture.duration
+
+    @pytest.mark.asyncio
+    async def test_snapshots_stay_in_step_with_looped_stream(self, tmp_path):
+        directory = str(tmp_path / "capture")
+        capture = MarketCaptureService(directory)
+        capture.start()
+        capture.record(STREAM_ORDERBOOK_SNAPSHOT, SYMBOL, _book(100))
+        for nonce in range(101, 201):
+            time.sleep(0.0005)
+            capture.record(STREAM_ORDERBOOK, SYMBOL, _book(nonce))
+        capture.stop()
+        exchange = ReplayExchange(CapturedMarket(directory), speed=0, loop=True)
+
+        # Five and a half passes over the 100 updates
+        for _ in range(550):
+            book = await exchange.watch_order_book(SYMBOL)
+        snapshot = await exchange.fetch_order_book(SYMBOL)
+
+        assert book['nonce'] == 150 + 5 * 101
+        # The snapshot is the one of the stream's current pass
+        assert snapshot['nonce'] == 100 + 5 * 101
+
+    @pytest.mark.asyncio
+    async def test_replay_leaves_the_capture_untouched(self, capture_dir):
+        market = CapturedMarket(capture_dir)
+        exchange = ReplayExchange(market, speed=0, loop=True)
+
+        book = await exchange.watch_order_book(SYMBOL)
+        trades = await exchange.watch_trades(SYMBOL)
+
+        assert book['timestamp'] != 1640995200000
+        assert 'timestamp' in trades[0]
+        # Served messages are stamped copies; the captured ones are replayed as recorded
+        assert market.latest(STREAM_ORDERBOOK, SYMBOL, 0.0)['timestamp'] == 1640995200000
+        assert market.first(STREAM_TRADES, SYMBOL) == [{'id': '101', 'price': 100.5}]
+
+    @pytest.mark.asyncio
+    async def test_capture_without_loop_goes_quiet(self, capture_dir):
+        exchange = ReplayExchange(CapturedMarket(capture_dir), speed=0, loop=False)
+        for _ in range(3):
+            await exchange.watch_order_book(SYMBOL)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(exchange.watch_order_book(SYMBOL), 0.05)
+
+    @pytest.mark.asyncio
+    async def test_uncaptured_symbol_is_rejected(self, capture_dir):
+        exchange = ReplayExchange(CapturedMarket(capture_dir), speed=0)
+
+        with pytest.raises(ccxt.BadSymbol):
+            await exchange.watch_order_book("ETH/USDT:USDT")
+        with pytest.raises(ccxt.BadSymbol):
+            await exchange.watch_order_book("ETH/USDT:USDT")
+        with pytest.raises(ccxt.BadSymbol):
+            await exchange.fetch_order_book("ETH/USDT:USDT")
+
+    def test_keys(self, capture_dir):
+        market = CapturedMarket(capture_dir)
+
+        assert market.keys(STREAM_TRADES) == [SYMBOL]
+        assert market.keys(STREAM_LIQUIDATIONS) == []
+
+
+class TestReplayRestExchange:
+    """Test the synchronous REST stand-in."""
+
+    def test_markets_load_into_symbol_service(self):
+        rest = ReplayRestExchange(_synthetic(), ["BTCUSDT", "ETH/USDT:USDT"])
+        service = SymbolService()
+
+        service.apply_markets_snapshot(service.build_markets_snapshot(rest.load_markets()))
+
+        assert service.resolve_symbol_to_exchange_format("BTCUSDT") == SYMBOL
+        metadata = service.get_symbol_metadata("ETHUSDT")
+        assert metadata.price_precision is not None
+        assert metadata.rounding_options
+
+    def test_history_precedes_the_stream(self):
+        rest = ReplayRestExchange(_synthetic(), ["BTCUSDT"])
+
+        trades = rest.fetch_trades(SYMBOL, limit=100)
+        candles = rest.fetch_ohlcv(SYMBOL, '5m', limit=200)
+        stream_trades = asyncio.run(rest.replay.watch_trades(SYMBOL))
+
+        assert len(trades) == 100
+        assert max(int(t['id']) for t in trades) < int(stream_trades[0]['id'])
+        assert len(candles) == 200
+        assert [c[0] for c in candles] == sorted({c[0] for c in candles})
+        assert all(low <= min(o, c) and max(o, c) <= high for _, o, high, low, c, _ in candles)
+        assert candles[-1][4] == pytest.approx(
+            rest.replay.synthetic.symbol(SYMBOL).mid_at(0), rel=1e-3)
+
+    def test_tickers_and_unknown_symbols(self):
+        rest = ReplayRestExchange(_synthetic(), ["BTCUSDT"])
+
+        tickers = rest.fetch_tickers()
+
+        assert float(tickers[SYMBOL]['info']['quoteVolume']) > 0
+        with pytest.raises(ccxt.BadSymbol):
+            rest.fetch_order_book("ETH/USDT:USDT")
+
+    def test_captured_markets(self, capture_dir):
+        rest = ReplayRestExchange(ReplayExchange(CapturedMarket(capture_dir), speed=0))
+
+        assert list(rest.markets) == [SYMBOL]
+        assert rest.markets[SYMBOL]['precision']['price'] == 1.0
+        assert rest.fetch_order_book(SYMBOL)['nonce'] == 100
+
+
+class TestReplayBackend:
+    """Test selecting the replay exchange and streaming through it."""
+
+    def test_exchange_service_uses_replay_backend(self):
+        service = ExchangeService()
+        with patch('app.services.exchange_service.settings') as mock_settings, \
+                patch('app.services.replay_exchange.settings') as replay_settings:
+            mock_settings.EXCHANGE_BACKEND = "replay"
+            replay_settings.EXCHANGE_REPLAY_CAPTURE_DIR = ""
+            replay_settings.EXCHANGE_REPLAY_SPEED = 4
+            replay_settings.EXCHANGE_REPLAY_LOOP = True
+            replay_settings.EXCHANGE_SYNTHETIC_LEVELS = 100
+            replay_settings.EXCHANGE_SYNTHETIC_BOOK_RATE = 10
+            replay_settings.EXCHANGE_SYNTHETIC_TRADE_RATE = 20
+            replay_settings.EXCHANGE_REPLAY_SYMBOLS = "BTCUSDT, ETHUSDT"
+            exchange_pro = service.get_exchange_pro()
+            exchange = service.get_exchange()
+
+        assert isinstance(exchange_pro, ReplayExchange)
+        assert exchange.replay is exchange_pro
+        assert sorted(exchange.load_markets()) == ["BTC/USDT:USDT", "ETH/USDT:USDT"]
+        assert exchange_pro.get_stats()['source'] == 'synthetic'
+        assert exchange_pro.clock.speed == 4
+        assert exchange_pro.synthetic.levels == 100
+
+    @staticmethod
+    async def _stream(exchange, count):
+        """Run the order book stream on a replay exchange for `count` broadcasts."""
+        connection_manager = ConnectionManager()
+        connection_manager.active_connections[SYMBOL] = [MagicMock()]
+        orderbook = OrderBook(SYMBOL)
+        sync_service = OrderBookSyncService()
+        broadcasts = []
+
+        async def broadcast(symbol):
+            broadcasts.append(await orderbook.get_best_bid_ask())
+            if len(broadcasts) == count:
+                connection_manager.active_connections[SYMBOL] = []
+
+        with patch('app.api.v1.endpoints.connection_manager.exchange_service') as mock_exchange_service, \
+                patch('app.api.v1.endpoints.connection_manager.orderbook_manager') as mock_manager, \
+                patch('app.api.v1.endpoints.connection_manager.orderbook_sync_service', sync_service), \
+                patch.object(connection_manager, '_broadcast_to_all_symbol_connections',
+                             AsyncMock(side_effect=broadcast)), \
+                patch.object(connection_manager, 'broadcast_to_symbol', AsyncMock()):
+            mock_exchange_service.get_exchange_pro.return_value = exchange
+            mock_manager.get_orderbook = AsyncMock(return_value=orderbook)
+            mock_manager.restore_orderbook = AsyncMock(return_value=None)
+            sync_service.reset = MagicMock()
+            await asyncio.wait_for(connection_manager._stream_orderbook(SYMBOL), 10)
+
+        return broadcasts, sync_service.get_stats(SYMBOL)[SYMBOL]
+
+    @pytest.mark.asyncio
+    async def test_orderbook_stream_end_to_end(self):
+        broadcasts, stats = await self._stream(_synthetic(levels=200), 50)
+
+        assert len(broadcasts) == 50
+        assert stats['resync_count'] == 0
+        assert stats['out_of_order'] == 0
+        bid, ask = broadcasts[-1]
+        assert bid < ask
+
+    @pytest.mark.asyncio
+    async def test_looped_capture_stays_in_sequence(self, capture_dir):
+        exchange = ReplayExchange(CapturedMarket(capture_dir), speed=0, loop=True)
+
+        # Initial snapshot plus three passes over the captured updates
+        broadcasts, stats = await self._stream(exchange, 10)
+
+        assert broadcasts[1:4] == broadcasts[4:7] == broadcasts[7:10]
+        assert stats['last_nonce'] == 111
+        assert stats['out_of_order'] == 0
+        assert stats['resync_count'] == 0
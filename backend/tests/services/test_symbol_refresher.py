@@ -0,0 +1,139 @@
+"""
+Unit tests for the Symbol Refresher.
+
+Tests background stale-while-revalidate refresh, atomic swaps and
+jittered retry of markets and tickers.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.symbol_refresher import SymbolRefresher
+from app.services.symbol_service import SymbolService
+
+
+MARKETS = {
+    "BTC/USDT": {
+        "id": "BTCUSDT",
+        "symbol": "BTC/USDT",
+        "base": "BTC",
+        "quote": "USDT",
+        "active": True,
+        "type": "swap",
+        "spot": False,
+        "precision": {"price": 0.1, "amount": 0.001},
+    },
+}
+
+TICKERS = {"BTC/USDT": {"last": 50000.0, "info": {"quoteVolume": "1000.0"}}}
+
+
+@pytest.fixture
+def mock_exchange():
+    exchange = Mock()
+    exchange.options = {}
+    exchange.load_markets.return_value = MARKETS
+    exchange.fetch_tickers.return_value = TICKERS
+    with patch("app.services.symbol_service.exchange_service") as mock_service:
+        mock_service.get_exchange.return_value = exchange
+        yield exchange
+
+
+@pytest.fixture
+def refresher():
+    service = SymbolService()
+    return SymbolRefresher(service, markets_interval=3600, tickers_interval=3600,
+                           retry_base_delay=0.001, retry_max_delay=0.01, max_retries=2)
+
+
+class TestSymbolRefresher:
+    """Test cases for SymbolRefresher."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_prebuilds_symbol_list(self, refresher, mock_exchange):
+        """Refreshing markets and tickers prebuilds the /symbols list."""
+        await refresher.refresh_markets()
+        await refresher.refresh_tickers()
+
+        service = refresher._service
+        assert service._symbols_list is not None
+        assert service.get_all_symbols()[0]["volume24h"] == 1000.0
+        assert refresher.get_stats()["markets_refreshes"] == 1
+        assert refresher.get_stats()["tickers_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_background_mode_never_fetches_in_request(self, refresher, mock_exchange):
+        """With the refresher active, get_all_symbols is answered from memory."""
+        await refresher.refresh_markets()
+        await refresher.refresh_tickers()
+        refresher._service._background_refresh_active = True
+        mock_exchange.fetch_tickers.reset_mock()
+
+        for _ in range(10):
+            refresher._service.get_all_symbols()
+
+        mock_exchange.fetch_tickers.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried(self, refresher, mock_exchange):
+        """A transient failure is retried and the refresh then succeeds."""
+        mock_exchange.fetch_tickers.side_effect = [Exception("timeout"), TICKERS]
+
+        assert await refresher._refresh_with_retry("tickers", refresher.refresh_tickers)
+        assert refresher.get_stats()["failures"] == 1
+        assert refresher._service._ticker_cache == TICKERS
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_keep_last_snapshot(self, refresher, mock_exchange):
+        """When retries are exhausted, the last good snapshot stays in place."""
+        await refresher.refresh_markets()
+        mock_exchange.load_markets.side_effect = Exception("down")
+
+        assert not await refresher._refresh_with_retry("markets", refresher.refresh_markets)
+        assert refresher._service.resolve_symbol_to_exchange_format("BTCUSDT") == "BTC/USDT"
+        assert refresher.get_stats()["failures"] == 3
+
+    def test_backoff_delay_is_jittered_and_capped(self, refresher):
+        """Retry delays grow exponentially, are jittered and capped."""
+        refresher._retry_base_delay = 1.0
+        refresher._retry_max_delay = 8.0
+
+        for attempt, cap in ((1, 1.0), (2, 2.0), (3, 4.0), (6, 8.0)):
+            delays = {refresher.backoff_delay(attempt) for _ in range(20)}
+            assert all(cap / 2 <= d <= cap for d in delays)
+            assert len(delays) > 1
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, refresher, mock_exchange):
+        """The background task performs an initial refresh and stops cleanly."""
+        await refresher.start()
+        assert refresher.is_running
+        assert refresher._service._background_refresh_active
+
+        for _ in range(100):
+            if refresher.get_stats()["tickers_refreshes"]:
+                break
+            await asyncio.sleep(0.01)
+
+        await refresher.stop()
+        assert not refresher.is_running
+        assert not refresher._service._background_refresh_active
+        assert refresher.get_stats()["markets_refreshes"] == 1
+        assert refresher.get_stats()["tickers_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_tickers_poll_skipped_while_live_stream_is_fresh(self, refresher, mock_exchange):
+        """Polled tickers are only a fallback when the live stream is fresh."""
+        with patch.object(refresher._service, "has_fresh_live_tickers", return_value=True):
+            await refresher.start()
+            for _ in range(100):
+                if refresher.get_stats()["markets_refreshes"]:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.02)
+            await refresher.stop()
+
+        assert refresher.get_stats()["tickers_refreshes"] == 0
+        mock_exchange.fetch_tickers.assert_not_called()
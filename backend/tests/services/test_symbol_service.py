@@ -474,30 +474,61 @@ class TestSymbolService:
         assert result == {}
 
     @patch("app.services.symbol_service.exchange_service")
-    def test_refresh_cache_clears_ticker_cache(self, mock_exchange_service):
-        """Test that refresh_cache clears ticker cache."""
+    def test_refresh_cache_replaces_ticker_cache(self, mock_exchange_service):
+        """Test that refresh_cache swaps in freshly fetched tickers."""
         # Mock exchange service
         mock_exchange = Mock()
         mock_exchange.load_markets.return_value = self.mock_markets
-        mock_exchange.fetch_tickers.return_value = {"BTC/USDT": {"last": 50000.0}}
+        mock_exchange.fetch_tickers.side_effect = [
+            {"BTC/USDT": {"last": 50000.0}},
+            {"BTC/USDT": {"last": 51000.0}},
+        ]
         mock_exchange_service.get_exchange.return_value = mock_exchange
         
         # Initialize caches
         self.symbol_service._fetch_tickers()
         self.symbol_service.resolve_symbol_to_exchange_format("BTCUSDT")
         
-        # Verify caches are loaded
-        stats_before = self.symbol_service.get_cache_stats()
-        assert stats_before["ticker_cache_loaded"] is True
-        assert stats_before["initialized"] is True
-        
         # Refresh cache
         self.symbol_service.refresh_cache()
         
-        # Verify ticker cache is cleared
+        # Verify new tickers were swapped in
         stats_after = self.symbol_service.get_cache_stats()
-        assert stats_after["ticker_cache_loaded"] is False
-        assert stats_after["ticker_cache_age_seconds"] is None
+        assert stats_after["ticker_cache_loaded"] is True
+        assert self.symbol_service._ticker_cache["BTC/USDT"]["last"] == 51000.0
+
+    @patch("app.services.symbol_service.exchange_service")
+    def test_refresh_cache_keeps_last_good_snapshot_on_failure(self, mock_exchange_service):
+        """Test that a failed refresh keeps serving the previous data."""
+        mock_exchange = Mock()
+        mock_exchange.load_markets.return_value = self.mock_markets
+        mock_exchange.fetch_tickers.return_value = {"BTC/USDT": {"last": 50000.0}}
+        mock_exchange_service.get_exchange.return_value = mock_exchange
+
+        self.symbol_service._fetch_tickers()
+        self.symbol_service.resolve_symbol_to_exchange_format("BTCUSDT")
+
+        mock_exchange.load_markets.side_effect = Exception("Exchange down")
+        mock_exchange.fetch_tickers.side_effect = Exception("Exchange down")
+        self.symbol_service.refresh_cache()
+
+        assert self.symbol_service.resolve_symbol_to_exchange_format("ETHUSDT") == "ETH/USDT"
+        assert self.symbol_service._ticker_cache == {"BTC/USDT": {"last": 50000.0}}
+
+    @patch("app.services.symbol_service.exchange_service")
+    def test_get_all_symbols_served_from_memory(self, mock_exchange_service):
+        """Test that the symbol list is prebuilt and not rebuilt per request."""
+        mock_exchange = Mock()
+        mock_exchange.options = {}
+        mock_exchange.load_markets.return_value = self.mock_markets
+        mock_exchange.fetch_tickers.return_value = {}
+        mock_exchange_service.get_exchange.return_value = mock_exchange
+
+        first = self.symbol_service.get_all_symbols()
+        second = self.symbol_service.get_all_symbols()
+
+        assert first == second
+        assert mock_exchange.fetch_tickers.call_count == 1
 
 
 # Integration test with actual exchange service (if available)
@@ -676,3 +707,76 @@ class TestSymbolServiceIntegration:
             symbol = result[0]
             assert "volume24h_formatted" in symbol
             assert symbol["volume24h_formatted"] == "1.23B"
+
+
+class TestSymbolMetadata:
+    """Test compiled symbol metadata records."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.symbol_service = SymbolService()
+
+    @patch("app.services.symbol_service.exchange_service")
+    def test_metadata_compiled_on_load(self, mock_exchange_service):
+        """Markets are compiled once and indexed by ID and exchange symbol."""
+        mock_exchange = Mock()
+        mock_exchange.load_markets.return_value = {
+            "BTC/USDT": {
+                "id": "BTCUSDT",
+                "symbol": "BTC/USDT",
+                "base": "BTC",
+                "quote": "USDT",
+                "active": True,
+                "type": "swap",
+                "precision": {"price": 0.1, "amount": 0.001},
+            }
+        }
+        mock_exchange_service.get_exchange.return_value = mock_exchange
+
+        self.symbol_service.resolve_symbol_to_exchange_format("BTCUSDT")
+
+        by_id = self.symbol_service.get_symbol_metadata("BTCUSDT")
+        by_symbol = self.symbol_service.get_symbol_metadata("BTC/USDT")
+        assert by_id is by_symbol
+        assert by_id.price_precision == 1
+        assert by_id.amount_precision == 3
+        assert by_id.tick_size == 0.1
+        assert by_id.price_format_spec == ".1f"
+        assert by_id.rounding_options == (0.1, 1.0, 10.0, 100.0, 1000.0)
+        assert self.symbol_service.get_cache_stats()["compiled_symbol_count"] == 1
+
+    def test_metadata_is_immutable(self):
+        """Compiled records cannot be modified by callers."""
+        import dataclasses
+
+        self.symbol_service._markets_cache = {
+            "ETH/USDT": {"id": "ETHUSDT", "symbol": "ETH/USDT", "type": "swap",
+                         "precision": {"price": 2, "amount": 3}}
+        }
+        self.symbol_service._symbol_cache = {"ETHUSDT": "ETH/USDT"}
+        self.symbol_service._cache_initialized = True
+
+        metadata = self.symbol_service.get_symbol_metadata("ETHUSDT")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            metadata.price_precision = 4
+
+        # Returned dicts are copies
+        info = self.symbol_service.get_symbol_info("ETHUSDT")
+        info["roundingOptions"].append(99)
+        assert 99 not in self.symbol_service.get_symbol_info("ETHUSDT")["roundingOptions"]
+
+    def test_current_price_limits_rounding_options(self):
+        """Current price limits rounding options to 1/10th of the price."""
+        self.symbol_service._markets_cache = {
+            "BTC/USDT": {"id": "BTCUSDT", "symbol": "BTC/USDT", "type": "swap",
+                         "precision": {"price": 0.1, "amount": 0.001}}
+        }
+        self.symbol_service._symbol_cache = {"BTCUSDT": "BTC/USDT"}
+        self.symbol_service._cache_initialized = True
+
+        info = self.symbol_service.get_symbol_info("BTCUSDT", current_price=50.0)
+        assert info["roundingOptions"] == [0.1, 1.0]
+        assert info["defaultRounding"] == 1.0
+
+        info = self.symbol_service.get_symbol_info("BTCUSDT", current_price=100000.0)
+        assert info["roundingOptions"] == [0.1, 1.0, 10.0, 100.0, 1000.0, 10000.0]
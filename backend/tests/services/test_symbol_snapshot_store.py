@@ -0,0 +1,153 @@
+"""
+Unit tests for the Symbol Snapshot Store.
+
+Tests the versioned disk snapshot used for warm starts and its use by the
+symbol refresher.
+"""
+
+import json
+
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.symbol_refresher import SymbolRefresher
+from app.services.symbol_service import SymbolService
+from app.services.symbol_snapshot_store import SNAPSHOT_FORMAT_VERSION, SymbolSnapshotStore
+
+
+MARKETS = {
+    "BTC/USDT:USDT": {
+        "id": "BTCUSDT",
+        "symbol": "BTC/USDT:USDT",
+        "base": "BTC",
+        "quote": "USDT",
+        "active": True,
+        "type": "swap",
+        "spot": False,
+        "precision": {"price": 0.1, "amount": 0.001},
+    },
+    "ETH/USDT:USDT": {
+        "id": "ETHUSDT",
+        "symbol": "ETH/USDT:USDT",
+        "base": "ETH",
+        "quote": "USDT",
+        "active": True,
+        "type": "swap",
+        "spot": False,
+        "precision": {"price": 2, "amount": 3},
+    },
+}
+
+
+@pytest.fixture
+def mock_exchange():
+    exchange = Mock()
+    exchange.options = {}
+    exchange.load_markets.return_value = MARKETS
+    exchange.fetch_tickers.return_value = {}
+    with patch("app.services.symbol_service.exchange_service") as mock_service:
+        mock_service.get_exchange.return_value = exchange
+        yield exchange
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SymbolSnapshotStore(str(tmp_path / "data" / "symbol_snapshot.json"))
+
+
+class TestSymbolSnapshotStore:
+    """Test cases for SymbolSnapshotStore."""
+
+    def test_round_trip_preserves_metadata(self, store):
+        service = SymbolService()
+        snapshot = service.build_markets_snapshot(MARKETS)
+
+        assert store.save(snapshot) == 2
+        loaded = store.load()
+
+        assert loaded.metadata_by_id == snapshot.metadata_by_id
+        assert loaded.symbol_cache == snapshot.symbol_cache
+        assert loaded.exchange_to_id == snapshot.exchange_to_id
+
+    def test_loaded_snapshot_serves_symbol_info(self, store):
+        service = SymbolService()
+        snapshot = service.build_markets_snapshot(MARKETS)
+        service.apply_markets_snapshot(snapshot)
+        expected = {symbol_id: service.get_symbol_info(symbol_id)
+                    for symbol_id in ("BTCUSDT", "ETHUSDT")}
+        store.save(snapshot)
+
+        warm = SymbolService()
+        warm.apply_markets_snapshot(store.load())
+
+        assert warm.resolve_symbol_to_exchange_format("BTCUSDT") == "BTC/USDT:USDT"
+        for symbol_id, info in expected.items():
+            assert warm.get_symbol_info(symbol_id) == info
+        # Recompiling the rebuilt markets gives the same metadata
+        assert warm.build_markets_snapshot(warm._markets_cache).metadata_by_id == \
+            snapshot.metadata_by_id
+
+    def test_missing_file(self, store):
+        assert store.load() is None
+
+    def test_incompatible_version_is_ignored(self, store):
+        store.save(SymbolService().build_markets_snapshot(MARKETS))
+        with open(store.path) as f:
+            payload = json.load(f)
+        payload["format_version"] = SNAPSHOT_FORMAT_VERSION + 1
+        with open(store.path, "w") as f:
+            json.dump(payload, f)
+
+        assert store.load() is None
+
+    def test_corrupt_file_is_ignored(self, store):
+        store.save(SymbolService().build_markets_snapshot(MARKETS))
+        with open(store.path, "w") as f:
+            f.write('{"format_version": 1, "symbols": [{"id": ')
+
+        assert store.load() is None
+
+
+class TestRefresherWarmStart:
+    """Test cases for disk warm starts in SymbolRefresher."""
+
+    def _refresher(self, store):
+        return SymbolRefresher(SymbolService(), markets_interval=3600, tickers_interval=3600,
+                               retry_base_delay=0.001, retry_max_delay=0.01, max_retries=0,
+                               snapshot_store=store)
+
+    @pytest.mark.asyncio
+    async def test_refresh_markets_persists_snapshot(self, store, mock_exchange):
+        refresher = self._refresher(store)
+
+        await refresher.refresh_markets()
+
+        assert set(store.load().metadata_by_id) == {"BTCUSDT", "ETHUSDT"}
+
+    @pytest.mark.asyncio
+    async def test_start_serves_disk_snapshot_before_exchange(self, store, mock_exchange):
+        store.save(SymbolService().build_markets_snapshot(MARKETS))
+        mock_exchange.load_markets.side_effect = Exception("exchange unavailable")
+        refresher = self._refresher(store)
+
+        await refresher.start()
+        try:
+            service = refresher._service
+            assert service.resolve_symbol_to_exchange_format("ETHUSDT") == "ETH/USDT:USDT"
+            assert [s["id"] for s in service.get_all_symbols()] == ["BTCUSDT", "ETHUSDT"]
+
+            stats = refresher.get_stats()
+            assert stats["first_ready_source"] == "disk"
+            assert stats["first_ready_seconds"] is not None
+        finally:
+            await refresher.stop()
+
+    @pytest.mark.asyncio
+    async def test_first_ready_from_exchange_without_snapshot(self, store, mock_exchange):
+        refresher = self._refresher(store)
+
+        assert await refresher.load_from_disk() is False
+        refresher._started_at = 0.0
+        await refresher.refresh_markets()
+
+        assert refresher.get_stats()["first_ready_source"] == "exchange"
@@ -0,0 +1,196 @@
+"""
+Unit tests for the Ticker Stream Service.
+
+Tests the live ticker table, incremental symbol list ordering and
+changed-row notifications from mini-ticker events.
+"""
+
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.symbol_service import SymbolService
+from app.services.ticker_stream_service import LiveTickerTable, TickerStreamService
+
+
+def _market(symbol_id, base):
+    return {
+        "id": symbol_id,
+        "symbol": f"{base}/USDT",
+        "base": base,
+        "quote": "USDT",
+        "active": True,
+        "type": "swap",
+        "spot": False,
+        "precision": {"price": 0.01, "amount": 0.001},
+    }
+
+
+MARKETS = {
+    "BTC/USDT": _market("BTCUSDT", "BTC"),
+    "ETH/USDT": _market("ETHUSDT", "ETH"),
+    "SOL/USDT": _market("SOLUSDT", "SOL"),
+}
+
+TICKERS = {
+    "BTC/USDT": {"last": 50000.0, "info": {"quoteVolume": "3000"}},
+    "ETH/USDT": {"last": 3000.0, "info": {"quoteVolume": "2000"}},
+    "SOL/USDT": {"last": 100.0, "info": {"quoteVolume": "1000"}},
+}
+
+
+def _mini_ticker(symbol_id, close, quote_volume):
+    return {"e": "24hrMiniTicker", "s": symbol_id, "c": str(close), "q": str(quote_volume)}
+
+
+class TestLiveTickerTable:
+    """Test cases for LiveTickerTable."""
+
+    def test_update_and_get(self):
+        table = LiveTickerTable()
+
+        assert table.update("BTCUSDT", 50000.0, 100.0) is True
+        assert table.get("BTCUSDT") == (50000.0, 100.0)
+        assert table.get("ETHUSDT") is None
+
+    def test_unchanged_volume_is_not_a_change(self):
+        table = LiveTickerTable()
+        table.update("BTCUSDT", 50000.0, 100.0)
+
+        assert table.update("BTCUSDT", 50001.0, 100.0) is False
+        assert table.get("BTCUSDT") == (50001.0, 100.0)
+
+    def test_ordering_is_maintained_incrementally(self):
+        table = LiveTickerTable()
+        table.update("A", 1.0, 10.0)
+        table.update("B", 1.0, 30.0)
+        table.update("C", 1.0, 20.0)
+        assert list(table.ordered_ids()) == ["B", "C", "A"]
+
+        table.update("A", 1.0, 40.0)
+        assert list(table.ordered_ids()) == ["A", "B", "C"]
+
+        # Zero volume drops out of the ranking
+        table.update("B", 1.0, 0.0)
+        assert list(table.ordered_ids()) == ["A", "C"]
+        assert not table.has_volume("B")
+
+
+class TestTickerStreamService:
+    """Test cases for TickerStreamService."""
+
+    @pytest.fixture
+    def service(self):
+        exchange = Mock()
+        exchange.options = {}
+        exchange.load_markets.return_value = MARKETS
+        exchange.fetch_tickers.return_value = TICKERS
+        with patch("app.services.symbol_service.exchange_service") as mock_service:
+            mock_service.get_exchange.return_value = exchange
+            symbol_service = SymbolService()
+            symbol_service._initialize_cache()
+            symbol_service._fetch_tickers()
+
+            stream = TickerStreamService(symbol_service, base_url="wss://example")
+            stream.seed_from_tickers(symbol_service._ticker_cache)
+            symbol_service.attach_live_tickers(stream.table)
+            yield stream
+
+    def test_seed_from_tickers(self, service):
+        assert len(service.table) == 3
+        assert service.table.get("ETHUSDT") == (3000.0, 2000.0)
+
+    def test_apply_mini_tickers_returns_changed_rows(self, service):
+        symbol_service = service._service
+        assert [s["id"] for s in symbol_service.get_all_symbols()] == \
+            ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+        rows = service.apply_mini_tickers([
+            _mini_ticker("SOLUSDT", 101.0, 5000),
+            _mini_ticker("BTCUSDT", 50000.0, 3000),  # Unchanged volume
+        ])
+
+        assert [row["id"] for row in rows] == ["SOLUSDT"]
+        assert rows[0]["volume24h"] == 5000.0
+        assert rows[0]["volume24h_formatted"] == "5.00K"
+
+    def test_symbol_list_reordered_without_refetch(self, service):
+        symbol_service = service._service
+        before = symbol_service.get_all_symbols()
+
+        service.apply_mini_tickers([_mini_ticker("SOLUSDT", 101.0, 5000)])
+        after = symbol_service.get_all_symbols()
+
+        assert [s["id"] for s in after] == ["SOLUSDT", "BTCUSDT", "ETHUSDT"]
+        # Previously returned lists and rows are not mutated
+        assert [s["id"] for s in before] == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+        assert before[2]["volume24h"] == 1000.0
+
+    def test_malformed_events_are_ignored(self, service):
+        service._service.get_all_symbols()
+
+        rows = service.apply_mini_tickers([{"s": "BTCUSDT"}, {"c": "1", "q": "2"}])
+
+        assert rows == []
+
+    def test_live_tickers_freshness(self, service):
+        symbol_service = service._service
+        assert not symbol_service.has_fresh_live_tickers()
+
+        service.apply_mini_tickers([_mini_ticker("BTCUSDT", 1.0, 1.0)])
+
+        assert symbol_service.has_fresh_live_tickers()
+
+    def test_stream_url(self, service):
+        assert service.stream_url == "wss://example/ws/!miniTicker@arr"
+
+
+class TestStartupSeeding:
+    """The stream starts before the refresher's first ticker poll lands."""
+
+    @pytest_asyncio.fixture
+    async def started(self):
+        exchange = Mock()
+        exchange.options = {}
+        exchange.load_markets.return_value = MARKETS
+        with patch("app.services.symbol_service.exchange_service") as mock_service:
+            mock_service.get_exchange.return_value = exchange
+            symbol_service = SymbolService()
+            symbol_service._initialize_cache()
+            symbol_service._background_refresh_active = True
+
+            stream = TickerStreamService(symbol_service, base_url="wss://example")
+            with patch.object(stream, "_maintain_connection", AsyncMock()):
+                await stream.start()
+                yield stream
+                await stream.stop()
+
+    @pytest.mark.asyncio
+    async def test_first_poll_seeds_and_orders(self, started):
+        symbol_service = started._service
+        assert len(started.table) == 0
+
+        symbol_service.apply_tickers(TICKERS)
+
+        assert started.table.get("ETHUSDT") == (3000.0, 2000.0)
+        assert [s["id"] for s in symbol_service.get_all_symbols()] == \
+            ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+    @pytest.mark.asyncio
+    async def test_live_values_win_over_polls(self, started):
+        symbol_service = started._service
+        symbol_service.apply_tickers(TICKERS)
+        started.apply_mini_tickers([_mini_ticker("SOLUSDT", 101.0, 5000)])
+
+        symbol_service.apply_tickers(TICKERS)
+
+        assert started.table.get("SOLUSDT") == (101.0, 5000.0)
+        assert symbol_service.get_all_symbols()[0]["id"] == "SOLUSDT"
+
+    @pytest.mark.asyncio
+    async def test_stop_unregisters(self, started):
+        await started.stop()
+
+        started._service.apply_tickers(TICKERS)
+
+        assert len(started.table) == 0
@@ -10,7 +10,7 @@ import time
 from unittest.mock import Mock, patch
 from fastapi import HTTPException
 
-from app.services.trade_service import TradeService
+from app.services.trade_service import RAW_TRADE_FIELDS, TradeService
 
 
 class TestTradeService:
@@ -271,4 +271,37 @@ class TestTradeService:
             result = self.trade_service.format_trade(zero_trade, self.mock_symbol_info)
             
             assert result['price'] == 1.0
-            assert result['amount'] == 1.0
\ No newline at end of file
+            assert result['amount'] == 1.0
+    def test_format_trades_matches_format_trade(self):
+        """Batch formatting gives the same rows as per-trade formatting."""
+        trades = [
+            dict(self.mock_trade_raw, id=str(i), price=108900.0 + i * 0.37, amount=0.001 * (i + 1))
+            for i in range(20)
+        ]
+        trades.insert(5, {'id': 'broken', 'price': None, 'amount': 1.0,
+                          'side': 'buy', 'timestamp': 1736267157000})
+
+        result = self.trade_service.format_trades(trades, self.mock_symbol_info)
+
+        expected = [self.trade_service.format_trade(trade, self.mock_symbol_info)
+                    for trade in trades if trade['id'] != 'broken']
+        assert result == expected
+
+    def test_compact_trades_rows(self):
+        """Raw-mode rows follow RAW_TRADE_FIELDS and match the formatted trades' values."""
+        trades = [
+            dict(self.mock_trade_raw, id=str(i), price=108900.0 + i, amount=0.001 * (i + 1))
+            for i in range(3)
+        ]
+        trades.append({'id': 'broken', 'price': None, 'amount': 1.0,
+                       'side': 'buy', 'timestamp': 1736267157000})
+
+        rows = self.trade_service.compact_trades(trades)
+        formatted = self.trade_service.format_trades(trades, self.mock_symbol_info)
+
+        assert len(rows) == 3
+        assert [dict(zip(RAW_TRADE_FIELDS, row)) for row in rows] == [
+            {field: trade[field] for field in RAW_TRADE_FIELDS} for trade in formatted
+        ]
+        # Formatted trades convert back to the same rows
+        assert self.trade_service.compact_trades(formatted) == rows
@@ -0,0 +1,138 @@
+"""
+Tests for the volume profile service.
+
+Covers integer-tick bucketing, bucket merging for coarser roundings,
+session handling and the REST response payload.
+"""
+
+import pytest
+from app.services.volume_profile_service import VolumeProfile, VolumeProfileService
+
+# 2024-01-01 00:00:00 UTC and 2024-01-02 00:00:00 UTC in milliseconds
+DAY1_MS = 1704067200000
+DAY2_MS = DAY1_MS + 24 * 60 * 60 * 1000
+
+SYMBOL_INFO = {'pricePrecision': 1, 'amountPrecision': 3}
+
+
+def make_trade(price, amount, side='buy', timestamp=DAY1_MS):
+    return {'price': price, 'amount': amount, 'side': side, 'timestamp': timestamp}
+
+
+class TestVolumeProfile:
+    """Test the sparse tick histogram."""
+
+    def test_add_trade_uses_integer_ticks(self):
+        profile = VolumeProfile('BTCUSDT', '2024-01-01', 0.1)
+        profile.add_trade(100.1, 1.0, 'buy')
+        profile.add_trade(100.1, 2.0, 'sell')
+        profile.add_trade(100.3, 0.5, 'buy')
+
+        assert profile.bucket_count() == 2
+        assert profile.get_histogram() == [(100.1, 1.0, 2.0), (100.3, 0.5, 0.0)]
+        assert profile.trade_count == 3
+        assert profile.total_volume == pytest.approx(3.5)
+
+    def test_ignores_non_positive_trades(self):
+        profile = VolumeProfile('BTCUSDT', '2024-01-01', 0.1)
+        profile.add_trade(0, 1.0, 'buy')
+        profile.add_trade(100.0, 0, 'buy')
+
+        assert profile.bucket_count() == 0
+        assert profile.trade_count == 0
+
+    def test_coarser_rounding_merges_buckets(self):
+        profile = VolumeProfile('BTCUSDT', '2024-01-01', 0.1)
+        for price in (100.0, 100.4, 100.9, 101.0, 109.9):
+            profile.add_trade(price, 1.0, 'buy')
+
+        assert profile.get_histogram(1.0) == [
+            (100.0, 3.0, 0.0), (101.0, 1.0, 0.0), (109.0, 1.0, 0.0)]
+        assert profile.get_histogram(10.0) == [(100.0, 5.0, 0.0)]
+        # Merging never mutates the tick-level buckets
+        assert profile.bucket_count() == 5
+
+    def test_rejects_rounding_off_tick_grid(self):
+        profile = VolumeProfile('BTCUSDT', '2024-01-01', 0.1)
+        profile.add_trade(100.0, 1.0, 'buy')
+
+        with pytest.raises(ValueError):
+            profile.get_histogram(0.25)
+
+    def test_invalid_tick_size(self):
+        with pytest.raises(ValueError):
+            VolumeProfile('BTCUSDT', '2024-01-01', 0)
+
+
+class TestVolumeProfileService:
+    """Test per-symbol/session profile management."""
+
+    @pytest.fixture
+    def service(self):
+        return VolumeProfileService(max_sessions_per_symbol=2)
+
+    def test_tick_size_from_symbol_info(self, service):
+        assert service.tick_size_for({'pricePrecision': 4}) == pytest.approx(0.0001)
+        assert service.tick_size_for({}) == 0.01
+        assert service.tick_size_for(None) == 0.01
+
+    def test_record_trades_skips_malformed(self, service):
+        trades = [make_trade(100.0, 1.0), {'price': 'bad'}, {'amount': 1.0}]
+
+        assert service.record_trades('BTCUSDT', trades, SYMBOL_INFO) == 1
+        assert service.get_profile('BTCUSDT').trade_count == 1
+
+    def test_sessions_split_by_utc_day(self, service):
+        service.record_trades('BTCUSDT', [
+            make_trade(100.0, 1.0, timestamp=DAY1_MS),
+            make_trade(100.0, 2.0, timestamp=DAY2_MS),
+        ], SYMBOL_INFO)
+
+        assert service.get_profile('BTCUSDT', '2024-01-01').total_volume == 1.0
+        assert service.get_profile('BTCUSDT', '2024-01-02').total_volume == 2.0
+        # Latest session is the default
+        assert service.get_profile('BTCUSDT').session == '2024-01-02'
+
+    def test_old_sessions_are_dropped(self, service):
+        for day in range(3):
+            service.record_trades('BTCUSDT', [
+                make_trade(100.0, 1.0, timestamp=DAY1_MS + day * 86400000)
+            ], SYMBOL_INFO)
+
+        assert service.get_profile('BTCUSDT', '2024-01-01') is None
+        assert service.get_stats()['profiles'] == 2
+
+    def test_build_profile_response(self, service):
+        service.record_trades('BTCUSDT', [
+            make_trade(100.1, 1.0, 'buy'),
+            make_trade(100.2, 3.0, 'sell'),
+            make_trade(101.5, 1.0, 'buy'),
+        ], SYMBOL_INFO)
+
+        result = service.build_profile_response(
+            'BTCUSDT', 'BTCUSDT', rounding=1.0, symbol_info=SYMBOL_INFO)
+
+        assert result['session'] == '2024-01-01'
+        assert result['trade_count'] == 3
+        assert result['point_of_control'] == 100.0
+        assert [row['price'] for row in result['data']] == [100.0, 101.0]
+        assert result['data'][0]['buy_volume'] == 1.0
+        assert result['data'][0]['sell_volume'] == 3.0
+        assert result['data'][0]['price_formatted'] == '100'
+
+    def test_build_profile_response_without_data(self, service):
+        result = service.build_profile_response(
+            'ETHUSDT', 'ETHUSDT', symbol_info=SYMBOL_INFO)
+
+        assert result['data'] == []
+        assert result['point_of_control'] is None
+        assert result['rounding'] == pytest.approx(0.1)
+
+    def test_clear_symbol(self, service):
+        service.record_trades('BTCUSDT', [make_trade(100.0, 1.0)], SYMBOL_INFO)
+        service.record_trades('ETHUSDT', [make_trade(10.0, 1.0)], SYMBOL_INFO)
+
+        service.clear('BTCUSDT')
+
+        assert service.get_profile('BTCUSDT') is None
+        assert service.get_profile('ETHUSDT') is not None
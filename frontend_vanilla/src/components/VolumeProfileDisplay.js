@@ -0,0 +1,126 @@
+/**
+ * Volume Profile Display Component
+ *
+ * Renders the session volume-by-price histogram next to the candlestick
+ * chart. Follows the thin client pattern - the backend aggregates and
+ * formats the buckets, this component only scales the bars.
+ */
+
+import { subscribe, state } from '../store/store.js';
+import volumeProfileService from '../services/volumeProfileService.js';
+
+export class VolumeProfileDisplay {
+    constructor(container) {
+        this.container = container;
+        this.refreshInterval = 5000;
+        this.maxRows = 60;
+        this.timer = null;
+
+        this.init();
+    }
+
+    init() {
+        this.render();
+        this.setupStateSubscriptions();
+        this.startPolling();
+    }
+
+    render() {
+        this.container.innerHTML = `
+            <div class="orderfox-volume-profile orderfox-display-base">
+                <div class="display-header">
+                    <h3>Volume Profile</h3>
+                    <span class="session-label"></span>
+                </div>
+                <div class="display-content">
+                    <div class="volume-profile-list">
+                        <div class="empty-state">Waiting for trades...</div>
+                    </div>
+                </div>
+            </div>
+        `;
+
+        this.listEl = this.container.querySelector('.volume-profile-list');
+        this.sessionEl = this.container.querySelector('.session-label');
+    }
+
+    async refresh() {
+        const symbol = state.selectedSymbol;
+        if (!symbol) {
+            return;
+        }
+
+        const profile = await volumeProfileService.fetchVolumeProfile(symbol, state.selectedRounding);
+        // Ignore stale responses after a symbol switch
+        if (!profile || symbol !== state.selectedSymbol) {
+            return;
+        }
+
+        this.renderProfile(profile);
+    }
+
+    renderProfile(profile) {
+        this.sessionEl.textContent = profile.session || '';
+
+        if (!profile.data || profile.data.length === 0) {
+            this.listEl.innerHTML = '<div class="empty-state">Waiting for trades...</div>';
+            return;
+        }
+
+        // Keep the rows closest to the point of control when the profile is tall
+        let rows = profile.data;
+        if (rows.length > this.maxRows) {
+            const pocIndex = Math.max(0, rows.findIndex(row => row.price === profile.point_of_control));
+            const start = Math.min(Math.max(0, pocIndex - Math.floor(this.maxRows / 2)), rows.length - this.maxRows);
+            rows = rows.slice(start, start + this.maxRows);
+        }
+
+        const maxVolume = Math.max(...rows.map(row => row.total_volume)) || 1;
+
+        // Highest price first, matching the chart's vertical axis
+        this.listEl.innerHTML = rows
+            .slice()
+            .reverse()
+            .map(row => {
+                const buyWidth = (row.buy_volume / maxVolume) * 100;
+                const sellWidth = (row.sell_volume / maxVolume) * 100;
+                const pocClass = row.price === profile.point_of_control ? ' poc' : '';
+                return `
+                    <div class="volume-profile-row${pocClass}" title="${row.total_volume_formatted}">
+                        <span class="display-price">${row.price_formatted}</span>
+                        <span class="volume-profile-bar">
+                            <span class="bar-buy" style="width: ${buyWidth}%"></span>
+                            <span class="bar-sell" style="width: ${sellWidth}%"></span>
+                        </span>
+                    </div>
+                `;
+            })
+            .join('');
+    }
+
+    startPolling() {
+        this.stopPolling();
+        this.refresh();
+        this.timer = setInterval(() => this.refresh(), this.refreshInterval);
+    }
+
+    stopPolling() {
+        if (this.timer) {
+            clearInterval(this.timer);
+            this.timer = null;
+        }
+    }
+
+    setupStateSubscriptions() {
+        subscribe((key) => {
+            if (key === 'selectedSymbol' || key === 'selectedRounding') {
+                this.listEl.innerHTML = '<div class="empty-state">Loading...</div>';
+                this.refresh();
+            }
+        });
+    }
+
+    cleanup() {
+        this.stopPolling();
+    }
+}
@@ -100,6 +100,11 @@ export function createMainLayout() {
   candlestickChartPlaceholder.textContent = 'CandlestickChart';
   chartSection.appendChild(candlestickChartPlaceholder);
   
+  const volumeProfilePlaceholder = document.createElement('div');
+  volumeProfilePlaceholder.id = 'volume-profile-container';
+  volumeProfilePlaceholder.className = 'volume-profile-container';
+  chartSection.appendChild(volumeProfilePlaceholder);
+  
   // Bottom Section - OrderBook, Trades, and Liquidations Side by Side
   const bottomSection = document.createElement('div');
   bottomSection.className = 'bottom-section grid grid-cols-1 lg:grid-cols-3 gap-4 w-full';
@@ -6,6 +6,7 @@ import { createCandlestickChart, createTimeframeSelector, createVolumeToggleButt
 import { createOrderBookDisplay, updateOrderBookDisplay } from './components/OrderBookDisplay.js';
 import { createLastTradesDisplay, updateLastTradesDisplay, updateTradesHeaders } from './components/LastTradesDisplay.js';
 import { LiquidationDisplay } from './components/LiquidationDisplay.js';
+import { VolumeProfileDisplay } from './components/VolumeProfileDisplay.js';
 import { createThemeSwitcher, initializeTheme } from './components/ThemeSwitcher.js';
 import { createBotNavigation, addNavigationEventListeners, showSelectedBotInfo } from './components/BotNavigation.js';
 import { createBotList, updateBotList, addBotListEventListeners } from './components/BotList.js';
@@ -52,6 +53,7 @@ const candlestickChartPlaceholder = document.querySelector('#candlestick-chart-p
 const orderBookPlaceholder = document.querySelector('#order-book-placeholder');
 const lastTradesPlaceholder = document.querySelector('#last-trades-container');
 const liquidationPlaceholder = document.querySelector('#liquidation-container');
+const volumeProfilePlaceholder = document.querySelector('#volume-profile-container');
 const themeSwitcherPlaceholder = document.querySelector('#theme-switcher-placeholder');
 const botNavigationPlaceholder = document.querySelector('#bot-navigation-placeholder');
 const botListPlaceholder = document.querySelector('#bot-list-placeholder');
@@ -72,6 +74,9 @@ lastTradesPlaceholder.replaceWith(lastTradesDisplay);
 // Initialize liquidation display
 const liquidationDisplay = new LiquidationDisplay(liquidationPlaceholder); // eslint-disable-line no-unused-vars
 
+// Initialize volume profile histogram next to the chart
+const volumeProfileDisplay = new VolumeProfileDisplay(volumeProfilePlaceholder); // eslint-disable-line no-unused-vars
+
 
 const themeSwitcher = createThemeSwitcher();
 themeSwitcherPlaceholder.replaceWith(themeSwitcher);
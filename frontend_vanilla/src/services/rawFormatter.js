@@ -0,0 +1,148 @@
+/**
+ * Client-side formatting for raw-numbers WebSocket mode.
+ *
+ * With `?raw=true` the backend sends plain numbers plus a formatting
+ * descriptor (see backend `SymbolFormatter.describe`). The functions here
+ * rebuild the same display strings the backend would have sent, so the
+ * display components can keep reading the *_formatted fields.
+ */
+
+const DEFAULT_ZERO = '0.00';
+
+/**
+ * Python-style scientific notation ("1.00e-06" rather than "1.00e-6")
+ * @param {number} value - Value to format
+ * @param {number} digits - Digits after the decimal point
+ * @returns {string} Formatted value
+ */
+function toScientific(value, digits) {
+  return value.toExponential(digits).replace(/e([+-])(\d)$/, 'e$10$2');
+}
+
+/**
+ * Fixed-point formatting with Python's round-half-even on exact ties
+ * (toFixed rounds exact ties away from zero: 0.5 -> "1" instead of "0")
+ * @param {number} value - Value to format
+ * @param {number} digits - Digits after the decimal point
+ * @returns {string} Formatted value
+ */
+function toFixed(value, digits) {
+  const fixed = value.toFixed(digits);
+  const extra = Math.min(100, digits + 40) - digits;
+  const expanded = Math.abs(value).toFixed(digits + extra);
+  if (!/^50*$/.test(expanded.slice(-extra))) return fixed;
+
+  let truncated = expanded.slice(0, -extra);
+  if (truncated.endsWith('.')) truncated = truncated.slice(0, -1);
+  if (Number(truncated.slice(-1)) % 2 !== 0) return fixed;
+  return value < 0 ? `-${truncated}` : truncated;
+}
+
+/**
+ * Format with compact K/M suffixes when a threshold applies
+ * @param {number} value - Value to format
+ * @param {Object} spec - Amount or total descriptor
+ * @returns {string|null} Compact string, or null if below all thresholds
+ */
+function toCompact(value, spec) {
+  const magnitude = Math.abs(value);
+  for (const [threshold, suffix] of spec.compact || []) {
+    if (magnitude >= threshold) {
+      return `${toFixed(value / threshold, spec.compactDecimals)}${suffix}`;
+    }
+  }
+  return null;
+}
+
+/**
+ * Build price, amount and total formatters from a backend descriptor
+ * @param {Object} descriptor - Descriptor from a format_descriptor message
+ * @returns {{price: Function, amount: Function, total: Function}} Formatters
+ */
+export function createFormatter(descriptor) {
+  const zero = descriptor.zero || DEFAULT_ZERO;
+  const scientificDecimals = descriptor.scientificDecimals ?? 2;
+  const priceSpec = descriptor.price;
+  const amountSpec = descriptor.amount;
+  const totalSpec = descriptor.total;
+
+  const price = (value) => {
+    if (value === null || value === undefined || value === 0) return zero;
+    const magnitude = Math.abs(value);
+    const halfRounding = priceSpec.scientificBelowHalfRounding;
+    if (magnitude < priceSpec.scientificBelow && (halfRounding === null || magnitude < halfRounding)) {
+      return toScientific(value, scientificDecimals);
+    }
+    if (priceSpec.decimals === null) return String(value);
+    if (priceSpec.wholeAsInteger && Number.isInteger(value)) return String(value);
+    return toFixed(value, priceSpec.decimals);
+  };
+
+  const amount = (value) => {
+    if (value === null || value === undefined || value === 0) return zero;
+    if (Math.abs(value) < amountSpec.scientificBelow) return toScientific(value, scientificDecimals);
+    return toCompact(value, amountSpec) ?? toFixed(value, amountSpec.decimals);
+  };
+
+  const total = (value) => {
+    if (value === null || value === undefined || value === 0) return zero;
+    const compact = toCompact(value, totalSpec);
+    if (compact !== null) return compact;
+    const magnitude = Math.abs(value);
+    if (magnitude < totalSpec.scientificBelow) return toScientific(value, scientificDecimals);
+    if (magnitude < totalSpec.smallBelow) return toFixed(value, totalSpec.smallDecimals);
+    return toFixed(value, totalSpec.decimals);
+  };
+
+  return { price, amount, total };
+}
+
+/**
+ * Format a millisecond timestamp as local HH:MM:SS
+ * @param {number} timestamp - Unix timestamp in milliseconds
+ * @returns {string} Formatted time
+ */
+export function formatTime(timestamp) {
+  const date = new Date(timestamp);
+  if (Number.isNaN(date.getTime())) return 'Invalid';
+  return [date.getHours(), date.getMinutes(), date.getSeconds()]
+    .map((part) => String(part).padStart(2, '0'))
+    .join(':');
+}
+
+/**
+ * Expand raw [price, amount, cumulative] levels into display level objects
+ * @param {Array<Array<number>>} levels - Raw order book levels
+ * @param {Object} formatter - Formatter from createFormatter
+ * @returns {Array<Object>} Levels with *_formatted fields
+ */
+export function expandOrderbookLevels(levels, formatter) {
+  return levels.map(([price, amount, cumulative]) => ({
+    price,
+    amount,
+    cumulative,
+    price_formatted: formatter.price(price),
+    amount_formatted: formatter.amount(amount),
+    cumulative_formatted: formatter.total(cumulative)
+  }));
+}
+
+/**
+ * Expand raw trade rows into display trade objects
+ * @param {Array<Array>} rows - Raw trade rows
+ * @param {Array<string>} fields - Row layout from the initial trades message
+ * @param {Object} formatter - Formatter from createFormatter
+ * @returns {Array<Object>} Trades with *_formatted fields
+ */
+export function expandTrades(rows, fields, formatter) {
+  return rows.map((row) => {
+    const trade = {};
+    fields.forEach((field, index) => {
+      trade[field] = row[index];
+    });
+    trade.price_formatted = formatter.price(trade.price);
+    trade.amount_formatted = formatter.amount(trade.amount);
+    trade.time_formatted = formatTime(trade.timestamp);
+    return trade;
+  });
+}
@@ -0,0 +1,71 @@
+import { API_BASE_URL } from '../config/env.js';
+
+class VolumeProfileService {
+  constructor() {
+    this.cache = new Map();
+    this.cacheTimeout = 2000; // Profile changes with every trade, keep cache short
+  }
+
+  /**
+   * Fetch volume profile histogram from the API
+   * @param {string} symbol - Trading symbol (e.g., BTCUSDT)
+   * @param {number} [rounding] - Price bucket size (defaults to tick size on the backend)
+   * @param {string} [session] - UTC session date (YYYY-MM-DD)
+   * @returns {Promise<Object|null>} Volume profile response or null on error
+   */
+  async fetchVolumeProfile(symbol, rounding = null, session = null) {
+    const cacheKey = `${symbol}:${rounding}:${session}`;
+
+    const cached = this.cache.get(cacheKey);
+    if (cached && Date.now() - cached.timestamp < this.cacheTimeout) {
+      return cached.data;
+    }
+
+    try {
+      let url = `${API_BASE_URL}/volume-profile/${symbol}`;
+      const params = new URLSearchParams();
+
+      if (rounding) {
+        params.append('rounding', rounding);
+      }
+      if (session) {
+        params.append('session', session);
+      }
+
+      if (params.toString()) {
+        url += `?${params.toString()}`;
+      }
+
+      const response = await fetch(url);
+
+      if (!response.ok) {
+        throw new Error(`Failed to fetch volume profile: ${response.statusText}`);
+      }
+
+      const result = await response.json();
+
+      this.cache.set(cacheKey, {
+        data: result,
+        timestamp: Date.now()
+      });
+
+      return result;
+
+    } catch (error) {
+      console.error('Error fetching volume profile:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Clear all cache
+   */
+  clearCache() {
+    this.cache.clear();
+  }
+}
+
+// Create singleton instance
+const volumeProfileService = new VolumeProfileService();
+
+export default volumeProfileService;
@@ -0,0 +1,86 @@
+import { describe, it, expect } from 'vitest';
+import {
+  createFormatter,
+  expandOrderbookLevels,
+  expandTrades
+} from '../../src/services/rawFormatter.js';
+
+// Descriptor as sent by the backend for pricePrecision=1, amountPrecision=3, rounding=10
+const descriptor = {
+  version: 1,
+  zero: '0.00',
+  scientificDecimals: 2,
+  price: {
+    rounding: 10,
+    decimals: 0,
+    wholeAsInteger: true,
+    scientificBelow: 0.00001,
+    scientificBelowHalfRounding: null
+  },
+  amount: {
+    decimals: 3,
+    compact: [[1000000, 'M'], [1000, 'K']],
+    compactDecimals: 2,
+    scientificBelow: 0.00001
+  },
+  total: {
+    decimals: 2,
+    compact: [[1000000, 'M'], [1000, 'K']],
+    compactDecimals: 2,
+    smallBelow: 0.01,
+    smallDecimals: 4,
+    scientificBelow: 0.00001
+  }
+};
+
+describe('rawFormatter', () => {
+  const formatter = createFormatter(descriptor);
+
+  it('formats prices like the backend', () => {
+    expect(formatter.price(50010)).toBe('50010');
+    expect(formatter.price(50012.5)).toBe('50012'); // round half to even
+    expect(formatter.price(0)).toBe('0.00');
+    expect(formatter.price(0.000004)).toBe('4.00e-06');
+  });
+
+  it('formats amounts with compact notation', () => {
+    expect(formatter.amount(1.23456)).toBe('1.235');
+    expect(formatter.amount(1500)).toBe('1.50K');
+    expect(formatter.amount(2500000)).toBe('2.50M');
+  });
+
+  it('formats totals', () => {
+    expect(formatter.total(0.005)).toBe('0.0050');
+    expect(formatter.total(12.345)).toBe('12.35');
+    expect(formatter.total(-2500.5)).toBe('-2.50K');
+  });
+
+  it('falls back to plain strings without a price precision', () => {
+    const plain = createFormatter({ ...descriptor, price: { ...descriptor.price, rounding: null, decimals: null, wholeAsInteger: false } });
+    expect(plain.price(1.5)).toBe('1.5');
+  });
+
+  it('expands raw order book levels', () => {
+    const [level] = expandOrderbookLevels([[50010, 1500, 1500.5]], formatter);
+
+    expect(level).toEqual({
+      price: 50010,
+      amount: 1500,
+      cumulative: 1500.5,
+      price_formatted: '50010',
+      amount_formatted: '1.50K',
+      cumulative_formatted: '1.50K'
+    });
+  });
+
+  it('expands raw trade rows', () => {
+    const fields = ['id', 'price', 'amount', 'side', 'timestamp'];
+    const [trade] = expandTrades([['1', 50010, 0.5, 'buy', 1640995200000]], fields, formatter);
+
+    expect(trade.id).toBe('1');
+    expect(trade.side).toBe('buy');
+    expect(trade.price_formatted).toBe('50010');
+    expect(trade.amount_formatted).toBe('0.500');
+    expect(trade.time_formatted).toMatch(/^\d{2}:\d{2}:\d{2}$/);
+  });
+});
@@ -0,0 +1,84 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+
+// Mock fetch globally
+global.fetch = vi.fn();
+
+// Mock config
+vi.mock('../../src/config/env.js', () => ({
+  API_BASE_URL: 'http://localhost:8000/api/v1'
+}));
+
+describe('VolumeProfileService', () => {
+  let volumeProfileService;
+
+  const mockResponse = {
+    symbol: 'BTCUSDT',
+    session: '2024-01-01',
+    rounding: 1,
+    tick_size: 0.1,
+    trade_count: 3,
+    total_volume: 5,
+    point_of_control: 100,
+    data: [
+      {
+        price: 100,
+        buy_volume: 1,
+        sell_volume: 3,
+        total_volume: 4,
+        price_formatted: '100',
+        total_volume_formatted: '4.000'
+      }
+    ]
+  };
+
+  beforeEach(async () => {
+    vi.clearAllMocks();
+    global.fetch.mockClear();
+
+    const module = await import('../../src/services/volumeProfileService.js');
+    volumeProfileService = module.default;
+    volumeProfileService.clearCache();
+  });
+
+  afterEach(() => {
+    vi.clearAllMocks();
+  });
+
+  it('should fetch volume profile with rounding', async () => {
+    global.fetch.mockResolvedValueOnce({
+      ok: true,
+      json: async () => mockResponse
+    });
+
+    const result = await volumeProfileService.fetchVolumeProfile('BTCUSDT', 1);
+
+    expect(global.fetch).toHaveBeenCalledWith(
+      'http://localhost:8000/api/v1/volume-profile/BTCUSDT?rounding=1'
+    );
+    expect(result).toEqual(mockResponse);
+  });
+
+  it('should use cache for repeated requests', async () => {
+    global.fetch.mockResolvedValueOnce({
+      ok: true,
+      json: async () => mockResponse
+    });
+
+    await volumeProfileService.fetchVolumeProfile('BTCUSDT', 1);
+    const result = await volumeProfileService.fetchVolumeProfile('BTCUSDT', 1);
+
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+    expect(result).toEqual(mockResponse);
+  });
+
+  it('should return null on API error', async () => {
+    global.fetch.mockResolvedValueOnce({
+      ok: false,
+      statusText: 'Bad Request'
+    });
+
+    const result = await volumeProfileService.fetchVolumeProfile('BTCUSDT', 0.25);
+
+    expect(result).toBeNull();
+  });
+});